@@ -8,6 +8,8 @@ Example: python3 add_emoji_to_json.py chicken_gun "<:chicken_gun:1234567890>"
 import json
 import sys
 
+from structure.emoji import reload_emojis
+
 def add_emoji(item_id, emoji_string):
     """Add an emoji to emojis.json"""
     try:
@@ -21,6 +23,9 @@ def add_emoji(item_id, emoji_string):
         # Save back to file
         with open('emojis.json', 'w') as f:
             json.dump(emojis, f, indent=2)
+
+        # Make lookups in this process see the new entry right away
+        reload_emojis()
         
         print(f"✅ Added emoji for '{item_id}': {emoji_string}")
         return True
@@ -2,19 +2,36 @@
 """
 Automated Database Backup and Maintenance System
 - Daily backups at noon UTC (keeps last 4 backups)
+- Hourly differential archives of the pages changed since the last backup
 - Weekly database vacuum on Sundays at noon UTC
 - Persistent through bot restarts using file-based scheduling
+
+Backups are taken with SQLite's online backup API in a worker thread, so
+they are consistent snapshots of the live WAL database and never block the
+bot's event loop. Every archive gets a sha256sum-style checksum file.
+
+Restore (bot stopped):  python3 automated_maintenance.py restore <backup> [--target new_player.db]
 """
 
+import argparse
 import asyncio
+import gzip
+import hashlib
 import os
 import shutil
 import sqlite3
+import struct
+import sys
+import tempfile
 import json
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 
+BACKUP_PAGES_PER_STEP = 1024   # pages copied per backup step for rollback-journal databases
+BACKUP_STEP_SLEEP = 0.01       # seconds between steps, so writers can take the lock
+CHUNK_SIZE = 1024 * 1024
+
 class AutomatedMaintenance:
     """Handles automated database backup and maintenance"""
     
@@ -28,6 +45,7 @@ class AutomatedMaintenance:
         self.backup_hour = 12  # Noon UTC
         self.vacuum_day = 6    # Sunday (0=Monday, 6=Sunday)
         self.max_backups = 4   # Keep last 4 backups
+        self.compress_backups = True
         
         self.setup_logging()
     
@@ -105,8 +123,79 @@ class AutomatedMaintenance:
         
         return next_vacuum.isoformat()
     
+    def snapshot(self, dest_path):
+        """Copy the live database to dest_path with SQLite's online backup API"""
+        source = sqlite3.connect(self.db_path, timeout=30)
+        dest = sqlite3.connect(str(dest_path))
+        try:
+            wal = source.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+            # A WAL reader never blocks writers, and stepping would restart on every
+            # write, so copy one snapshot in a single step. Rollback-journal databases
+            # are copied a few pages at a time so writers can get in between steps.
+            source.backup(dest, pages=-1 if wal else BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP)
+        finally:
+            dest.close()
+            source.close()
+
+    def check_integrity(self, db_path):
+        conn = sqlite3.connect(str(db_path))
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            conn.close()
+        if result != "ok":
+            raise RuntimeError(f"integrity check failed for {Path(db_path).name}: {result}")
+
+    def compress(self, path):
+        """Gzip path in place and return the new path"""
+        compressed = Path(f"{path}.gz")
+        with open(path, "rb") as src, gzip.open(compressed, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        os.remove(path)
+        return compressed
+
+    def extract(self, backup_path, dest_path):
+        """Write the plain database held in a (possibly gzipped) backup to dest_path"""
+        opener = gzip.open if str(backup_path).endswith(".gz") else open
+        with opener(backup_path, "rb") as src, open(dest_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+    def file_checksum(self, path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def write_checksum(self, path):
+        """Record the archive's sha256 next to it (readable by `sha256sum -c`)"""
+        checksum = self.file_checksum(path)
+        Path(f"{path}.sha256").write_text(f"{checksum}  {Path(path).name}\n")
+        return checksum
+
+    def verify_checksum(self, path):
+        """True if the archive matches its recorded checksum"""
+        checksum_file = Path(f"{path}.sha256")
+        if not checksum_file.exists():
+            self.logger.warning(f"⚠️ No checksum recorded for {Path(path).name}")
+            return False
+        expected = checksum_file.read_text().split()[0]
+        return self.file_checksum(path) == expected
+
+    def list_backups(self, directory=None):
+        """Full backups, newest first"""
+        directory = Path(directory or self.backup_dir)
+        backups = [path for path in directory.glob("new_player_backup_*")
+                   if path.name.endswith((".db", ".db.gz"))]
+        return sorted(backups, key=lambda path: path.name, reverse=True)
+
+    def list_differentials(self, directory=None):
+        """Differential archives, newest first"""
+        directory = Path(directory or self.backup_dir)
+        return sorted(directory.glob("new_player_diff_*.pages.gz"), key=lambda path: path.name, reverse=True)
+
     def create_backup(self):
-        """Create database backup"""
+        """Create a consistent, verified database backup (blocking; run it off the event loop)"""
         try:
             if not os.path.exists(self.db_path):
                 self.logger.error("Database not found for backup")
@@ -118,15 +207,24 @@ class AutomatedMaintenance:
             backup_path = self.backup_dir / backup_filename
             
             # Create backup
-            shutil.copy2(self.db_path, backup_path)
+            self.snapshot(backup_path)
+            self.check_integrity(backup_path)
+            if self.compress_backups:
+                backup_path = self.compress(backup_path)
+            self.write_checksum(backup_path)
             
             # Get sizes
             original_size = os.path.getsize(self.db_path)
             backup_size = os.path.getsize(backup_path)
             
-            self.logger.info(f"✅ Database backup created: {backup_filename}")
-            self.logger.info(f"📊 Backup size: {self.format_size(backup_size)}")
+            self.logger.info(f"✅ Database backup created: {backup_path.name}")
+            self.logger.info(f"📊 Backup size: {self.format_size(backup_size)} (database {self.format_size(original_size)})")
             
+            # Differentials were taken against the previous backup
+            for differential in self.list_differentials():
+                differential.unlink()
+                Path(f"{differential}.sha256").unlink(missing_ok=True)
+
             # Clean old backups
             self.cleanup_old_backups()
             
@@ -135,21 +233,136 @@ class AutomatedMaintenance:
         except Exception as e:
             self.logger.error(f"❌ Backup failed: {e}")
             return False
+
+    def create_differential(self):
+        """
+        Archive the pages that changed since the latest full backup.
+        Each differential is taken against that backup, so a restore needs
+        the backup plus only the newest differential.
+        """
+        try:
+            backups = self.list_backups()
+            if not backups or not os.path.exists(self.db_path):
+                return False
+            base = backups[0]
+
+            with tempfile.TemporaryDirectory(dir=self.backup_dir) as tmp:
+                base_db = Path(tmp) / "base.db"
+                snapshot_db = Path(tmp) / "snapshot.db"
+                self.extract(base, base_db)
+                self.snapshot(snapshot_db)
+                self.check_integrity(snapshot_db)
+
+                with open(snapshot_db, "rb") as f:
+                    page_size = struct.unpack(">H", f.read(100)[16:18])[0]
+                page_size = 65536 if page_size == 1 else page_size
+                snapshot_size = os.path.getsize(snapshot_db)
+
+                timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+                diff_path = self.backup_dir / f"new_player_diff_{timestamp}.pages.gz"
+                changed = 0
+                with open(base_db, "rb") as old, open(snapshot_db, "rb") as new, \
+                        gzip.open(diff_path, "wb") as out:
+                    header = {
+                        "base": base.name, "page_size": page_size, "size": snapshot_size,
+                        "sha256": self.file_checksum(snapshot_db),
+                    }
+                    out.write(json.dumps(header).encode() + b"\n")
+                    page_number = 0
+                    while True:
+                        page = new.read(page_size)
+                        if not page:
+                            break
+                        page_number += 1
+                        if old.read(page_size) != page:
+                            out.write(struct.pack(">I", page_number) + page)
+                            changed += 1
+
+            self.write_checksum(diff_path)
+            self.logger.info(f"✅ Differential archive created: {diff_path.name} "
+                             f"({changed} changed pages, {self.format_size(os.path.getsize(diff_path))})")
+
+            # Older differentials against the same backup are superseded
+            for differential in self.list_differentials()[1:]:
+                differential.unlink()
+                Path(f"{differential}.sha256").unlink(missing_ok=True)
+            return True
+
+        except Exception as e:
+            self.logger.error(f"❌ Differential archive failed: {e}")
+            return False
+
+    def apply_differential(self, diff_path, db_file):
+        """Apply a differential archive to a plain copy of its base backup"""
+        with gzip.open(diff_path, "rb") as diff, open(db_file, "r+b") as db:
+            header = json.loads(diff.readline())
+            page_size = header["page_size"]
+            while True:
+                number = diff.read(4)
+                if not number:
+                    break
+                page_number = struct.unpack(">I", number)[0]
+                db.seek((page_number - 1) * page_size)
+                db.write(diff.read(page_size))
+            db.truncate(header["size"])
+        if self.file_checksum(db_file) != header["sha256"]:
+            raise RuntimeError(f"{Path(diff_path).name} did not reproduce its snapshot")
+
+    def restore(self, backup_path, target_path=None, use_differential=True):
+        """
+        Restore a backup (and its newest differential) over target_path.
+        The bot must be stopped: the target's WAL and shared-memory files are removed.
+        """
+        backup_path = Path(backup_path)
+        target_path = Path(target_path or self.db_path)
+        try:
+            if not self.verify_checksum(backup_path):
+                self.logger.error(f"❌ {backup_path.name} failed checksum verification")
+                return False
+
+            staging = Path(f"{target_path}.restoring")
+            self.extract(backup_path, staging)
+
+            if use_differential:
+                differentials = [path for path in self.list_differentials(backup_path.parent)
+                                 if self._differential_base(path) == backup_path.name]
+                if differentials:
+                    if not self.verify_checksum(differentials[0]):
+                        raise RuntimeError(f"{differentials[0].name} failed checksum verification")
+                    self.apply_differential(differentials[0], staging)
+                    self.logger.info(f"📦 Applied differential {differentials[0].name}")
+
+            self.check_integrity(staging)
+            for suffix in ("-wal", "-shm"):
+                Path(f"{target_path}{suffix}").unlink(missing_ok=True)
+            os.replace(staging, target_path)
+            self.logger.info(f"✅ Restored {target_path} from {backup_path.name}")
+            return True
+
+        except Exception as e:
+            Path(f"{target_path}.restoring").unlink(missing_ok=True)
+            self.logger.error(f"❌ Restore failed: {e}")
+            return False
+
+    def _differential_base(self, diff_path):
+        try:
+            with gzip.open(diff_path, "rb") as diff:
+                return json.loads(diff.readline()).get("base")
+        except Exception:
+            return None
     
     def cleanup_old_backups(self):
         """Keep only the last N backups"""
         try:
-            # Get all backup files
-            backup_files = list(self.backup_dir.glob("new_player_backup_*.db"))
-            
-            # Sort by modification time (newest first)
-            backup_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+            # Get all backup files (newest first)
+            backup_files = self.list_backups()
             
             # Remove old backups beyond the limit
             removed_count = 0
             for backup_file in backup_files[self.max_backups:]:
                 size = backup_file.stat().st_size
                 backup_file.unlink()
+                Path(f"{backup_file}.sha256").unlink(missing_ok=True)
                 removed_count += 1
                 self.logger.info(f"🗑️  Removed old backup: {backup_file.name} ({self.format_size(size)})")
             
@@ -164,7 +377,7 @@ class AutomatedMaintenance:
             self.logger.error(f"❌ Backup cleanup failed: {e}")
     
     def vacuum_database(self):
-        """Perform database vacuum operation"""
+        """Perform database vacuum operation (blocking; run it off the event loop)"""
         try:
             if not os.path.exists(self.db_path):
                 self.logger.error("Database not found for vacuum")
@@ -174,7 +387,8 @@ class AutomatedMaintenance:
             size_before = os.path.getsize(self.db_path)
             
             # Perform vacuum
-            conn = sqlite3.connect(self.db_path)
+            # Wait for the bot's writers instead of failing on a busy database
+            conn = sqlite3.connect(self.db_path, timeout=60)
             conn.execute("PRAGMA optimize")
             conn.execute("VACUUM")
             conn.execute("ANALYZE")
@@ -217,18 +431,20 @@ class AutomatedMaintenance:
         
         schedule = self.load_schedule()
         
-        # Check for backup
+        # Backups and vacuums run in a worker thread so the bot keeps handling commands
         if self.should_backup(schedule):
             self.logger.info("📅 Daily backup is due")
-            if self.create_backup():
+            if await asyncio.to_thread(self.create_backup):
                 schedule["last_backup"] = datetime.utcnow().isoformat()
                 schedule["next_backup"] = self.calculate_next_backup()
                 self.logger.info(f"📅 Next backup scheduled: {schedule['next_backup']}")
+        elif await asyncio.to_thread(self.create_differential):
+            schedule["last_differential"] = datetime.utcnow().isoformat()
         
         # Check for vacuum
         if self.should_vacuum(schedule):
             self.logger.info("📅 Weekly vacuum is due")
-            if self.vacuum_database():
+            if await asyncio.to_thread(self.vacuum_database):
                 schedule["last_vacuum"] = datetime.utcnow().isoformat()
                 schedule["next_vacuum"] = self.calculate_next_vacuum()
                 self.logger.info(f"📅 Next vacuum scheduled: {schedule['next_vacuum']}")
@@ -246,6 +462,7 @@ class AutomatedMaintenance:
         """Start the maintenance loop"""
         self.logger.info("🚀 Starting automated maintenance system...")
         self.logger.info(f"📅 Daily backups at {self.backup_hour:02d}:00 UTC (keeps last {self.max_backups} backups)")
+        self.logger.info("📅 Hourly differential archives between backups")
         self.logger.info(f"📅 Weekly vacuum on Sundays at {self.backup_hour:02d}:00 UTC")
         
         while True:
@@ -268,7 +485,8 @@ class AutomatedMaintenance:
             "next_backup": schedule.get("next_backup"),
             "last_vacuum": schedule.get("last_vacuum"),
             "next_vacuum": schedule.get("next_vacuum"),
-            "backup_count": len(list(self.backup_dir.glob("new_player_backup_*.db")))
+            "last_differential": schedule.get("last_differential"),
+            "backup_count": len(self.list_backups())
         }
         
         return status
@@ -279,5 +497,23 @@ async def main():
     maintenance = AutomatedMaintenance()
     await maintenance.start_maintenance_loop()
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Arise database backup and maintenance")
+    subcommands = parser.add_subparsers(dest="command")
+    subcommands.add_parser("run", help="Run the maintenance loop (default)")
+    subcommands.add_parser("backup", help="Take a full backup now")
+    restore = subcommands.add_parser("restore", help="Restore a backup; stop the bot first")
+    restore.add_argument("backup", help="Backup file (.db or .db.gz)")
+    restore.add_argument("--target", help="Database to overwrite (default: new_player.db)")
+    restore.add_argument("--no-differential", action="store_true", help="Ignore differential archives")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.command == "backup":
+        sys.exit(0 if AutomatedMaintenance().create_backup() else 1)
+    elif args.command == "restore":
+        restored = AutomatedMaintenance().restore(args.backup, args.target, not args.no_differential)
+        sys.exit(0 if restored else 1)
+    else:
+        asyncio.run(main())
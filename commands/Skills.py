@@ -6,6 +6,7 @@ from structure.emoji import getEmoji
 from utilis.utilis import extractId
 from structure.player import Player
 from structure.skills import SkillManager, Skill
+from structure.story_campaign import story_gate
 
 class Skills(commands.Cog):
     def __init__(self, bot):
@@ -57,6 +58,7 @@ class Skills(commands.Cog):
         await ctx.send(embed=embed)
 
     @commands.command(name="learn", help="Learn a new skill by ID or name.")
+    @story_gate("Skill Learning")
     async def skill_learn(self, ctx, *, name: str):
         player_id = ctx.author.id
         player = await Player.get(player_id)
@@ -65,15 +67,6 @@ class Skills(commands.Cog):
             await ctx.send("You don't have a profile yet. Use `sl start` to create one.")
             return
 
-        # Check story lock for advanced skills
-        from structure.story_campaign import check_story_lock
-        from utilis.utilis import create_embed, WARNING_COLOR
-        can_access, lock_message = await check_story_lock(ctx.author.id, "double_dungeon_002", "Skill Learning")
-        if not can_access:
-            embed = create_embed("🔒 Feature Locked", lock_message, WARNING_COLOR, ctx.author)
-            await ctx.reply(embed=embed, mention_author=False)
-            return
-
         all_skills = await SkillManager.get_all()
         skill_names = [skill.name for skill in all_skills]
 
@@ -5,6 +5,7 @@ from structure.items import ItemManager
 from utilis.utilis import getStatWeapon
 from structure.emoji import getEmoji
 from structure.player import Player
+from structure.story_campaign import story_gate
 from typing import Optional
 import time
 from datetime import datetime, timedelta
@@ -571,6 +572,7 @@ Mana Points  : {player.mp:<5} +({equipped_stats['mp']})
         await ctx.send(embed=embed)
     
     @commands.command(name="statupgrade", aliases=["su"], help="Interactive stat upgrade system.")
+    @story_gate("Stat Allocation")
     async def stats_upgrade(self, ctx, stat: Optional[str] = None, points: Optional[int] = None):
         player = await Player.get(ctx.author.id)
 
@@ -584,18 +586,6 @@ Mana Points  : {player.mp:<5} +({equipped_stats['mp']})
             )
             return
 
-        # Check story lock for stat allocation
-        from structure.story_campaign import check_story_lock
-        can_access, lock_message = await check_story_lock(ctx.author.id, "double_dungeon_002", "Stat Allocation")
-        if not can_access:
-            embed = discord.Embed(
-                title="🔒 Feature Locked",
-                description=lock_message,
-                color=discord.Color.orange()
-            )
-            await ctx.reply(embed=embed, mention_author=False)
-            return
-
         if player.trade:
             await ctx.send(f"<@{player.id}>, is in the middle of a 🤝 trade. Complete it before proceeding or join the support server if this is a bug.")
             return
@@ -685,7 +685,7 @@ class AdminGrant(commands.Cog):
                     return
 
                 # Calculate data size
-                player_data = player.__dict__
+                player_data = player.to_dict()
                 data_json = json.dumps(player_data, default=str)
                 data_size = sys.getsizeof(data_json)
 
@@ -788,7 +788,7 @@ class AdminGrant(commands.Cog):
                 return
 
             # Calculate original size
-            original_data = json.dumps(player.__dict__, default=str)
+            original_data = json.dumps(player.to_dict(), default=str)
             original_size = sys.getsizeof(original_data)
 
             # Perform cleanup operations
@@ -831,7 +831,7 @@ class AdminGrant(commands.Cog):
             await player.save()
 
             # Calculate new size
-            new_data = json.dumps(player.__dict__, default=str)
+            new_data = json.dumps(player.to_dict(), default=str)
             new_size = sys.getsizeof(new_data)
 
             size_reduction = original_size - new_size
@@ -904,7 +904,7 @@ class AdminGrant(commands.Cog):
                 return
 
             # Calculate original size
-            original_data = json.dumps(player.__dict__, default=str)
+            original_data = json.dumps(player.to_dict(), default=str)
             original_size = sys.getsizeof(original_data)
 
             embed = discord.Embed(
@@ -926,7 +926,7 @@ class AdminGrant(commands.Cog):
             await player.save()
 
             # Calculate new size
-            new_data = json.dumps(player.__dict__, default=str)
+            new_data = json.dumps(player.to_dict(), default=str)
             new_size = sys.getsizeof(new_data)
 
             size_reduction = original_size - new_size
@@ -1252,6 +1252,7 @@ class AdminGrant(commands.Cog):
                 value=(
                     f"**Last Backup**: {format_datetime(status.get('last_backup'))}\n"
                     f"**Next Backup**: {format_datetime(status.get('next_backup'))}\n"
+                    f"**Last Differential**: {format_datetime(status.get('last_differential'))}\n"
                     f"**Backup Count**: {status.get('backup_count', 0)}/4"
                 ),
                 inline=False
@@ -1288,6 +1289,7 @@ class AdminGrant(commands.Cog):
                 name="⚙️ System Configuration",
                 value=(
                     "**Daily Backups**: 12:00 UTC (keeps last 4)\n"
+                    "**Differentials**: Hourly, changed pages since the last backup\n"
                     "**Weekly Vacuum**: Sundays at 12:00 UTC\n"
                     "**Backup Location**: `database_backups/`\n"
                     "**Schedule File**: `maintenance_schedule.json`"
@@ -3469,6 +3471,45 @@ class AdminControlPanelView(discord.ui.View):
                 inline=False
             )
 
+        cache_stats = Player._players.get_stats()
+        embed.add_field(
+            name="🧠 **Player Cache**",
+            value=(
+                f"**Cached Players**: {cache_stats['entries']:,}/{cache_stats['max_entries']:,}\n"
+                f"**Hit Rate**: {cache_stats['hit_rate']*100:.1f}% ({cache_stats['hits']:,} hits, {cache_stats['misses']:,} misses)\n"
+                f"**Evictions**: {cache_stats['evictions']:,} LRU, {cache_stats['expirations']:,} idle\n"
+                f"**Revived In-Use**: {cache_stats['revived']:,}"
+            ),
+            inline=False
+        )
+
+        from structure.notification_system import notification_manager
+        if notification_manager is not None:
+            queue_stats = notification_manager.get_queue_stats()
+            next_due = queue_stats['next_due_in']
+            embed.add_field(
+                name="🔔 **Notification Queue**",
+                value=(
+                    f"**Queued**: {queue_stats['depth']:,} (next in {f'{next_due:.0f}s' if next_due is not None else '—'})\n"
+                    f"**In Flight**: {queue_stats['in_flight']:,}\n"
+                    f"**Dispatched**: {queue_stats['dispatched']:,} in {queue_stats['batches']:,} batches\n"
+                    f"**Cancelled**: {queue_stats['cancelled']:,}"
+                ),
+                inline=False
+            )
+
+        from structure.delivery_queue import delivery_queue
+        delivery_stats = delivery_queue.get_stats()
+        embed.add_field(
+            name="📨 **Delivery Queue**",
+            value=(
+                f"**Pending**: {delivery_stats['pending']:,} ({delivery_stats['retrying']:,} awaiting retry)\n"
+                f"**Sent**: {delivery_stats['sent']:,} • **DMs Closed**: {delivery_stats['forbidden']:,}\n"
+                f"**Failed**: {delivery_stats['failed']:,} • **Dropped**: {delivery_stats['dropped']:,}"
+            ),
+            inline=False
+        )
+
         embed.set_footer(text="◆ Admin System ◆ • Server tracking never deletes data")
         await ctx.send(embed=embed)
 
@@ -3668,9 +3709,7 @@ class AdminControlPanelView(discord.ui.View):
     @commands.has_permissions(administrator=True)
     async def fix_ranks(self, ctx):
         """Recalculate all player ranks based on current stats"""
-        from structure.ranking_system import RankingSystem
-        from structure.player import Player
-        import aiosqlite
+        from structure.ranking_system import RankingSystem, message_progress
 
         embed = discord.Embed(
             title="🔧 **RANK RECALCULATION**",
@@ -3681,30 +3720,11 @@ class AdminControlPanelView(discord.ui.View):
         message = await ctx.send(embed=embed)
 
         try:
-            # Get all players
-            async with aiosqlite.connect("database.db") as conn:
-                cursor = await conn.execute("SELECT id FROM players")
-                player_ids = await cursor.fetchall()
-
-            recalculated_count = 0
-            rank_changes = 0
-
-            for (player_id,) in player_ids:
-                try:
-                    # Get current rank
-                    old_rank, _ = await RankingSystem.get_player_rank(str(player_id))
-
-                    # Recalculate rank
-                    new_rank, rank_changed = await RankingSystem.calculate_rank(str(player_id))
-
-                    if rank_changed or old_rank != new_rank:
-                        rank_changes += 1
-
-                    recalculated_count += 1
-
-                except Exception as e:
-                    logging.error(f"Error recalculating rank for player {player_id}: {e}")
-                    continue
+            # One pass over the players table, changed ranks written in one transaction
+            result = await RankingSystem.recalculate_all(
+                progress=message_progress(message, embed, "Recalculating all player ranks..."))
+            recalculated_count = result["processed"]
+            rank_changes = result["changed"]
 
             embed = discord.Embed(
                 title="✅ **RANK RECALCULATION COMPLETE**",
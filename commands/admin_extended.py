@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 import logging
+import time
 import aiosqlite
 import json
 from structure.player import Player
@@ -304,9 +305,7 @@ class AdminExtended(commands.Cog):
             )
             await ctx.send(embed=embed)
             return
-        from structure.ranking_system import RankingSystem
-        from structure.player import Player
-        import aiosqlite
+        from structure.ranking_system import RankingSystem, message_progress
         
         embed = discord.Embed(
             title="🔧 **RANK RECALCULATION**",
@@ -317,31 +316,12 @@ class AdminExtended(commands.Cog):
         message = await ctx.send(embed=embed)
         
         try:
-            # Get all players
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
-                cursor = await conn.execute("SELECT id FROM players")
-                player_ids = await cursor.fetchall()
-            
-            recalculated_count = 0
-            rank_changes = 0
-            
-            for (player_id,) in player_ids:
-                try:
-                    # Get current rank
-                    old_rank, _ = await RankingSystem.get_player_rank(str(player_id))
-                    
-                    # Recalculate rank
-                    new_rank, rank_changed = await RankingSystem.calculate_rank(str(player_id))
-                    
-                    if rank_changed or old_rank != new_rank:
-                        rank_changes += 1
-                    
-                    recalculated_count += 1
-                    
-                except Exception as e:
-                    logging.error(f"Error recalculating rank for player {player_id}: {e}")
-                    continue
-            
+            # One pass over the players table, changed ranks written in one transaction
+            result = await RankingSystem.recalculate_all(
+                progress=message_progress(message, embed, "Recalculating all player ranks..."))
+            recalculated_count = result["processed"]
+            rank_changes = result["changed"]
+
             embed = discord.Embed(
                 title="✅ **RANK RECALCULATION COMPLETE**",
                 description="All player ranks have been recalculated",
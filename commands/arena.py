@@ -6,10 +6,11 @@ import asyncio
 import time
 from typing import List, Optional
 
-from structure.playerId import PlayerIdManager
 from structure.emoji import getClassEmoji, getEmoji
 from structure.heroes import HeroManager
+from structure import player as player_db
 from structure.player import Player
+from structure.matchmaking import matchmaking_index, party_power
 from structure.glory import Glory
 from structure.skills import SkillManager
 from utilis.utilis import PremiumCheck, extractId, get_emoji, getStatHunter, getStatWeapon
@@ -273,37 +274,15 @@ class ArenaCog(commands.Cog):
         self.battle_messages = {}
 
     async def get_random_opponent(self, player_id: int) -> Optional[int]:
+        """Closest-rated player with a party who isn't already fighting"""
         try:
-            # Use cached player IDs for better performance
-            all_ids = await PlayerIdManager.get_all_ids()
-            valid_opponents = [
-                opponent_id for opponent_id in all_ids
-                if opponent_id != player_id and opponent_id not in self.active_battles
-            ]
-
-            # Limit the number of opponents to check for better performance
-            if len(valid_opponents) > 50:
-                valid_opponents = random.sample(valid_opponents, 50)
-
-            opponents_with_parties = []
-            # Batch load opponents for better performance
-            for oid in valid_opponents[:20]:  # Limit to first 20 for speed
-                opponent = await Player.get(oid)
-                if opponent and opponent.hunters:  # Quick check if they have any hunters
-                    party_count = sum(1 for slot in ["Party_1", "Party_2", "Party_3"]
-                                      if opponent.equipped.get(slot) in opponent.hunters)
-                    if party_count >= 1:
-                        opponents_with_parties.append(oid)
-                        if len(opponents_with_parties) >= 10:  # Stop after finding 10 valid opponents
-                            break
-
-            return random.choice(opponents_with_parties) if opponents_with_parties else None
+            await matchmaking_index.ensure_loaded(player_db.DATABASE_PATH)
+            player = await Player.get(player_id)
+            power = party_power(player.equipped, player.hunters) if player else None
+            return matchmaking_index.find_opponent(player_id, power, exclude=self.active_battles)
         except Exception as e:
             print(f"Error getting random opponent: {e}")
-            # Fallback to simple random selection
-            all_ids = await Player.get_all_player_ids()
-            fallback_opponents = [pid for pid in all_ids if pid != player_id]
-            return random.choice(fallback_opponents) if fallback_opponents else None
+            return None
 
     async def load_party(self, player) -> List[BattleHunter]:
         party = []
@@ -12,7 +12,7 @@ from structure.boss import Boss
 from structure.heroes import Hero, HeroManager
 from structure.items import Item, ItemManager
 from structure.skills import Element, Skill, SkillManager
-from structure.emoji import getEmoji
+from structure.emoji import getEmoji, reload_emojis
 
 # Import centralized admin system
 from utilis.admin import is_bot_admin
@@ -1179,6 +1179,7 @@ class ItemCreationView(ui.View):
             # Save back to file with proper encoding
             with open('emojis.json', 'w', encoding='utf-8') as f:
                 json.dump(emojis, f, indent=2, ensure_ascii=False)
+            reload_emojis()
 
             print(f"✅ Added emoji to emojis.json: {item_id} -> {emoji_string}")
             return True
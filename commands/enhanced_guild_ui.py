@@ -6,6 +6,7 @@ from discord.ext import commands
 from discord import ui
 from datetime import datetime, timedelta
 from structure.enhanced_guild import EnhancedGuild, GuildRole, GuildPermission
+from structure.guild_directory import guild_directory
 from structure.player import Player
 from utilis.utilis import extractId
 from structure.emoji import getEmoji
@@ -160,7 +161,9 @@ class EnhancedGuildMainView(ui.View):
     
     async def create_browse_embed(self):
         """Create enhanced guild browsing embed with sorting"""
-        guilds = await self.get_all_guilds_unified()
+        await guild_directory.ensure_loaded()
+        sort_mode = getattr(self, 'sort_mode', 'points')
+        guilds = guild_directory.ranked(sort_mode)
 
         embed = discord.Embed(
             title="🔍 **BROWSE GUILDS**",
@@ -176,24 +179,9 @@ class EnhancedGuildMainView(ui.View):
             )
             return embed
 
-        # Sort guilds based on current sort mode
-        sort_mode = getattr(self, 'sort_mode', 'points')
-        if sort_mode == "points":
-            guilds.sort(key=lambda g: g.points, reverse=True)
-        elif sort_mode == "members":
-            guilds.sort(key=lambda g: len(g.members), reverse=True)
-        elif sort_mode == "level":
-            guilds.sort(key=lambda g: g.level, reverse=True)
-        elif sort_mode == "name":
-            guilds.sort(key=lambda g: g.name.lower())
-        else:  # Default: points
-            guilds.sort(key=lambda g: g.points, reverse=True)
-
         # Enhanced pagination - show more guilds per page
         per_page = 9  # Increased from 5 to 9 (3x3 grid)
-        start_idx = self.current_page * per_page
-        end_idx = start_idx + per_page
-        page_guilds = guilds[start_idx:end_idx]
+        page_guilds = guild_directory.page(sort_mode, self.current_page, per_page)
 
         # Add sorting info
         sort_names = {
@@ -335,68 +323,8 @@ class EnhancedGuildMainView(ui.View):
 
     async def get_all_guilds_unified(self):
         """Get all guilds from both old and new systems"""
-        all_guilds = []
-
-        # Get enhanced guilds (new system)
-        try:
-            enhanced_guilds = await EnhancedGuild.get_all()
-            all_guilds.extend(enhanced_guilds)
-        except Exception as e:
-            print(f"Error getting enhanced guilds: {e}")
-
-        # Get old guilds and convert them to enhanced guild format
-        try:
-            from structure.guild import Guild
-            import aiosqlite
-            import json
-
-            # Get database path
-            def get_database_path():
-                try:
-                    with open("db.json", "r") as f:
-                        config = json.load(f)
-                        return config.get("player", "data/player.db")
-                except Exception as e:
-                    return "data/player.db"
-
-            DATABASE_PATH = get_database_path()
-
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute("SELECT * FROM guilds") as cursor:
-                    rows = await cursor.fetchall()
-                    for row in rows:
-                        # Skip if this guild already exists in enhanced guilds
-                        guild_id = row[0]
-                        if any(g.id == guild_id for g in all_guilds):
-                            continue
-
-                        # Convert old guild to enhanced guild format
-                        old_guild = Guild(
-                            id=row[0], name=row[1], owner=row[2],
-                            members=json.loads(row[3]) if row[3] else [],
-                            level=row[4], points=row[5], image=row[6],
-                            description=row[7], gates=row[8] if len(row) > 8 else 0,
-                            allow_alliances=bool(row[9]) if len(row) > 9 else False
-                        )
-
-                        # Create enhanced guild wrapper
-                        enhanced_wrapper = EnhancedGuild(
-                            id=old_guild.id,
-                            name=old_guild.name,
-                            owner=old_guild.owner,
-                            members=old_guild.members,
-                            level=old_guild.level,
-                            points=old_guild.points,
-                            image=old_guild.image,
-                            description=old_guild.description,
-                            gates=old_guild.gates,
-                            allow_alliances=old_guild.allow_alliances
-                        )
-                        all_guilds.append(enhanced_wrapper)
-        except Exception as e:
-            print(f"Error getting old guilds: {e}")
-
-        return all_guilds
+        await guild_directory.ensure_loaded()
+        return guild_directory.guilds()
 
     async def create_manage_embed(self):
         """Create guild management embed"""
@@ -2431,11 +2359,7 @@ class GuildDetailsDropdown(ui.Select):
         """Show detailed information for selected guild"""
         try:
             # Find the selected guild
-            selected_guild = None
-            for guild in self.guilds:
-                if guild.id == guild_id:
-                    selected_guild = guild
-                    break
+            selected_guild = guild_directory.get(guild_id)
 
             if not selected_guild:
                 await interaction.response.send_message("❌ Guild not found!", ephemeral=True)
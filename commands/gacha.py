@@ -7,6 +7,7 @@ from structure.heroes import HeroManager
 from structure.emoji import getClassEmoji, getEmoji, getRarityEmoji
 from structure.player import Player
 from structure.items import ItemManager
+from structure.gacha_pool import gacha_pool
 from discord.ext.commands import cooldown, BucketType
 import logging
 from typing import List, Optional
@@ -437,141 +438,10 @@ class Gacha(commands.Cog):
             await ctx.reply(embed=embed, mention_author=False)
 
     async def gacha_pull(self, player, pulls):
-        results = []
-        luck_values = []
-
-        # Get regular items/heroes (non-custom)
-        all_heroes = [h for h in await HeroManager.get_all() if h.rarity.lower() != "custom"]
-        all_items = [i for i in await ItemManager.get_all() if i.rarity.lower() != "custom"]
-
-        # Get custom items/heroes assigned to this player
-        custom_heroes = await self.get_player_custom_heroes(player.id)
-        custom_items = await self.get_player_custom_items(player.id)
-
-        # Add custom items to the pool
-        all_heroes.extend(custom_heroes)
-        all_items.extend(custom_items)
-
-        for _ in range(pulls):
-            player.gacha += 1
-            if player.gacha > 1_000_000: player.gacha %= 80
-
-            rarity = "SSR" if player.gacha % 80 == 0 else random.choices(list(BASE_DROP_RATES.keys()), list(BASE_DROP_RATES.values()), k=1)[0]
-            
-            entity, res_type, is_duplicate = None, None, False
-            
-            possible_heroes = [h for h in all_heroes if h.rarity.lower() == rarity.lower()]
-            possible_items = [i for i in all_items if i.rarity.lower() == rarity.lower()]
-
-            if not possible_heroes and not possible_items:
-                possible_heroes = all_heroes
-                possible_items = all_items
-                if not possible_heroes and not possible_items:
-                    raise Exception("Configuration Error: No pullable items or heroes exist.")
-
-            is_item_pull = random.random() < 0.35 or rarity == "Rare"
-            
-            if is_item_pull and possible_items:
-                entity = random.choice(possible_items)
-                res_type = "Item"
-                is_duplicate = player.add_item(entity.id)
-            elif not is_item_pull and possible_heroes:
-                entity = random.choice(possible_heroes)
-                res_type = "Hero"
-                is_duplicate = player.add_hunter(entity.id)
-            elif possible_heroes:
-                entity = random.choice(possible_heroes)
-                res_type = "Hero"
-                is_duplicate = player.add_hunter(entity.id)
-            elif possible_items:
-                entity = random.choice(possible_items)
-                res_type = "Item"
-                is_duplicate = player.add_item(entity.id)
-
-            if entity:
-                results.append((res_type, entity.rarity, entity, is_duplicate))
-                luck_values.append(self.calculate_luck_value(entity.rarity))
-            else:
-                raise Exception("Could not find any item/hero to pull.")
-
+        results = await gacha_pool.draw(player, pulls, BASE_DROP_RATES)
+        luck_values = [self.calculate_luck_value(rarity) for _, rarity, _, _ in results]
         return results, luck_values
 
-    async def get_player_custom_heroes(self, player_id: int):
-        """Get custom heroes assigned to this player"""
-        try:
-            import json
-            with open('customs.json', 'r') as f:
-                customs = json.load(f)
-
-            # Find customs assigned to this player
-            player_customs = []
-            for custom in customs:
-                if custom.get('type') == 'hunter' and str(custom.get('user_id')) == str(player_id):
-                    # Convert custom data to Hero object
-                    from structure.heroes import Hero
-                    hero = Hero(
-                        id=custom['name'].lower().replace(' ', '_'),
-                        name=custom['name'],
-                        rarity='Custom',
-                        classType=custom.get('element', 'Fire'),
-                        type=custom.get('classType', 'DPS'),
-                        image='https://files.catbox.moe/jvxvcr.png',  # Default image
-                        description=f"Custom hero for {custom.get('user_id')}",
-                        health=1000,
-                        attack=200,
-                        defense=150,
-                        speed=100,
-                        mp=200,
-                        precision=100,
-                        age=25,
-                        gender='Unknown',
-                        country='Custom',
-                        weapon='Custom Weapon',
-                        guild='None',
-                        rank='S'
-                    )
-                    player_customs.append(hero)
-
-            return player_customs
-        except Exception as e:
-            logging.error(f"Error loading custom heroes: {e}")
-            return []
-
-    async def get_player_custom_items(self, player_id: int):
-        """Get custom items assigned to this player"""
-        try:
-            import json
-            with open('customs.json', 'r') as f:
-                customs = json.load(f)
-
-            # Find custom items assigned to this player
-            player_customs = []
-            for custom in customs:
-                if custom.get('type') == 'item' and str(custom.get('user_id')) == str(player_id):
-                    # Convert custom data to Item object
-                    from structure.items import Item
-                    item = Item(
-                        id=custom['name'].lower().replace(' ', '_'),
-                        name=custom['name'],
-                        rarity='Custom',
-                        classType=custom.get('element', 'Fire'),
-                        type='Weapon',
-                        image='https://files.catbox.moe/jvxvcr.png',  # Default image
-                        description=f"Custom item for {custom.get('user_id')}",
-                        health=100,
-                        attack=150,
-                        defense=100,
-                        speed=50,
-                        mp=50,
-                        precision=75
-                    )
-                    player_customs.append(item)
-
-            return player_customs
-        except Exception as e:
-            logging.error(f"Error loading custom items: {e}")
-            return []
-
     def calculate_luck_value(self, rarity):
         return {"UR": 1000, "SSR": 500, "Super Rare": 175}.get(rarity, 0)
 
@@ -6,6 +6,7 @@ from structure.emoji import getEmoji
 from structure.player import Player
 from utilis.utilis import extractId
 from structure.guild import Guild
+from structure.guild_directory import guild_directory
 from commands.guild_creation import GuildCreationView
 import re
 
@@ -283,7 +284,8 @@ class GuildCommands(commands.Cog):
         player = await Player.get(ctx.author.id)
         if player is None: await ctx.send(embed=discord.Embed(title="Error", description="You haven't started.", color=discord.Color.red())); return
         if player.trade: await ctx.send(embed=discord.Embed(title="Error", description=f"<@{player.id}> is in a trade.", color=discord.Color.orange())); return
-        if player.guild: await ctx.send(embed=discord.Embed(title="Error", description="You are already in a guild.", color=discord.Color.red())); return
+        await guild_directory.ensure_loaded()
+        if player.guild or guild_directory.guild_id_of(player.id): await ctx.send(embed=discord.Embed(title="Error", description="You are already in a guild.", color=discord.Color.red())); return
 
         guild_id = extractId(name)
         guild = await Guild.get(guild_id)
@@ -4,6 +4,7 @@ from discord import app_commands, ui
 from discord.ui import View, Button
 from structure.player import Player
 from structure.guild import Guild
+from structure.guild_directory import guild_directory
 from structure.emoji import getEmoji
 import re
 import asyncio
@@ -75,8 +76,9 @@ class GuildMainView(ui.View):
         )
         
         # Player's current guild status
+        await guild_directory.ensure_loaded()
         if self.player.guild:
-            guild = await Guild.get(self.player.guild)
+            guild = guild_directory.guild_of(self.player.id)
             if guild:
                 tiers = {"S-Tier": 1000000, "A-Tier": 500000, "B-Tier": 250000, "C-Tier": 100000, "D-Tier": 50000, "E-Tier": 0}
                 tier_label, _ = _get_tier_and_color(guild.points, tiers)
@@ -108,12 +110,11 @@ class GuildMainView(ui.View):
             )
         
         # Guild system stats
-        all_guilds = await Guild.get_all()
-        if all_guilds:
-            total_members = sum(len(g.members) for g in all_guilds)
+        stats = guild_directory.get_stats()
+        if stats["guilds"]:
             embed.add_field(
                 name="📊 System Stats",
-                value=f"🏰 Total Guilds: {len(all_guilds)}\n👥 Total Members: {total_members}\n🏆 Top Guild: {max(all_guilds, key=lambda g: g.points).name}",
+                value=f"🏰 Total Guilds: {stats['guilds']}\n👥 Total Members: {stats['members']}\n🏆 Top Guild: {stats['top_guild']}",
                 inline=False
             )
         
@@ -310,11 +311,9 @@ class GuildMainView(ui.View):
         self.player = await Player.get(self.ctx.author.id)
 
         # Check if player is guild leader
-        if self.player.guild:
-            guild = await Guild.get(self.player.guild)
-            self._is_guild_leader = guild and guild.owner == self.player.id
-        else:
-            self._is_guild_leader = False
+        await guild_directory.ensure_loaded()
+        guild = guild_directory.guild_of(self.player.id) if self.player.guild else None
+        self._is_guild_leader = guild is not None and guild.owner == self.player.id
 
         self.update_buttons()
         embed = await self.create_embed()
@@ -491,14 +490,12 @@ class GuildSelectionView(ui.View):
 
         # Add player's guild first if they have one
         if player_guild_id:
-            player_guild = next((g for g in self.all_guilds if g.id == player_guild_id), None)
+            player_guild = guild_directory.get(player_guild_id)
             if player_guild:
                 sorted_guilds.append(player_guild)
 
         # Add other guilds sorted by points
-        other_guilds = [g for g in self.all_guilds if g.id != player_guild_id]
-        other_guilds.sort(key=lambda g: g.points, reverse=True)
-        sorted_guilds.extend(other_guilds)
+        sorted_guilds.extend(g for g in guild_directory.ranked("points") if g.id != player_guild_id)
 
         self.all_guilds = sorted_guilds
 
@@ -704,7 +701,8 @@ class GuildApplicationSelectView(ui.View):
     async def create_embed(self):
         """Create the guild application embed"""
         # Get all guilds and sort them by points
-        self.all_guilds = await Guild.get_all()
+        await guild_directory.ensure_loaded()
+        self.all_guilds = [g for g in guild_directory.ranked("points") if guild_directory.is_legacy(g.id)]
         if not self.all_guilds:
             embed = discord.Embed(
                 title="📭 **NO GUILDS AVAILABLE** 📭",
@@ -713,9 +711,6 @@ class GuildApplicationSelectView(ui.View):
             )
             return embed
 
-        # Sort guilds by points (highest first)
-        self.all_guilds.sort(key=lambda g: g.points, reverse=True)
-
         # Calculate pagination
         total_pages = (len(self.all_guilds) - 1) // self.guilds_per_page + 1
         start_idx = self.current_page * self.guilds_per_page
@@ -879,7 +874,8 @@ class GuildApplicationDropdown(ui.Select):
             return
 
         # Check if player is already in a guild
-        if self.player.guild:
+        await guild_directory.ensure_loaded()
+        if self.player.guild or guild_directory.guild_id_of(self.player.id):
             await interaction.followup.send("❌ You are already in a guild! Leave your current guild first.", ephemeral=True)
             return
 
@@ -999,7 +995,8 @@ class GuildApplicationView(ui.View):
                 return
 
             # Check if player is already in a guild
-            if fresh_player.guild:
+            await guild_directory.ensure_loaded()
+            if fresh_player.guild or guild_directory.guild_id_of(fresh_player.id):
                 await interaction.followup.send("❌ Player is already in a guild!", ephemeral=True)
                 return
 
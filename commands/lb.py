@@ -1,23 +1,14 @@
 import logging
 import discord
 import json
-import aiosqlite
 from discord.ext import commands
 from discord import app_commands
 from typing import List
 
 from structure.emoji import getEmoji
+from structure.glory import Glory
+from structure.player import Player
 
-def get_database_path():
-    try:
-        with open("db.json", "r") as f:
-            config = json.load(f)
-            return config.get("player","data/player.db")
-    except Exception as e:
-        logging.error(f"Error loading database configuration: {e}")
-        return "data/player.db"
-
-DATABASE_PATH = get_database_path()
 LEADERBOARD_FILE = "leaderboard.json"
 
 async def leaderboard_category_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
@@ -75,29 +66,22 @@ class Leaderboard(commands.Cog):
         """Refreshes and caches all leaderboard data with usernames (Bot Owner Only)"""
         await ctx.defer()
         
-        categories = ["aStreak", "gold", "diamond"]
-        leaderboard_data = {category: [] for category in categories}
+        # leaderboard.json key -> rank index category
+        categories = {"aStreak": "arena", "gold": "gold", "diamond": "diamond"}
+        leaderboard_data = {column: [] for column in categories}
         
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
-                async with conn.cursor() as cursor:
-                    for category in categories:
-                        await cursor.execute(
-                            f"SELECT id, {category} FROM players "
-                            f"ORDER BY {category} DESC LIMIT 15"
-                        )
-                        rows = await cursor.fetchall()
-                        
-                        category_data = []
-                        for row in rows:
-                            user_id = str(row[0])
-                            user_name = await self.fetch_user_name(user_id)
-                            category_data.append({
-                                "id": user_id,
-                                "name": user_name,
-                                "value": row[1]
-                            })
-                        leaderboard_data[category] = category_data
+            for column, category in categories.items():
+                index = await Player.get_rank_index(category)
+                category_data = []
+                for user_id, value in index.top(15):
+                    user_name = await self.fetch_user_name(user_id)
+                    category_data.append({
+                        "id": str(user_id),
+                        "name": user_name,
+                        "value": value
+                    })
+                leaderboard_data[column] = category_data
 
             with open(LEADERBOARD_FILE, "w") as file:
                 json.dump(leaderboard_data, file, indent=4)
@@ -132,34 +116,27 @@ class Leaderboard(commands.Cog):
         offset = (page - 1) * items_per_page
 
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute("SELECT COUNT(*) FROM glory") as cursor:
-                    total_players = (await cursor.fetchone())[0]
-                
-                if total_players == 0:
-                    await ctx.send(embed=discord.Embed(title="Empty Leaderboard", description="No players found in the glory rankings yet!", color=discord.Color.blue()))
-                    return
-
-                total_pages = (total_players + items_per_page - 1) // items_per_page
-                if page > total_pages:
-                    await ctx.send(embed=discord.Embed(title="Error", description=f"Invalid page number. There are only {total_pages} pages.", color=discord.Color.red()))
-                    return
-
-                async with db.execute(
-                    "SELECT user_id, name, points, rank, current_streak FROM glory ORDER BY points DESC LIMIT ? OFFSET ?",
-                    (items_per_page, offset)
-                ) as cursor:
-                    top_players = await cursor.fetchall()
+            total_players = len(await Glory.get_rank_index())
+            if total_players == 0:
+                await ctx.send(embed=discord.Embed(title="Empty Leaderboard", description="No players found in the glory rankings yet!", color=discord.Color.blue()))
+                return
+
+            total_pages = (total_players + items_per_page - 1) // items_per_page
+            if page > total_pages:
+                await ctx.send(embed=discord.Embed(title="Error", description=f"Invalid page number. There are only {total_pages} pages.", color=discord.Color.red()))
+                return
+
+            top_players = await Glory.get_page(page, items_per_page)
 
             description = []
             player_position_str = await self.get_player_position(ctx.author.id)
             if player_position_str:
                 description.append(f"**Your Rank:** {player_position_str}\n")
             
-            for idx, (user_id, name, points, rank, hs) in enumerate(top_players, start=offset + 1):
+            for idx, glory in enumerate(top_players, start=offset + 1):
                 description.append(
-                    f"`#{idx}` **{name}** • "
-                    f"AP: `{points:,}` • Streak: `{hs:,}`"
+                    f"`#{idx}` **{glory.name}** • "
+                    f"AP: `{glory.points:,}` • Streak: `{glory.current_streak:,}`"
                 )
 
             embed = discord.Embed(
@@ -178,24 +155,10 @@ class Leaderboard(commands.Cog):
     async def get_player_position(self, user_id: int) -> str:
         """Get a player's position in the leaderboard"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                # Count how many players have higher points
-                async with db.execute(
-                    "SELECT COUNT(*) FROM glory WHERE points > (SELECT points FROM glory WHERE user_id = ?)",
-                    (user_id,)
-                ) as cursor:
-                    position = (await cursor.fetchone())[0] + 1
-
-                # Get the player's glory data
-                async with db.execute(
-                    "SELECT points, rank, current_streak FROM glory WHERE user_id = ?",
-                    (user_id,)
-                ) as cursor:
-                    player_data = await cursor.fetchone()
-
-            if player_data:
-                points, rank, hs = player_data
-                return f"#{position} | **Arena Points**: {points:,} | **Highest Streak**: {hs:,}"
+            position = await Glory.get_position(user_id)
+            glory = await Glory.get(user_id) if position is not None else None
+            if glory:
+                return f"#{position} | **Arena Points**: {glory.points:,} | **Highest Streak**: {glory.current_streak:,}"
             return "Not ranked yet"
         except Exception:
             return "Not ranked yet"
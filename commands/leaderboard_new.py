@@ -2,14 +2,15 @@ import discord
 from discord.ext import commands
 from discord import app_commands, ui
 import json
-import aiosqlite
 import logging
 from structure.emoji import getEmoji
+from structure.glory import Glory
 from structure.player import Player
 
 # Constants
 LEADERBOARD_FILE = "leaderboard.json"
-DATABASE_PATH = "new_player.db"
+# leaderboard.json key / players column -> rank index category
+COLUMN_CATEGORIES = {"gold": "gold", "diamond": "diamond", "aStreak": "arena"}
 
 class LeaderboardMainView(ui.View):
     """Main leaderboard interface with modern UI"""
@@ -131,25 +132,16 @@ class LeaderboardMainView(ui.View):
             items_per_page = 15
             offset = (self.current_page - 1) * items_per_page
             
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                # Get total count
-                async with db.execute("SELECT COUNT(*) FROM glory") as cursor:
-                    total_players = (await cursor.fetchone())[0]
-                
-                if total_players == 0:
-                    embed = discord.Embed(
-                        title="📭 Empty Glory Board",
-                        description="No players found in the glory rankings yet!",
-                        color=discord.Color.blue()
-                    )
-                    return embed
-                
-                # Get leaderboard data
-                async with db.execute(
-                    "SELECT user_id, name, points, rank, current_streak FROM glory ORDER BY points DESC LIMIT ? OFFSET ?",
-                    (items_per_page, offset)
-                ) as cursor:
-                    top_players = await cursor.fetchall()
+            total_players = len(await Glory.get_rank_index())
+            if total_players == 0:
+                embed = discord.Embed(
+                    title="📭 Empty Glory Board",
+                    description="No players found in the glory rankings yet!",
+                    color=discord.Color.blue()
+                )
+                return embed
+            
+            top_players = await Glory.get_page(self.current_page, items_per_page)
             
             # Create description
             description = ""
@@ -157,11 +149,11 @@ class LeaderboardMainView(ui.View):
             if user_position_str:
                 description += f"**📍 Your Rank:** {user_position_str}\n\n"
             
-            for idx, (user_id, name, points, rank, streak) in enumerate(top_players, start=offset + 1):
+            for idx, glory in enumerate(top_players, start=offset + 1):
                 rank_icon = self.get_rank_icon(idx)
                 description += (
-                    f"`#{idx:2}` {rank_icon} **{name}**\n"
-                    f"     └─ *AP: {points:,} • Streak: {streak:,}*\n\n"
+                    f"`#{idx:2}` {rank_icon} **{glory.name}**\n"
+                    f"     └─ *AP: {glory.points:,} • Streak: {glory.current_streak:,}*\n\n"
                 )
             
             total_pages = (total_players + items_per_page - 1) // items_per_page
@@ -201,17 +193,10 @@ class LeaderboardMainView(ui.View):
     async def get_user_position(self, user_id, column):
         """Get user's position in leaderboard if not in top 15"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(
-                    f"SELECT COUNT(*) + 1 FROM players WHERE {column} > (SELECT {column} FROM players WHERE id = ?)",
-                    (user_id,)
-                ) as cursor:
-                    position = (await cursor.fetchone())[0]
-                
-                async with db.execute(f"SELECT {column} FROM players WHERE id = ?", (user_id,)) as cursor:
-                    result = await cursor.fetchone()
-                    if result and result[0] > 0:
-                        return f"#{position} with {result[0]:,}"
+            index = await Player.get_rank_index(COLUMN_CATEGORIES[column])
+            score = index.score(user_id)
+            if score and score > 0:
+                return f"#{index.rank(user_id)} with {score:,}"
             return None
         except:
             return None
@@ -219,20 +204,10 @@ class LeaderboardMainView(ui.View):
     async def get_glory_position(self, user_id):
         """Get user's glory position"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(
-                    "SELECT points, current_streak FROM glory WHERE user_id = ?",
-                    (user_id,)
-                ) as cursor:
-                    result = await cursor.fetchone()
-                    if result:
-                        points, streak = result
-                        async with db.execute(
-                            "SELECT COUNT(*) + 1 FROM glory WHERE points > ?",
-                            (points,)
-                        ) as cursor:
-                            position = (await cursor.fetchone())[0]
-                        return f"#{position} • AP: {points:,} • Streak: {streak:,}"
+            position = await Glory.get_position(user_id)
+            glory = await Glory.get(user_id) if position is not None else None
+            if glory:
+                return f"#{position} • AP: {glory.points:,} • Streak: {glory.current_streak:,}"
             return None
         except:
             return None
@@ -326,33 +301,23 @@ class RefreshButton(ui.Button):
         
         # Refresh leaderboard data (same logic as original)
         try:
-            categories = ["gold", "diamond", "aStreak"]
             leaderboard_data = {}
-            
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
-                async with conn.cursor() as cursor:
-                    for category in categories:
-                        await cursor.execute(
-                            f"SELECT id, {category} FROM players "
-                            f"ORDER BY {category} DESC LIMIT 15"
-                        )
-                        rows = await cursor.fetchall()
-                        
-                        category_data = []
-                        for row in rows:
-                            user_id = str(row[0])
-                            try:
-                                user = await interaction.client.fetch_user(int(user_id))
-                                user_name = user.display_name
-                            except:
-                                user_name = f"Hunter {user_id}"
-                            
-                            category_data.append({
-                                "id": user_id,
-                                "name": user_name,
-                                "value": row[1]
-                            })
-                        leaderboard_data[category] = category_data
+            for column, category in COLUMN_CATEGORIES.items():
+                index = await Player.get_rank_index(category)
+                category_data = []
+                for user_id, value in index.top(15):
+                    try:
+                        user = await interaction.client.fetch_user(int(user_id))
+                        user_name = user.display_name
+                    except:
+                        user_name = f"Hunter {user_id}"
+                    
+                    category_data.append({
+                        "id": str(user_id),
+                        "name": user_name,
+                        "value": value
+                    })
+                leaderboard_data[column] = category_data
             
             with open(LEADERBOARD_FILE, "w") as file:
                 json.dump(leaderboard_data, file, indent=4)
@@ -450,8 +450,9 @@ class ProfileView(ui.View):
         if player.inventory:
             weapon_list = []
             weapon_ids = list(player.inventory.keys())[:10]  # Show first 10
+            weapons = await ItemManager.get_many(weapon_ids)
             for weapon_id in weapon_ids:
-                weapon_data = await ItemManager.get(weapon_id)
+                weapon_data = weapons.get(weapon_id)
                 if weapon_data:
                     weapon_emoji = await get_emoji(weapon_data.id)
                     weapon_list.append(f"{weapon_emoji} {weapon_data.name}")
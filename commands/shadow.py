@@ -9,6 +9,7 @@ from structure.emoji import getEmoji
 from structure.player import Player
 from utilis.utilis import extractId
 from structure.shadow import Shadow
+from structure.story_campaign import story_gate
 
 class ShadowPaginationView(ui.View):
     def __init__(self, ctx, shadows_data, total_pages, current_page=1):
@@ -479,6 +480,7 @@ class ShadowCommands(commands.Cog):
         await ctx.reply(embed=embed, mention_author=False)
 
     @commands.hybrid_command(name="arise", description="Arise and summon a shadow")
+    @story_gate("Shadow Extraction")
     async def arise(self, ctx, name: str, tries: int = None):
         player = await Player.get(ctx.author.id)
         trace = getEmoji("trace")
@@ -488,14 +490,6 @@ class ShadowCommands(commands.Cog):
             await ctx.send(f"You haven't started the bot yet\n{down}Use `sl start` to get Re-Awakening")
             return
 
-        # Check story lock for shadow extraction
-        from structure.story_campaign import check_story_lock
-        can_access, lock_message = await check_story_lock(ctx.author.id, "cartenon_002", "Shadow Extraction")
-        if not can_access:
-            embed = create_embed("🔒 Feature Locked", lock_message, WARNING_COLOR, ctx.author)
-            await ctx.reply(embed=embed, mention_author=False)
-            return
-
         shadow = await Shadow.get(extractId(name))
         if isinstance(player.shadows, str):  # Fix the issue if shadows is a string
             player.shadows = json.loads(player.shadows)
@@ -365,6 +365,7 @@ class StoryCampaignView(discord.ui.View):
 
         # Combine available and completed missions for selection
         all_missions = available_missions + completed_missions
+        completed_ids = {mission.id for mission in completed_missions}
 
         # Sort by chapter and mission order
         chapter_order = {
@@ -393,8 +394,7 @@ class StoryCampaignView(discord.ui.View):
             used_values.add(mission.id)
 
             # Check if completed
-            progress = await StoryCampaign.get_player_story_progress(self.player.id)
-            is_completed = mission.id in progress and progress[mission.id].get("completed", False)
+            is_completed = mission.id in completed_ids
 
             chapter_emoji = {
                 StoryChapter.PROLOGUE: "🌅",
@@ -7,10 +7,18 @@ from structure.heroes import HeroManager
 from structure.items import ItemManager
 from structure.shadow import Shadow
 from structure.emoji import getEmoji
+from structure import upgrade_planner
 from utilis.utilis import create_embed, INFO_COLOR, ERROR_COLOR, SUCCESS_COLOR, WARNING_COLOR, create_progress_bar
 from commands.missions import track_mission_progress
 import math
 
+GEAR_NAMES = {
+    "gear1": "Enhancement Gear I",
+    "gear2": "Enhancement Gear II",
+    "gear3": "Enhancement Gear III",
+}
+RESOURCE_NAMES = {"gold": "Gold", "tos": "Traces of Shadow", **GEAR_NAMES}
+
 def get_comprehensive_cube_count(player, cube_attr, class_type):
     """Get cube count from multiple possible sources"""
     print(f"    DEBUG - get_comprehensive_cube_count called:")
@@ -149,6 +157,7 @@ class UpgradeItemSelectView(ui.View):
         if not player:
             return
 
+        budget = upgrade_planner.budget_of(player)
         options = []
 
         if self.item_type == 'shadow':
@@ -225,42 +234,11 @@ class UpgradeItemSelectView(ui.View):
                         tier = data.get('tier', 1)
 
                         # Check if player has materials to upgrade with tier-based requirements
-                        if is_hunter:
-                            gold_cost = (150 * level) + ((level // 10) * 500)
-                            # Hunters use different gear based on tier (higher tier = more expensive)
-                            if tier >= 3:  # High tier hunters need more gear
-                                gear_cost = (8 * level) + ((level // 10) * 25)
-                                gear_type = "gear3"
-                                gear_name = "Enhancement Gear III"
-                                can_upgrade = player.gold >= gold_cost and player.gear3 >= gear_cost
-                            elif tier >= 2:  # Mid tier hunters
-                                gear_cost = (5 * level) + ((level // 10) * 15)
-                                gear_type = "gear2"
-                                gear_name = "Enhancement Gear II"
-                                can_upgrade = player.gold >= gold_cost and player.gear2 >= gear_cost
-                            else:  # Low tier hunters (cheapest)
-                                gear_cost = (3 * level) + ((level // 10) * 10)
-                                gear_type = "gear1"
-                                gear_name = "Enhancement Gear I"
-                                can_upgrade = player.gold >= gold_cost and player.gear1 >= gear_cost
-                        else:  # weapon
-                            gold_cost = 1000 + (level * 300) + ((level // 10) * 1000)
-                            # Weapons use different gear based on tier and level (higher tier = more expensive)
-                            if tier >= 3 or level >= 40:  # High tier/level weapons (most expensive)
-                                gear_cost = (12 * level) + ((level // 15) * 35)
-                                gear_type = "gear3"
-                                gear_name = "Enhancement Gear III"
-                                can_upgrade = player.gold >= gold_cost and player.gear3 >= gear_cost
-                            elif tier >= 2 or level >= 20:  # Mid tier/level weapons
-                                gear_cost = (8 * level) + ((level // 15) * 20)
-                                gear_type = "gear2"
-                                gear_name = "Enhancement Gear II"
-                                can_upgrade = player.gold >= gold_cost and player.gear2 >= gear_cost
-                            else:  # Low tier/level weapons (cheapest)
-                                gear_cost = (5 * level) + ((level // 15) * 10)
-                                gear_type = "gear1"
-                                gear_name = "Enhancement Gear I"
-                                can_upgrade = player.gold >= gold_cost and player.gear1 >= gear_cost
+                        gear_type = upgrade_planner.gear_type(self.item_type, tier, level)
+                        cost = upgrade_planner.upgrade_cost(self.item_type, tier, level, 1)
+                        gold_cost, gear_cost = cost['gold'], cost[gear_type]
+                        gear_name = GEAR_NAMES[gear_type]
+                        can_upgrade = upgrade_planner.affordable(cost, budget)
                         status_emoji = "✅" if can_upgrade else "❌"
 
                         # Create detailed description with material status
@@ -580,6 +558,7 @@ class UpgradeFilterView(ui.View):
     async def collect_all_items(self):
         """Collect all upgradeable items from player inventory"""
         self.all_items = []
+        budget = upgrade_planner.budget_of(self.player)
 
         # Collect hunters
         hunters = self.player.get_hunters()
@@ -593,19 +572,10 @@ class UpgradeFilterView(ui.View):
                 tier = data.get('tier', 1)
 
                 # Calculate upgrade requirements
-                gold_cost = (150 * level) + ((level // 10) * 500)
-                if tier >= 3:
-                    gear_cost = (8 * level) + ((level // 10) * 25)
-                    gear_type = "gear3"
-                    can_upgrade = self.player.gold >= gold_cost and self.player.gear3 >= gear_cost
-                elif tier >= 2:
-                    gear_cost = (5 * level) + ((level // 10) * 15)
-                    gear_type = "gear2"
-                    can_upgrade = self.player.gold >= gold_cost and self.player.gear2 >= gear_cost
-                else:
-                    gear_cost = (3 * level) + ((level // 10) * 10)
-                    gear_type = "gear1"
-                    can_upgrade = self.player.gold >= gold_cost and self.player.gear1 >= gear_cost
+                gear_type = upgrade_planner.gear_type('hunter', tier, level)
+                cost = upgrade_planner.upgrade_cost('hunter', tier, level, 1)
+                gold_cost, gear_cost = cost['gold'], cost[gear_type]
+                can_upgrade = upgrade_planner.affordable(cost, budget)
 
                 upgrade_info = f"Gold: {gold_cost:,}, Gear: {gear_cost}" if can_upgrade else f"Need: {gold_cost:,} gold, {gear_cost} {gear_type}"
 
@@ -623,29 +593,21 @@ class UpgradeFilterView(ui.View):
 
         # Collect weapons
         weapons = self.player.get_inventory()
+        weapon_objs = await ItemManager.get_many(weapons.keys())
         for weapon_id, data in weapons.items():
             if weapon_id.startswith('s_') or not isinstance(data, dict) or 'level' not in data:
                 continue
 
-            weapon_obj = await ItemManager.get(weapon_id)
+            weapon_obj = weapon_objs.get(weapon_id)
             if weapon_obj:
                 level = data.get('level', 1)
                 tier = data.get('tier', 1)
 
                 # Calculate upgrade requirements
-                gold_cost = 1000 + (level * 300) + ((level // 10) * 1000)
-                if tier >= 3 or level >= 40:
-                    gear_cost = (12 * level) + ((level // 15) * 35)
-                    gear_type = "gear3"
-                    can_upgrade = self.player.gold >= gold_cost and self.player.gear3 >= gear_cost
-                elif tier >= 2 or level >= 20:
-                    gear_cost = (8 * level) + ((level // 15) * 20)
-                    gear_type = "gear2"
-                    can_upgrade = self.player.gold >= gold_cost and self.player.gear2 >= gear_cost
-                else:
-                    gear_cost = (5 * level) + ((level // 15) * 10)
-                    gear_type = "gear1"
-                    can_upgrade = self.player.gold >= gold_cost and self.player.gear1 >= gear_cost
+                gear_type = upgrade_planner.gear_type('weapon', tier, level)
+                cost = upgrade_planner.upgrade_cost('weapon', tier, level, 1)
+                gold_cost, gear_cost = cost['gold'], cost[gear_type]
+                can_upgrade = upgrade_planner.affordable(cost, budget)
 
                 upgrade_info = f"Gold: {gold_cost:,}, Gear: {gear_cost}" if can_upgrade else f"Need: {gold_cost:,} gold, {gear_cost} {gear_type}"
 
@@ -663,8 +625,9 @@ class UpgradeFilterView(ui.View):
 
         # Collect shadows
         shadows = self.player.get_shadows()
+        shadow_objs = await Shadow.get_many(shadows.keys())
         for shadow_id, data in shadows.items():
-            shadow_obj = await Shadow.get(shadow_id)
+            shadow_obj = shadow_objs.get(shadow_id)
             if shadow_obj:
                 level = data.get('level', 1)
                 tos_cost = level * 100
@@ -971,70 +934,44 @@ class UpgradeAllItemsView(ui.View):
         return embed
 
     async def collect_all_items(self):
-        """Collect all upgradeable items from player inventory"""
+        """Collect all upgradeable items from player inventory, priced by the upgrade planner"""
         self.all_items = []
+        budget = upgrade_planner.budget_of(self.player)
+        items = upgrade_planner.upgradeable_items(self.player)
 
-        # Check hunters
-        hunters = self.player.get_hunters()
-        for hunter_id, data in hunters.items():
-            if isinstance(data, dict) and 'level' in data:
-                level = data.get('level', 1)
-                tier = data.get('tier', 1)
-                hunter_obj = await HeroManager.get(hunter_id)
-                if hunter_obj:
-                    # Calculate upgrade cost
-                    gold_cost = level * 1000
-                    gear_cost = max(1, level // 10)
-                    can_upgrade = self.player.gold >= gold_cost and self.player.gear1 >= gear_cost
-
-                    self.all_items.append({
-                        'type': 'hunter',
-                        'name': hunter_obj.name,
-                        'level': level,
-                        'tier': tier,
-                        'can_upgrade': can_upgrade,
-                        'cost_text': f"Gold: {gold_cost:,}, Gear: {gear_cost}"
-                    })
-
-        # Check weapons
-        inventory = self.player.get_inventory()
-        for item_id, data in inventory.items():
-            if not item_id.startswith('s_') and isinstance(data, dict) and 'level' in data:
-                level = data.get('level', 1)
-                tier = data.get('tier', 1)
-                item_obj = await ItemManager.get(item_id)
-                if item_obj:
-                    # Calculate upgrade cost
-                    gold_cost = level * 1000
-                    gear_cost = max(1, level // 10)
-                    can_upgrade = self.player.gold >= gold_cost and self.player.gear1 >= gear_cost
-
-                    self.all_items.append({
-                        'type': 'weapon',
-                        'name': item_obj.name,
-                        'level': level,
-                        'tier': tier,
-                        'can_upgrade': can_upgrade,
-                        'cost_text': f"Gold: {gold_cost:,}, Gear: {gear_cost}"
-                    })
-
-        # Check shadows
-        shadows = self.player.get_shadows()
-        for shadow_id, shadow_data in shadows.items():
-            shadow_obj = await Shadow.get(shadow_id)
-            if shadow_obj:
-                level = shadow_data.get('level', 1)
-                tos_cost = level * 100
-                can_upgrade = self.player.tos >= tos_cost
+        item_objs = await ItemManager.get_many(item_id for item_id, kind, _, _ in items if kind == 'weapon')
+        shadow_objs = await Shadow.get_many(item_id for item_id, kind, _, _ in items if kind == 'shadow')
 
-                self.all_items.append({
-                    'type': 'shadow',
-                    'name': shadow_obj.name,
-                    'level': level,
-                    'tier': 1,
-                    'can_upgrade': can_upgrade,
-                    'cost_text': f"TOS: {tos_cost:,}"
-                })
+        for item_id, kind, tier, level in items:
+            if kind == 'hunter':
+                obj = await HeroManager.get(item_id)
+            else:
+                obj = (item_objs if kind == 'weapon' else shadow_objs).get(item_id)
+            if not obj:
+                continue
+
+            # Next level's price and how far the current budget reaches
+            cost = upgrade_planner.upgrade_cost(kind, tier, level, 1)
+            max_levels = upgrade_planner.max_affordable(kind, tier, level, budget)
+            if level >= upgrade_planner.level_cap(kind, tier):
+                cost_text = "Max level" if kind == 'shadow' else "Limit Break required"
+            elif kind == 'shadow':
+                cost_text = f"TOS: {cost['tos']:,}"
+            else:
+                gear_type = upgrade_planner.gear_type(kind, tier, level)
+                cost_text = f"Gold: {cost['gold']:,}, {GEAR_NAMES[gear_type]}: {cost[gear_type]:,}"
+            if max_levels > 1:
+                cost_text += f" • MAX +{max_levels}"
+
+            self.all_items.append({
+                'id': item_id,
+                'type': kind,
+                'name': obj.name,
+                'level': level,
+                'tier': tier,
+                'can_upgrade': max_levels > 0,
+                'cost_text': cost_text
+            })
 
         # Sort by upgrade availability, then by level
         self.all_items.sort(key=lambda x: (x['can_upgrade'], x['level']), reverse=True)
@@ -1083,6 +1020,89 @@ class UpgradeAllItemsView(ui.View):
         view = UpgradeTypeSelectView(self.author, self.upgrade_cog)
         await interaction.response.edit_message(embed=embed, view=view)
 
+    @ui.button(label="⚡ Upgrade All Within Budget", style=discord.ButtonStyle.success, row=1)
+    async def upgrade_all(self, interaction: discord.Interaction, button: ui.Button):
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("❌ This is not your upgrade view.", ephemeral=True)
+            return
+
+        self.player = await Player.get(self.author.id)
+        plans, _ = upgrade_planner.plan_many(upgrade_planner.upgradeable_items(self.player),
+                                             upgrade_planner.budget_of(self.player))
+        if not plans:
+            await interaction.response.send_message("❌ You can't afford a single level on any item right now.", ephemeral=True)
+            return
+
+        embed = bulk_upgrade_embed(self.author, plans, {item['id']: item['name'] for item in self.all_items},
+                                   "⚡ **Upgrade Everything Within Budget?**")
+        view = BulkUpgradeConfirmView(self.author, self)
+        await interaction.response.edit_message(embed=embed, view=view)
+
+
+def bulk_upgrade_embed(author, plans, names, title):
+    """Summary of a bulk upgrade plan: levels per item and the combined cost"""
+    totals = {}
+    for plan in plans:
+        for resource, amount in plan.cost.items():
+            totals[resource] = totals.get(resource, 0) + amount
+
+    lines = [f"**{names.get(plan.item_id, plan.item_id)}**: Lv.{plan.level} → Lv.{plan.target}" for plan in plans[:15]]
+    if len(plans) > 15:
+        lines.append(f"... and {len(plans) - 15} more")
+
+    embed = create_embed(title, "\n".join(lines), INFO_COLOR, author)
+    embed.add_field(
+        name="💰 Total Cost",
+        value="\n".join(
+            f"{getEmoji('trace' if resource == 'tos' else resource)} **{RESOURCE_NAMES[resource]}**: `{amount:,}`"
+            for resource, amount in totals.items() if amount
+        ) or "Nothing",
+        inline=False
+    )
+    embed.set_footer(text=f"{len(plans)} items • {sum(plan.levels for plan in plans)} levels • Lowest levels are upgraded first")
+    return embed
+
+
+class BulkUpgradeConfirmView(ui.View):
+    """Confirmation for the bulk upgrade; the plan is recomputed on confirm so it always matches the wallet"""
+
+    def __init__(self, author, items_view):
+        super().__init__(timeout=60)
+        self.author = author
+        self.items_view = items_view
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("❌ This is not your upgrade view.", ephemeral=True)
+            return False
+        return True
+
+    @ui.button(label="✅ Confirm", style=discord.ButtonStyle.success)
+    async def confirm(self, interaction: discord.Interaction, button: ui.Button):
+        await interaction.response.defer()
+        player = await Player.get(self.author.id)
+        plans, _ = upgrade_planner.plan_many(upgrade_planner.upgradeable_items(player),
+                                             upgrade_planner.budget_of(player))
+        if not plans:
+            await interaction.followup.send("❌ You can't afford a single level on any item right now.", ephemeral=True)
+            return
+
+        names = {item['id']: item['name'] for item in self.items_view.all_items}
+        levels_gained = upgrade_planner.apply_plans(player, plans)
+        await player.save()
+        await track_mission_progress(self.author.id, "upgrade", levels_gained)
+
+        self.items_view.player = player
+        embed = await self.items_view.create_main_embed()
+        await interaction.edit_original_response(embed=embed, view=self.items_view)
+        await interaction.followup.send(embed=bulk_upgrade_embed(self.author, plans, names, "✅ **Bulk Upgrade Complete**"),
+                                        ephemeral=True)
+
+    @ui.button(label="❌ Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: ui.Button):
+        embed = await self.items_view.create_main_embed()
+        await interaction.response.edit_message(embed=embed, view=self.items_view)
+
 
 class UpgradeCog(commands.Cog):
     def __init__(self, bot):
@@ -1331,8 +1351,8 @@ class UpgradeCog(commands.Cog):
             tier = item_data.get('tier', 0)
 
         # Define level caps for limit breaks
-        limit_break_caps = [10, 20, 40, 60, 80, 100]
-        level_cap = limit_break_caps[tier] if tier < len(limit_break_caps) else 100
+        limit_break_caps = upgrade_planner.LIMIT_BREAK_CAPS
+        level_cap = upgrade_planner.level_cap(item_type, tier)
 
         embed = create_embed(f"Upgrade: {item_obj.name}", color=INFO_COLOR, author=interaction.user)
 
@@ -1374,13 +1394,7 @@ class UpgradeCog(commands.Cog):
             )
 
             # Show max possible upgrades
-            max_upgrades = 0
-            temp_tos = player.tos
-            temp_level = level
-            while temp_level < 100 and temp_tos >= (temp_level * 100):
-                temp_tos -= temp_level * 100
-                temp_level += 1
-                max_upgrades += 1
+            max_upgrades = upgrade_planner.max_affordable('shadow', 0, level, upgrade_planner.budget_of(player))
 
             if max_upgrades > 0:
                 embed.add_field(
@@ -1445,24 +1459,12 @@ class UpgradeCog(commands.Cog):
                     inline=False
                 )
             else:
-                gold_cost = (150 * level) + ((level // 10) * 500)
-
-                # Determine gear type based on tier (higher tier = more expensive)
-                if tier >= 3:  # High tier hunters need more gear
-                    gear_cost = (8 * level) + ((level // 10) * 25)
-                    gear_type = "gear3"
-                    gear_name = "Enhancement Gear III"
-                    player_gear = player.gear3
-                elif tier >= 2:  # Mid tier hunters
-                    gear_cost = (5 * level) + ((level // 10) * 15)
-                    gear_type = "gear2"
-                    gear_name = "Enhancement Gear II"
-                    player_gear = player.gear2
-                else:  # Low tier hunters (cheapest)
-                    gear_cost = (3 * level) + ((level // 10) * 10)
-                    gear_type = "gear1"
-                    gear_name = "Enhancement Gear I"
-                    player_gear = player.gear1
+                # Gear type depends on tier (higher tier = more expensive)
+                gear_type = upgrade_planner.gear_type('hunter', tier, level)
+                cost = upgrade_planner.upgrade_cost('hunter', tier, level, 1)
+                gold_cost, gear_cost = cost['gold'], cost[gear_type]
+                gear_name = GEAR_NAMES[gear_type]
+                player_gear = getattr(player, gear_type)
 
                 can_upgrade_gold = player.gold >= gold_cost
                 can_upgrade_gear = player_gear >= gear_cost
@@ -1482,22 +1484,7 @@ class UpgradeCog(commands.Cog):
                 )
 
                 # Show max possible upgrades
-                max_upgrades = 0
-                temp_gold = player.gold
-                temp_gear1 = player.gear1
-                temp_level = level
-
-                while temp_level < level_cap:
-                    level_gold_cost = (150 * temp_level) + ((temp_level // 10) * 500)
-                    level_gear1_cost = (5 * temp_level) + ((temp_level // 10) * 25)
-
-                    if temp_gold >= level_gold_cost and temp_gear1 >= level_gear1_cost:
-                        temp_gold -= level_gold_cost
-                        temp_gear1 -= level_gear1_cost
-                        temp_level += 1
-                        max_upgrades += 1
-                    else:
-                        break
+                max_upgrades = upgrade_planner.max_affordable('hunter', tier, level, upgrade_planner.budget_of(player))
 
                 if max_upgrades > 0:
                     embed.add_field(
@@ -1554,24 +1541,12 @@ class UpgradeCog(commands.Cog):
                     inline=False
                 )
             else:
-                gold_cost = 1000 + (level * 300) + ((level // 10) * 1000)
-
-                # Determine gear type based on tier and level for weapons (higher tier = more expensive)
-                if tier >= 3 or level >= 40:  # High tier/level weapons (most expensive)
-                    gear_cost = (12 * level) + ((level // 15) * 35)
-                    gear_type = "gear3"
-                    gear_name = "Enhancement Gear III"
-                    player_gear = player.gear3
-                elif tier >= 2 or level >= 20:  # Mid tier/level weapons
-                    gear_cost = (8 * level) + ((level // 15) * 20)
-                    gear_type = "gear2"
-                    gear_name = "Enhancement Gear II"
-                    player_gear = player.gear2
-                else:  # Low tier/level weapons (cheapest)
-                    gear_cost = (5 * level) + ((level // 15) * 10)
-                    gear_type = "gear1"
-                    gear_name = "Enhancement Gear I"
-                    player_gear = player.gear1
+                # Gear type depends on tier and level for weapons (higher tier = more expensive)
+                gear_type = upgrade_planner.gear_type('weapon', tier, level)
+                cost = upgrade_planner.upgrade_cost('weapon', tier, level, 1)
+                gold_cost, gear_cost = cost['gold'], cost[gear_type]
+                gear_name = GEAR_NAMES[gear_type]
+                player_gear = getattr(player, gear_type)
 
                 can_upgrade_gold = player.gold >= gold_cost
                 can_upgrade_gear = player_gear >= gear_cost
@@ -1591,22 +1566,7 @@ class UpgradeCog(commands.Cog):
                 )
 
                 # Show max possible upgrades for weapons
-                max_upgrades = 0
-                temp_gold = player.gold
-                temp_gear1 = player.gear1
-                temp_level = level
-
-                while temp_level < level_cap:
-                    level_gold_cost = 1000 + (temp_level * 300) + ((temp_level // 10) * 1000)
-                    level_gear1_cost = 10 * temp_level
-
-                    if temp_gold >= level_gold_cost and temp_gear1 >= level_gear1_cost:
-                        temp_gold -= level_gold_cost
-                        temp_gear1 -= level_gear1_cost
-                        temp_level += 1
-                        max_upgrades += 1
-                    else:
-                        break
+                max_upgrades = upgrade_planner.max_affordable('weapon', tier, level, upgrade_planner.budget_of(player))
 
                 if max_upgrades > 0:
                     embed.add_field(
@@ -1656,141 +1616,36 @@ class UpgradeActionsView(ui.View):
 
         current_level = item_data.get('level', 1)
         tier = item_data.get('tier', 0)
-        
-        # Define level caps for limit breaks
-        limit_break_caps = [10, 20, 40, 60, 80, 100]
-        level_cap = limit_break_caps[tier] if tier < len(limit_break_caps) else 100
-
-        # Check if at level cap and needs limit break
-        at_level_cap = current_level >= level_cap and tier < len(limit_break_caps) - 1
+        level_cap = upgrade_planner.level_cap(self.item_type, tier)
+        budget = upgrade_planner.budget_of(player)
 
         # If a specific number of levels isn't provided, calculate the max possible
         if levels_to_add == -1: # -1 will signify "MAX"
-            levels_to_add = 0
-            temp_gold = player.gold
-
-            # Determine gear type based on tier
-            if is_hunter:
-                if tier >= 3:
-                    temp_gear = player.gear3
-                    gear_attr = "gear3"
-                elif tier >= 2:
-                    temp_gear = player.gear2
-                    gear_attr = "gear2"
-                else:
-                    temp_gear = player.gear1
-                    gear_attr = "gear1"
-            else:  # weapon
-                if tier >= 3 or current_level >= 40:
-                    temp_gear = player.gear3
-                    gear_attr = "gear3"
-                elif tier >= 2 or current_level >= 20:
-                    temp_gear = player.gear2
-                    gear_attr = "gear2"
-                else:
-                    temp_gear = player.gear1
-                    gear_attr = "gear1"
-
-            for i in range(current_level, level_cap):
-                level_for_cost = current_level + levels_to_add
-                if is_hunter:
-                    gold_cost = (150 * level_for_cost) + ((level_for_cost // 10) * 500)
-                    if tier >= 3:
-                        gear_cost = (8 * level_for_cost) + ((level_for_cost // 10) * 25)
-                    elif tier >= 2:
-                        gear_cost = (5 * level_for_cost) + ((level_for_cost // 10) * 15)
-                    else:
-                        gear_cost = (3 * level_for_cost) + ((level_for_cost // 10) * 10)
-                else: # Weapon costs
-                    gold_cost = 1000 + (level_for_cost * 300) + ((level_for_cost // 10) * 1000)
-                    if tier >= 3 or level_for_cost >= 40:
-                        gear_cost = (12 * level_for_cost) + ((level_for_cost // 15) * 35)
-                    elif tier >= 2 or level_for_cost >= 20:
-                        gear_cost = (8 * level_for_cost) + ((level_for_cost // 15) * 20)
-                    else:
-                        gear_cost = (5 * level_for_cost) + ((level_for_cost // 15) * 10)
-
-                if temp_gold >= gold_cost and temp_gear >= gear_cost:
-                    temp_gold -= gold_cost
-                    temp_gear -= gear_cost
-                    levels_to_add += 1
-                else:
-                    break
-            
-            if levels_to_add == 0:
+            levels_to_add = upgrade_planner.max_affordable(self.item_type, tier, current_level, budget)
+            if levels_to_add == 0 and current_level < level_cap:
                 embed = create_embed("Cannot Upgrade", "You don't have enough materials for even one level.", WARNING_COLOR, self.author)
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
 
-        if current_level + levels_to_add > level_cap:
-            levels_to_add = level_cap - current_level
-            if levels_to_add <= 0:
-                embed = create_embed(
-                    "Limit Break Required",
-                    f"This {self.item_type} is at its current level cap of `{level_cap}` and needs a Limit-Break to upgrade further.",
-                    WARNING_COLOR,
-                    self.author
-                )
-                await interaction.followup.send(embed=embed, ephemeral=True)
-                return
-
-        # Calculate total costs with correct gear types
-        total_gold_cost = 0
-        total_gear_cost = 0
-
-        # Determine gear type based on tier
-        if is_hunter:
-            if tier >= 3:
-                gear_attr = "gear3"
-                player_gear = player.gear3
-            elif tier >= 2:
-                gear_attr = "gear2"
-                player_gear = player.gear2
-            else:
-                gear_attr = "gear1"
-                player_gear = player.gear1
-        else:  # weapon
-            if tier >= 3 or current_level >= 40:
-                gear_attr = "gear3"
-                player_gear = player.gear3
-            elif tier >= 2 or current_level >= 20:
-                gear_attr = "gear2"
-                player_gear = player.gear2
-            else:
-                gear_attr = "gear1"
-                player_gear = player.gear1
-
-        for i in range(levels_to_add):
-            level_for_cost = current_level + i
-            if is_hunter:
-                total_gold_cost += (150 * level_for_cost) + ((level_for_cost // 10) * 500)
-                if tier >= 3:
-                    total_gear_cost += (8 * level_for_cost) + ((level_for_cost // 10) * 25)
-                elif tier >= 2:
-                    total_gear_cost += (5 * level_for_cost) + ((level_for_cost // 10) * 15)
-                else:
-                    total_gear_cost += (3 * level_for_cost) + ((level_for_cost // 10) * 10)
-            else: # Weapon costs
-                total_gold_cost += 1000 + (level_for_cost * 300) + ((level_for_cost // 10) * 1000)
-                if tier >= 3 or level_for_cost >= 40:
-                    total_gear_cost += (12 * level_for_cost) + ((level_for_cost // 15) * 35)
-                elif tier >= 2 or level_for_cost >= 20:
-                    total_gear_cost += (8 * level_for_cost) + ((level_for_cost // 15) * 20)
-                else:
-                    total_gear_cost += (5 * level_for_cost) + ((level_for_cost // 15) * 10)
-
-        if player.gold < total_gold_cost or player_gear < total_gear_cost:
-            embed = create_embed("Insufficient Materials", f"You can't afford to upgrade by `{levels_to_add}` levels.", ERROR_COLOR, self.author)
+        plan = upgrade_planner.plan_upgrade(self.item_id, self.item_type, tier, current_level, budget, levels_to_add)
+        if plan.levels <= 0:
+            embed = create_embed(
+                "Limit Break Required",
+                f"This {self.item_type} is at its current level cap of `{level_cap}` and needs a Limit-Break to upgrade further.",
+                WARNING_COLOR,
+                self.author
+            )
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        # Deduct costs
-        player.gold -= total_gold_cost
-        setattr(player, gear_attr, player_gear - total_gear_cost)
+        if not upgrade_planner.affordable(plan.cost, budget):
+            embed = create_embed("Insufficient Materials", f"You can't afford to upgrade by `{plan.levels}` levels.", ERROR_COLOR, self.author)
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
 
-        # Apply level ups
+        # Deduct costs and apply level ups
         # For now, we just add levels. XP system can be added if needed.
-        item_data['level'] += levels_to_add
+        levels_to_add = upgrade_planner.apply_plans(player, [plan])
 
         await player.save()
 
@@ -1823,32 +1678,23 @@ class UpgradeActionsView(ui.View):
             return
 
         current_level = shadow_data.get('level', 1)
+        budget = upgrade_planner.budget_of(player)
 
-        # Calculate total cost for shadow upgrades
-        if levels_to_add == -1:  # MAX upgrade
-            levels_to_add = 0
-            temp_tos = player.tos
-            temp_level = current_level
-
-            while temp_level < 100 and temp_tos >= (temp_level * 100):
-                cost = temp_level * 100
-                temp_tos -= cost
-                temp_level += 1
-                levels_to_add += 1
+        # MAX upgrade (-1) buys as many levels as the TOS covers; counts are capped at the max level
+        plan = upgrade_planner.plan_upgrade(self.item_id, 'shadow', 0, current_level, budget, levels_to_add)
+        levels_to_add = plan.levels
+        total_cost = plan.cost['tos']
 
-            if levels_to_add == 0:
+        if levels_to_add == 0:
+            if current_level >= upgrade_planner.SHADOW_MAX_LEVEL:
+                embed = create_embed("Max Level", f"This shadow is already at the max level of `{upgrade_planner.SHADOW_MAX_LEVEL}`.", WARNING_COLOR, self.author)
+            else:
                 embed = create_embed("Insufficient Resources", "You don't have enough Traces of Shadow to upgrade this shadow.", WARNING_COLOR, self.author)
-                await interaction.edit_original_response(embed=embed, view=None)
-                return
-
-        # Calculate total cost
-        total_cost = 0
-        for i in range(levels_to_add):
-            level_cost = (current_level + i) * 100
-            total_cost += level_cost
+            await interaction.edit_original_response(embed=embed, view=None)
+            return
 
         # Check if player has enough TOS
-        if player.tos < total_cost:
+        if not upgrade_planner.affordable(plan.cost, budget):
             embed = create_embed(
                 "Insufficient Resources",
                 f"You need **{total_cost:,}** {getEmoji('trace')} Traces of Shadow to upgrade by {levels_to_add} level{'s' if levels_to_add > 1 else ''}.\n\nYou have: **{player.tos:,}** TOS",
@@ -1858,16 +1704,8 @@ class UpgradeActionsView(ui.View):
             await interaction.edit_original_response(embed=embed, view=None)
             return
 
-        # Perform upgrade
-        player.tos -= total_cost
-
-        # Add XP to level up the shadow
-        xp_to_add = 0
-        for i in range(levels_to_add):
-            level_xp_needed = (current_level + i) * 1000
-            xp_to_add += level_xp_needed
-
-        player.add_shadow(self.item_id, xp_to_add)
+        # Perform upgrade: spend the TOS and add the XP that levels the shadow up
+        upgrade_planner.apply_plans(player, [plan])
         await player.save()
 
         # Track mission progress
@@ -1921,7 +1759,7 @@ class UpgradeActionsView(ui.View):
             inventory[self.item_id] = item_data
 
         # Define level caps and requirements for limit breaks
-        limit_break_caps = [10, 20, 40, 60, 80, 100]
+        limit_break_caps = upgrade_planner.LIMIT_BREAK_CAPS
         shard_requirements = [1, 1, 2, 2, 4]  # Shards needed for each tier
         cube_requirements = [5, 10, 20, 40, 60]  # Cubes needed for each tier
 
@@ -18,7 +18,7 @@ NC='\033[0m'
 # Check if backup file is provided
 if [ $# -eq 0 ]; then
     echo -e "${RED}❌ Please provide the backup file name${NC}"
-    echo -e "${YELLOW}Usage: $0 <backup_file.tar.gz>${NC}"
+    echo -e "${YELLOW}Usage: $0 <backup_file.tar.gz | new_player_backup_*.db.gz>${NC}"
     exit 1
 fi
 
@@ -31,6 +31,26 @@ if [ ! -f "$BACKUP_FILE" ]; then
     exit 1
 fi
 
+# Backups from automated_maintenance.py are restored (with checksum checks
+# and the newest differential archive) by the maintenance script itself
+case "$BACKUP_FILE" in
+    *.db|*.db.gz)
+        echo -e "${BLUE}🛑 Stopping bot service...${NC}"
+        systemctl stop arise-bot || echo -e "${YELLOW}⚠️  Service not running${NC}"
+
+        echo -e "${BLUE}📁 Restoring new_player.db from $BACKUP_FILE...${NC}"
+        if ! python3 "$BOT_DIR/automated_maintenance.py" restore "$BACKUP_FILE" --target "$BOT_DIR/new_player.db"; then
+            echo -e "${RED}❌ Restore failed, current database left in place${NC}"
+            exit 1
+        fi
+
+        echo -e "${BLUE}🚀 Starting bot service...${NC}"
+        systemctl start arise-bot
+        echo -e "${GREEN}✅ Database restore complete!${NC}"
+        exit 0
+        ;;
+esac
+
 echo -e "${BLUE}📦 Extracting backup file...${NC}"
 tar -xzf "$BACKUP_FILE"
 
@@ -7,6 +7,7 @@ import logging
 from typing import Optional, List, Dict, Any
 from structure.guild import Guild
 from structure.enhanced_guild import EnhancedGuild, GuildRole
+from structure.guild_directory import guild_directory
 from structure.player import Player
 from datetime import datetime
 
@@ -141,26 +142,19 @@ class GuildIntegrationManager:
     @staticmethod
     async def get_all_guilds() -> List[EnhancedGuild]:
         """Get all guilds from both systems, converting old ones as needed"""
-        all_guilds = []
-        
         try:
-            # Get all enhanced guilds
-            enhanced_guilds = await EnhancedGuild.get_all()
-            all_guilds.extend(enhanced_guilds)
-            enhanced_guild_ids = {guild.id for guild in enhanced_guilds}
-            
-            # Get old guilds that haven't been converted yet
-            old_guilds = await Guild.get_all()
-            for old_guild in old_guilds:
-                if old_guild.id not in enhanced_guild_ids:
-                    # Convert old guild
+            await guild_directory.ensure_loaded()
+
+            # Convert old guilds that haven't been converted yet; the directory knows which those are
+            for guild_id in guild_directory.legacy_ids():
+                old_guild = await Guild.get(guild_id)
+                if old_guild:
                     enhanced_guild = await GuildIntegrationManager.convert_old_to_enhanced(old_guild)
                     if enhanced_guild:
-                        all_guilds.append(enhanced_guild)
                         # Delete old guild after conversion
                         await old_guild.delete()
             
-            return all_guilds
+            return guild_directory.guilds()
             
         except Exception as e:
             logging.error(f"Error getting all guilds: {e}")
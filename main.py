@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 from pathlib import Path
 import time
 import json
@@ -15,7 +16,7 @@ from utilis.database_setup import setup_database
 from structure.glory import Glory
 from utilis.utilis import ELEMENT_WEAKNESSES, create_embed, INFO_COLOR
 from utilis.vote import VoteReminderManager
-from structure.raids import Raid
+from structure.raids import Raid, raid_checkpointer
 from structure.Rank import RankingLeaderboard
 from structure.BossDrop import BossDrop
 # Removed unused WorldBoss imports - now using Raid.spawn_world_boss()
@@ -28,6 +29,9 @@ from structure.items import ItemManager
 from structure.player import Player
 from structure.guild import Guild
 from structure.channel_commands import channel_command_manager, is_command_allowed
+from structure.db_pool import open_pools, close_pools
+from structure.player_writer import player_write_behind
+from structure.delivery_queue import delivery_queue
 
 load_dotenv()
 
@@ -332,6 +336,10 @@ async def on_command_error(ctx, error):
         return # Stop further processing
 
     if isinstance(error, commands.CommandNotFound):
+        # The command may live in a deferred cog; load those and retry once
+        if ctx.message and await load_lazy_extensions():
+            await bot.process_commands(ctx.message)
+            return
         embed = discord.Embed(
             title="Command Not Found",
             description="The command you entered does not exist. Please use `/help` to see the list of available commands.",
@@ -491,146 +499,272 @@ async def adminreset(ctx: commands.Context, player_id: int):
 # --- Bot Startup ---
 vote_reminder_manager = None
 
+# Heavy or rarely used cogs load on their first command, or once the bot is ready
+LAZY_EXTENSIONS = ["commands.admin", "commands.create", "commands.changelog", "commands.codex"]
+_lazy_attempted = set()
+_lazy_lock = asyncio.Lock()
+
+STARTUP_TIMINGS = []  # (stage, seconds) in completion order
+
+@contextlib.contextmanager
+def startup_stage(label):
+    """Record how long a startup stage took for the timing report"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS.append((label, time.perf_counter() - started))
+
+def print_startup_report(total_time):
+    print(f"⏱️ Startup timing ({total_time:.2f}s total):")
+    stages = [entry for entry in STARTUP_TIMINGS if not entry[0].startswith("ext ")]
+    for label, seconds in stages:
+        print(f"   {seconds:7.3f}s  {label}")
+    extensions = sorted((entry for entry in STARTUP_TIMINGS if entry[0].startswith("ext ")),
+                        key=lambda entry: entry[1], reverse=True)
+    if extensions:
+        slowest = ", ".join(f"{label[4:]} {seconds:.2f}s" for label, seconds in extensions[:5])
+        print(f"   Slowest extensions: {slowest}")
+
+async def load_extension_timed(name):
+    with startup_stage(f"ext {name}"):
+        await bot.load_extension(name)
+
+async def load_lazy_extensions():
+    """Load deferred extensions not tried yet; True if any loaded by this call"""
+    async with _lazy_lock:
+        loaded = False
+        for name in LAZY_EXTENSIONS:
+            if name in _lazy_attempted or name in bot.extensions:
+                continue
+            _lazy_attempted.add(name)
+            try:
+                await load_extension_timed(name)
+                loaded = True
+                print(f"✅ Loaded deferred extension: {name}")
+            except Exception as e:
+                print(f"❌ Failed to load deferred extension {name}: {e}")
+        return loaded
+
 async def setup_hook():
     global vote_reminder_manager
     startup_time = time.time()
+    STARTUP_TIMINGS.clear()
     print("🚀 Starting bot initialization...")
 
     # Initialize databases with progress tracking
     print("📊 Setting up database...")
-    await setup_database()
+    with startup_stage("database setup"):
+        await setup_database()
     print("✅ Database setup complete")
 
     print("🔄 Running data migration...")
-    await run_migration()
+    with startup_stage("data migration"):
+        await run_migration()
     print("✅ Data migration complete")
 
-    print("🎒 Initializing ItemManager...")
-    await ItemManager.initialize()
-    print("✅ ItemManager initialized")
-
-    print("⚡ Initializing SkillManager...")
-    await SkillManager.initialize()
-    await SkillManager.migrate_add_level()
-    print("✅ SkillManager initialized")
-
-    print("🌳 Initializing Skill Tree System...")
-    from structure.skill_tree_system import SkillTreeSystem
-    SkillTreeSystem.initialize_skill_trees()
-    await SkillTreeSystem.register_all_skills_with_manager()
-    print("✅ Skill Tree System initialized")
-
-    print("👹 Initializing Boss system...")
-    await Boss.initialize()
-    print("✅ Boss system initialized")
-
-    print("🌑 Initializing Shadow system...")
-    await Shadow.initialize()
-    print("✅ Shadow system initialized")
-
-    print("🏆 Initializing Leaderboard...")
-    await RankingLeaderboard.initialize_db()
-    print("✅ Leaderboard initialized")
-
-    print("🎖️ Initializing Ranking System...")
-    from structure.ranking_system import RankingSystem
-    await RankingSystem.initialize()
-    print("✅ Ranking System initialized")
-
-    print("🏰 Initializing Guild system...")
-    Guild.initialize()
-    print("✅ Guild system initialized")
-
-    print("⚔️ Initializing Raid system...")
-    await Raid.initialize()
-    await Raid.clear_all_raids()
-    print("✅ Raid system initialized")
-
-    print("👑 Initializing Glory system...")
-    Glory.initialize()
-    print("✅ Glory system initialized")
-
-    # Initialize world boss system
-    print("🌍 Initializing World Boss system...")
-    try:
-        from structure.raids import get_world_boss_manager
-        world_boss_manager = get_world_boss_manager(bot)
-        await world_boss_manager.start_world_boss_system()
-        print("✅ World Boss system initialized")
-    except Exception as e:
-        print(f"⚠️ World Boss system initialization failed: {e}")
-        print("🔄 Bot will continue without world boss auto-spawning")
-    
-    # Reset 'inc' flag for all players (temporarily disabled for faster startup)
-    print("✅ Skipping player flag reset for faster startup...")
+    print("🔌 Opening database connection pools...")
+    from structure import (player as player_db, items as items_db, skills as skills_db, shadow as shadow_db,
+                           ranking_system as ranking_db, achievement_system as achievement_db,
+                           notification_system as notification_db, raids as raids_db)
+    with startup_stage("connection pools"):
+        await open_pools([
+            player_db.DATABASE_PATH, items_db.DATABASE_PATH, skills_db.DATABASE_PATH, shadow_db.DATABASE_PATH,
+            ranking_db.DATABASE_PATH, achievement_db.DATABASE_PATH, notification_db.DATABASE_PATH,
+            raids_db.DATABASE_PATH
+        ])
+    print("✅ Database connection pools ready")
+
+    print("💾 Starting player write-behind buffer...")
+    player_write_behind.start()
+    print("✅ Player saves are now batched")
+
+    print("📨 Starting outbound delivery queue...")
+    delivery_queue.start(bot)
+    print("✅ DMs and alerts are now rate limited")
+
+    # Table setup that is still synchronous sqlite3; quick, and kept off the concurrent group
+    print("🏰 Initializing Guild and Glory tables...")
+    with startup_stage("guild + glory tables"):
+        Guild.initialize()
+        Glory.initialize()
+    print("✅ Guild and Glory systems initialized")
+
+    # Independent subsystems initialize concurrently; each chain keeps its own order.
+    # Pooled writes from different tasks are serialized per database by the pool.
+    async def init_items():
+        with startup_stage("items"):
+            await ItemManager.initialize()
+        print("✅ ItemManager initialized")
+
+    async def init_skills():
+        from structure.skill_tree_system import SkillTreeSystem
+        with startup_stage("skills + skill trees"):
+            await SkillManager.initialize()
+            await SkillManager.migrate_add_level()
+            SkillTreeSystem.initialize_skill_trees()
+            await SkillTreeSystem.register_all_skills_with_manager()
+        print("✅ SkillManager and Skill Tree System initialized")
+
+    async def init_bosses():
+        with startup_stage("bosses"):
+            await Boss.initialize()
+        print("✅ Boss system initialized")
+
+    async def init_shadows():
+        with startup_stage("shadows"):
+            await Shadow.initialize()
+        print("✅ Shadow system initialized")
+
+    async def init_rankings():
+        from structure.ranking_system import RankingSystem
+        with startup_stage("leaderboard + ranking"):
+            await RankingLeaderboard.initialize_db()
+            await RankingSystem.initialize()
+        print("✅ Leaderboard and Ranking System initialized")
+
+    async def init_raids():
+        with startup_stage("raids + world bosses"):
+            await Raid.initialize()
+            recovered = await Raid.recover_interrupted()
+            if recovered:
+                print(f"♻️ Closed out {recovered} raids interrupted by the last shutdown")
+            raid_checkpointer.start()
+            print("✅ Raid system initialized")
 
-    # Initialize channel command manager database
-    print("Initializing channel command management system...")
-    await channel_command_manager.initialize_database()
-    print("✅ Channel command management system initialized")
+            try:
+                from structure.raids import get_world_boss_manager
+                world_boss_manager = get_world_boss_manager(bot)
+                await world_boss_manager.start_world_boss_system()
+                print("✅ World Boss system initialized")
+            except Exception as e:
+                print(f"⚠️ World Boss system initialization failed: {e}")
+                print("🔄 Bot will continue without world boss auto-spawning")
+
+    async def init_channel_commands():
+        with startup_stage("channel commands"):
+            await channel_command_manager.initialize_database()
+        print("✅ Channel command management system initialized")
+
+    async def init_notifications():
+        with startup_stage("notifications"):
+            try:
+                from structure.notification_system import get_notification_manager
+                notification_manager = get_notification_manager(bot)
+                await notification_manager.initialize()
+                print("✅ Notification system initialized")
+            except Exception as e:
+                print(f"⚠️ Failed to initialize notification system: {e}")
+                print("🔄 Bot will continue without notification system")
+
+    print("⚙️ Initializing game systems concurrently...")
+    with startup_stage("game systems (concurrent)"):
+        await asyncio.gather(
+            init_items(), init_skills(), init_bosses(), init_shadows(), init_rankings(),
+            init_raids(), init_channel_commands(), init_notifications()
+        )
 
     # Load cogs with progress tracking
-    print("Loading extensions...")
-    await bot.add_cog(HelpCog(bot))
-
-    # Core extensions (load first for essential functionality)
-    core_extensions = [
-        "commands.start", "commands.profile", "commands.inventory", "commands.daily",
-        "commands.guild", "commands.Fight", "commands.gates", "commands.system_commands"
-    ]
-
-    # Secondary extensions (can load in parallel)
-    secondary_extensions = [
-        "commands.party", "commands.gacha", "commands.edit", "commands.afk", "commands.give",
-        "commands.create", "commands.upgrade", "commands.equip", "commands.Skills", "commands.shadow",
-        "commands.codex", "commands.evaluate", "commands.cooldowns", "commands.Shop", "commands.Trade",
-        "commands.Stat", "commands.Shards", "commands.Gallery", "commands.Raids", "commands.trivia",
-        "commands.tutorial", "commands.sacrifice", "commands.patreon", "commands.admin", "commands.admin_extended",
-        "commands.dungeons", "commands.train", "commands.boost", "commands.redeem", "commands.badges", "commands.vote",
-        "commands.missions", "commands.arena", "commands.market", "commands.lb", "commands.inbox",
-        "commands.test", "commands.hunter_weapon", "commands.changelog", "commands.oshi", "commands.elements",
-        "commands.view", "commands.skill_reset", "commands.achievement_backtrack", "commands.channel_management",
-        "commands.story", "commands.titles", "commands.notifications", "commands.badge", "events.server_tracking"
-    ]
-
-    # Load core extensions first
-    loaded_count = 0
-    total_extensions = len(core_extensions) + len(secondary_extensions)
-
-    for cog in core_extensions:
-        try:
-            await bot.load_extension(cog)
-            loaded_count += 1
-            print(f"✅ Loaded core extension: {cog} ({loaded_count}/{total_extensions})")
-        except Exception as e:
-            print(f"❌ Failed to load core extension {cog}: {e}")
+    async def load_extensions():
+        print("Loading extensions...")
+        await bot.add_cog(HelpCog(bot))
+
+        # Core extensions (load first for essential functionality)
+        core_extensions = [
+            "commands.start", "commands.profile", "commands.inventory", "commands.daily",
+            "commands.guild", "commands.Fight", "commands.gates", "commands.system_commands"
+        ]
 
-    # Load secondary extensions
-    for cog in secondary_extensions:
+        # Secondary extensions; LAZY_EXTENSIONS are loaded later
+        secondary_extensions = [
+            "commands.party", "commands.gacha", "commands.edit", "commands.afk", "commands.give",
+            "commands.upgrade", "commands.equip", "commands.Skills", "commands.shadow",
+            "commands.evaluate", "commands.cooldowns", "commands.Shop", "commands.Trade",
+            "commands.Stat", "commands.Shards", "commands.Gallery", "commands.Raids", "commands.trivia",
+            "commands.tutorial", "commands.sacrifice", "commands.patreon", "commands.admin_extended",
+            "commands.dungeons", "commands.train", "commands.boost", "commands.redeem", "commands.badges", "commands.vote",
+            "commands.missions", "commands.arena", "commands.market", "commands.lb", "commands.inbox",
+            "commands.test", "commands.hunter_weapon", "commands.oshi", "commands.elements",
+            "commands.view", "commands.skill_reset", "commands.achievement_backtrack", "commands.channel_management",
+            "commands.story", "commands.titles", "commands.notifications", "commands.badge", "events.server_tracking"
+        ]
+
+        # Load core extensions first
+        loaded_count = 0
+        total_extensions = len(core_extensions) + len(secondary_extensions)
+
+        for cog in core_extensions:
+            try:
+                await load_extension_timed(cog)
+                loaded_count += 1
+                print(f"✅ Loaded core extension: {cog} ({loaded_count}/{total_extensions})")
+            except Exception as e:
+                print(f"❌ Failed to load core extension {cog}: {e}")
+
+        # Load secondary extensions
+        for cog in secondary_extensions:
+            try:
+                await load_extension_timed(cog)
+                loaded_count += 1
+                print(f"✅ Loaded extension: {cog} ({loaded_count}/{total_extensions})")
+            except Exception as e:
+                print(f"❌ Failed to load extension {cog}: {e}")
+
+        print(f"🎉 Extension loading complete! ({loaded_count}/{total_extensions} loaded, "
+              f"{len(LAZY_EXTENSIONS)} deferred)")
+
+    # Versioned indexes/columns for every database, then check the hot query plans
+    async def migrate_and_index():
+        print("🧱 Applying schema migrations...")
         try:
-            await bot.load_extension(cog)
-            loaded_count += 1
-            print(f"✅ Loaded extension: {cog} ({loaded_count}/{total_extensions})")
+            from structure import glory as glory_db, market as market_db
+            from structure.migrations import apply_all, explain_hot_queries
+            migration_targets = {
+                "players": player_db.DATABASE_PATH,
+                "items": items_db.DATABASE_PATH,
+                "skills": skills_db.DATABASE_PATH,
+                "shadows": shadow_db.DATABASE_PATH,
+                "raids": raids_db.DATABASE_PATH,
+                "glory": glory_db.DATABASE_PATH,
+                "market": market_db.DATABASE_PATH,
+                "notifications": notification_db.DATABASE_PATH,
+            }
+            with startup_stage("schema migrations"):
+                applied = await apply_all(migration_targets)
+            print(f"✅ Schema migrations complete ({applied} applied)")
+            for line in await explain_hot_queries(migration_targets):
+                print(f"   {line}")
         except Exception as e:
-            print(f"❌ Failed to load extension {cog}: {e}")
+            print(f"⚠️ Schema migrations failed: {e}")
+
+        print("📈 Building leaderboard rank indexes...")
+        from structure import rank_index, glory as glory_db, Rank as leaderboard_db
+        with startup_stage("rank indexes"):
+            await rank_index.load_all({"players": player_db.DATABASE_PATH, "glory": glory_db.DATABASE_PATH,
+                                       "leaderboard": leaderboard_db.DATABASE_PATH})
+        print("✅ Leaderboard rank indexes ready")
+
+        from structure.matchmaking import matchmaking_index
+        with startup_stage("matchmaking index"):
+            try:
+                await matchmaking_index.ensure_loaded(player_db.DATABASE_PATH)
+                print(f"✅ Arena matchmaking index ready ({len(matchmaking_index)} eligible players)")
+            except Exception as e:
+                print(f"⚠️ Failed to build matchmaking index: {e}")
 
-    print(f"🎉 Extension loading complete! ({loaded_count}/{total_extensions} loaded)")
+        from structure.guild_directory import guild_directory
+        with startup_stage("guild directory"):
+            await guild_directory.ensure_loaded()
+            print(f"✅ Guild directory ready ({len(guild_directory)} guilds)")
+
+    # Extension imports are CPU-bound, the migrations and index builds wait on the database
+    with startup_stage("extensions + migrations (concurrent)"):
+        await asyncio.gather(load_extensions(), migrate_and_index())
 
     print("🗳️ Initializing vote reminder manager...")
     vote_reminder_manager = VoteReminderManager(bot)
     print("✅ Vote reminder manager initialized")
 
-    # Initialize notification system
-    print("🔔 Initializing notification system...")
-    try:
-        from structure.notification_system import get_notification_manager
-        notification_manager = get_notification_manager(bot)
-        await notification_manager.initialize()
-        print("✅ Notification system initialized")
-    except Exception as e:
-        print(f"⚠️ Failed to initialize notification system: {e}")
-        print("🔄 Bot will continue without notification system")
-
     # Initialize automated maintenance system
     print("🔧 Starting automated maintenance system...")
     try:
@@ -646,6 +780,7 @@ async def setup_hook():
 
     # Calculate and display total startup time
     total_time = time.time() - startup_time
+    print_startup_report(total_time)
     print(f"🎊 Bot initialization complete! Total time: {total_time:.2f} seconds")
     print("🤖 Arise is ready to rock and roll!")
 
@@ -654,6 +789,8 @@ async def on_ready():
     print(f"{bot.user.name} READY TO ROCK N ROLL")
     activity = discord.Activity(type=discord.ActivityType.watching, name="sl help | sl story | World Bosses")
     await bot.change_presence(activity=activity)
+    # Deferred cogs must be registered before syncing, or their slash commands would be dropped
+    await load_lazy_extensions()
     await bot.tree.sync()
 
 @bot.before_invoke
@@ -931,12 +1068,20 @@ async def test_timer_command(ctx):
 
 async def main():
     async with bot:
-        await setup_hook()
-        token = os.getenv("DISCORD_TOKEN")
-        if token:
-            await bot.start(token)
-        else:
-            print("Error: DISCORD_TOKEN environment variable not set.")
+        try:
+            await setup_hook()
+            token = os.getenv("DISCORD_TOKEN")
+            if token:
+                await bot.start(token)
+            else:
+                print("Error: DISCORD_TOKEN environment variable not set.")
+        finally:
+            # Flush queued player saves before the connections go away
+            await player_write_behind.stop()
+            await delivery_queue.stop()
+            # Final battle checkpoint before the connections go away
+            await raid_checkpointer.stop()
+            await close_pools()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
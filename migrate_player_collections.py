@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Move player collections (inventory, hunters, shadows, skills, defeated_bosses,
+titles) between the JSON blob columns and the normalized player_* tables.
+
+Usage:
+    python migrate_player_collections.py            # blobs -> tables
+    python migrate_player_collections.py --restore  # tables -> blobs
+
+Run the migration before (or after) setting "normalized_player_collections": true
+in db.json; players that are not migrated yet are also moved on their next save.
+Run --restore before turning the flag back off.
+"""
+
+import asyncio
+import logging
+import sys
+
+from structure import player_storage
+from structure.db_pool import close_pools, db_write
+from structure.player import DATABASE_PATH, Player
+
+BATCH_SIZE = 200
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+async def _write_in_batches(players):
+    written = 0
+    for start in range(0, len(players), BATCH_SIZE):
+        batch = players[start:start + BATCH_SIZE]
+        result = await Player.write_many(batch)
+        if result is None:
+            raise RuntimeError(f"Batch starting at player {batch[0].id} failed, see log")
+        written += result
+    return written
+
+
+async def migrate():
+    """Copy every blob that still holds data into the tables and blank it."""
+    player_storage.NORMALIZED_COLLECTIONS = True
+    players = await Player.all()
+    written = await _write_in_batches(players)
+    logging.info(f"Migrated collections for {written} of {len(players)} players")
+
+
+async def restore():
+    """Write the table contents back into the blob columns and empty the tables."""
+    player_storage.NORMALIZED_COLLECTIONS = True
+    players = await Player.all()
+
+    player_storage.NORMALIZED_COLLECTIONS = False
+    written = await _write_in_batches(players)
+
+    async with db_write(DATABASE_PATH) as conn:
+        for table, _ in player_storage.COLLECTION_TABLES.values():
+            await conn.execute(f"DELETE FROM {table}")
+        await conn.commit()
+    logging.info(f"Restored collection blobs for {written} of {len(players)} players")
+
+
+async def main():
+    try:
+        if "--restore" in sys.argv:
+            await restore()
+        else:
+            await migrate()
+    finally:
+        await close_pools()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
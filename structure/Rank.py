@@ -1,6 +1,8 @@
 import json
 import logging
 import aiosqlite
+from bisect import bisect_left
+from structure import rank_index
 from structure.player import Player
 
 def get_database_path():
@@ -14,6 +16,18 @@ def get_database_path():
 
 DATABASE_PATH = get_database_path()
 
+# (percentile cutoff, rank): positions in the top `cutoff` percent get the rank, anything lower is E-Rank
+PERCENTILE_RANKS = ((10, 'S-Rank'), (25, 'A-Rank'), (50, 'B-Rank'), (75, 'C-Rank'), (90, 'D-Rank'))
+_CUTOFFS = [cutoff for cutoff, _ in PERCENTILE_RANKS]
+
+
+def rank_for_position(position, total_players):
+    """Rank for a 1-based leaderboard position among `total_players`"""
+    percentile = position * 100 / total_players
+    i = bisect_left(_CUTOFFS, percentile)
+    return PERCENTILE_RANKS[i][1] if i < len(PERCENTILE_RANKS) else 'E-Rank'
+
+
 class RankingLeaderboard:
     @staticmethod
     async def initialize_db():
@@ -36,47 +50,38 @@ class RankingLeaderboard:
             ''')
             await db.commit()
 
-    async def assign_rank(self, player_power):
-        """Assign a rank to a player based on their power level."""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            # Fetch all players' power levels from the database
-            cursor = await db.execute('SELECT id, power FROM leaderboard')
-            players = await cursor.fetchall()
-
-        if not players:
-            return 'S-Rank', 1  # If no players, assign S-Rank by default with rank 1
-
-        # Sort players by power in descending order
-        sorted_players = sorted(players, key=lambda x: x[1], reverse=True)
-
-        # Find the player's position based on their power level
-        player_position = 0
-        for i, player in enumerate(sorted_players):
-            if player_power >= player[1]:
-                player_position = i
-                break
-
-        # Calculate the percentile
-        total_players = len(sorted_players)
-        percentile = ((player_position + 1) / total_players) * 100  # Positions are 1-based
-
-        # Determine rank based on percentile
-        if percentile <= 10:
-            return 'S-Rank', player_position + 1
-        elif percentile <= 25:
-            return 'A-Rank', player_position + 1
-        elif percentile <= 50:
-            return 'B-Rank', player_position + 1
-        elif percentile <= 75:
-            return 'C-Rank', player_position + 1
-        elif percentile <= 90:
-            return 'D-Rank', player_position + 1
-        else:
-            return 'E-Rank', player_position + 1 
+    @staticmethod
+    async def power_index() -> rank_index.RankIndex:
+        """Leaderboard powers, highest first, built on first use"""
+        index = rank_index.get_index("power")
+        await index.ensure_loaded(DATABASE_PATH)
+        return index
+
+    async def assign_rank(self, player_power, player_id=None):
+        """
+        Assign a rank to a player based on their power level. The position is
+        the number of stronger players plus one (O(log n) on the power index).
+        Pass `player_id` so a player's own stored power is not counted
+        against them and a new player counts towards the total.
+        """
+        index = await self.power_index()
+        own_power = index.score(player_id) if player_id is not None else None
+        if len(index) == (own_power is not None):
+            return 'S-Rank', 1  # If no other players, assign S-Rank by default with rank 1
+
+        stronger = index.count_above(player_power)
+        total_players = len(index)
+        if own_power is not None and own_power > player_power:
+            stronger -= 1
+        elif own_power is None and player_id is not None:
+            total_players += 1
+
+        position = stronger + 1
+        return rank_for_position(position, total_players), position
 
     async def add_player(self, player_id, power):
         """Add a new player to the leaderboard with a calculated rank."""
-        rank, rank_ = await self.assign_rank(power)
+        rank, rank_ = await self.assign_rank(power, player_id)
 
         async with aiosqlite.connect(DATABASE_PATH) as db:
             # Insert the player into the leaderboard
@@ -85,6 +90,7 @@ class RankingLeaderboard:
                 VALUES (?, ?, ?, ?)
             ''', (player_id, rank, rank_, power))
             await db.commit()
+        rank_index.get_index("power").update(player_id, power)
 
     async def get_all_players(self):
         """Retrieve all players in the leaderboard."""
@@ -106,10 +112,11 @@ class RankingLeaderboard:
         async with aiosqlite.connect(DATABASE_PATH) as db:
             await db.execute('DELETE FROM leaderboard WHERE id = ?', (player_id,))
             await db.commit()
+        rank_index.get_index("power").remove(player_id)
 
     async def evaluate(self, player_id, new_power):
         """Evaluate a player's new power and update their rank."""
-        rank, rank_ = await self.assign_rank(new_power)
+        rank, rank_ = await self.assign_rank(new_power, player_id)
 
         async with aiosqlite.connect(DATABASE_PATH) as db:
             # Update the player's rank and power
@@ -119,38 +126,54 @@ class RankingLeaderboard:
                 WHERE id = ?
             ''', (rank, rank_, new_power, player_id))
             await db.commit()
+        rank_index.get_index("power").update(player_id, new_power)
 
         return rank, rank_
 
 
-    async def update_srank(self):
-        """Update the S-Rank players in the separate table."""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            # Fetch all S-Rank players
-            cursor = await db.execute('SELECT id FROM leaderboard WHERE rank = "S-Rank"')
-            srank_players = await cursor.fetchall()
+    @staticmethod
+    def percentile_members(index, cutoff):
+        """Ids whose position is within the top `cutoff` percent of the index, ties at the edge included"""
+        members = index.top(len(index) * cutoff // 100)
+        if members:
+            lowest, offset = members[-1][1], len(members)
+            while True:
+                batch = index.top(50, offset)
+                tied = [entry for entry in batch if entry[1] == lowest]
+                members.extend(tied)
+                if not batch or len(tied) < len(batch):
+                    break
+                offset += len(batch)
+        return [member_id for member_id, _ in members]
 
-            if not srank_players:
-                return "No S-Rank players to update."
+    async def update_srank(self):
+        """
+        Update the S-Rank players in the separate table. Membership is the
+        current S-Rank percentile of the power index; only players who
+        joined or left it since the last update are written.
+        """
+        members = set(self.percentile_members(await self.power_index(), PERCENTILE_RANKS[0][0]))
 
-            # Create or update the S-Rank players table
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            # Create the S-Rank players table if needed
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS srank_players (
                     id INTEGER PRIMARY KEY
                 )
             ''')
+            cursor = await db.execute('SELECT id FROM srank_players')
+            current = {row[0] for row in await cursor.fetchall()}
 
-            # Insert or update the S-Rank players into the table
-            for player in srank_players:
-                player_id = player[0]
-                await db.execute('''
-                    INSERT OR REPLACE INTO srank_players (id)
-                    VALUES (?)
-                ''', (player_id,))
-
+            joined, left = members - current, current - members
+            if joined:
+                await db.executemany('INSERT OR IGNORE INTO srank_players (id) VALUES (?)', [(i,) for i in joined])
+            if left:
+                await db.executemany('DELETE FROM srank_players WHERE id = ?', [(i,) for i in left])
             await db.commit()
 
-        return "S-Rank players have been updated!"
+        if not members:
+            return "No S-Rank players to update."
+        return f"S-Rank players have been updated! ({len(joined)} joined, {len(left)} left)"
 
     
     async def get_srank_players(self):
@@ -1,8 +1,9 @@
 import json
 import logging
-import aiosqlite
+from bisect import bisect_right
+from structure.db_pool import db_read, db_write
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 from enum import Enum
 
 def get_database_path():
@@ -16,6 +17,12 @@ def get_database_path():
 
 DATABASE_PATH = get_database_path()
 
+# achievement_progress columns, in table order
+PROGRESS_COLUMNS = ['player_id', 'level', 'battles_won', 'shadows_collected', 'unique_items',
+                    'dungeons_cleared', 'party_activities', 'daily_streak', 'consecutive_rare_drops',
+                    'guild_joined', 'total_damage_dealt', 'total_xp_gained']
+PROGRESS_COUNTERS = PROGRESS_COLUMNS[1:]
+
 class AchievementCategory(Enum):
     """Achievement categories"""
     COMBAT = "Combat"
@@ -47,6 +54,95 @@ class Achievement:
         self.rewards = rewards
         self.hidden = hidden
 
+class AchievementRules:
+    """
+    Achievement requirements compiled into threshold tables.
+    Each achievement is a bit; for every counter the thresholds that reference it
+    are sorted alongside a running mask of the achievements met at that point, so
+    the rules a counter value satisfies are one bisect away. `met` only looks at
+    rules that reference the counters that changed.
+    """
+
+    def __init__(self, requirements: Dict[str, Dict], counters: Iterable[str] = None):
+        self.source = requirements
+        self.ids = list(requirements)
+        self.index = {achievement_id: bit for bit, achievement_id in enumerate(self.ids)}
+        self.all_mask = (1 << len(self.ids)) - 1
+        self.requires: Dict[str, int] = {}       # counter -> achievements that reference it
+        self.thresholds: Dict[str, List] = {}    # counter -> sorted thresholds
+        self.met_masks: Dict[str, List[int]] = {}  # counter -> achievements met below each threshold position
+        self.zero_masks: Dict[str, int] = {}     # counter -> achievements that need the counter at 0
+        self.blocked = 0                         # achievements that need a counter nobody tracks
+        known = set(counters) if counters is not None else None
+
+        entries: Dict[str, List] = {}
+        for achievement_id, requirement in requirements.items():
+            bit = 1 << self.index[achievement_id]
+            for counter, value in requirement.items():
+                if known is not None and counter not in known:
+                    self.blocked |= bit
+                    continue
+                self.requires[counter] = self.requires.get(counter, 0) | bit
+                if value is False:
+                    self.zero_masks[counter] = self.zero_masks.get(counter, 0) | bit
+                else:
+                    entries.setdefault(counter, []).append((1 if value is True else value, bit))
+
+        for counter in self.requires:
+            thresholds, masks, mask = [], [0], 0
+            for threshold, bit in sorted(entries.get(counter, []), key=lambda entry: entry[0]):
+                mask |= bit
+                thresholds.append(threshold)
+                masks.append(mask)
+            self.thresholds[counter] = thresholds
+            self.met_masks[counter] = masks
+
+    def satisfied(self, counter: str, value) -> int:
+        """Achievements whose requirement on `counter` holds at `value`"""
+        if value is None or counter not in self.requires:
+            return 0
+        mask = self.met_masks[counter][bisect_right(self.thresholds[counter], value)]
+        if not value:
+            mask |= self.zero_masks.get(counter, 0)
+        return mask
+
+    def met(self, progress: Dict, changed: Iterable[str] = None, exclude: int = 0) -> int:
+        """
+        Mask of achievements whose requirements all hold in `progress`.
+        With `changed`, only achievements that reference one of those counters
+        are considered; `exclude` masks out ones already unlocked.
+        """
+        if changed is None:
+            candidates = self.all_mask
+        else:
+            candidates = 0
+            for counter in changed:
+                candidates |= self.satisfied(counter, progress.get(counter))
+        candidates &= ~(self.blocked | exclude)
+        for counter, mask in self.requires.items():
+            if not candidates:
+                break
+            if mask & candidates:
+                candidates &= ~(mask & ~self.satisfied(counter, progress.get(counter)))
+        return candidates
+
+    def mask_of(self, achievement_ids: Iterable[str]) -> int:
+        mask = 0
+        for achievement_id in achievement_ids:
+            bit = self.index.get(achievement_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def select(self, mask: int) -> List[str]:
+        """Achievement ids in a mask, in declaration order"""
+        selected = []
+        while mask:
+            low = mask & -mask
+            selected.append(self.ids[low.bit_length() - 1])
+            mask ^= low
+        return selected
+
 class AchievementSystem:
     """
     Solo Leveling style Achievement System
@@ -155,7 +251,7 @@ class AchievementSystem:
     @classmethod
     async def initialize(cls):
         """Initialize the achievement database"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS player_achievements (
                     player_id TEXT,
@@ -184,13 +280,28 @@ class AchievementSystem:
             """)
             await db.commit()
     
+    _rules: Optional[AchievementRules] = None
+
+    @classmethod
+    def rules(cls) -> AchievementRules:
+        """The compiled requirement tables (rebuilt if ACHIEVEMENTS is swapped or resized)"""
+        rules = cls._rules
+        if rules is None or rules.source is not cls.ACHIEVEMENTS or len(rules.ids) != len(cls.ACHIEVEMENTS):
+            rules = cls._rules = AchievementRules(
+                {achievement_id: achievement.requirements for achievement_id, achievement in cls.ACHIEVEMENTS.items()},
+                PROGRESS_COUNTERS
+            )
+            rules.source = cls.ACHIEVEMENTS
+        return rules
+
     @classmethod
     async def update_progress(cls, player_id: str, **kwargs):
         """Update player's achievement progress"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        counters = {key: value for key, value in kwargs.items() if key in PROGRESS_COUNTERS}
+        async with db_write(DATABASE_PATH) as db:
             # Get current progress
             cursor = await db.execute(
-                "SELECT * FROM achievement_progress WHERE player_id = ?",
+                f"SELECT {', '.join(PROGRESS_COLUMNS)} FROM achievement_progress WHERE player_id = ?",
                 (player_id,)
             )
             result = await cursor.fetchone()
@@ -198,55 +309,37 @@ class AchievementSystem:
             
             if result:
                 # Update existing record
-                update_fields = []
-                update_values = []
-                for key, value in kwargs.items():
-                    if key in ['level', 'battles_won', 'shadows_collected', 'unique_items', 
-                              'dungeons_cleared', 'party_activities', 'daily_streak', 
-                              'consecutive_rare_drops', 'guild_joined', 'total_damage_dealt', 'total_xp_gained']:
-                        update_fields.append(f"{key} = ?")
-                        update_values.append(value)
-                
-                if update_fields:
-                    update_values.append(player_id)
+                progress = dict(zip(PROGRESS_COLUMNS, result))
+                if counters:
                     await db.execute(
-                        f"UPDATE achievement_progress SET {', '.join(update_fields)} WHERE player_id = ?",
-                        update_values
+                        f"UPDATE achievement_progress SET {', '.join(f'{key} = ?' for key in counters)} WHERE player_id = ?",
+                        [*counters.values(), player_id]
                     )
             else:
                 # Create new record
-                await db.execute("""
-                    INSERT INTO achievement_progress (player_id, level, battles_won, shadows_collected, 
-                    unique_items, dungeons_cleared, party_activities, daily_streak, consecutive_rare_drops, 
-                    guild_joined, total_damage_dealt, total_xp_gained)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    player_id,
-                    kwargs.get('level', 1),
-                    kwargs.get('battles_won', 0),
-                    kwargs.get('shadows_collected', 0),
-                    kwargs.get('unique_items', 0),
-                    kwargs.get('dungeons_cleared', 0),
-                    kwargs.get('party_activities', 0),
-                    kwargs.get('daily_streak', 0),
-                    kwargs.get('consecutive_rare_drops', 0),
-                    kwargs.get('guild_joined', 0),
-                    kwargs.get('total_damage_dealt', 0),
-                    kwargs.get('total_xp_gained', 0)
-                ))
+                progress = {key: 0 for key in PROGRESS_COUNTERS}
+                progress['level'] = 1
+                progress['player_id'] = player_id
+                await db.execute(f"""
+                    INSERT INTO achievement_progress ({', '.join(PROGRESS_COLUMNS)})
+                    VALUES ({', '.join('?' for _ in PROGRESS_COLUMNS)})
+                """, [player_id, *(counters.get(key, progress[key]) for key in PROGRESS_COUNTERS)])
+            progress.update(counters)
             
+            # Check for new achievements in the same transaction, only the rules these counters feed
+            newly_unlocked = await cls._unlock(db, player_id, progress, list(counters) or None)
             await db.commit()
-            
-            # Check for new achievements
-            return await cls.check_achievements(player_id)
+            return newly_unlocked
     
     @classmethod
-    async def check_achievements(cls, player_id: str) -> List[Achievement]:
-        """Check if player has unlocked any new achievements"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            # Get player progress
+    async def check_achievements(cls, player_id: str, changed: Iterable[str] = None) -> List[Achievement]:
+        """
+        Check if player has unlocked any new achievements.
+        Pass `changed` to only evaluate the rules that depend on those counters.
+        """
+        async with db_write(DATABASE_PATH) as db:
             cursor = await db.execute(
-                "SELECT * FROM achievement_progress WHERE player_id = ?",
+                f"SELECT {', '.join(PROGRESS_COLUMNS)} FROM achievement_progress WHERE player_id = ?",
                 (player_id,)
             )
             progress_result = await cursor.fetchone()
@@ -255,57 +348,74 @@ class AchievementSystem:
             if not progress_result:
                 return []
             
-            # Get already unlocked achievements
-            cursor = await db.execute(
-                "SELECT achievement_id FROM player_achievements WHERE player_id = ?",
-                (player_id,)
-            )
-            unlocked = {row[0] for row in await cursor.fetchall()}
-            await cursor.close()
-            
-            # Convert progress to dict
-            progress_keys = ['player_id', 'level', 'battles_won', 'shadows_collected', 'unique_items', 
-                           'dungeons_cleared', 'party_activities', 'daily_streak', 'consecutive_rare_drops', 
-                           'guild_joined', 'total_damage_dealt', 'total_xp_gained']
-            progress = dict(zip(progress_keys, progress_result))
-            
-            # Check each achievement
-            newly_unlocked = []
-            for achievement_id, achievement in cls.ACHIEVEMENTS.items():
-                if achievement_id in unlocked:
-                    continue
-                
-                # Check if requirements are met
-                requirements_met = True
-                for req_key, req_value in achievement.requirements.items():
-                    if req_key in progress:
-                        if isinstance(req_value, bool):
-                            if not (progress[req_key] >= 1 if req_value else progress[req_key] == 0):
-                                requirements_met = False
-                                break
-                        else:
-                            if progress[req_key] < req_value:
-                                requirements_met = False
-                                break
-                    else:
-                        requirements_met = False
-                        break
-                
-                if requirements_met:
-                    # Unlock achievement
-                    await db.execute("""
-                        INSERT INTO player_achievements (player_id, achievement_id, unlocked_at)
-                        VALUES (?, ?, ?)
-                    """, (player_id, achievement_id, str(time.time())))
-                    await db.commit()
-                    newly_unlocked.append(achievement)
-            
+            newly_unlocked = await cls._unlock(db, player_id, dict(zip(PROGRESS_COLUMNS, progress_result)), changed)
+            if newly_unlocked:
+                await db.commit()
             return newly_unlocked
+
+    @classmethod
+    async def _unlock(cls, db, player_id: str, progress: Dict, changed: Iterable[str] = None) -> List[Achievement]:
+        """Insert every achievement `progress` newly meets in one batch; the caller commits"""
+        rules = cls.rules()
+        cursor = await db.execute(
+            "SELECT achievement_id FROM player_achievements WHERE player_id = ?",
+            (player_id,)
+        )
+        unlocked = rules.mask_of(row[0] for row in await cursor.fetchall())
+        await cursor.close()
+
+        achievement_ids = rules.select(rules.met(progress, changed, exclude=unlocked))
+        if achievement_ids:
+            unlocked_at = str(time.time())
+            await db.executemany("""
+                INSERT OR IGNORE INTO player_achievements (player_id, achievement_id, unlocked_at)
+                VALUES (?, ?, ?)
+            """, [(player_id, achievement_id, unlocked_at) for achievement_id in achievement_ids])
+        return [cls.ACHIEVEMENTS[achievement_id] for achievement_id in achievement_ids]
+
+    @classmethod
+    async def backtrack(cls) -> Dict[str, List[Achievement]]:
+        """
+        Evaluate every player's stored progress against every rule and award
+        whatever is missing, in one read and one transaction.
+        Returns the newly unlocked achievements per player id.
+        """
+        rules = cls.rules()
+        async with db_write(DATABASE_PATH) as db:
+            cursor = await db.execute(f"SELECT {', '.join(PROGRESS_COLUMNS)} FROM achievement_progress")
+            rows = await cursor.fetchall()
+            await cursor.close()
+
+            cursor = await db.execute("SELECT player_id, achievement_id FROM player_achievements")
+            unlocked: Dict[str, int] = {}
+            for player_id, achievement_id in await cursor.fetchall():
+                unlocked[player_id] = unlocked.get(player_id, 0) | rules.mask_of((achievement_id,))
+            await cursor.close()
+
+            awarded: Dict[str, List[Achievement]] = {}
+            params = []
+            unlocked_at = str(time.time())
+            for row in rows:
+                progress = dict(zip(PROGRESS_COLUMNS, row))
+                player_id = progress['player_id']
+                achievement_ids = rules.select(rules.met(progress, exclude=unlocked.get(player_id, 0)))
+                if achievement_ids:
+                    awarded[player_id] = [cls.ACHIEVEMENTS[achievement_id] for achievement_id in achievement_ids]
+                    params.extend((player_id, achievement_id, unlocked_at) for achievement_id in achievement_ids)
+
+            if params:
+                await db.executemany("""
+                    INSERT OR IGNORE INTO player_achievements (player_id, achievement_id, unlocked_at)
+                    VALUES (?, ?, ?)
+                """, params)
+                await db.commit()
+        logging.info(f"Achievement backtrack awarded {len(params)} achievements to {len(awarded)} players")
+        return awarded
     
     @classmethod
     async def get_player_achievements(cls, player_id: str) -> Dict:
         """Get player's achievement data"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             # Get unlocked achievements
             cursor = await db.execute("""
                 SELECT achievement_id, unlocked_at FROM player_achievements 
@@ -316,7 +426,7 @@ class AchievementSystem:
             
             # Get progress
             cursor = await db.execute(
-                "SELECT * FROM achievement_progress WHERE player_id = ?",
+                f"SELECT {', '.join(PROGRESS_COLUMNS)} FROM achievement_progress WHERE player_id = ?",
                 (player_id,)
             )
             progress_result = await cursor.fetchone()
@@ -332,10 +442,7 @@ class AchievementSystem:
             
             progress = {}
             if progress_result:
-                progress_keys = ['player_id', 'level', 'battles_won', 'shadows_collected', 'unique_items', 
-                               'dungeons_cleared', 'party_activities', 'daily_streak', 'consecutive_rare_drops', 
-                               'guild_joined', 'total_damage_dealt', 'total_xp_gained']
-                progress = dict(zip(progress_keys, progress_result))
+                progress = dict(zip(PROGRESS_COLUMNS, progress_result))
             
             return {
                 'unlocked': unlocked,
@@ -4,310 +4,219 @@ Tracks player actions and awards achievements automatically
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
+from structure.achievement_system import AchievementRules
 from structure.player import Player
 
+# achievement id -> (name, description, requirements). The first requirement is
+# the one shown as progress; event counters (victories, daily_quests, ...) are 1
+# when the action being tracked just happened.
+TRACKED_ACHIEVEMENTS = {
+    # Level milestones
+    "level_10": ("Level 10 Reached", "Reached level 10", {"level": 10}),
+    "level_25": ("Level 25 Reached", "Reached level 25", {"level": 25}),
+    "level_50": ("Level 50 Reached", "Reached level 50", {"level": 50}),
+    "level_75": ("Level 75 Reached", "Reached level 75", {"level": 75}),
+    "level_100": ("Level 100 Reached", "Reached level 100", {"level": 100}),
+
+    # Combat, with level as a proxy for experience
+    "first_victory": ("First Victory", "Won your first battle", {"victories": 1}),
+    "combat_veteran": ("Combat Achievement", "Proven combat prowess", {"victories": 1, "level": 10}),
+    "battle_master": ("Combat Achievement", "Proven combat prowess", {"victories": 1, "level": 25}),
+    "war_hero": ("Combat Achievement", "Proven combat prowess", {"victories": 1, "level": 50}),
+
+    # Gacha
+    "gacha_novice": ("Gacha Achievement", "Performed 10 gacha pulls", {"gacha_pulls": 10}),
+    "gacha_enthusiast": ("Gacha Achievement", "Performed 50 gacha pulls", {"gacha_pulls": 50}),
+    "gacha_addict": ("Gacha Achievement", "Performed 100 gacha pulls", {"gacha_pulls": 100}),
+    "gacha_master": ("Gacha Achievement", "Performed 500 gacha pulls", {"gacha_pulls": 500}),
+
+    # Collection
+    "collector_10": ("Item Collector", "Collected 10 different items", {"unique_items": 10}),
+    "collector_25": ("Item Collector", "Collected 25 different items", {"unique_items": 25}),
+    "collector_50": ("Item Collector", "Collected 50 different items", {"unique_items": 50}),
+    "collector_100": ("Item Collector", "Collected 100 different items", {"unique_items": 100}),
+    "hunter_collector_5": ("Hunter Collector", "Collected 5 different hunters", {"hunters_owned": 5}),
+    "hunter_collector_15": ("Hunter Collector", "Collected 15 different hunters", {"hunters_owned": 15}),
+    "hunter_collector_30": ("Hunter Collector", "Collected 30 different hunters", {"hunters_owned": 30}),
+    "hunter_collector_50": ("Hunter Collector", "Collected 50 different hunters", {"hunters_owned": 50}),
+
+    # Guild
+    "guild_member": ("Guild Member", "Joined a guild", {"guild_joined": 1}),
+    "guild_leader": ("Guild Leader", "Became leader of a guild", {"guild_led": 1}),
+
+    # Wealth
+    "wealthy_1k": ("Wealth Achievement", "Accumulated 1,000 gold", {"gold": 1000}),
+    "wealthy_10k": ("Wealth Achievement", "Accumulated 10,000 gold", {"gold": 10000}),
+    "wealthy_100k": ("Wealth Achievement", "Accumulated 100,000 gold", {"gold": 100000}),
+    "wealthy_1m": ("Wealth Achievement", "Accumulated 1,000,000 gold", {"gold": 1000000}),
+
+    # Activities
+    "daily_warrior": ("Daily Warrior", "Completed daily quests", {"daily_quests": 1}),
+    "skill_learner": ("Skill Learner", "Earned skill points", {"skill_points": 1}),
+    "arena_fighter": ("Arena Achievement", "Arena prowess demonstrated", {"arena_matches": 1, "level": 5}),
+    "arena_champion": ("Arena Achievement", "Arena prowess demonstrated", {"arena_matches": 1, "level": 15}),
+    "arena_legend": ("Arena Achievement", "Arena prowess demonstrated", {"arena_matches": 1, "level": 30}),
+    "gate_explorer": ("Gate Achievement", "Dimensional exploration mastery", {"gates_explored": 1, "level": 5}),
+    "gate_master": ("Gate Achievement", "Dimensional exploration mastery", {"gates_explored": 1, "level": 20}),
+    "dimension_walker": ("Gate Achievement", "Dimensional exploration mastery", {"gates_explored": 1, "level": 40}),
+    "raid_participant": ("Raid Achievement", "Raid mastery demonstrated", {"raids": 1, "level": 10}),
+    "raid_veteran": ("Raid Achievement", "Raid mastery demonstrated", {"raids": 1, "level": 25}),
+    "raid_legend": ("Raid Achievement", "Raid mastery demonstrated", {"raids": 1, "level": 50}),
+}
+
+TRACKER_RULES = AchievementRules({achievement_id: entry[2] for achievement_id, entry in TRACKED_ACHIEVEMENTS.items()})
+
+
+def count_unique_items(player) -> int:
+    """Different items (not shards) the player holds at least one of"""
+    item_count = 0
+    for k, v in (getattr(player, 'inventory', None) or {}).items():
+        if not k.startswith('s_'):  # Skip shards
+            if isinstance(v, dict):
+                quantity = v.get('quantity', 0)
+            elif isinstance(v, int):
+                quantity = v
+            else:
+                quantity = 0
+            try:
+                if quantity > 0:
+                    item_count += 1
+            except TypeError:
+                continue
+    return item_count
+
+
+def count_hunters(player) -> int:
+    """Hunters the player owns (quantity or level above zero)"""
+    hunter_count = 0
+    for v in (getattr(player, 'hunters', None) or {}).values():
+        try:
+            if isinstance(v, dict):
+                if v.get('quantity', 0) > 0 or v.get('level', 0) > 0:
+                    hunter_count += 1
+            elif isinstance(v, int) and v > 0:
+                hunter_count += 1
+        except TypeError:
+            continue
+    return hunter_count
+
+
+def player_counters(player) -> Dict[str, int]:
+    """Every counter that can be read straight off a player"""
+    return {
+        "level": getattr(player, 'level', 1),
+        "gold": getattr(player, 'gold', 0),
+        "gacha_pulls": getattr(player, 'gacha', 0),
+        "unique_items": count_unique_items(player),
+        "hunters_owned": count_hunters(player),
+        "skill_points": getattr(player, 'skillPoints', 0),
+    }
+
+
+def apply_achievements(player, counters: Dict[str, Any], changed: Iterable[str] = None,
+                       unlocked_at: str = "real_time", descriptions: Dict[str, str] = None) -> List[str]:
+    """
+    Record every tracked achievement `counters` newly meets on the player.
+    With `changed`, only rules that depend on those counters are evaluated.
+    Returns the awarded ids; saving the player is left to the caller.
+    """
+    if not hasattr(player, 'achievements') or not player.achievements:
+        player.achievements = {}
+
+    mask = TRACKER_RULES.met(counters, changed, exclude=TRACKER_RULES.mask_of(player.achievements))
+    awarded = TRACKER_RULES.select(mask)
+    for achievement_id in awarded:
+        name, description, requirements = TRACKED_ACHIEVEMENTS[achievement_id]
+        counter, required = next(iter(requirements.items()))
+        player.achievements[achievement_id] = {
+            "unlocked": True,
+            "progress": counters.get(counter, required),
+            "max_progress": required,
+            "unlocked_at": unlocked_at,
+            "name": name,
+            "description": (descriptions or {}).get(achievement_id, description)
+        }
+    return awarded
+
+
 class AchievementTracker:
     """Tracks and awards achievements in real-time"""
-    
+
     @staticmethod
     async def track_level_up(player: Player, new_level: int):
         """Track level-based achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        level_achievements = {
-            10: "level_10",
-            25: "level_25", 
-            50: "level_50",
-            75: "level_75",
-            100: "level_100"
-        }
-        
-        for required_level, achievement_id in level_achievements.items():
-            if new_level >= required_level and achievement_id not in player.achievements:
-                await AchievementTracker._award_achievement(player, achievement_id, {
-                    "name": f"Level {required_level} Reached",
-                    "description": f"Reached level {required_level}",
-                    "progress": new_level,
-                    "max_progress": required_level
-                })
-    
+        await AchievementTracker._award_met(player, {"level": new_level}, ("level",))
+
     @staticmethod
     async def track_combat_victory(player: Player, opponent_type: str = "player"):
         """Track combat-related achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        # First victory achievement
-        if "first_victory" not in player.achievements:
-            await AchievementTracker._award_achievement(player, "first_victory", {
-                "name": "First Victory",
-                "description": "Won your first battle",
-                "progress": 1,
-                "max_progress": 1
-            })
-        
-        # Combat milestone achievements based on level (proxy for combat experience)
-        combat_achievements = {
-            10: "combat_veteran",
-            25: "battle_master", 
-            50: "war_hero"
-        }
-        
-        for required_level, achievement_id in combat_achievements.items():
-            if player.level >= required_level and achievement_id not in player.achievements:
-                await AchievementTracker._award_achievement(player, achievement_id, {
-                    "name": f"Combat Achievement",
-                    "description": f"Proven combat prowess",
-                    "progress": 1,
-                    "max_progress": 1
-                })
-    
+        # Combat milestones use level as a proxy for combat experience
+        await AchievementTracker._award_met(player, {"victories": 1, "level": player.level}, ("victories",))
+
     @staticmethod
     async def track_gacha_pull(player: Player, pulls_count: int = 1):
         """Track gacha-related achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        total_pulls = getattr(player, 'gacha', 0)
-        
-        gacha_achievements = {
-            10: "gacha_novice",
-            50: "gacha_enthusiast", 
-            100: "gacha_addict",
-            500: "gacha_master"
-        }
-        
-        for required_pulls, achievement_id in gacha_achievements.items():
-            if total_pulls >= required_pulls and achievement_id not in player.achievements:
-                await AchievementTracker._award_achievement(player, achievement_id, {
-                    "name": f"Gacha Achievement",
-                    "description": f"Performed {required_pulls} gacha pulls",
-                    "progress": total_pulls,
-                    "max_progress": required_pulls
-                })
-    
+        await AchievementTracker._award_met(player, {"gacha_pulls": getattr(player, 'gacha', 0)}, ("gacha_pulls",))
+
     @staticmethod
     async def track_collection(player: Player, item_type: str = "item"):
         """Track collection-related achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
         if item_type == "item":
-            # Count inventory items
-            item_count = 0
-            if hasattr(player, 'inventory') and player.inventory:
-                for k, v in player.inventory.items():
-                    if not k.startswith('s_'):  # Skip shards
-                        try:
-                            if isinstance(v, dict):
-                                quantity = v.get('quantity', 0)
-                            elif isinstance(v, int):
-                                quantity = v
-                            else:
-                                quantity = 0
-                            
-                            if quantity > 0:
-                                item_count += 1
-                        except Exception:
-                            continue
-            
-            collection_achievements = {
-                10: "collector_10",
-                25: "collector_25",
-                50: "collector_50", 
-                100: "collector_100"
-            }
-            
-            for required_items, achievement_id in collection_achievements.items():
-                if item_count >= required_items and achievement_id not in player.achievements:
-                    await AchievementTracker._award_achievement(player, achievement_id, {
-                        "name": f"Item Collector",
-                        "description": f"Collected {required_items} different items",
-                        "progress": item_count,
-                        "max_progress": required_items
-                    })
-        
+            await AchievementTracker._award_met(player, {"unique_items": count_unique_items(player)}, ("unique_items",))
         elif item_type == "hunter":
-            # Count hunters
-            hunter_count = 0
-            if hasattr(player, 'hunters') and player.hunters:
-                for k, v in player.hunters.items():
-                    try:
-                        if isinstance(v, dict):
-                            quantity = v.get('quantity', 0)
-                            level = v.get('level', 0)
-                            if quantity > 0 or level > 0:
-                                hunter_count += 1
-                        elif isinstance(v, int):
-                            if v > 0:
-                                hunter_count += 1
-                    except Exception:
-                        continue
-            
-            hunter_achievements = {
-                5: "hunter_collector_5",
-                15: "hunter_collector_15",
-                30: "hunter_collector_30",
-                50: "hunter_collector_50"
-            }
-            
-            for required_hunters, achievement_id in hunter_achievements.items():
-                if hunter_count >= required_hunters and achievement_id not in player.achievements:
-                    await AchievementTracker._award_achievement(player, achievement_id, {
-                        "name": f"Hunter Collector",
-                        "description": f"Collected {required_hunters} different hunters",
-                        "progress": hunter_count,
-                        "max_progress": required_hunters
-                    })
-    
+            await AchievementTracker._award_met(player, {"hunters_owned": count_hunters(player)}, ("hunters_owned",))
+
     @staticmethod
     async def track_guild_join(player: Player, guild_name: str):
         """Track guild-related achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        if "guild_member" not in player.achievements:
-            await AchievementTracker._award_achievement(player, "guild_member", {
-                "name": "Guild Member",
-                "description": f"Joined guild: {guild_name}",
-                "progress": 1,
-                "max_progress": 1
-            })
-    
+        await AchievementTracker._award_met(player, {"guild_joined": 1}, ("guild_joined",),
+                                            {"guild_member": f"Joined guild: {guild_name}"})
+
     @staticmethod
     async def track_guild_leadership(player: Player, guild_name: str):
         """Track guild leadership achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        if "guild_leader" not in player.achievements:
-            await AchievementTracker._award_achievement(player, "guild_leader", {
-                "name": "Guild Leader",
-                "description": f"Became leader of guild: {guild_name}",
-                "progress": 1,
-                "max_progress": 1
-            })
-    
+        await AchievementTracker._award_met(player, {"guild_led": 1}, ("guild_led",),
+                                            {"guild_leader": f"Became leader of guild: {guild_name}"})
+
     @staticmethod
     async def track_wealth(player: Player):
         """Track wealth-related achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        gold = getattr(player, 'gold', 0)
-        
-        wealth_achievements = {
-            1000: "wealthy_1k",
-            10000: "wealthy_10k",
-            100000: "wealthy_100k",
-            1000000: "wealthy_1m"
-        }
-        
-        for required_gold, achievement_id in wealth_achievements.items():
-            if gold >= required_gold and achievement_id not in player.achievements:
-                await AchievementTracker._award_achievement(player, achievement_id, {
-                    "name": f"Wealth Achievement",
-                    "description": f"Accumulated {required_gold:,} gold",
-                    "progress": gold,
-                    "max_progress": required_gold
-                })
-    
+        await AchievementTracker._award_met(player, {"gold": getattr(player, 'gold', 0)}, ("gold",))
+
     @staticmethod
     async def track_daily_quest(player: Player):
         """Track daily quest achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        if "daily_warrior" not in player.achievements:
-            await AchievementTracker._award_achievement(player, "daily_warrior", {
-                "name": "Daily Warrior",
-                "description": "Completed daily quests",
-                "progress": 1,
-                "max_progress": 1
-            })
-    
+        await AchievementTracker._award_met(player, {"daily_quests": 1}, ("daily_quests",))
+
     @staticmethod
     async def track_arena_participation(player: Player):
         """Track arena achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        arena_achievements = {
-            5: "arena_fighter",
-            15: "arena_champion",
-            30: "arena_legend"
-        }
-        
-        for required_level, achievement_id in arena_achievements.items():
-            if player.level >= required_level and achievement_id not in player.achievements:
-                await AchievementTracker._award_achievement(player, achievement_id, {
-                    "name": f"Arena Achievement",
-                    "description": f"Arena prowess demonstrated",
-                    "progress": 1,
-                    "max_progress": 1
-                })
-    
+        await AchievementTracker._award_met(player, {"arena_matches": 1, "level": player.level}, ("arena_matches",))
+
     @staticmethod
     async def track_gate_exploration(player: Player):
         """Track gate exploration achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        gate_achievements = {
-            5: "gate_explorer",
-            20: "gate_master",
-            40: "dimension_walker"
-        }
-        
-        for required_level, achievement_id in gate_achievements.items():
-            if player.level >= required_level and achievement_id not in player.achievements:
-                await AchievementTracker._award_achievement(player, achievement_id, {
-                    "name": f"Gate Achievement",
-                    "description": f"Dimensional exploration mastery",
-                    "progress": 1,
-                    "max_progress": 1
-                })
-    
+        await AchievementTracker._award_met(player, {"gates_explored": 1, "level": player.level}, ("gates_explored",))
+
     @staticmethod
     async def track_raid_participation(player: Player):
         """Track raid achievements"""
-        if not hasattr(player, 'achievements') or not player.achievements:
-            player.achievements = {}
-        
-        raid_achievements = {
-            10: "raid_participant",
-            25: "raid_veteran",
-            50: "raid_legend"
-        }
-        
-        for required_level, achievement_id in raid_achievements.items():
-            if player.level >= required_level and achievement_id not in player.achievements:
-                await AchievementTracker._award_achievement(player, achievement_id, {
-                    "name": f"Raid Achievement",
-                    "description": f"Raid mastery demonstrated",
-                    "progress": 1,
-                    "max_progress": 1
-                })
-    
+        await AchievementTracker._award_met(player, {"raids": 1, "level": player.level}, ("raids",))
+
     @staticmethod
-    async def _award_achievement(player: Player, achievement_id: str, achievement_data: Dict[str, Any]):
-        """Internal method to award an achievement"""
+    async def _award_met(player: Player, counters: Dict[str, Any], changed: Iterable[str],
+                         descriptions: Optional[Dict[str, str]] = None):
+        """Internal method to award every achievement the update unlocks, with a single save"""
         try:
-            player.achievements[achievement_id] = {
-                "unlocked": True,
-                "progress": achievement_data.get("progress", 1),
-                "max_progress": achievement_data.get("max_progress", 1),
-                "unlocked_at": "real_time",
-                "name": achievement_data.get("name", achievement_id),
-                "description": achievement_data.get("description", "Achievement unlocked")
-            }
-            
+            awarded = apply_achievements(player, counters, changed, descriptions=descriptions)
+            if not awarded:
+                return
+
             # Save player data
             await player.save()
-            
-            logging.info(f"Achievement '{achievement_id}' awarded to player {player.id}")
-            
+
+            logging.info(f"Achievements {awarded} awarded to player {player.id}")
+
         except Exception as e:
-            logging.error(f"Error awarding achievement '{achievement_id}' to player {player.id}: {e}")
+            logging.error(f"Error awarding achievements to player {player.id}: {e}")
@@ -128,8 +128,9 @@ class BattleSkillIntegration:
             return {"has_skills": False, "skills": {}}
         
         skills_info = {}
+        skills = await SkillManager.get_many_with_player_level(player.skills.keys(), str(player_id))
         for skill_id, skill_data in player.skills.items():
-            skill = await SkillManager.get_skill_with_player_level(skill_id, str(player_id))
+            skill = skills.get(skill_id)
             if skill:
                 skills_info[skill_id] = {
                     "name": skill.name,
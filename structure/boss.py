@@ -1,6 +1,7 @@
 import json
 import logging
 import aiosqlite
+from structure.catalog_cache import CatalogCache
 
 def get_database_path():
     try:
@@ -14,6 +15,8 @@ def get_database_path():
 DATABASE_PATH = get_database_path()
 
 class Boss:
+    _catalog = CatalogCache("bosses", lambda: Boss._fetch_all())
+
     def __init__(
         self, 
         boss_id: str, 
@@ -65,24 +68,28 @@ class Boss:
             await db.commit()
 
     @classmethod
-    async def get(cls, boss_id: str):
-        """Retrieve a single boss by its ID."""
+    async def _fetch_all(cls):
+        """Read the whole bosses table (used to fill the catalog cache)."""
         async with aiosqlite.connect(DATABASE_PATH) as db:
-            cursor = await db.execute("SELECT * FROM bosses WHERE id = ?", (boss_id,))
-            row = await cursor.fetchone()
+            cursor = await db.execute("SELECT * FROM bosses")
+            rows = await cursor.fetchall()
             await cursor.close()
-            if row:
-                return cls(*row)
-            return None
+            return [cls(*row) for row in rows]
+
+    @classmethod
+    async def get(cls, boss_id: str):
+        """Retrieve a single boss by its ID."""
+        return await cls._catalog.get(boss_id)
+
+    @classmethod
+    async def get_many(cls, boss_ids):
+        """Retrieve several bosses at once as {boss_id: Boss}; unknown ids are left out."""
+        return await cls._catalog.get_many(boss_ids)
 
     @classmethod
     async def get_all(cls):
         """Retrieve all bosses from the database."""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            cursor = await db.execute("SELECT * FROM bosses")
-            rows = await cursor.fetchall()
-            await cursor.close()
-            return [cls(*row) for row in rows]
+        return await cls._catalog.all()
 
     async def save(self):
         """Save or update a boss in the database."""
@@ -97,6 +104,7 @@ class Boss:
                 self.health, self.speed, self.precision, self.rarity, self.boss_class, self.weakness_class
             ))
             await db.commit()
+        Boss._catalog.invalidate()
 
     @classmethod
     async def get_all_ids(cls):
@@ -114,6 +122,7 @@ class Boss:
             async with aiosqlite.connect(DATABASE_PATH) as db:
                 cursor = await db.execute("DELETE FROM bosses WHERE id = ?", (boss_id,))
                 await db.commit()
+                cls._catalog.invalidate()
                 return cursor.rowcount > 0  # Returns True if boss was deleted
         except Exception as e:
             print(f"An error occurred while deleting boss {boss_id}: {e}")
@@ -126,6 +135,7 @@ class Boss:
             async with aiosqlite.connect(DATABASE_PATH) as db:
                 cursor = await db.execute("DELETE FROM bosses WHERE id = ?", (boss_id,))
                 await db.commit()
+                cls._catalog.invalidate()
                 return cursor.rowcount > 0  # Returns True if boss was deleted
         except Exception as e:
             print(f"An error occurred while deleting boss {boss_id}: {e}")
@@ -0,0 +1,70 @@
+"""
+Catalog cache
+Read-through, in-memory copy of the static game tables (items, skills,
+shadows, bosses) so per-id lookups and batch lookups are dict hits
+instead of one query each
+"""
+
+import copy
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List
+
+CATALOG_TTL = 10 * 60  # seconds before a catalog is re-read as a safety net
+
+
+class CatalogCache:
+    """Whole-table cache keyed by object id, invalidated on save/delete"""
+
+    def __init__(self, name: str, load_all: Callable[[], Awaitable[list]], ttl: float = CATALOG_TTL):
+        self.name = name
+        self._load_all = load_all
+        self.ttl = ttl
+        self._entries = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self.version = 0  # bumps whenever the cached table is replaced or dropped
+        self.stats = {"loads": 0, "lookups": 0, "invalidations": 0}
+
+    async def _mapping(self) -> Dict:
+        if self._entries is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return self._entries
+
+        generation = self._generation
+        objects = await self._load_all()
+        entries = {obj.id: obj for obj in objects}
+        self.stats["loads"] += 1
+        # A save/delete that landed while we were reading makes this copy stale
+        if generation == self._generation:
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+            self.version += 1
+        return entries
+
+    async def current_version(self) -> int:
+        """Load the table if needed and return its version, for derived caches"""
+        await self._mapping()
+        return self.version
+
+    async def get(self, key):
+        """Return a copy of one object, or None"""
+        self.stats["lookups"] += 1
+        obj = (await self._mapping()).get(key)
+        # Copies keep callers that tweak stats from editing the shared catalog
+        return copy.copy(obj) if obj is not None else None
+
+    async def get_many(self, keys: Iterable) -> Dict:
+        """Return {id: object} for every key that exists, in one pass"""
+        self.stats["lookups"] += 1
+        entries = await self._mapping()
+        return {key: copy.copy(entries[key]) for key in keys if key in entries}
+
+    async def all(self) -> List:
+        entries = await self._mapping()
+        return [copy.copy(obj) for obj in entries.values()]
+
+    def invalidate(self):
+        """Drop the cached table; the next lookup reloads it"""
+        self._entries = None
+        self._generation += 1
+        self.version += 1
+        self.stats["invalidations"] += 1
@@ -6,15 +6,46 @@ Allows enabling/disabling specific commands in specific channels
 import aiosqlite
 import discord
 from discord.ext import commands
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, FrozenSet, Set, Optional
 import logging
 
+_NONE_DISABLED: FrozenSet[str] = frozenset()
+
 class ChannelCommandManager:
-    """Manages channel-specific command enable/disable functionality"""
+    """
+    Manages channel-specific command enable/disable functionality.
+    All settings are preloaded at startup, so the per-command check is a dict
+    lookup; channels with nothing disabled simply have no entry.
+    """
     
     def __init__(self):
         self.db_path = "data/channel_commands.db"
-        self._cache = {}  # Cache for faster lookups: {channel_id: {disabled_commands}}
+        self._cache: Dict[int, FrozenSet[str]] = {}  # {channel_id: frozenset(disabled_commands)}
+        self._preloaded = False  # once True, a missing channel means nothing is disabled
+
+    def _store(self, channel_id: int, disabled: FrozenSet[str]):
+        # Before the preload an empty entry is kept as a negative result
+        if disabled or not self._preloaded:
+            self._cache[channel_id] = disabled
+        else:
+            self._cache.pop(channel_id, None)
+
+    async def preload(self):
+        """Load every channel's disabled commands into memory"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute("SELECT channel_id, command_name FROM channel_disabled_commands")
+                rows = await cursor.fetchall()
+        except Exception as e:
+            logging.error(f"Error preloading channel command settings: {e}")
+            return
+
+        settings: Dict[int, Set[str]] = {}
+        for channel_id, command_name in rows:
+            settings.setdefault(channel_id, set()).add(command_name)
+        self._cache = {channel_id: frozenset(names) for channel_id, names in settings.items()}
+        self._preloaded = True
+        logging.info(f"Preloaded command settings for {len(self._cache)} channels")
         
     async def initialize_database(self):
         """Initialize the database table for channel command settings"""
@@ -29,6 +60,7 @@ class ChannelCommandManager:
                 )
             """)
             await db.commit()
+        await self.preload()
     
     async def disable_command(self, channel_id: int, command_name: str, disabled_by: int) -> bool:
         """
@@ -59,10 +91,9 @@ class ChannelCommandManager:
                 )
                 await db.commit()
                 
-                # Update cache
-                if channel_id not in self._cache:
-                    self._cache[channel_id] = set()
-                self._cache[channel_id].add(command_name)
+                # Update cache (entries are immutable, so replace rather than mutate)
+                if self._preloaded or channel_id in self._cache:
+                    self._store(channel_id, self._cache.get(channel_id, _NONE_DISABLED) | {command_name})
                 
                 return True
                 
@@ -94,9 +125,7 @@ class ChannelCommandManager:
                 
                 # Update cache
                 if channel_id in self._cache:
-                    self._cache[channel_id].discard(command_name)
-                    if not self._cache[channel_id]:  # Remove empty set
-                        del self._cache[channel_id]
+                    self._store(channel_id, self._cache[channel_id] - {command_name})
                 
                 return True
                 
@@ -115,28 +144,27 @@ class ChannelCommandManager:
         Returns:
             bool: True if disabled, False if enabled
         """
-        # Check cache first
-        if channel_id in self._cache:
-            return command_name in self._cache[channel_id]
-        
-        # Load from database and cache
-        try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute(
-                    "SELECT command_name FROM channel_disabled_commands WHERE channel_id = ?",
-                    (channel_id,)
-                )
-                disabled_commands = {row[0] for row in await cursor.fetchall()}
-                
-                # Cache the result
-                if disabled_commands:
-                    self._cache[channel_id] = disabled_commands
-                
-                return command_name in disabled_commands
-                
-        except Exception as e:
-            logging.error(f"Error checking if command {command_name} is disabled in channel {channel_id}: {e}")
-            return False
+        disabled = self._cache.get(channel_id)
+        if disabled is None:
+            if self._preloaded:
+                return False
+            try:
+                disabled = await self._load_channel(channel_id)
+            except Exception as e:
+                logging.error(f"Error checking if command {command_name} is disabled in channel {channel_id}: {e}")
+                return False
+        return command_name in disabled
+
+    async def _load_channel(self, channel_id: int) -> FrozenSet[str]:
+        """Read one channel's settings (only needed before the preload) and cache them, even if empty"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT command_name FROM channel_disabled_commands WHERE channel_id = ?",
+                (channel_id,)
+            )
+            disabled = frozenset(row[0] for row in await cursor.fetchall())
+        self._store(channel_id, disabled)
+        return disabled
     
     async def get_disabled_commands(self, channel_id: int) -> Set[str]:
         """
@@ -148,23 +176,12 @@ class ChannelCommandManager:
         Returns:
             Set[str]: Set of disabled command names
         """
-        # Check cache first
-        if channel_id in self._cache:
-            return self._cache[channel_id].copy()
+        disabled = self._cache.get(channel_id)
+        if disabled is not None or self._preloaded:
+            return set(disabled or ())
         
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute(
-                    "SELECT command_name FROM channel_disabled_commands WHERE channel_id = ?",
-                    (channel_id,)
-                )
-                disabled_commands = {row[0] for row in await cursor.fetchall()}
-                
-                # Cache the result
-                if disabled_commands:
-                    self._cache[channel_id] = disabled_commands
-                
-                return disabled_commands
+            return set(await self._load_channel(channel_id))
                 
         except Exception as e:
             logging.error(f"Error getting disabled commands for channel {channel_id}: {e}")
@@ -188,8 +205,9 @@ class ChannelCommandManager:
                         result[channel_id] = set()
                     result[channel_id].add(command_name)
                 
-                # Update cache
-                self._cache = result.copy()
+                # Refresh the cache from the full table
+                self._cache = {channel_id: frozenset(names) for channel_id, names in result.items()}
+                self._preloaded = True
                 
                 return result
                 
@@ -198,12 +216,38 @@ class ChannelCommandManager:
             return {}
     
     def clear_cache(self):
-        """Clear the internal cache"""
+        """Clear the internal cache; lookups read the database until the next preload"""
         self._cache.clear()
+        self._preloaded = False
+
+    def get_cache_stats(self) -> dict:
+        return {
+            "preloaded": self._preloaded,
+            "channels": len(self._cache),
+            "disabled_commands": sum(len(disabled) for disabled in self._cache.values()),
+        }
 
 # Global instance
 channel_command_manager = ChannelCommandManager()
 
+# Never disable channel management commands themselves
+CHANNEL_MANAGEMENT_COMMANDS = frozenset({'channelcommands', 'disablecommand', 'enablecommand', 'listcommands'})
+
+# Never disable core essential commands
+ESSENTIAL_COMMANDS = frozenset({
+    'help', 'start', 'profile', 'guild', 'fixuser', 'unstuck', 'ping'
+})
+
+# Never disable admin commands (bot admin only commands)
+ADMIN_ONLY_COMMANDS = frozenset({
+    'admin', 'adminhelp', 'give', 'create', 'createpanel', 'fix', 'adminreset',
+    'spawnboss', 'spawnworldboss', 'worldbossstatus', 'serveranalytics',
+    'servertracking', 'rankmigration', 'rankrecalc', 'testitem', 'balancecheck',
+    'itemusage', 'contentreport', 'contenteditor'
+})
+
+ALWAYS_ALLOWED_COMMANDS = CHANNEL_MANAGEMENT_COMMANDS | ESSENTIAL_COMMANDS | ADMIN_ONLY_COMMANDS
+
 async def is_command_allowed(ctx: commands.Context) -> bool:
     """
     Check if a command is allowed to run in the current channel
@@ -221,31 +265,11 @@ async def is_command_allowed(ctx: commands.Context) -> bool:
         return True  # No command to check
 
     command_name = ctx.command.name
-
-    # Never disable channel management commands themselves
-    if command_name in ['channelcommands', 'disablecommand', 'enablecommand', 'listcommands']:
+    if command_name in ALWAYS_ALLOWED_COMMANDS:
         return True
 
-    # Never disable core essential commands
-    essential_commands = [
-        'help', 'start', 'profile', 'guild', 'fixuser', 'unstuck', 'ping'
-    ]
-    if command_name in essential_commands:
-        return True
-
-    # Never disable admin commands (bot admin only commands)
-    admin_only_commands = [
-        'admin', 'adminhelp', 'give', 'create', 'createpanel', 'fix', 'adminreset',
-        'spawnboss', 'spawnworldboss', 'worldbossstatus', 'serveranalytics',
-        'servertracking', 'rankmigration', 'rankrecalc', 'testitem', 'balancecheck',
-        'itemusage', 'contentreport', 'contenteditor'
-    ]
-    if command_name in admin_only_commands:
-        return True
-
-    channel_id = ctx.channel.id
-
-    return not await channel_command_manager.is_command_disabled(channel_id, command_name)
+    # Served from the preloaded cache; no database access per command
+    return not await channel_command_manager.is_command_disabled(ctx.channel.id, command_name)
 
 def command_enabled_check():
     """
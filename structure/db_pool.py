@@ -0,0 +1,205 @@
+"""
+Shared aiosqlite connection pool
+Keeps one writer connection and a few reader connections open per database file
+so the managers in structure/ don't pay connection setup on every query
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, Optional
+
+import aiosqlite
+from aiosqlite.context import Result
+
+READER_CONNECTIONS = 4
+BUSY_TIMEOUT_MS = 5000
+
+
+class DatabasePool:
+    """One writer and N reader connections for a single SQLite file"""
+
+    _pools: Dict[str, "DatabasePool"] = {}
+
+    def __init__(self, path: str, readers: int = READER_CONNECTIONS):
+        self.path = path
+        self.reader_count = max(1, readers)
+        self.loop = asyncio.get_running_loop()
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._writer_owner = None
+        self._readers: asyncio.Queue = asyncio.Queue()
+        self._all_readers = []
+        self._open_lock = asyncio.Lock()
+        self._opened = False
+        self.stats = {"reads": 0, "writes": 0}
+
+    @classmethod
+    def for_path(cls, path: str) -> "DatabasePool":
+        """Get (or lazily create) the pool for a database file"""
+        key = os.path.abspath(path)
+        pool = cls._pools.get(key)
+        # A pool is tied to the event loop that created it; scripts that call
+        # asyncio.run() more than once get a fresh pool per loop
+        if pool is None or pool.loop is not asyncio.get_running_loop() or pool.loop.is_closed():
+            pool = cls(path)
+            cls._pools[key] = pool
+        return pool
+
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = aiosqlite.connect(self.path)
+        # Pooled connections live for the whole process; don't let their worker
+        # threads keep the interpreter alive if a script never closes the pool
+        getattr(conn, "_thread", conn).daemon = True
+        await conn
+        await self._pragma(conn, f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS};")
+        self._track_cursors(conn)
+        return conn
+
+    @staticmethod
+    def _track_cursors(conn: aiosqlite.Connection):
+        # A cursor left mid-result keeps its read snapshot open, and the next
+        # borrower would see stale data; remember every cursor handed out
+        # during a borrow so they can all be closed when it ends
+        borrowed = []
+        open_cursor = conn.cursor
+        run = conn.execute
+
+        async def tracked(pending):
+            new_cursor = await pending
+            borrowed.append(new_cursor)
+            return new_cursor
+
+        # Result keeps both `await conn.execute(...)` and `async with` working
+        def cursor():
+            return Result(tracked(open_cursor()))
+
+        def execute(sql, parameters=None):
+            return Result(tracked(run(sql, parameters)))
+
+        conn.cursor = cursor
+        conn.execute = execute
+        conn.borrowed_cursors = borrowed
+
+    @staticmethod
+    async def _pragma(conn: aiosqlite.Connection, statement: str):
+        # Step the statement to completion so it doesn't keep a lock open
+        async with conn.execute(statement) as cursor:
+            await cursor.fetchall()
+
+    async def open(self):
+        """Open all connections and run the one-time PRAGMA setup"""
+        if self._opened:
+            return
+        async with self._open_lock:
+            if self._opened:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # The writer switches the file to WAL before any reader attaches
+            self._writer = await self._connect()
+            await self._pragma(self._writer, "PRAGMA journal_mode=WAL;")
+
+            for _ in range(self.reader_count):
+                conn = await self._connect()
+                self._all_readers.append(conn)
+                self._readers.put_nowait(conn)
+
+            self._opened = True
+            logging.info(f"Opened database pool for {self.path} (1 writer, {self.reader_count} readers)")
+
+    async def _release(self, conn: aiosqlite.Connection):
+        """Reset per-borrow state so the next borrower gets a clean connection"""
+        conn.row_factory = None
+        try:
+            while conn.borrowed_cursors:
+                await conn.borrowed_cursors.pop().close()
+            if conn.in_transaction:
+                # Same outcome as closing a private connection without commit
+                await conn.rollback()
+        except Exception as e:
+            logging.error(f"Error resetting pooled connection for {self.path}: {e}")
+
+    @asynccontextmanager
+    async def read(self):
+        """Borrow a reader connection"""
+        await self.open()
+        conn = await self._readers.get()
+        self.stats["reads"] += 1
+        try:
+            yield conn
+        finally:
+            await self._release(conn)
+            self._readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def write(self):
+        """Borrow the writer connection (re-entrant within the same task)"""
+        await self.open()
+        task = asyncio.current_task()
+        if task is not None and self._writer_owner is task:
+            # Nested write from the task that already holds the writer
+            row_factory = self._writer.row_factory
+            try:
+                yield self._writer
+            finally:
+                self._writer.row_factory = row_factory
+            return
+
+        async with self._writer_lock:
+            self._writer_owner = task
+            self.stats["writes"] += 1
+            try:
+                yield self._writer
+            finally:
+                await self._release(self._writer)
+                self._writer_owner = None
+
+    async def close(self):
+        """Close every connection in the pool"""
+        connections = self._all_readers + ([self._writer] if self._writer else [])
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                logging.error(f"Error closing pooled connection for {self.path}: {e}")
+        self._all_readers = []
+        self._readers = asyncio.Queue()
+        self._writer = None
+        self._opened = False
+
+
+def db_read(path: str):
+    """Context manager yielding a pooled reader connection for `path`"""
+    return DatabasePool.for_path(path).read()
+
+
+def db_write(path: str):
+    """Context manager yielding the pooled writer connection for `path`"""
+    return DatabasePool.for_path(path).write()
+
+
+async def open_pools(paths: Iterable[str]):
+    """Open pools up front so PRAGMA setup happens once at startup"""
+    for path in dict.fromkeys(paths):
+        try:
+            await DatabasePool.for_path(path).open()
+        except Exception as e:
+            logging.error(f"Failed to open database pool for {path}: {e}")
+
+
+async def close_pools():
+    """Close every pool (call on shutdown)"""
+    pools = list(DatabasePool._pools.values())
+    DatabasePool._pools.clear()
+    for pool in pools:
+        if pool.loop is asyncio.get_running_loop():
+            await pool.close()
+
+
+def get_pool_stats() -> Dict[str, Dict[str, int]]:
+    """Borrow counters per database file, for admin diagnostics"""
+    return {pool.path: dict(pool.stats) for pool in DatabasePool._pools.values()}
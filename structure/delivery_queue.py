@@ -0,0 +1,172 @@
+"""
+Outbound delivery queue
+DMs and alert messages are queued and sent by a few background workers
+behind one shared token bucket, so callers (boss kills, notifications)
+return immediately and bursts drain at a rate Discord tolerates.
+Transient failures are retried with exponential backoff.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import discord
+
+WORKERS = 4             # concurrent sends
+SEND_RATE = 5.0         # messages per second, shared by every feature
+SEND_BURST = 10         # messages that may go out back to back
+MAX_PENDING = 10000     # queued deliveries before new ones are dropped
+MAX_ATTEMPTS = 4
+BASE_BACKOFF = 2.0      # seconds, doubled per attempt
+
+
+class TokenBucket:
+    """Async token bucket: acquire() waits until a token is available"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _Delivery:
+    __slots__ = ("label", "send", "on_forbidden", "attempts")
+
+    def __init__(self, label: str, send: Callable[[], Awaitable], on_forbidden: Optional[Callable[[], Awaitable]]):
+        self.label = label
+        self.send = send
+        self.on_forbidden = on_forbidden
+        self.attempts = 0
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, discord.HTTPException):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (asyncio.TimeoutError, OSError))
+
+
+class DeliveryQueue:
+    """Bounded-concurrency, rate-limited sender for DMs and alerts"""
+
+    def __init__(self, workers: int = WORKERS, rate: float = SEND_RATE, burst: int = SEND_BURST,
+                 max_pending: int = MAX_PENDING):
+        self.bot = None
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._tasks = []
+        self._retrying: Dict[_Delivery, asyncio.TimerHandle] = {}  # next attempt of each retried delivery
+        self.stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "forbidden": 0, "dropped": 0}
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    @property
+    def pending_count(self) -> int:
+        return self._queue.qsize()
+
+    def start(self, bot):
+        """Start the workers (needs a running event loop)"""
+        self.bot = bot
+        if self.running:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logging.info(f"Delivery queue started ({self.workers} workers, {self.bucket.rate}/s)")
+
+    def enqueue(self, label: str, send: Callable[[], Awaitable],
+                on_forbidden: Optional[Callable[[], Awaitable]] = None) -> bool:
+        """Queue a send coroutine factory; returns False if the queue is full"""
+        try:
+            self._queue.put_nowait(_Delivery(label, send, on_forbidden))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logging.warning(f"Delivery queue full, dropped {label}")
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def send_dm(self, user_id: int, content: str = None, embed: discord.Embed = None,
+                on_forbidden: Optional[Callable[[], Awaitable]] = None) -> bool:
+        """Queue a direct message; on_forbidden runs if the user has DMs closed"""
+        async def send():
+            user = self.bot.get_user(user_id)
+            if user is None:
+                user = await self.bot.fetch_user(user_id)
+            await user.send(content=content, embed=embed)
+
+        return self.enqueue(f"DM to {user_id}", send, on_forbidden)
+
+    async def _worker(self):
+        while True:
+            delivery = await self._queue.get()
+            try:
+                await self.bucket.acquire()
+                await self._attempt(delivery)
+            except Exception as e:
+                logging.error(f"Delivery worker error for {delivery.label}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _attempt(self, delivery: _Delivery):
+        delivery.attempts += 1
+        try:
+            await delivery.send()
+            self.stats["sent"] += 1
+        except discord.Forbidden:
+            self.stats["forbidden"] += 1
+            if delivery.on_forbidden is not None:
+                await delivery.on_forbidden()
+        except discord.NotFound:
+            self.stats["failed"] += 1
+        except Exception as e:
+            if _is_transient(e) and delivery.attempts < MAX_ATTEMPTS:
+                self.stats["retried"] += 1
+                delay = BASE_BACKOFF * 2 ** (delivery.attempts - 1) * random.uniform(0.8, 1.2)
+                self._retrying[delivery] = asyncio.get_running_loop().call_later(delay, self._requeue, delivery)
+            else:
+                self.stats["failed"] += 1
+                logging.warning(f"Giving up on {delivery.label} after {delivery.attempts} attempts: {e}")
+
+    def _requeue(self, delivery: _Delivery):
+        self._retrying.pop(delivery, None)
+        try:
+            self._queue.put_nowait(delivery)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "pending": self._queue.qsize(), "retrying": len(self._retrying)}
+
+    async def stop(self, timeout: float = 10.0):
+        """Give queued deliveries a moment to drain, then stop the workers"""
+        if self.running and not self._queue.empty():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logging.warning(f"Delivery queue stopped with {self._queue.qsize()} messages unsent")
+        for handle in self._retrying.values():
+            handle.cancel()
+        self._retrying.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+delivery_queue = DeliveryQueue()
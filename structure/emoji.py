@@ -1,34 +1,84 @@
 from enum import Enum
 import json
+import os
 import re
+import time
+
+EMOJIS_JSON_PATH = 'emojis.json'
+IMAGES_JSON_PATH = 'images.json'
+DEFAULT_IMAGE = "https://files.catbox.moe/jvxvcr.png"
+REGISTRY_CHECK_INTERVAL = 5.0  # seconds between mtime checks of the JSON files
+
+_CUSTOM_EMOJI_ID = re.compile(r"<a?:\w+:(\d+)>")
+
+
+class JsonRegistry:
+    """Process-wide cache of a JSON mapping file, reloaded when its mtime changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = {}
+        self.mtime = None
+        self.last_check = None
+        self.derived = {}  # per-load memo, e.g. emoji name -> CDN url
+
+    def mapping(self) -> dict:
+        now = time.monotonic()
+        if self.last_check is not None and now - self.last_check < REGISTRY_CHECK_INTERVAL:
+            return self.data
+        self.last_check = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self.mtime or mtime is None:
+            self._load(mtime)
+        return self.data
+
+    def _load(self, mtime):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+            mtime = None  # retry on the next check
+        self.data = data if isinstance(data, dict) else {}
+        self.derived = {}
+        self.mtime = mtime
+
+    def reload(self):
+        """Drop the cached copy so the next lookup re-reads the file."""
+        self.last_check = None
+        self.mtime = None
+
+
+_emojis = JsonRegistry(EMOJIS_JSON_PATH)
+_images = JsonRegistry(IMAGES_JSON_PATH)
+
+
+def reload_emojis():
+    """Reload hook for tools that edit emojis.json or images.json."""
+    _emojis.reload()
+    _images.reload()
+
 
 def getEmoji(name: str, as_url: bool = False):
     """Retrieves a custom emoji string or its URL from the emojis.json file."""
-    try:
-        with open('emojis.json', 'r') as file:
-            emojis = json.load(file)
-        emoji_str = emojis.get(name, "❔")
-
-        if as_url:
-            match = re.match(r"<a?:\w+:(\d+)>", emoji_str)
-            if match:
-                emoji_id = match.group(1)
-                return f"https://cdn.discordapp.com/emojis/{emoji_id}.png"
-            return None # Return None if it's not a custom emoji or no match
-        
-        return emoji_str
-    except (FileNotFoundError, json.JSONDecodeError):
-        return "❔" if not as_url else None
+    emojis = _emojis.mapping()
+    if not as_url:
+        return emojis.get(name, "❔")
+
+    urls = _emojis.derived
+    if name not in urls:
+        match = _CUSTOM_EMOJI_ID.match(emojis.get(name, "❔"))
+        # None if it's not a custom emoji or no match
+        urls[name] = f"https://cdn.discordapp.com/emojis/{match.group(1)}.png" if match else None
+    return urls[name]
 
 def get_image(name: str) -> str:
     """Retrieves the image URL of an item or character based on its name."""
     # Try to get from images.json first, fallback to default image
-    try:
-        with open('images.json', 'r') as file:
-            images = json.load(file)
-        return images.get(name, "https://files.catbox.moe/jvxvcr.png")  # Default fallback image
-    except (FileNotFoundError, json.JSONDecodeError):
-        return "https://files.catbox.moe/jvxvcr.png"  # Default fallback image
+    return _images.mapping().get(name, DEFAULT_IMAGE)
 
 class Rarity(Enum):
     UR = "UR"
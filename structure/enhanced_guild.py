@@ -7,6 +7,7 @@ import aiosqlite
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from enum import Enum
+from structure.guild_directory import guild_directory
 
 DATABASE_PATH = "database.db"
 
@@ -250,6 +251,7 @@ class EnhancedGuild:
                 ))
             
             await db.commit()
+        guild_directory.record(self)
 
     @staticmethod
     async def get(guild_id: str) -> Optional['EnhancedGuild']:
@@ -321,6 +323,7 @@ class EnhancedGuild:
         async with aiosqlite.connect(DATABASE_PATH) as db:
             await db.execute("DELETE FROM enhanced_guilds WHERE id = ?", (self.id,))
             await db.commit()
+        guild_directory.forget(self.id)
 
     def get_guild_tier(self) -> tuple:
         """Get guild tier based on points"""
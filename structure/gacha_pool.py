@@ -0,0 +1,166 @@
+"""
+Gacha pool engine
+Rarity buckets are built once from the hero and item catalogs and rebuilt
+only when either catalog changes; customs.json is indexed per player.
+A multi-pull draws all of its rarities in one weighted sample.
+"""
+
+import json
+import logging
+import os
+import random
+from typing import Dict, List, Tuple
+
+from structure.heroes import Hero, HeroManager
+from structure.items import Item, ItemManager
+
+CUSTOMS_JSON_PATH = 'customs.json'
+PITY_INTERVAL = 80          # every 80th pull is a guaranteed SSR
+ITEM_PULL_CHANCE = 0.35     # share of pulls that roll an item instead of a hunter
+CUSTOM_IMAGE = 'https://files.catbox.moe/jvxvcr.png'
+
+
+class GachaPool:
+    """Precomputed rarity buckets for gacha pulls"""
+
+    def __init__(self):
+        self._version = None
+        self.heroes: List[Hero] = []
+        self.items: List[Item] = []
+        self.hero_buckets: Dict[str, List[Hero]] = {}
+        self.item_buckets: Dict[str, List[Item]] = {}
+        self._customs_mtime = None
+        self._customs: Dict[str, Tuple[List[Hero], List[Item]]] = {}
+
+    @staticmethod
+    def _bucket(entities) -> Dict[str, list]:
+        buckets = {}
+        for entity in entities:
+            buckets.setdefault(entity.rarity.lower(), []).append(entity)
+        return buckets
+
+    async def refresh(self):
+        """Rebuild the buckets if the hero or item catalog changed"""
+        version = (HeroManager.catalog_version(), await ItemManager.catalog_version())
+        if version == self._version:
+            return
+        self.heroes = [h for h in await HeroManager.get_all() if h.rarity.lower() != "custom"]
+        self.items = [i for i in await ItemManager.get_all() if i.rarity.lower() != "custom"]
+        self.hero_buckets = self._bucket(self.heroes)
+        self.item_buckets = self._bucket(self.items)
+        self._version = version
+        logging.info(f"Gacha pool rebuilt: {len(self.heroes)} hunters, {len(self.items)} items")
+
+    def _load_customs(self):
+        """Index customs.json by user id, re-reading only when the file changes"""
+        try:
+            mtime = os.stat(CUSTOMS_JSON_PATH).st_mtime_ns
+        except OSError:
+            self._customs_mtime, self._customs = None, {}
+            return
+        if mtime == self._customs_mtime:
+            return
+
+        index = {}
+        try:
+            with open(CUSTOMS_JSON_PATH, 'r') as f:
+                customs = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error(f"Error loading customs: {e}")
+            customs = []
+
+        for custom in customs:
+            try:
+                heroes, items = index.setdefault(str(custom.get('user_id')), ([], []))
+                custom_id = custom['name'].lower().replace(' ', '_')
+                if custom.get('type') == 'hunter':
+                    heroes.append(Hero(
+                        id=custom_id,
+                        name=custom['name'],
+                        rarity='Custom',
+                        classType=custom.get('element', 'Fire'),
+                        type=custom.get('classType', 'DPS'),
+                        image=CUSTOM_IMAGE,
+                        description=f"Custom hero for {custom.get('user_id')}",
+                        health=1000,
+                        attack=200,
+                        defense=150,
+                        speed=100,
+                        mp=200,
+                        age=25,
+                        gender='Unknown',
+                        country='Custom',
+                        weapon='Custom Weapon',
+                        guild='None',
+                        rank='S'
+                    ))
+                elif custom.get('type') == 'item':
+                    items.append(Item(
+                        id=custom_id,
+                        name=custom['name'],
+                        rarity='Custom',
+                        classType=custom.get('element', 'Fire'),
+                        type='Weapon',
+                        image=CUSTOM_IMAGE,
+                        description=f"Custom item for {custom.get('user_id')}",
+                        health=100,
+                        attack=150,
+                        defense=100,
+                        speed=50,
+                        mp=50,
+                        precision=75
+                    ))
+            except (KeyError, AttributeError, TypeError) as e:
+                logging.error(f"Skipping malformed custom entry: {e}")
+
+        self._customs = index
+        self._customs_mtime = mtime
+
+    def get_customs(self, player_id) -> Tuple[List[Hero], List[Item]]:
+        """Custom heroes and items assigned to a player"""
+        self._load_customs()
+        return self._customs.get(str(player_id), ([], []))
+
+    async def draw(self, player, pulls: int, drop_rates: Dict[str, float]):
+        """
+        Perform `pulls` pulls for a player, advancing their pity counter.
+        Returns (type, rarity, entity, is_duplicate) tuples, one per pull.
+        """
+        await self.refresh()
+        custom_heroes, custom_items = self.get_customs(player.id)
+        all_heroes = self.heroes + custom_heroes if custom_heroes else self.heroes
+        all_items = self.items + custom_items if custom_items else self.items
+        if not all_heroes and not all_items:
+            raise Exception("Configuration Error: No pullable items or heroes exist.")
+
+        # One weighted sample for every pull, then pity overrides
+        rarities = random.choices(list(drop_rates.keys()), list(drop_rates.values()), k=pulls)
+        coins = [random.random() for _ in range(pulls)]
+
+        results = []
+        for rarity, coin in zip(rarities, coins):
+            player.gacha += 1
+            if player.gacha > 1_000_000: player.gacha %= PITY_INTERVAL
+            if player.gacha % PITY_INTERVAL == 0:
+                rarity = "SSR"
+
+            key = rarity.lower()
+            possible_heroes = self.hero_buckets.get(key, [])
+            possible_items = self.item_buckets.get(key, [])
+            if key == "custom":
+                possible_heroes, possible_items = custom_heroes, custom_items
+            if not possible_heroes and not possible_items:
+                possible_heroes, possible_items = all_heroes, all_items
+
+            is_item_pull = coin < ITEM_PULL_CHANCE or rarity == "Rare"
+            if (is_item_pull and possible_items) or not possible_heroes:
+                entity = random.choice(possible_items)
+                results.append(("Item", entity.rarity, entity, player.add_item(entity.id)))
+            else:
+                entity = random.choice(possible_heroes)
+                results.append(("Hero", entity.rarity, entity, player.add_hunter(entity.id)))
+
+        return results
+
+
+gacha_pool = GachaPool()
@@ -1,7 +1,8 @@
 import json
 import logging
 import sqlite3
-import aiosqlite
+from structure.db_pool import db_read, db_write
+from structure import rank_index
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -41,7 +42,7 @@ class Glory:
         
     async def save(self):
         """Save or update the glory record in the database"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             async with db.execute("SELECT 1 FROM glory WHERE user_id = ?", (self.user_id,)) as cursor:
                 if await cursor.fetchone():
                     await db.execute("""
@@ -55,11 +56,12 @@ class Glory:
                         VALUES (?, ?, ?, ?, ?, ?, ?)
                     """, (self.user_id, self.name, self.points, self.rank, self.hs, self.current_streak, self._logs))
             await db.commit()
+        rank_index.record("glory", self.user_id, {"points": self.points})
     
     @staticmethod
     async def get(user_id: int) -> Optional['Glory']:
         """Get a glory record by user ID"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             async with db.execute("SELECT * FROM glory WHERE user_id = ?", (user_id,)) as cursor:
                 row = await cursor.fetchone()
                 if row:
@@ -69,7 +71,7 @@ class Glory:
     @staticmethod
     async def get_top(n: int = 10) -> List['Glory']:
         """Get top n glory records by points"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             async with db.execute("""
                 SELECT * FROM glory 
                 ORDER BY points DESC 
@@ -78,10 +80,35 @@ class Glory:
                 rows = await cursor.fetchall()
                 return [Glory(*row) for row in rows]
     
+    @staticmethod
+    async def get_rank_index() -> rank_index.RankIndex:
+        """The glory points rank index, built on first use"""
+        index = rank_index.get_index("glory")
+        await index.ensure_loaded(DATABASE_PATH)
+        return index
+
+    @staticmethod
+    async def get_page(page: int, per_page: int = 15) -> List['Glory']:
+        """One page of the glory rankings, looked up by position in the rank index"""
+        index = await Glory.get_rank_index()
+        user_ids = [user_id for user_id, _ in index.top(per_page, (page - 1) * per_page)]
+        if not user_ids:
+            return []
+        placeholders = ', '.join('?' for _ in user_ids)
+        async with db_read(DATABASE_PATH) as db:
+            async with db.execute(f"SELECT * FROM glory WHERE user_id IN ({placeholders})", user_ids) as cursor:
+                by_id = {row[0]: Glory(*row) for row in await cursor.fetchall()}
+        return [by_id[user_id] for user_id in user_ids if user_id in by_id]
+
+    @staticmethod
+    async def get_position(user_id: int) -> Optional[int]:
+        """1-based glory position, or None if the user isn't ranked"""
+        return (await Glory.get_rank_index()).rank(user_id)
+
     @staticmethod
     async def get_ranked_list(n: int = None) -> List['Glory']:
         """Get all glory records ordered by rank/points"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             query = "SELECT * FROM glory ORDER BY points DESC"
             if n is not None:
                 query += f" LIMIT {n}"
@@ -122,12 +149,10 @@ class Glory:
     
     async def update_rank(self):
         """Update the rank based on the current points"""
-        ranked_list = await Glory.get_ranked_list()
-        for index, glory in enumerate(ranked_list, start=1):
-            if glory.user_id == self.user_id:
-                self.rank = index
-                await self.save()
-                break
+        position = await Glory.get_position(self.user_id)
+        if position is not None:
+            self.rank = position
+            await self.save()
     
     @staticmethod
     def initialize():
@@ -157,14 +182,15 @@ class Glory:
     @staticmethod
     async def clear():
         """Clear the glory table (for testing/reset purposes)"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             await db.execute("DROP TABLE IF EXISTS glory")
             await db.commit()
+        rank_index.reset("glory")
     
     @staticmethod
     async def update_name(user_id: int, name: str):
         """Update the name for a glory record"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             await db.execute("""
                 UPDATE glory 
                 SET name = ?
@@ -2,6 +2,7 @@ import json
 import logging
 import sqlite3
 import aiosqlite
+from structure.guild_directory import guild_directory
 
 def get_database_path():
     try:
@@ -34,6 +35,7 @@ class Guild:
         async with aiosqlite.connect(DATABASE_PATH) as db:
             await db.execute("DELETE FROM guilds WHERE id = ?", (self.id,))
             await db.commit()
+        guild_directory.forget(self.id, legacy=True)
 
     @staticmethod
     async def get(guild_id: str):
@@ -82,6 +84,7 @@ class Guild:
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """, (self.id, self.name, self.owner, json.dumps(self.members), self.level, self.points, self.image, self.description, self.gates, int(self.allow_alliances)))
                 await db.commit()
+        guild_directory.record(self, legacy=True)
 
     async def get_members(self):
         """
@@ -144,4 +147,5 @@ class Guild:
     async def clear():      
         async with aiosqlite.connect(DATABASE_PATH) as db:
             await db.execute("DROP TABLE IF EXISTS guilds")
-            await db.commit()
\ No newline at end of file
+            await db.commit()
+        guild_directory.reset()
\ No newline at end of file
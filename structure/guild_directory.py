@@ -0,0 +1,263 @@
+"""
+Guild directory
+Every guild from the legacy `guilds` table and the `enhanced_guilds` table,
+keyed by id, with a member -> guild reverse index. Built once from both
+tables and kept current from Guild/EnhancedGuild saves and deletes, so
+membership checks and guild browser pages never decode every guild.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set
+
+from structure.rank_index import REBUILD_INTERVAL
+
+SORT_KEYS = {
+    "points": (lambda guild: guild.points or 0, True),
+    "members": (lambda guild: len(guild.members or []), True),
+    "level": (lambda guild: guild.level or 0, True),
+    "name": (lambda guild: (guild.name or "").lower(), False),
+}
+
+
+def member_ids(guild) -> Set[int]:
+    """User ids in a guild, owner included; handles dict and bare-id member entries"""
+    ids = set()
+    for member in guild.members or []:
+        raw = (member.get("id") or member.get("user_id")) if isinstance(member, dict) else member
+        try:
+            ids.add(int(raw))
+        except (TypeError, ValueError):
+            continue
+    try:
+        ids.add(int(guild.owner))
+    except (TypeError, ValueError):
+        pass
+    return ids
+
+
+def _wrap(old_guild):
+    """A legacy guild in EnhancedGuild form, as the guild browser shows it"""
+    from structure.enhanced_guild import EnhancedGuild
+    return EnhancedGuild(
+        id=old_guild.id,
+        name=old_guild.name,
+        owner=old_guild.owner,
+        members=old_guild.members,
+        level=old_guild.level,
+        points=old_guild.points,
+        image=old_guild.image,
+        description=old_guild.description,
+        gates=old_guild.gates,
+        allow_alliances=old_guild.allow_alliances
+    )
+
+
+class GuildDirectory:
+    """
+    id -> guild map and user id -> guild id index across both guild tables.
+    When a guild id exists in both tables the enhanced copy wins. Returned
+    guilds are shared snapshots; load a fresh copy before mutating one.
+    """
+
+    def __init__(self):
+        self._guilds: Dict[str, object] = {}
+        self._legacy: Set[str] = set()          # ids whose entry came from the legacy table
+        self._shadowed: Dict[str, object] = {}  # legacy copies hidden by an enhanced guild with the same id
+        self._members: Dict[str, Set[int]] = {}  # guild id -> indexed member ids
+        self._member_guild: Dict[int, str] = {}
+        self._ranked: Dict[str, List] = {}       # sort mode -> cached ordering
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._pending: Optional[List] = None    # changes seen while rebuilding
+        self._refresh: Optional[asyncio.Task] = None  # background safety rebuild
+
+    def __len__(self):
+        return len(self._guilds)
+
+    def __contains__(self, guild_id):
+        return guild_id in self._guilds
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    async def ensure_loaded(self):
+        """
+        Build the directory if it was never built. Once built, a due safety
+        rebuild runs as a background task and lookups keep using the current
+        directory until it finishes.
+        """
+        if self._loaded_at is not None:
+            if (time.monotonic() - self._loaded_at >= REBUILD_INTERVAL
+                    and (self._refresh is None or self._refresh.done())):
+                self._refresh = asyncio.create_task(self._background_rebuild())
+            return
+        async with self._lock:
+            if self._loaded_at is None:
+                await self.rebuild()
+
+    async def _background_rebuild(self):
+        async with self._lock:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logging.error(f"Guild directory rebuild failed: {e}")
+
+    async def rebuild(self):
+        """Replace the directory with the guilds currently in both tables"""
+        from structure.enhanced_guild import EnhancedGuild
+        from structure.guild import Guild
+
+        self._pending = []
+        try:
+            try:
+                enhanced = await EnhancedGuild.get_all()
+            except Exception as e:
+                logging.error(f"Guild directory could not read enhanced guilds: {e}")
+                enhanced = []
+            try:
+                legacy = await Guild.get_all()
+            except Exception as e:
+                logging.error(f"Guild directory could not read legacy guilds: {e}")
+                legacy = []
+            pending = self._pending
+        finally:
+            self._pending = None
+
+        self.reset()
+        for guild in enhanced:
+            self._set(guild, False)
+        for guild in legacy:
+            self._set(guild, True)
+        # Saves and deletes that landed while the tables were being read win over the snapshot
+        for guild, guild_id, legacy_source in pending:
+            if guild is None:
+                self._drop(guild_id, legacy_source)
+            else:
+                self._set(guild, legacy_source)
+        self._loaded_at = time.monotonic()
+        logging.info(f"Guild directory built with {len(self._guilds)} guilds and {len(self._member_guild)} members")
+
+    def reset(self):
+        self._guilds = {}
+        self._legacy = set()
+        self._shadowed = {}
+        self._members = {}
+        self._member_guild = {}
+        self._ranked = {}
+        self._loaded_at = None
+
+    def _unindex(self, guild_id):
+        for user_id in self._members.pop(guild_id, ()):
+            if self._member_guild.get(user_id) == guild_id:
+                del self._member_guild[user_id]
+
+    def _index(self, guild_id, guild):
+        self._unindex(guild_id)
+        self._guilds[guild_id] = guild
+        ids = member_ids(guild)
+        self._members[guild_id] = ids
+        for user_id in ids:
+            self._member_guild[user_id] = guild_id
+        self._ranked.clear()
+
+    def _set(self, guild, legacy: bool):
+        guild_id = guild.id
+        if legacy:
+            guild = _wrap(guild)
+            if guild_id in self._guilds and guild_id not in self._legacy:
+                self._shadowed[guild_id] = guild  # the enhanced copy wins while it exists
+                return
+            self._legacy.add(guild_id)
+        elif guild_id in self._legacy:
+            self._shadowed[guild_id] = self._guilds[guild_id]
+            self._legacy.discard(guild_id)
+        self._index(guild_id, guild)
+
+    def _drop(self, guild_id, legacy: bool):
+        if legacy and guild_id not in self._legacy:
+            self._shadowed.pop(guild_id, None)
+            return
+        if guild_id not in self._guilds or (guild_id in self._legacy) != legacy:
+            return
+        self._unindex(guild_id)
+        del self._guilds[guild_id]
+        self._legacy.discard(guild_id)
+        self._ranked.clear()
+        # Deleting the enhanced copy uncovers the legacy guild it was hiding
+        shadowed = self._shadowed.pop(guild_id, None)
+        if shadowed is not None:
+            self._legacy.add(guild_id)
+            self._index(guild_id, shadowed)
+
+    def record(self, guild, legacy: bool = False):
+        """Record a saved guild (legacy=True for the old `guilds` table)"""
+        if self._pending is not None:
+            self._pending.append((guild, guild.id, legacy))
+        if self._loaded_at is not None:
+            self._set(guild, legacy)
+
+    def forget(self, guild_id, legacy: bool = False):
+        """Drop a deleted guild; deleting one table's copy leaves the other's entry alone"""
+        if self._pending is not None:
+            self._pending.append((None, guild_id, legacy))
+        if self._loaded_at is not None:
+            self._drop(guild_id, legacy)
+
+    def get(self, guild_id):
+        return self._guilds.get(guild_id)
+
+    def guild_id_of(self, user_id) -> Optional[str]:
+        """Id of the guild a user is in (as member or owner), if any"""
+        try:
+            return self._member_guild.get(int(user_id))
+        except (TypeError, ValueError):
+            return None
+
+    def guild_of(self, user_id):
+        guild_id = self.guild_id_of(user_id)
+        return self._guilds.get(guild_id) if guild_id is not None else None
+
+    def is_member(self, user_id, guild_id) -> bool:
+        return guild_id is not None and self.guild_id_of(user_id) == guild_id
+
+    def is_legacy(self, guild_id) -> bool:
+        return guild_id in self._legacy
+
+    def legacy_ids(self) -> List[str]:
+        return list(self._legacy)
+
+    def guilds(self) -> List:
+        """All guilds, enhanced and legacy, as a new list"""
+        return list(self._guilds.values())
+
+    def ranked(self, sort: str = "points") -> List:
+        """
+        Guilds in browser order for a sort mode (points, members, level, name).
+        The ordering is cached until a guild changes; treat it as read-only.
+        """
+        if sort not in SORT_KEYS:
+            sort = "points"
+        ordering = self._ranked.get(sort)
+        if ordering is None:
+            key, reverse = SORT_KEYS[sort]
+            ordering = self._ranked[sort] = sorted(self._guilds.values(), key=key, reverse=reverse)
+        return ordering
+
+    def page(self, sort: str, page: int, per_page: int) -> List:
+        start = page * per_page
+        return self.ranked(sort)[start:start + per_page]
+
+    def get_stats(self) -> Dict:
+        ranked = self.ranked("points")
+        return {
+            "guilds": len(self._guilds),
+            "legacy_guilds": len(self._legacy),
+            "members": len(self._member_guild),
+            "top_guild": ranked[0].name if ranked else None,
+        }
+
+
+guild_directory = GuildDirectory()
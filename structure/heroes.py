@@ -1,7 +1,11 @@
 from enum import Enum
+import copy
 import json
 import logging
+import os
 import random
+import tempfile
+import time
 import aiosqlite
 
 
@@ -105,31 +109,91 @@ class Hero:
                 f"weapon={self.weapon}, guild={self.guild})")
 
 HUNTERS_JSON_PATH = "hunters.json"
+RELOAD_CHECK_INTERVAL = 2.0  # seconds between hunters.json mtime checks
+
+
+class HeroCatalog:
+    """Immutable snapshot of hunters.json with id and rarity indexes"""
+
+    def __init__(self, heroes_data, mtime):
+        self.mtime = mtime
+        self.data = tuple(heroes_data)
+        self.by_id = {}
+        self.by_rarity = {}
+        for hero_data in self.data:
+            hero = Hero(**hero_data)
+            self.by_id.setdefault(hero.id, hero)
+            self.by_rarity.setdefault(hero.rarity, []).append(hero)
+        self.heroes = tuple(self.by_id.values())
+
 
 class HeroManager:
+    _catalog = None
+    _last_check = 0.0
+
     @staticmethod
-    async def get(hero_id):
-        """Retrieve a hero by ID from hunters.json and return it as a Hero object."""
-        try:
+    def _load_catalog():
+        """Load hunters.json into the in-memory catalog, reloading when the file changes."""
+        now = time.monotonic()
+        catalog = HeroManager._catalog
+        if catalog is not None and now - HeroManager._last_check < RELOAD_CHECK_INTERVAL:
+            return catalog
+        HeroManager._last_check = now
+
+        mtime = os.stat(HUNTERS_JSON_PATH).st_mtime_ns
+        if catalog is None or catalog.mtime != mtime:
             with open(HUNTERS_JSON_PATH, "r", encoding="utf-8") as file:
                 heroes = json.load(file)
+            catalog = HeroCatalog(heroes, mtime)
+            HeroManager._catalog = catalog  # Swap the whole snapshot at once
+            logging.info(f"Loaded {len(catalog.heroes)} heroes from {HUNTERS_JSON_PATH}")
+        return catalog
 
-            for hero_data in heroes:
-                if hero_data["id"] == hero_id:
-                    return Hero(**hero_data)  # Return as a Hero object
-            return None
+    @staticmethod
+    def _write_catalog(heroes):
+        """Write heroes to hunters.json through a temp file and atomic rename."""
+        directory = os.path.dirname(os.path.abspath(HUNTERS_JSON_PATH))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".hunters.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(heroes, file, indent=4)
+            # mkstemp creates the file as 0600; keep the catalog's own permissions
+            if os.path.exists(HUNTERS_JSON_PATH):
+                os.chmod(temp_path, os.stat(HUNTERS_JSON_PATH).st_mode)
+            os.replace(temp_path, HUNTERS_JSON_PATH)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        HeroManager._catalog = HeroCatalog(heroes, os.stat(HUNTERS_JSON_PATH).st_mtime_ns)
+        HeroManager._last_check = time.monotonic()
+
+    @staticmethod
+    def catalog_version():
+        """Changes whenever the hero catalog is reloaded or written."""
+        return HeroManager._load_catalog().mtime
+
+    @staticmethod
+    def invalidate():
+        """Force the next lookup to re-read hunters.json."""
+        HeroManager._catalog = None
+
+    @staticmethod
+    async def get(hero_id):
+        """Retrieve a hero by ID from the hunters.json catalog and return it as a Hero object."""
+        try:
+            hero = HeroManager._load_catalog().by_id.get(hero_id)
+            # Hand out copies so callers editing a hero never touch the catalog
+            return copy.copy(hero) if hero else None
         except Exception as e:
             logging.error(f"An error occurred while retrieving hero: {e}")
             return None
 
     @staticmethod
     async def get_all():
-        """Retrieve all heroes from hunters.json and return them as a list of Hero objects."""
+        """Retrieve all heroes from the hunters.json catalog as a list of Hero objects."""
         try:
-            with open(HUNTERS_JSON_PATH, "r", encoding="utf-8") as file:
-                heroes = json.load(file)
-
-            return [Hero(**hero_data) for hero_data in heroes]  # Convert each to a Hero object
+            return [copy.copy(hero) for hero in HeroManager._load_catalog().heroes]
         except Exception as e:
             logging.error(f"An error occurred while retrieving heroes: {e}")
             return []
@@ -138,8 +202,7 @@ class HeroManager:
     async def save(hero: Hero):
         """Save a hero to hunters.json (update if exists, otherwise add new)."""
         try:
-            with open(HUNTERS_JSON_PATH, "r", encoding="utf-8") as file:
-                heroes = json.load(file)
+            heroes = list(HeroManager._load_catalog().data)
 
             hero_dict = hero.to_dict()  # Convert Hero object to dictionary
 
@@ -150,8 +213,7 @@ class HeroManager:
             else:
                 heroes.append(hero_dict)  # Add new hero if not found
 
-            with open(HUNTERS_JSON_PATH, "w", encoding="utf-8") as file:
-                json.dump(heroes, file, indent=4)
+            HeroManager._write_catalog(heroes)
 
         except Exception as e:
             logging.error(f"An error occurred while saving hero: {e}")
@@ -160,18 +222,14 @@ class HeroManager:
     async def get_random(rarity):
         """Retrieve a random hero of a specified rarity. If none are found, return a random hero."""
         try:
-            with open(HUNTERS_JSON_PATH, "r", encoding="utf-8") as file:
-                heroes = json.load(file)
+            catalog = HeroManager._load_catalog()
+            # If no heroes match rarity, pick from all
+            candidates = catalog.by_rarity.get(rarity) or catalog.heroes
 
-            filtered_heroes = [Hero(**hero) for hero in heroes if hero["rarity"] == rarity]
-
-            if not filtered_heroes:
-                filtered_heroes = [Hero(**hero) for hero in heroes]  # If no heroes match rarity, pick from all
-
-            if not filtered_heroes:
+            if not candidates:
                 return None  # No heroes available
 
-            return random.choice(filtered_heroes)  # Return as a Hero object
+            return copy.copy(random.choice(candidates))  # Return as a Hero object
 
         except Exception as e:
             logging.error(f"An error occurred while retrieving a random hero: {e}")
@@ -181,22 +239,15 @@ class HeroManager:
     async def delete(hero_id):
         """Delete a hero from hunters.json."""
         try:
-            with open(HUNTERS_JSON_PATH, "r", encoding="utf-8") as file:
-                heroes = json.load(file)
-
-            # Find and remove the hero
-            original_count = len(heroes)
-            heroes = [hero for hero in heroes if hero["id"] != hero_id]
-
-            if len(heroes) < original_count:
-                # Hero was found and removed
-                with open(HUNTERS_JSON_PATH, "w", encoding="utf-8") as file:
-                    json.dump(heroes, file, indent=4)
-                return True
-            else:
+            catalog = HeroManager._load_catalog()
+            if hero_id not in catalog.by_id:
                 # Hero not found
                 return False
 
+            heroes = [hero for hero in catalog.data if hero["id"] != hero_id]
+            HeroManager._write_catalog(heroes)
+            return True
+
         except Exception as e:
             logging.error(f"An error occurred while deleting hero {hero_id}: {e}")
             return False
@@ -1,5 +1,7 @@
 import random
-import aiosqlite
+from structure.db_pool import db_read, db_write
+from structure.catalog_cache import CatalogCache
+from structure.migrations import apply_migrations
 import json
 from enum import Enum
 
@@ -82,10 +84,12 @@ class Item:
 class ItemManager:
     """Handles database operations for items."""
 
+    _catalog = CatalogCache("items", lambda: ItemManager._fetch_all())
+
     @staticmethod
     async def initialize():
         """Initialize the items table in the database."""
-        async with aiosqlite.connect(DATABASE_PATH) as conn:
+        async with db_write(DATABASE_PATH) as conn:
             await conn.execute(
                 '''
                 CREATE TABLE IF NOT EXISTS items (
@@ -107,23 +111,15 @@ class ItemManager:
                 )
                 '''
             )
-
-            # Add new columns to existing tables if they don't exist
-            try:
-                await conn.execute("ALTER TABLE items ADD COLUMN custom_emoji TEXT DEFAULT ''")
-            except:
-                pass  # Column already exists
-            try:
-                await conn.execute("ALTER TABLE items ADD COLUMN emoji_name TEXT DEFAULT ''")
-            except:
-                pass  # Column already exists
             await conn.commit()
+        # Columns added after the table was first created
+        await apply_migrations("items", DATABASE_PATH)
 
     @staticmethod
     async def save(item):
         """Save or update an item in the database."""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 await conn.execute(
                     '''
                     INSERT INTO items (id, name, rarity, classType, type, image, description, health, attack, defense, speed, mp, precision, custom_emoji, emoji_name)
@@ -163,18 +159,24 @@ class ItemManager:
                     ),
                 )
                 await conn.commit()
+            ItemManager._catalog.invalidate()
         except Exception as e:
             print(f"An error occurred while saving item: {e}")
 
+    @staticmethod
+    async def _fetch_all():
+        """Read the whole items table (used to fill the catalog cache)."""
+        async with db_read(DATABASE_PATH) as conn:
+            cursor = await conn.execute("SELECT * FROM items")
+            rows = await cursor.fetchall()
+            column_names = [description[0] for description in cursor.description]
+            return [Item.from_row(row, column_names) for row in rows]
+
     @staticmethod
     async def get_all():
         """Retrieve all items from the database."""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
-                cursor = await conn.execute("SELECT * FROM items")
-                rows = await cursor.fetchall()
-                column_names = [description[0] for description in cursor.description]
-                return [Item.from_row(row, column_names) for row in rows]
+            return await ItemManager._catalog.all()
         except Exception as e:
             print(f"An error occurred while retrieving items: {e}")
             return []
@@ -183,29 +185,33 @@ class ItemManager:
     async def get(item_id):
         """Retrieve a specific item by its ID."""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
-                cursor = await conn.execute("SELECT * FROM items WHERE id = ?", (item_id,))
-                row = await cursor.fetchone()
-                if row:
-                    column_names = [description[0] for description in cursor.description]
-                    return Item.from_row(row, column_names)
-                return None
+            return await ItemManager._catalog.get(item_id)
         except Exception as e:
             print(f"An error occurred while retrieving item: {e}")
             return None
 
+    @staticmethod
+    async def get_many(item_ids):
+        """Retrieve several items at once as {item_id: Item}; unknown ids are left out."""
+        try:
+            return await ItemManager._catalog.get_many(item_ids)
+        except Exception as e:
+            print(f"An error occurred while retrieving items: {e}")
+            return {}
+
+    @staticmethod
+    async def catalog_version():
+        """Changes whenever the item catalog is reloaded or edited."""
+        return await ItemManager._catalog.current_version()
+
     @staticmethod
     async def get_random_item_by_rarity(rarity):
         """Retrieve a random item of a specified rarity."""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
-                cursor = await conn.execute("SELECT * FROM items WHERE rarity = ?", (rarity,))
-                rows = await cursor.fetchall()
-                if not rows:
-                    return None
-                column_names = [description[0] for description in cursor.description]
-                selected_row = random.choice(rows)
-                return Item.from_row(selected_row, column_names)
+            items = [item for item in await ItemManager._catalog.all() if item.rarity == rarity]
+            if not items:
+                return None
+            return random.choice(items)
         except Exception as e:
             print(f"An error occurred while retrieving a random item by rarity: {e}")
             return None
@@ -214,9 +220,10 @@ class ItemManager:
     async def delete(item_id):
         """Delete an item from the database."""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 cursor = await conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
                 await conn.commit()
+                ItemManager._catalog.invalidate()
                 return cursor.rowcount > 0  # Returns True if item was deleted
         except Exception as e:
             print(f"An error occurred while deleting item {item_id}: {e}")
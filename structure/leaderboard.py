@@ -13,19 +13,22 @@ class Leaderboard:
     async def refresh():
         """Refresh the leaderboard data and store top 15 players for each category"""
         try:
-            all_players = await Player.all()
-            
-            # Sort players by each metric
-            gold_leaderboard = sorted(all_players, key=lambda p: p.gold, reverse=True)[:15]
-            diamond_leaderboard = sorted(all_players, key=lambda p: p.diamonds, reverse=True)[:15]
-            streak_leaderboard = sorted(all_players, key=lambda p: p.aStreak, reverse=True)[:15]
+            # Top 15 of each category straight from the rank indexes
+            async def top_players(category):
+                index = await Player.get_rank_index(category)
+                players = [await Player.get(player_id) for player_id, _ in index.top(15)]
+                return [p for p in players if p is not None]
+
+            gold_leaderboard = await top_players("gold")
+            diamond_leaderboard = await top_players("diamond")
+            streak_leaderboard = await top_players("arena")
             
             # Convert to serializable data
             leaderboard_data = {
                 "gold": [Leaderboard._player_to_dict(p) for p in gold_leaderboard],
                 "diamonds": [Leaderboard._player_to_dict(p) for p in diamond_leaderboard],
                 "streak": [Leaderboard._player_to_dict(p) for p in streak_leaderboard],
-                "last_updated": datetime.datetime.now().isoformat()
+                "last_updated": datetime.now().isoformat()
             }
             
             # Save to file
@@ -42,9 +45,9 @@ class Leaderboard:
         """Convert player object to dictionary for JSON serialization"""
         return {
             "id": player.id,
-            "name": player.name,
+            "name": getattr(player, "name", f"Hunter {player.id}"),
             "gold": player.gold,
-            "diamonds": player.diamonds,
+            "diamonds": player.diamond,
             "aStreak": player.aStreak
             # Add any other relevant fields you want to display
         }
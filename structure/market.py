@@ -1,7 +1,7 @@
 import json
 import logging
 import sqlite3
-import aiosqlite
+from structure.db_pool import db_read, db_write
 from typing import List, Dict, Optional
 
 def get_database_path():
@@ -28,7 +28,7 @@ class Market:
     @staticmethod
     async def get(market_id: int) -> Optional['Market']:
         """Get listing by ID"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             async with db.execute("SELECT * FROM market WHERE id = ?", (market_id,)) as cursor:
                 row = await cursor.fetchone()
                 return Market(*row) if row else None
@@ -36,14 +36,14 @@ class Market:
     @staticmethod
     async def get_all() -> List['Market']:
         """Get all listings"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             async with db.execute("SELECT * FROM market") as cursor:
                 return [Market(*row) for row in await cursor.fetchall()]
 
     @staticmethod
     async def get_by_seller(seller_id: int) -> List['Market']:
         """Get seller's listings"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             async with db.execute("SELECT * FROM market WHERE sid = ?", (seller_id,)) as cursor:
                 return [Market(*row) for row in await cursor.fetchall()]
 
@@ -63,13 +63,13 @@ class Market:
             query += " AND p <= ?"
             params.append(max_p)
             
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             async with db.execute(query, params) as cursor:
                 return [Market(*row) for row in await cursor.fetchall()]
 
     async def save(self):
         """Save/update listing"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             if await Market.get(self.id):
                 await db.execute("""
                     UPDATE market SET 
@@ -96,7 +96,7 @@ class Market:
     @staticmethod
     async def get_next_id():
         """Get the next available ID for a new listing"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             async with db.execute("SELECT value FROM counters WHERE name = 'market'") as cursor:
                 counter = (await cursor.fetchone())[0]
                 return counter + 1
@@ -118,7 +118,7 @@ class Market:
 
     async def delete(self):
         """Delete listing"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             await db.execute("DELETE FROM market WHERE id = ?", (self.id,))
             await db.commit()
 
@@ -0,0 +1,171 @@
+"""
+Arena matchmaking index
+Players with at least one party hunter, ordered by party power (the same
+level * (tier + 1) strength the arena uses for XP). Built from the players
+table on startup and kept current from Player saves, so finding a fair
+opponent is an O(log n) nearest-rating lookup instead of loading players.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Iterable, Optional
+
+from structure import player_storage
+from structure.db_pool import db_read
+from structure.rank_index import REBUILD_INTERVAL, _IndexableSkipList
+
+PARTY_SLOTS = ("Party_1", "Party_2", "Party_3")
+CANDIDATE_WINDOW = 10   # players on each side of the seeker's rating to look at
+CLOSEST_CHOICES = 5     # pick randomly among this many closest ratings
+MAX_WINDOW = 640        # stop widening the search after this many per side
+
+
+def party_power(equipped: dict, hunters: dict) -> int:
+    """Total strength of the equipped party; 0 means the player can't be matched"""
+    power = 0
+    for slot in PARTY_SLOTS:
+        hunter_id = (equipped or {}).get(slot)
+        if hunter_id and hunter_id in (hunters or {}):
+            hunter = hunters[hunter_id] if isinstance(hunters[hunter_id], dict) else {}
+            power += (hunter.get("level") or 1) * ((hunter.get("tier") or 0) + 1)
+    return power
+
+
+def _decode(raw) -> dict:
+    if isinstance(raw, dict):
+        return raw
+    try:
+        value = json.loads(raw) if raw else {}
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+class MatchmakingIndex:
+    """Eligible arena players keyed by (party power, player id)"""
+
+    def __init__(self):
+        self._list = _IndexableSkipList()
+        self._power: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._pending: Optional[Dict[int, int]] = None  # changes seen while rebuilding
+        self._refresh: Optional[asyncio.Task] = None  # background safety rebuild
+
+    def __len__(self):
+        return len(self._power)
+
+    def __contains__(self, player_id):
+        return player_id in self._power
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    async def ensure_loaded(self, path: str):
+        """
+        Build the index if it was never built. Once built, a due safety
+        rebuild runs as a background task and matches keep coming from the
+        current index until it finishes.
+        """
+        if self._loaded_at is not None:
+            if (time.monotonic() - self._loaded_at >= REBUILD_INTERVAL
+                    and (self._refresh is None or self._refresh.done())):
+                self._refresh = asyncio.create_task(self._background_rebuild(path))
+            return
+        async with self._lock:
+            if self._loaded_at is None:
+                await self.rebuild(path)
+
+    async def _background_rebuild(self, path: str):
+        async with self._lock:
+            try:
+                await self.rebuild(path)
+            except Exception as e:
+                logging.error(f"Matchmaking index rebuild failed: {e}")
+
+    async def rebuild(self, path: str):
+        """Replace the index with the parties currently in the database"""
+        self._pending = {}
+        try:
+            async with db_read(path) as conn:
+                cursor = await conn.execute("SELECT id, equipped, hunters FROM players")
+                rows = await cursor.fetchall()
+                table_hunters = {}
+                if player_storage.NORMALIZED_COLLECTIONS:
+                    # Migrated players keep their hunters in player_hunters; level and tier are columns there
+                    cursor = await conn.execute("SELECT player_id, hunter_id, level, tier FROM player_hunters")
+                    for player_id, hunter_id, level, tier in await cursor.fetchall():
+                        table_hunters.setdefault(player_id, {})[hunter_id] = {"level": level, "tier": tier}
+            pending = self._pending
+        finally:
+            self._pending = None
+
+        self._list = _IndexableSkipList()
+        self._power = {}
+        for player_id, equipped, hunters in rows:
+            if player_storage.NORMALIZED_COLLECTIONS and player_storage.blob_is_empty(hunters):
+                hunters = table_hunters.get(player_id, {})
+            self._set(player_id, party_power(_decode(equipped), _decode(hunters)))
+        # Saves that landed while the rows were being read win over the snapshot
+        for player_id, power in pending.items():
+            self._set(player_id, power)
+        self._loaded_at = time.monotonic()
+        logging.info(f"Matchmaking index built with {len(self._power)} eligible players")
+
+    def reset(self):
+        self._list = _IndexableSkipList()
+        self._power = {}
+        self._loaded_at = None
+
+    def _set(self, player_id, power: int):
+        current = self._power.get(player_id)
+        if current == power or (current is None and not power):
+            return
+        if current is not None:
+            del self._power[player_id]
+            self._list.remove((current, player_id))
+        if power:
+            self._power[player_id] = power
+            self._list.insert((power, player_id))
+
+    def update(self, player_id, power: int):
+        """Record a player's party power (0 removes them from the pool)"""
+        if self._pending is not None:
+            self._pending[player_id] = power
+        if self._loaded_at is not None:
+            self._set(player_id, power)
+
+    def record_player(self, player):
+        self.update(player.id, party_power(player.equipped, player.hunters))
+
+    def remove(self, player_id):
+        self.update(player_id, 0)
+
+    def power(self, player_id) -> Optional[int]:
+        return self._power.get(player_id)
+
+    def find_opponent(self, player_id, power: int = None, exclude: Iterable = ()) -> Optional[int]:
+        """A random pick among the eligible players rated closest to `power`"""
+        if power is None:
+            power = self._power.get(player_id, 0)
+        position = self._list.count_below((power, player_id))
+        window = CANDIDATE_WINDOW
+        while True:
+            start = max(0, position - window)
+            keys = self._list.slice(start, position - start + window + 1)
+            candidates = [(abs(rating - power), opponent_id) for rating, opponent_id in keys
+                          if opponent_id != player_id and opponent_id not in exclude]
+            if candidates or window >= MAX_WINDOW or window >= len(self._power):
+                break
+            window *= 2  # everyone nearby is busy; look further out
+        if not candidates:
+            return None
+        candidates.sort()
+        return random.choice(candidates[:CLOSEST_CHOICES])[1]
+
+
+matchmaking_index = MatchmakingIndex()
@@ -0,0 +1,208 @@
+"""
+Schema migrations
+Versioned DDL for the bot's databases. Each scope (players, items, ...) has
+an ordered list of migrations; applied versions are recorded per database in
+schema_migrations, so every migration runs once per file. A migration whose
+tables don't exist yet is left pending and retried on the next run.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from structure.db_pool import db_read, db_write
+
+
+class Migration:
+    def __init__(self, version: int, description: str, steps: Iterable, requires: Iterable[str] = ()):
+        self.version = version
+        self.description = description
+        self.steps = list(steps)      # SQL strings or AddColumn
+        self.requires = tuple(requires)
+
+
+class AddColumn:
+    """ALTER TABLE ... ADD COLUMN, skipped when the column is already there"""
+
+    def __init__(self, table: str, column: str, declaration: str):
+        self.table = table
+        self.column = column
+        self.declaration = declaration
+
+    async def run(self, conn):
+        cursor = await conn.execute(f"PRAGMA table_info({self.table})")
+        if self.column in {row[1] for row in await cursor.fetchall()}:
+            return
+        await conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {self.column} {self.declaration}")
+        logging.info(f"Added '{self.column}' column to {self.table}")
+
+
+def create_index(name: str, table: str, columns: str) -> str:
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+
+
+MIGRATIONS: Dict[str, List[Migration]] = {
+    "players": [
+        Migration(1, "players: oshi_list, ecube, story_progress, titles, active_title columns", [
+            AddColumn("players", "oshi_list", "TEXT DEFAULT '[]'"),
+            AddColumn("players", "ecube", "INTEGER DEFAULT 0"),
+            AddColumn("players", "story_progress", "TEXT DEFAULT '{}'"),
+            AddColumn("players", "titles", "TEXT DEFAULT '{}'"),
+            AddColumn("players", "active_title", "TEXT DEFAULT NULL"),
+        ], requires=["players"]),
+        Migration(2, "players: leaderboard indexes", [
+            create_index("idx_players_gold", "players", "gold"),
+            create_index("idx_players_diamond", "players", "diamond"),
+            create_index("idx_players_astreak", "players", "aStreak"),
+            create_index("idx_players_level", "players", "level"),
+        ], requires=["players"]),
+        Migration(3, "leaderboard: power index for rank evaluation", [
+            create_index("idx_leaderboard_power", "leaderboard", "power"),
+        ], requires=["leaderboard"]),
+    ],
+    "glory": [
+        Migration(1, "glory: points index for rankings", [
+            create_index("idx_glory_points", "glory", "points"),
+        ], requires=["glory"]),
+    ],
+    "market": [
+        Migration(1, "market: seller and type/price indexes", [
+            create_index("idx_market_sid", "market", "sid"),
+            create_index("idx_market_type_price", "market", "i_t, p"),
+        ], requires=["market"]),
+    ],
+    "notifications": [
+        Migration(1, "notifications: active schedule and per-user indexes", [
+            create_index("idx_notifications_active_time", "notifications", "is_active, scheduled_time"),
+            create_index("idx_notifications_user", "notifications", "user_id, is_active, scheduled_time"),
+        ], requires=["notifications"]),
+    ],
+    "items": [
+        Migration(1, "items: custom emoji columns", [
+            AddColumn("items", "custom_emoji", "TEXT DEFAULT ''"),
+            AddColumn("items", "emoji_name", "TEXT DEFAULT ''"),
+        ], requires=["items"]),
+    ],
+    "skills": [
+        Migration(1, "skills: level column", [
+            AddColumn("skills", "level", "INTEGER NOT NULL DEFAULT 1"),
+        ], requires=["skills"]),
+    ],
+    "shadows": [
+        Migration(1, "shadows: custom emoji and rarity columns", [
+            AddColumn("shadows", "custom_emoji", "TEXT DEFAULT ''"),
+            AddColumn("shadows", "emoji_name", "TEXT DEFAULT ''"),
+            AddColumn("shadows", "rarity", "TEXT DEFAULT 'Common'"),
+        ], requires=["shadows"]),
+    ],
+    "raids": [
+        Migration(1, "raids: image, stats and message columns", [
+            AddColumn("raids", "image", "TEXT"),
+            AddColumn("raids", "attack", "INTEGER"),
+            AddColumn("raids", "defense", "INTEGER"),
+            AddColumn("raids", "max_health", "INTEGER"),
+            AddColumn("raids", "message_id", "INTEGER"),
+        ], requires=["raids"]),
+    ],
+}
+
+# Queries checked by the startup self-check: (scope, description, sql, params)
+HOT_QUERIES = [
+    ("players", "leaderboard top 15 by gold", "SELECT id, gold FROM players ORDER BY gold DESC LIMIT 15", ()),
+    ("players", "leaderboard position by gold",
+     "SELECT COUNT(*) + 1 FROM players WHERE gold > (SELECT gold FROM players WHERE id = ?)", (0,)),
+    ("players", "power leaderboard position", "SELECT COUNT(*) FROM leaderboard WHERE power > ?", (0,)),
+    ("glory", "glory page", "SELECT * FROM glory ORDER BY points DESC LIMIT ? OFFSET ?", (10, 0)),
+    ("glory", "glory position", "SELECT COUNT(*) FROM glory WHERE points > ?", (0,)),
+    ("market", "listings by seller", "SELECT * FROM market WHERE sid = ?", (0,)),
+    ("market", "search by type and price", "SELECT * FROM market WHERE 1=1 AND i_t = ? AND p <= ?", ("hunter", 0)),
+    ("notifications", "due notifications",
+     "SELECT * FROM notifications WHERE is_active = 1 AND scheduled_time > ? ORDER BY scheduled_time ASC", (0,)),
+    ("notifications", "user notifications",
+     "SELECT * FROM notifications WHERE user_id = ? AND is_active = 1 ORDER BY scheduled_time ASC", (0,)),
+]
+
+
+async def _existing_tables(conn) -> set:
+    cursor = await conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    return {row[0] for row in await cursor.fetchall()}
+
+
+async def apply_migrations(scope: str, path: str) -> int:
+    """Apply pending migrations of one scope to one database; returns how many ran."""
+    applied_now = 0
+    async with db_write(path) as conn:
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                scope TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                description TEXT,
+                applied_at REAL,
+                PRIMARY KEY (scope, version)
+            )
+        """)
+        await conn.commit()
+        cursor = await conn.execute("SELECT version FROM schema_migrations WHERE scope = ?", (scope,))
+        applied = {row[0] for row in await cursor.fetchall()}
+        tables = await _existing_tables(conn)
+
+        for migration in sorted(MIGRATIONS.get(scope, []), key=lambda m: m.version):
+            if migration.version in applied:
+                continue
+            missing = [table for table in migration.requires if table not in tables]
+            if missing:
+                # Later versions may depend on this one, so stop here and retry next run
+                logging.debug(f"Migration {scope} v{migration.version} waiting for tables {missing} in {path}")
+                break
+            try:
+                for step in migration.steps:
+                    if isinstance(step, str):
+                        await conn.execute(step)
+                    else:
+                        await step.run(conn)
+                await conn.execute(
+                    "INSERT INTO schema_migrations (scope, version, description, applied_at) VALUES (?, ?, ?, ?)",
+                    (scope, migration.version, migration.description, time.time()))
+                await conn.commit()
+            except Exception as e:
+                await conn.rollback()
+                logging.error(f"Migration {scope} v{migration.version} failed on {path}: {e}")
+                break
+            applied_now += 1
+            logging.info(f"Applied migration {scope} v{migration.version}: {migration.description}")
+    return applied_now
+
+
+async def apply_all(targets: Dict[str, str]) -> int:
+    """Apply every scope in {scope: database path}."""
+    total = 0
+    for scope, path in targets.items():
+        total += await apply_migrations(scope, path)
+    return total
+
+
+async def explain_hot_queries(targets: Dict[str, str]) -> List[str]:
+    """
+    Run EXPLAIN QUERY PLAN for HOT_QUERIES and return one report line each.
+    Plans that scan a whole table or sort in a temp b-tree are flagged.
+    """
+    report = []
+    for scope, description, sql, params in HOT_QUERIES:
+        path = targets.get(scope)
+        if path is None:
+            continue
+        try:
+            async with db_read(path) as conn:
+                cursor = await conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                details = [row[-1] for row in await cursor.fetchall()]
+        except Exception as e:
+            report.append(f"⚪ {description}: not checked ({e})")
+            continue
+
+        full_scan = any(detail.startswith("SCAN") and "INDEX" not in detail for detail in details)
+        temp_sort = any("TEMP B-TREE" in detail for detail in details)
+        marker = "⚠️" if full_scan or temp_sort else "✅"
+        report.append(f"{marker} {description}: {' | '.join(details)}")
+        if full_scan or temp_sort:
+            logging.warning(f"Query plan for '{description}' is not indexed: {details}")
+    return report
@@ -8,136 +8,146 @@ from typing import Dict, List, Optional, Tuple, Any
 import discord
 from discord.ext import tasks
 
+from structure.db_pool import db_read, db_write
+from structure.delivery_queue import delivery_queue
+from structure.timer_scheduler import TimerScheduler
+
 DATABASE_PATH = "new_player.db"
+SCHEDULE_WINDOW = 15 * 60  # seconds of upcoming notifications paged into memory
+
+DEFAULT_SETTINGS = {
+    'cooldown_alerts': 1,
+    'world_boss_alerts': 1,
+    'daily_reminders': 0,
+    'custom_alerts': 1,
+    'dm_notifications': 1,
+    'channel_notifications': 0,
+    'preferred_channel': None,
+    'notification_sound': 1,
+    'quiet_hours_start': None,
+    'quiet_hours_end': None,
+    'timezone_offset': 0,
+    'settings_data': '{}'
+}
 
 class NotificationManager:
     """Manages custom notifications for players"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.active_notifications: Dict[int, List[dict]] = {}  # user_id -> [notifications]
-        self.scheduled_tasks: Dict[int, asyncio.Task] = {}  # notification_id -> task
+        # Only notifications due before the horizon are held in memory; the loop pages in the rest
+        self.scheduler = TimerScheduler("notifications", self.deliver_batch)
+        self.horizon = 0.0
+        self.in_flight = set()  # ids popped from the scheduler but not retired yet
         self.logger = logging.getLogger(__name__)
         
     async def initialize(self):
         """Initialize the notification system"""
         try:
             await self.load_active_notifications()
+            self.scheduler.start()
             self.notification_loop.start()
             self.logger.info("✅ Notification system initialized")
         except Exception as e:
             self.logger.error(f"❌ Failed to initialize notification system: {e}")
     
     async def load_active_notifications(self):
-        """Load active notifications from database and schedule them"""
+        """Page the next window of active notifications from the database into the scheduler"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            now = time.time()
+            start = max(self.horizon, now)
+            horizon = now + SCHEDULE_WINDOW
+            async with db_read(DATABASE_PATH) as conn:
                 conn.row_factory = aiosqlite.Row
                 cursor = await conn.execute("""
                     SELECT * FROM notifications
-                    WHERE is_active = 1 AND scheduled_time > ?
+                    WHERE is_active = 1 AND scheduled_time > ? AND scheduled_time <= ?
                     ORDER BY scheduled_time ASC
-                """, (time.time(),))
+                """, (start, horizon))
 
                 notifications = await cursor.fetchall()
 
-                for notification in notifications:
-                    await self.schedule_notification(dict(notification))
-                    
-                self.logger.info(f"Loaded {len(notifications)} active notifications")
+            for notification in notifications:
+                notification_data = dict(notification)
+                if notification_data['id'] not in self.scheduler:
+                    self.scheduler.schedule(notification_data['id'], notification_data['scheduled_time'], notification_data)
+            self.horizon = horizon
+
+            self.logger.debug(f"Paged {len(notifications)} notifications due before {horizon:.0f}")
         except Exception as e:
             self.logger.error(f"Error loading notifications: {e}")
     
     async def schedule_notification(self, notification_data: dict):
         """Schedule a notification for delivery"""
-        notification_id = notification_data['id']
-        user_id = notification_data['user_id']
-        scheduled_time = notification_data['scheduled_time']
-        
-        # Calculate delay
-        delay = scheduled_time - time.time()
-        if delay <= 0:
-            # Notification is overdue, send immediately
-            await self.deliver_notification(notification_data)
-            return
-        
-        # Schedule the notification
-        task = asyncio.create_task(self._schedule_delivery(notification_data, delay))
-        self.scheduled_tasks[notification_id] = task
-        
-        # Add to active notifications
-        if user_id not in self.active_notifications:
-            self.active_notifications[user_id] = []
-        self.active_notifications[user_id].append(notification_data)
+        # Later notifications stay in the database until their window is paged in
+        if notification_data['scheduled_time'] <= max(self.horizon, time.time()):
+            self.scheduler.schedule(notification_data['id'], notification_data['scheduled_time'], notification_data)
     
-    async def _schedule_delivery(self, notification_data: dict, delay: float):
-        """Internal method to handle scheduled delivery"""
+    async def deliver_batch(self, batch: List[dict]):
+        """Deliver notifications that came due together, then retire them in one write"""
+        ids = {n['id'] for n in batch}
+        self.in_flight |= ids
         try:
-            await asyncio.sleep(delay)
-            await self.deliver_notification(notification_data)
-        except asyncio.CancelledError:
-            pass  # Task was cancelled
-        except Exception as e:
-            self.logger.error(f"Error in scheduled delivery: {e}")
+            settings = await self.get_user_settings_many({n['user_id'] for n in batch})
+            results = await asyncio.gather(*(self._deliver(n, settings.get(n['user_id'])) for n in batch),
+                                           return_exceptions=True)
+            finished = [n['id'] for n, done in zip(batch, results) if done is True]
+            for n, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    self.logger.error(f"Error delivering notification {n.get('id')}: {result}")
+            await self.mark_notifications_delivered(finished)
+        finally:
+            self.in_flight -= ids
+    
+    def get_queue_stats(self) -> dict:
+        """Scheduler depth and delivery counters"""
+        return {**self.scheduler.get_stats(), "in_flight": len(self.in_flight), "horizon_in": round(self.horizon - time.time(), 1)}
     
     async def deliver_notification(self, notification_data: dict):
         """Deliver a notification to the user"""
         try:
-            user_id = notification_data['user_id']
-            notification_id = notification_data['id']
-            
-            # Get user settings
-            settings = await self.get_user_settings(user_id)
-            
-            # Check quiet hours
-            if await self.is_quiet_hours(settings):
-                # Reschedule for after quiet hours
-                await self.reschedule_after_quiet_hours(notification_data, settings)
-                return
-            
-            # Get user
-            user = self.bot.get_user(user_id)
-            if not user:
-                try:
-                    user = await self.bot.fetch_user(user_id)
-                except discord.NotFound:
-                    await self.mark_notification_failed(notification_id)
-                    return
-            
-            # Create embed
-            embed = self.create_notification_embed(notification_data)
-            
-            # Deliver based on settings
-            if settings.get('dm_notifications', 1):
-                try:
-                    await user.send(embed=embed)
-                except discord.Forbidden:
-                    # Try channel notification if DM fails
-                    if settings.get('channel_notifications', 0):
-                        await self.send_channel_notification(user_id, embed, settings)
-            elif settings.get('channel_notifications', 0):
-                await self.send_channel_notification(user_id, embed, settings)
-            
-            # Handle recurring notifications
-            if notification_data['is_recurring']:
-                await self.schedule_recurring_notification(notification_data)
-            else:
-                await self.mark_notification_delivered(notification_id)
-            
-            # Remove from active notifications
-            if user_id in self.active_notifications:
-                self.active_notifications[user_id] = [
-                    n for n in self.active_notifications[user_id] 
-                    if n['id'] != notification_id
-                ]
-            
-            # Remove scheduled task
-            if notification_id in self.scheduled_tasks:
-                del self.scheduled_tasks[notification_id]
-                
+            if await self._deliver(notification_data):
+                await self.mark_notification_delivered(notification_data['id'])
         except Exception as e:
             self.logger.error(f"Error delivering notification {notification_data.get('id')}: {e}")
     
+    async def _deliver(self, notification_data: dict, settings: dict = None) -> bool:
+        """Queue one notification for sending; returns True when its row should be retired"""
+        user_id = notification_data['user_id']
+        
+        # Get user settings
+        if settings is None:
+            settings = await self.get_user_settings(user_id)
+        
+        # Check quiet hours
+        if await self.is_quiet_hours(settings):
+            # Reschedule for after quiet hours
+            await self.reschedule_after_quiet_hours(notification_data, settings)
+            return False
+        
+        # Create embed
+        embed = self.create_notification_embed(notification_data)
+        
+        # Deliver based on settings
+        self.queue_delivery(user_id, embed, settings)
+        
+        # Handle recurring notifications; once the next occurrence has its own row this one is retired
+        if notification_data['is_recurring']:
+            return await self.schedule_recurring_notification(notification_data)
+        return True
+    
+    def queue_delivery(self, user_id: int, embed: discord.Embed, settings: dict, ephemeral: bool = False):
+        """Queue a DM (or channel message, per settings) on the shared delivery queue"""
+        async def channel_fallback():
+            await self.send_channel_notification(user_id, embed, settings, ephemeral=ephemeral)
+
+        if settings.get('dm_notifications', 1):
+            # Try channel notification if DM fails
+            fallback = channel_fallback if settings.get('channel_notifications', 0) else None
+            delivery_queue.send_dm(user_id, embed=embed, on_forbidden=fallback)
+        elif settings.get('channel_notifications', 0):
+            delivery_queue.enqueue(f"channel alert for {user_id}", channel_fallback)
+    
     def create_notification_embed(self, notification_data: dict) -> discord.Embed:
         """Create an embed for the notification"""
         notification_type = notification_data['notification_type']
@@ -192,14 +202,8 @@ class NotificationManager:
                 if ephemeral:
                     # For world boss notifications, send as ephemeral to avoid spam
                     # This requires interaction context, so we'll use a different approach
-                    # Send a brief message that auto-deletes
-                    message = await channel.send(f"{user.mention} - World Boss Alert (auto-deleting in 30s)", embed=embed)
-                    # Delete after 30 seconds to avoid channel spam
-                    await asyncio.sleep(30)
-                    try:
-                        await message.delete()
-                    except:
-                        pass  # Message might already be deleted
+                    # Send a brief message that deletes itself after 30 seconds
+                    await channel.send(f"{user.mention} - World Boss Alert (auto-deleting in 30s)", embed=embed, delete_after=30)
                 else:
                     await channel.send(f"{user.mention}", embed=embed)
         except Exception as e:
@@ -208,7 +212,7 @@ class NotificationManager:
     async def get_user_settings(self, user_id: int) -> dict:
         """Get user notification settings"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_read(DATABASE_PATH) as conn:
                 conn.row_factory = aiosqlite.Row
                 cursor = await conn.execute("""
                     SELECT * FROM notification_settings WHERE user_id = ?
@@ -220,25 +224,34 @@ class NotificationManager:
                 else:
                     # Create default settings
                     await self.create_default_settings(user_id)
-                    return {
-                        'user_id': user_id,
-                        'cooldown_alerts': 1,
-                        'world_boss_alerts': 1,
-                        'daily_reminders': 0,
-                        'custom_alerts': 1,
-                        'dm_notifications': 1,
-                        'channel_notifications': 0,
-                        'preferred_channel': None,
-                        'notification_sound': 1,
-                        'quiet_hours_start': None,
-                        'quiet_hours_end': None,
-                        'timezone_offset': 0,
-                        'settings_data': '{}'
-                    }
+                    return {'user_id': user_id, **DEFAULT_SETTINGS}
         except Exception as e:
             self.logger.error(f"Error getting user settings: {e}")
             return {}
     
+    async def get_user_settings_many(self, user_ids) -> Dict[int, dict]:
+        """Settings for several users in one query; users without a row get defaults"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        try:
+            placeholders = ', '.join('?' for _ in user_ids)
+            async with db_read(DATABASE_PATH) as conn:
+                conn.row_factory = aiosqlite.Row
+                cursor = await conn.execute(f"""
+                    SELECT * FROM notification_settings WHERE user_id IN ({placeholders})
+                """, user_ids)
+                settings = {row['user_id']: dict(row) for row in await cursor.fetchall()}
+        except Exception as e:
+            self.logger.error(f"Error getting user settings: {e}")
+            return {user_id: {} for user_id in user_ids}
+
+        for user_id in user_ids:
+            if user_id not in settings:
+                await self.create_default_settings(user_id)
+                settings[user_id] = {'user_id': user_id, **DEFAULT_SETTINGS}
+        return settings
+    
     async def create_default_settings(self, user_id: int):
         """Create default notification settings for a user"""
         try:
@@ -259,7 +272,7 @@ class NotificationManager:
                     else:
                         default_servers = '[]'  # User not in any server
 
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 await conn.execute("""
                     INSERT OR IGNORE INTO notification_settings
                     (user_id, world_boss_servers) VALUES (?, ?)
@@ -304,7 +317,7 @@ class NotificationManager:
                 next_delivery += timedelta(days=1)
             
             # Update notification in database
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 await conn.execute("""
                     UPDATE notifications SET scheduled_time = ? WHERE id = ?
                 """, (next_delivery.timestamp(), notification_data['id']))
@@ -321,28 +334,24 @@ class NotificationManager:
     async def notification_loop(self):
         """Background loop to check for notifications"""
         try:
-            # Clean up completed tasks
-            completed_tasks = [
-                nid for nid, task in self.scheduled_tasks.items() 
-                if task.done()
-            ]
-            for nid in completed_tasks:
-                del self.scheduled_tasks[nid]
+            # Page in the next window before the current one runs out
+            await self.load_active_notifications()
             
             # Check for any missed notifications
             current_time = time.time()
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_read(DATABASE_PATH) as conn:
+                conn.row_factory = aiosqlite.Row
                 cursor = await conn.execute("""
                     SELECT * FROM notifications 
                     WHERE is_active = 1 AND scheduled_time <= ? AND scheduled_time > ?
                 """, (current_time, current_time - 300))  # Last 5 minutes
                 
                 missed_notifications = await cursor.fetchall()
-                
-                for notification in missed_notifications:
-                    notification_data = dict(notification)
-                    if notification_data['id'] not in self.scheduled_tasks:
-                        await self.deliver_notification(notification_data)
+
+            for notification in missed_notifications:
+                notification_data = dict(notification)
+                if notification_data['id'] not in self.scheduler and notification_data['id'] not in self.in_flight:
+                    await self.deliver_notification(notification_data)
                         
         except Exception as e:
             self.logger.error(f"Error in notification loop: {e}")
@@ -355,7 +364,7 @@ class NotificationManager:
             if notification_data is None:
                 notification_data = {}
 
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 cursor = await conn.execute("""
                     INSERT INTO notifications
                     (user_id, notification_type, title, message, scheduled_time,
@@ -393,7 +402,7 @@ class NotificationManager:
     async def cancel_notification(self, notification_id: int, user_id: int) -> bool:
         """Cancel a notification"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 # Verify ownership
                 cursor = await conn.execute("""
                     SELECT user_id FROM notifications WHERE id = ?
@@ -409,18 +418,7 @@ class NotificationManager:
                 """, (notification_id,))
                 await conn.commit()
 
-            # Cancel scheduled task
-            if notification_id in self.scheduled_tasks:
-                self.scheduled_tasks[notification_id].cancel()
-                del self.scheduled_tasks[notification_id]
-
-            # Remove from active notifications
-            if user_id in self.active_notifications:
-                self.active_notifications[user_id] = [
-                    n for n in self.active_notifications[user_id]
-                    if n['id'] != notification_id
-                ]
-
+            self.scheduler.cancel(notification_id)
             return True
 
         except Exception as e:
@@ -430,7 +428,7 @@ class NotificationManager:
     async def get_user_notifications(self, user_id: int, active_only: bool = True) -> List[dict]:
         """Get all notifications for a user"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_read(DATABASE_PATH) as conn:
                 conn.row_factory = aiosqlite.Row
                 if active_only:
                     cursor = await conn.execute("""
@@ -455,7 +453,7 @@ class NotificationManager:
     async def update_user_settings(self, user_id: int, settings: dict) -> bool:
         """Update user notification settings"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 # First, ensure the user has a settings record
                 await conn.execute("""
                     INSERT OR IGNORE INTO notification_settings (user_id) VALUES (?)
@@ -488,15 +486,15 @@ class NotificationManager:
             self.logger.error(f"Error updating user settings: {e}")
             return False
 
-    async def schedule_recurring_notification(self, notification_data: dict):
-        """Schedule the next occurrence of a recurring notification"""
+    async def schedule_recurring_notification(self, notification_data: dict) -> bool:
+        """Schedule the next occurrence of a recurring notification; returns True once it is stored"""
         try:
             interval = notification_data['recurring_interval']
             next_time = notification_data['scheduled_time'] + interval
 
             # Create new notification entry
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
-                await conn.execute("""
+            async with db_write(DATABASE_PATH) as conn:
+                cursor = await conn.execute("""
                     INSERT INTO notifications
                     (user_id, notification_type, title, message, scheduled_time,
                      created_time, is_recurring, recurring_interval, notification_data)
@@ -516,14 +514,16 @@ class NotificationManager:
             new_notification['created_time'] = time.time()
 
             await self.schedule_notification(new_notification)
+            return True
 
         except Exception as e:
             self.logger.error(f"Error scheduling recurring notification: {e}")
+            return False
 
     async def mark_notification_delivered(self, notification_id: int):
         """Mark a notification as delivered"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 await conn.execute("""
                     UPDATE notifications SET is_active = 0 WHERE id = ?
                 """, (notification_id,))
@@ -531,10 +531,23 @@ class NotificationManager:
         except Exception as e:
             self.logger.error(f"Error marking notification delivered: {e}")
 
+    async def mark_notifications_delivered(self, notification_ids: List[int]):
+        """Mark several notifications as delivered in one transaction"""
+        if not notification_ids:
+            return
+        try:
+            async with db_write(DATABASE_PATH) as conn:
+                await conn.executemany("""
+                    UPDATE notifications SET is_active = 0 WHERE id = ?
+                """, [(notification_id,) for notification_id in notification_ids])
+                await conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error marking notifications delivered: {e}")
+
     async def mark_notification_failed(self, notification_id: int):
         """Mark a notification as failed"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 await conn.execute("""
                     UPDATE notifications SET is_active = 0 WHERE id = ?
                 """, (notification_id,))
@@ -546,7 +559,7 @@ class NotificationManager:
         """Clean up old notifications"""
         try:
             cutoff_time = time.time() - (days_old * 24 * 60 * 60)
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 await conn.execute("""
                     DELETE FROM notifications
                     WHERE is_active = 0 AND created_time < ?
@@ -7,10 +7,16 @@ import aiohttp
 import aiosqlite
 import discord
 from discord.ext import commands
+from structure.db_pool import db_read, db_write
+from structure.player_writer import player_write_behind
+from structure.player_cache import PlayerCache
+from structure import player_storage, rank_index
+from structure.matchmaking import matchmaking_index
 from structure.skills import SkillManager
 from structure.emoji import getEmoji
 from structure.items import ItemManager
 from datetime import datetime, timedelta
+from typing import Optional
 
 def get_database_path():
     try:
@@ -23,14 +29,21 @@ def get_database_path():
 
 DATABASE_PATH = get_database_path()
 
+# Marker for columns that have never been read from or written to the database
+_UNSET = object()
+
 class Player:
-    _players = {}
+    _players = PlayerCache()
 
     def __init__(self, player_id, data=None):
         if data is None:
             data = {}
         
         self.id = player_id
+        # Row as last read from / written to the database (None = not stored yet)
+        self._persisted = None
+        # Collection entries as last stored in the normalized tables (see player_storage)
+        self._persisted_entries = None
         self.level = data.get('level', 1)
         self.xp = data.get('xp', 0)  # Ensure XP always exists
         self.attack = data.get('attack', 10)
@@ -170,6 +183,10 @@ class Player:
         # Active title (currently equipped title)
         self.active_title = data.get('active_title', None)
         
+    def to_dict(self):
+        """Player attributes without internal bookkeeping (for size analysis)."""
+        return {key: value for key, value in self.__dict__.items() if not key.startswith('_')}
+
     def get_inventory(self):
         """Safely gets the player's inventory."""
         return self.inventory
@@ -538,11 +555,13 @@ class Player:
 
     @classmethod
     async def all(cls):
-        """Loads all players from the database into the cache."""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        """
+        Loads all players from the database.
+        Already cached players are reused; the rest are returned without being
+        cached so a full scan doesn't flush the active set out of the cache.
+        """
+        async with db_read(DATABASE_PATH) as db:
             db.row_factory = aiosqlite.Row
-            await db.execute("PRAGMA journal_mode=WAL;")
-            await db.execute("PRAGMA busy_timeout = 5000;")
             try:
                 cursor = await db.execute("SELECT * FROM players")
                 rows = await cursor.fetchall()
@@ -550,30 +569,39 @@ class Player:
                 logging.error(f"Failed to load players, table might not exist yet. Error: {e}")
                 return []
 
+        tables = await player_storage.load(DATABASE_PATH) if player_storage.NORMALIZED_COLLECTIONS else {}
 
+        players = []
         for row in rows:
             player_id = row['id']
-            if player_id not in cls._players:
+            player = cls._players.peek(player_id)
+            if player is None:
                 player_data = dict(row)
+                persisted = dict(row)
                 # JSON fields need to be decoded
-                for key in ['quests', 'inventory', 'equipped', 'hunters', 'skills', 'shadows', 'mission', 'loot', 'market', 'story_progress']:
+                for key in ['quests', 'inventory', 'equipped', 'hunters', 'skills', 'shadows', 'mission', 'loot', 'market', 'story_progress', 'defeated_bosses', 'oshi_list', 'locked_items', 'badge_collection']:
                     if key in player_data and isinstance(player_data[key], str):
                         try:
                             player_data[key] = json.loads(player_data[key])
                         except (json.JSONDecodeError, TypeError):
                             logging.warning(f"Could not decode JSON for key '{key}' for player {player_id}. Using default.")
                             player_data[key] = {}
-                cls._players[player_id] = cls(player_id, data=player_data)
-        return list(cls._players.values())
+                player = cls(player_id, data=player_data)
+                player._persisted = persisted
+                if player_storage.NORMALIZED_COLLECTIONS:
+                    player_storage.attach(player, persisted, tables.get(player_id, {}))
+            players.append(player)
+        return players
 
     @classmethod
     async def get(cls, player_id):
         """Gets a player from cache or database."""
-        if player_id in cls._players:
-            return cls._players[player_id]
+        cached = cls._players.get(player_id)
+        if cached is not None:
+            return cached
 
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_read(DATABASE_PATH) as conn:
                 conn.row_factory = aiosqlite.Row
                 async with conn.cursor() as cursor:
                     await cursor.execute('SELECT * FROM players WHERE id = ?', (player_id,))
@@ -581,6 +609,7 @@ class Player:
 
                     if row:
                         player_data = dict(row)
+                        persisted = dict(row)
                         # JSON fields need to be decoded
                         for key in ['quests', 'inventory', 'equipped', 'hunters', 'skills', 'shadows', 'mission', 'loot', 'market', 'defeated_bosses', 'oshi_list', 'locked_items', 'badge_collection']:
                              if key in player_data and isinstance(player_data[key], str):
@@ -596,12 +625,22 @@ class Player:
                                         player_data[key] = {}
                         
                         player = cls(player_id, data=player_data)
-                        cls._players[player_id] = player
-                        return player
-            # If player not in DB, create a new one, add to cache, and return
-            new_player = cls(player_id)
-            cls._players[player_id] = new_player
-            return new_player
+                        player._persisted = persisted
+                    else:
+                        # If player not in DB, create a new one
+                        player = cls(player_id)
+
+            if player._persisted is not None and player_storage.NORMALIZED_COLLECTIONS:
+                row_id = player._persisted['id']
+                tables = await player_storage.load(DATABASE_PATH, [row_id])
+                player_storage.attach(player, player._persisted, tables.get(row_id, {}))
+
+            # Another task may have loaded the same player while we awaited
+            cached = cls._players.peek(player_id)
+            if cached is not None:
+                return cls._players.get(player_id)
+            cls._players[player_id] = player
+            return player
         except Exception as e:
             if "database is locked" in str(e).lower():
                 pass
@@ -667,113 +706,172 @@ class Player:
         except Exception as e:
             logging.error(f"Error during emergency cleanup for player {self.id}: {e}")
 
-    async def save(self):
-        """Save the player's data to the database using named parameters for safety."""
-        try:
-            # Check data size before saving
-            import json
-            import sys
-
-            player_data_json = json.dumps(self.__dict__, default=str)
-            data_size = sys.getsizeof(player_data_json)
-
-            # Warn if data is very large (> 5MB)
-            if data_size > 5 * 1024 * 1024:
-                logging.warning(f"Player {self.id} data size is {data_size} bytes, which is very large")
+    def to_row(self) -> dict:
+        """Build the players row for this player, with JSON fields encoded."""
+        # Clean data before saving to reduce size
+        cleaned_inventory = self._clean_data_for_save(self.inventory)
+        cleaned_hunters = self._clean_data_for_save(self.hunters)
+        cleaned_shadows = self._clean_data_for_save(self.shadows)
+        cleaned_quests = self._clean_data_for_save(self.quests)
+        cleaned_skills = self._clean_data_for_save(self.skills)
+        cleaned_market = self._clean_data_for_save(self.market)
+        cleaned_defeated_bosses = self._clean_data_for_save(self.defeated_bosses)
+
+        # Ensure story_progress is always a dict before cleaning
+        if not hasattr(self, 'story_progress') or self.story_progress is None:
+            self.story_progress = {}
+        cleaned_story_progress = self._clean_data_for_save(self.story_progress)
+
+        # Ensure titles is always a dict before cleaning
+        if not hasattr(self, 'titles') or self.titles is None:
+            self.titles = {}
+        cleaned_titles = self._clean_data_for_save(self.titles)
+
+        # Ensure unlocked_features is always a dict before cleaning
+        if not hasattr(self, 'unlocked_features') or self.unlocked_features is None:
+            self.unlocked_features = {}
+        cleaned_unlocked_features = self._clean_data_for_save(self.unlocked_features)
+
+        # Create a dictionary of data to save, ensuring JSON fields are encoded
+        return {
+            "id": self.id, "level": self.level, "xp": self.xp, "attack": self.attack, "defense": self.defense,
+            "hp": self.hp, "mp": self.mp, "gold": self.gold, "precision": self.precision, "diamond": self.diamond,
+            "stone": self.stone, "ticket": self.ticket, "crystals": self.crystals, "premiumT": self.premiumT,
+            "premium": self.premium, "skillPoints": self.skillPoints, "statPoints": self.statPoints, "afk": self.afk, "afk_level": self.afk_level,
+            "gacha": self.gacha, "army_lv": self.army_lv, "fcube": self.fcube, "icube": self.icube,
+            "wcube": self.wcube, "ecube": self.ecube, "dcube": self.dcube, "lcube": self.lcube, "ccube": self.ccube, "tos": self.tos, "gear1": self.gear1,
+            "gear2": self.gear2, "gear3": self.gear3, "boss": self.boss, "train": self.train, "daily": self.daily,
+            "guild": self.guild, "trivia": self.trivia, "raid": self.raid, "prem1": self.prem1, "prem2": self.prem2,
+            "prem3": self.prem3, "inc": self.inc, "fight": self.fight, "dungeon": self.dungeon, "trade": self.trade,
+            "key": self.key, "vote": self.vote, "aStreak": self.aStreak, "aC": self.aC, "dS": self.dS, "lD": self.lD,
+            "vS": self.vS, "lV": self.lV, "last_stat_reset": self.last_stat_reset, "last_skill_reset": self.last_skill_reset,
+            "market": json.dumps(cleaned_market, separators=(',', ':')),
+            "loot": json.dumps(self.loot, separators=(',', ':')),
+            "mission": json.dumps(self.mission, separators=(',', ':')),
+            "story_progress": json.dumps(cleaned_story_progress, separators=(',', ':')),
+            "shadows": json.dumps(cleaned_shadows, separators=(',', ':')),
+            "quests": json.dumps(cleaned_quests, separators=(',', ':')),
+            "inventory": json.dumps(cleaned_inventory, separators=(',', ':')),
+            "equipped": json.dumps(self.equipped, separators=(',', ':')),
+            "hunters": json.dumps(cleaned_hunters, separators=(',', ':')),
+            "skills": json.dumps(cleaned_skills, separators=(',', ':')),
+            "defeated_bosses": json.dumps(cleaned_defeated_bosses, separators=(',', ':')),
+            "oshi_list": json.dumps(self.oshi_list, separators=(',', ':')),
+            "locked_items": json.dumps(self.locked_items, separators=(',', ':')),
+            "badge_collection": json.dumps(self.badge_collection, separators=(',', ':')),
+            "titles": json.dumps(cleaned_titles, separators=(',', ':')),
+            "active_title": self.active_title,
+            "unlocked_features": json.dumps(cleaned_unlocked_features, separators=(',', ':'))
+        }
+
+    async def _checked_row(self) -> dict:
+        """Build the row, warning about (and trimming) oversized player data."""
+        data = self.to_row()
+        total_size = sum(len(str(v).encode('utf-8')) for v in data.values())
+
+        # Auto-cleanup for extremely large data (> 10MB)
+        if total_size > 10 * 1024 * 1024:
+            logging.error(f"Player {self.id} data size exceeds 10MB, performing emergency cleanup")
+            await self._emergency_cleanup()
+            data = self.to_row()
+        elif total_size > 1000000:  # 1MB limit
+            logging.warning(f"Player {self.id} data size is {total_size} bytes, which is very large")
+            # Try to reduce size by removing old/unnecessary data
+            if len(self.inventory) > 1000:
+                logging.warning(f"Player {self.id} has {len(self.inventory)} inventory items - this might be too many")
+        return data
+
+    def dirty_columns(self, row: dict) -> dict:
+        """Columns of `row` that differ from what was last read from or written to the database."""
+        if self._persisted is None:
+            return row
+        return {key: value for key, value in row.items() if self._persisted.get(key, _UNSET) != value}
 
-                # Auto-cleanup for extremely large data (> 10MB)
-                if data_size > 10 * 1024 * 1024:
-                    logging.error(f"Player {self.id} data size exceeds 10MB, performing emergency cleanup")
-                    await self._emergency_cleanup()
-            elif data_size > 1 * 1024 * 1024:  # > 1MB
-                logging.info(f"Player {self.id} data size is {data_size} bytes ({data_size / 1024 / 1024:.2f} MB)")
+    @classmethod
+    async def write_many(cls, players, raise_errors: bool = False) -> Optional[int]:
+        """
+        Write several players in one transaction, touching only changed columns.
+        Players never stored before get a full INSERT OR REPLACE.
+        Returns the number of players whose row was written, or None if the
+        transaction failed; with raise_errors, a row too large for SQLite
+        raises instead of only being logged.
+        """
+        written = []
+        inserts = []
+        updates = {}  # column tuple -> [params]
+        normalized = player_storage.NORMALIZED_COLLECTIONS
+        if normalized:
+            await player_storage.ensure_schema(DATABASE_PATH)
+        for player in players:
+            try:
+                row = await player._checked_row()
+                entry_changes = None
+                if normalized:
+                    # Collections go to their own tables, one row per changed entry
+                    collections = {column: player._clean_data_for_save(getattr(player, column, {}))
+                                   for column in player_storage.COLLECTION_TABLES}
+                    entry_changes = player_storage.diff(player.id, collections, player._persisted_entries)
+                    row = player_storage.strip_row(row)
+            except Exception as e:
+                logging.error(f"Failed to serialize player {player.id}: {e}")
+                continue
 
-        except Exception as e:
-            logging.error(f"Error checking player data size: {e}")
+            changed = player.dirty_columns(row)
+            if not changed and not entry_changes:
+                continue
+            if player._persisted is None:
+                inserts.append(row)
+            elif changed:
+                columns = tuple(sorted(key for key in changed if key != 'id'))
+                updates.setdefault(columns, []).append({**changed, 'id': player.id})
+            written.append((player, row, entry_changes))
+
+        if not written:
+            return 0
 
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
-                await conn.execute("PRAGMA journal_mode=WAL;")
-                await conn.execute("PRAGMA busy_timeout = 5000;")
-
-                # Clean data before saving to reduce size
-                cleaned_inventory = self._clean_data_for_save(self.inventory)
-                cleaned_hunters = self._clean_data_for_save(self.hunters)
-                cleaned_shadows = self._clean_data_for_save(self.shadows)
-                cleaned_quests = self._clean_data_for_save(self.quests)
-                cleaned_skills = self._clean_data_for_save(self.skills)
-                cleaned_market = self._clean_data_for_save(self.market)
-                cleaned_defeated_bosses = self._clean_data_for_save(self.defeated_bosses)
-
-                # Ensure story_progress is always a dict before cleaning
-                if not hasattr(self, 'story_progress') or self.story_progress is None:
-                    self.story_progress = {}
-                cleaned_story_progress = self._clean_data_for_save(self.story_progress)
-
-                # Ensure titles is always a dict before cleaning
-                if not hasattr(self, 'titles') or self.titles is None:
-                    self.titles = {}
-                cleaned_titles = self._clean_data_for_save(self.titles)
-
-                # Ensure unlocked_features is always a dict before cleaning
-                if not hasattr(self, 'unlocked_features') or self.unlocked_features is None:
-                    self.unlocked_features = {}
-                cleaned_unlocked_features = self._clean_data_for_save(self.unlocked_features)
-
-                # Create a dictionary of data to save, ensuring JSON fields are encoded
-                data = {
-                    "id": self.id, "level": self.level, "xp": self.xp, "attack": self.attack, "defense": self.defense,
-                    "hp": self.hp, "mp": self.mp, "gold": self.gold, "precision": self.precision, "diamond": self.diamond,
-                    "stone": self.stone, "ticket": self.ticket, "crystals": self.crystals, "premiumT": self.premiumT,
-                    "premium": self.premium, "skillPoints": self.skillPoints, "statPoints": self.statPoints, "afk": self.afk, "afk_level": self.afk_level,
-                    "gacha": self.gacha, "army_lv": self.army_lv, "fcube": self.fcube, "icube": self.icube,
-                    "wcube": self.wcube, "ecube": self.ecube, "dcube": self.dcube, "lcube": self.lcube, "ccube": self.ccube, "tos": self.tos, "gear1": self.gear1,
-                    "gear2": self.gear2, "gear3": self.gear3, "boss": self.boss, "train": self.train, "daily": self.daily,
-                    "guild": self.guild, "trivia": self.trivia, "raid": self.raid, "prem1": self.prem1, "prem2": self.prem2,
-                    "prem3": self.prem3, "inc": self.inc, "fight": self.fight, "dungeon": self.dungeon, "trade": self.trade,
-                    "key": self.key, "vote": self.vote, "aStreak": self.aStreak, "aC": self.aC, "dS": self.dS, "lD": self.lD,
-                    "vS": self.vS, "lV": self.lV, "last_stat_reset": self.last_stat_reset, "last_skill_reset": self.last_skill_reset,
-                    "market": json.dumps(cleaned_market, separators=(',', ':')),
-                    "loot": json.dumps(self.loot, separators=(',', ':')),
-                    "mission": json.dumps(self.mission, separators=(',', ':')),
-                    "story_progress": json.dumps(cleaned_story_progress, separators=(',', ':')),
-                    "shadows": json.dumps(cleaned_shadows, separators=(',', ':')),
-                    "quests": json.dumps(cleaned_quests, separators=(',', ':')),
-                    "inventory": json.dumps(cleaned_inventory, separators=(',', ':')),
-                    "equipped": json.dumps(self.equipped, separators=(',', ':')),
-                    "hunters": json.dumps(cleaned_hunters, separators=(',', ':')),
-                    "skills": json.dumps(cleaned_skills, separators=(',', ':')),
-                    "defeated_bosses": json.dumps(cleaned_defeated_bosses, separators=(',', ':')),
-                    "oshi_list": json.dumps(self.oshi_list, separators=(',', ':')),
-                    "locked_items": json.dumps(self.locked_items, separators=(',', ':')),
-                    "badge_collection": json.dumps(self.badge_collection, separators=(',', ':')),
-                    "titles": json.dumps(cleaned_titles, separators=(',', ':')),
-                    "active_title": self.active_title,
-                    "unlocked_features": json.dumps(cleaned_unlocked_features, separators=(',', ':'))
-                }
-
-                # Check total data size before saving
-                total_size = sum(len(str(v).encode('utf-8')) for v in data.values())
-                if total_size > 1000000:  # 1MB limit
-                    logging.warning(f"Player {self.id} data size is {total_size} bytes, which is very large")
-                    # Try to reduce size by removing old/unnecessary data
-                    if len(cleaned_inventory) > 1000:
-                        logging.warning(f"Player {self.id} has {len(cleaned_inventory)} inventory items - this might be too many")
-
-                columns = ', '.join(data.keys())
-                placeholders = ', '.join(f':{key}' for key in data.keys())
-
-                query = f"INSERT OR REPLACE INTO players ({columns}) VALUES ({placeholders})"
-
-                await conn.execute(query, data)
+            async with db_write(DATABASE_PATH) as conn:
+                if inserts:
+                    columns = ', '.join(inserts[0].keys())
+                    placeholders = ', '.join(f':{key}' for key in inserts[0].keys())
+                    await conn.executemany(f"INSERT OR REPLACE INTO players ({columns}) VALUES ({placeholders})", inserts)
+                for columns, params in updates.items():
+                    assignments = ', '.join(f"{key} = :{key}" for key in columns)
+                    await conn.executemany(f"UPDATE players SET {assignments} WHERE id = :id", params)
+                if normalized:
+                    await player_storage.apply(conn, [changes for _, _, changes in written if changes])
                 await conn.commit()
         except Exception as e:
-            logging.error(f"Failed to save player {self.id}: {e}")
+            ids = [player.id for player, _, _ in written]
+            logging.error(f"Failed to save players {ids}: {e}")
             logging.debug(traceback.format_exc())
             # If it's a size error, try to provide more helpful information
             if "string or blob too big" in str(e).lower():
-                logging.error(f"Database size error for player {self.id}. Inventory items: {len(self.inventory)}, Hunters: {len(self.hunters)}")
-                raise Exception(f"Player data too large to save. Use debug commands to analyze and clean up data.")
+                for player, _, _ in written:
+                    logging.error(f"Database size error for player {player.id}. Inventory items: {len(player.inventory)}, Hunters: {len(player.hunters)}")
+                if raise_errors:
+                    raise Exception(f"Player data too large to save. Use debug commands to analyze and clean up data.")
+            return None
+
+        for player, row, entry_changes in written:
+            player._persisted = row
+            if entry_changes is not None:
+                player._persisted_entries = entry_changes.snapshot
+            rank_index.record("players", player.id, row)
+            matchmaking_index.record_player(player)
+        return len(written)
+
+    async def save(self, immediate: bool = False):
+        """
+        Save the player's data.
+        While the write-behind buffer is running the player is queued and flushed
+        with other pending players; pass immediate=True to write through now.
+        """
+        if not immediate and player_write_behind.running:
+            player_write_behind.enqueue(self)
+            return
+
+        await Player.write_many([self], raise_errors=True)
 
     def add_skill(self, skill_id: str, level: int = 1):
         """Adds a skill to the player's collection."""
@@ -845,11 +943,18 @@ class Player:
 
         return weapon_data, xp_amount, levels_gained
 
+    @staticmethod
+    async def get_rank_index(category: str) -> rank_index.RankIndex:
+        """The gold / diamond / arena rank index, built on first use"""
+        index = rank_index.get_index(category)
+        await index.ensure_loaded(DATABASE_PATH)
+        return index
+
     @staticmethod
     async def vacuum_database():
         """Perform database maintenance to prevent bloat"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 await conn.execute("PRAGMA optimize")
                 await conn.execute("VACUUM")
                 await conn.commit()
@@ -871,8 +976,13 @@ class Player:
     @staticmethod
     async def delete_player(player_id: int):
         """Delete a player from the database (Admin only)"""
+        # Don't let a queued save resurrect the row
+        player_write_behind.discard(player_id)
+        Player._players.pop(player_id, None)
+        rank_index.forget("players", player_id)
+        matchmaking_index.remove(player_id)
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as conn:
+            async with db_write(DATABASE_PATH) as conn:
                 # Delete from main players table
                 await conn.execute("DELETE FROM players WHERE id = ?", (player_id,))
 
@@ -884,7 +994,7 @@ class Player:
                     "player_quests",
                     "player_inventory",
                     "player_stats"
-                ]
+                ] + [table for table, _ in player_storage.COLLECTION_TABLES.values()]
 
                 for table in tables_to_clean:
                     try:
@@ -0,0 +1,145 @@
+"""
+Bounded player cache
+LRU + idle-TTL cache behind Player._players so memory follows the active
+player set instead of every player ever fetched
+"""
+
+import time
+import weakref
+from collections import OrderedDict
+from typing import Optional
+
+MAX_CACHED_PLAYERS = 5000        # entry budget
+PLAYER_IDLE_TTL = 30 * 60        # seconds a player may sit unused before expiring
+MAX_CACHE_BYTES = None           # optional budget on the players' stored row size
+
+
+class PlayerCache:
+    """
+    Player cache with LRU and idle-TTL eviction.
+    Evicted players are remembered weakly: if a view or queued save still holds
+    one, the next lookup hands back that same object instead of loading a second
+    copy from the database.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_PLAYERS, idle_ttl: float = PLAYER_IDLE_TTL,
+                 max_bytes: Optional[int] = MAX_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # player_id -> Player, least recently used first
+        self._touched = {}             # player_id -> last access (monotonic)
+        self._sizes = {}               # player_id -> estimated bytes
+        self._bytes = 0
+        self._evicted = weakref.WeakValueDictionary()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "revived": 0}
+
+    @staticmethod
+    def _estimate_size(player) -> int:
+        row = getattr(player, '_persisted', None) or {}
+        return sum(len(value) for value in row.values() if isinstance(value, str)) + 512
+
+    def _store(self, player_id, player):
+        if player_id in self._entries:
+            self._bytes -= self._sizes.pop(player_id, 0)
+        self._entries[player_id] = player
+        self._entries.move_to_end(player_id)
+        self._touched[player_id] = time.monotonic()
+        size = self._estimate_size(player)
+        self._sizes[player_id] = size
+        self._bytes += size
+
+    def _drop(self, player_id, counter: str):
+        player = self._entries.pop(player_id)
+        self._touched.pop(player_id, None)
+        self._bytes -= self._sizes.pop(player_id, 0)
+        self._evicted[player_id] = player
+        self.stats[counter] += 1
+
+    def _enforce_budget(self):
+        now = time.monotonic()
+        # Oldest entries sit at the front, so expiry stops at the first fresh one
+        while self._entries:
+            oldest = next(iter(self._entries))
+            if now - self._touched[oldest] < self.idle_ttl:
+                break
+            self._drop(oldest, "expirations")
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)), "evictions")
+        while self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)), "evictions")
+
+    def get(self, player_id, default=None):
+        """Look up a player, counting hits and misses"""
+        player = self._entries.get(player_id)
+        if player is not None:
+            if time.monotonic() - self._touched[player_id] < self.idle_ttl:
+                self.stats["hits"] += 1
+                self._entries.move_to_end(player_id)
+                self._touched[player_id] = time.monotonic()
+                return player
+            self._drop(player_id, "expirations")
+            player = None
+
+        player = self._evicted.pop(player_id, None)
+        if player is not None:
+            # Still referenced elsewhere; keep using the same object
+            self.stats["revived"] += 1
+            self._store(player_id, player)
+            return player
+
+        self.stats["misses"] += 1
+        return default
+
+    def peek(self, player_id):
+        """Look up a player without touching LRU order or counters"""
+        player = self._entries.get(player_id)
+        if player is None:
+            player = self._evicted.get(player_id)
+        return player
+
+    def __getitem__(self, player_id):
+        player = self.get(player_id)
+        if player is None:
+            raise KeyError(player_id)
+        return player
+
+    def __setitem__(self, player_id, player):
+        self._evicted.pop(player_id, None)
+        self._store(player_id, player)
+        self._enforce_budget()
+
+    def __contains__(self, player_id) -> bool:
+        return self.peek(player_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pop(self, player_id, default=None):
+        self._evicted.pop(player_id, None)
+        if player_id not in self._entries:
+            return default
+        self._touched.pop(player_id, None)
+        self._bytes -= self._sizes.pop(player_id, 0)
+        return self._entries.pop(player_id)
+
+    def clear(self):
+        self._entries.clear()
+        self._touched.clear()
+        self._sizes.clear()
+        self._bytes = 0
+        self._evicted = weakref.WeakValueDictionary()
+
+    def values(self):
+        return list(self._entries.values())
+
+    def get_stats(self) -> dict:
+        """Counters and sizes for admin diagnostics"""
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["revived"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "estimated_bytes": self._bytes,
+            "hit_rate": (self.stats["hits"] + self.stats["revived"]) / lookups if lookups else 0.0,
+        }
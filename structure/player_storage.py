@@ -0,0 +1,201 @@
+"""
+Normalized player collection storage (opt-in)
+Keeps inventory, hunters, shadows, skills, defeated_bosses and titles in
+per-entry tables instead of JSON blobs on the players row, so a save only
+rewrites the entries that changed. Enable with
+"normalized_player_collections": true in db.json.
+
+Migration is lazy: a player whose blob column still holds data is treated
+as not migrated, and their next save replaces their table rows and blanks
+the blob. migrate_player_collections.py does the same for every player
+eagerly, and can restore the blobs before switching the flag back off.
+"""
+
+import json
+import logging
+from typing import Dict, Iterable, Optional
+
+from structure.db_pool import db_read, db_write
+
+# players column -> (table, entry id column)
+COLLECTION_TABLES = {
+    "inventory": ("player_items", "item_id"),
+    "hunters": ("player_hunters", "hunter_id"),
+    "shadows": ("player_shadows", "shadow_id"),
+    "skills": ("player_skills", "skill_id"),
+    "defeated_bosses": ("player_defeated_bosses", "boss_id"),
+    "titles": ("player_titles", "title_id"),
+}
+EMPTY_BLOB = "{}"
+
+_ready_paths = set()
+
+
+def is_enabled() -> bool:
+    try:
+        with open("db.json", "r") as f:
+            config = json.load(f)
+            return bool(config.get("normalized_player_collections", False))
+    except Exception:
+        return False
+
+
+NORMALIZED_COLLECTIONS = is_enabled()
+
+
+def encode(value) -> str:
+    return json.dumps(value, separators=(',', ':'), sort_keys=True)
+
+
+class CollectionChanges:
+    """Row-level changes to one player's collections, plus the snapshot to keep after commit"""
+
+    def __init__(self, player_id):
+        self.player_id = player_id
+        self.replace = []   # collections whose rows are rewritten from scratch
+        self.upserts = {}   # collection -> {entry_id: (value, encoded)}
+        self.deletes = {}   # collection -> [entry_id]
+        self.snapshot = {}  # collection -> {entry_id: encoded}
+
+    def __bool__(self):
+        return bool(self.replace or self.upserts or self.deletes)
+
+
+def diff(player_id, collections: Dict[str, dict], persisted: Optional[Dict[str, Optional[dict]]]) -> CollectionChanges:
+    """Compare cleaned collections with the last persisted entries."""
+    changes = CollectionChanges(player_id)
+    persisted = persisted or {}
+    for column, entries in collections.items():
+        if isinstance(entries, str):
+            try:
+                entries = json.loads(entries)
+            except json.JSONDecodeError:
+                entries = {}
+        if not isinstance(entries, dict):
+            entries = {}
+        # JSON object keys are strings, so entry ids are compared as strings
+        current = {str(entry_id): (value, encode(value)) for entry_id, value in entries.items()}
+        changes.snapshot[column] = {entry_id: encoded for entry_id, (_, encoded) in current.items()}
+        previous = persisted.get(column)
+
+        if previous is None:
+            # Never loaded from the tables: the blob (or a new player) is the truth
+            changes.replace.append(column)
+            if current:
+                changes.upserts[column] = current
+            continue
+
+        upserts = {entry_id: pair for entry_id, pair in current.items() if previous.get(entry_id) != pair[1]}
+        deletes = [entry_id for entry_id in previous if entry_id not in current]
+        if upserts:
+            changes.upserts[column] = upserts
+        if deletes:
+            changes.deletes[column] = deletes
+    return changes
+
+
+def _entry_row(player_id, entry_id, value, encoded):
+    fields = value if isinstance(value, dict) else {}
+    return (player_id, entry_id, fields.get('level'), fields.get('tier'), fields.get('xp'), encoded)
+
+
+async def ensure_schema(path: str):
+    """Create the collection tables (once per database path)."""
+    if path in _ready_paths:
+        return
+    async with db_write(path) as conn:
+        for table, key in COLLECTION_TABLES.values():
+            await conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    player_id INTEGER NOT NULL,
+                    {key} TEXT NOT NULL,
+                    level INTEGER,
+                    tier INTEGER,
+                    xp INTEGER,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (player_id, {key})
+                ) WITHOUT ROWID
+            """)
+        await conn.commit()
+    _ready_paths.add(path)
+
+
+async def apply(conn, changes: Iterable[CollectionChanges]):
+    """Write collection changes inside the caller's transaction."""
+    replaces, upserts, deletes = {}, {}, {}
+    for change in changes:
+        for column in change.replace:
+            replaces.setdefault(column, []).append((change.player_id,))
+        for column, entries in change.upserts.items():
+            upserts.setdefault(column, []).extend(
+                _entry_row(change.player_id, entry_id, value, encoded)
+                for entry_id, (value, encoded) in entries.items())
+        for column, entry_ids in change.deletes.items():
+            deletes.setdefault(column, []).extend((change.player_id, entry_id) for entry_id in entry_ids)
+
+    for column, (table, key) in COLLECTION_TABLES.items():
+        if column in replaces:
+            await conn.executemany(f"DELETE FROM {table} WHERE player_id = ?", replaces[column])
+        if column in deletes:
+            await conn.executemany(f"DELETE FROM {table} WHERE player_id = ? AND {key} = ?", deletes[column])
+        if column in upserts:
+            await conn.executemany(
+                f"INSERT OR REPLACE INTO {table} (player_id, {key}, level, tier, xp, data) VALUES (?, ?, ?, ?, ?, ?)",
+                upserts[column])
+
+
+async def load(path: str, player_ids=None) -> Dict[int, Dict[str, dict]]:
+    """Read collection rows as {player_id: {column: {entry_id: value}}}; None loads every player."""
+    await ensure_schema(path)
+    result = {}
+    async with db_read(path) as conn:
+        for column, (table, key) in COLLECTION_TABLES.items():
+            if player_ids is None:
+                cursor = await conn.execute(f"SELECT player_id, {key}, data FROM {table}")
+            else:
+                ids = list(player_ids)
+                placeholders = ', '.join('?' for _ in ids)
+                cursor = await conn.execute(
+                    f"SELECT player_id, {key}, data FROM {table} WHERE player_id IN ({placeholders})", ids)
+            for player_id, entry_id, data in await cursor.fetchall():
+                try:
+                    value = json.loads(data)
+                except (json.JSONDecodeError, TypeError):
+                    logging.warning(f"Could not decode {table} entry '{entry_id}' for player {player_id}")
+                    continue
+                result.setdefault(player_id, {}).setdefault(column, {})[entry_id] = value
+    return result
+
+
+def blob_is_empty(raw) -> bool:
+    """True for a players column that holds no collection data (already migrated)."""
+    if raw is None or raw == "" or raw == EMPTY_BLOB:
+        return True
+    if isinstance(raw, str):
+        try:
+            return not json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            return False
+    return not raw
+
+
+def strip_row(row: dict) -> dict:
+    """Replace the collection blobs of a players row with the empty placeholder."""
+    return {key: (EMPTY_BLOB if key in COLLECTION_TABLES else value) for key, value in row.items()}
+
+
+def attach(player, row: dict, tables: Dict[str, dict]):
+    """
+    Give a freshly loaded player its table-backed collections.
+    Columns whose blob still holds data keep the blob value and are marked
+    unmigrated, so the next save moves them into the tables.
+    """
+    persisted = {}
+    for column in COLLECTION_TABLES:
+        if blob_is_empty(row.get(column)):
+            entries = tables.get(column, {})
+            setattr(player, column, entries)
+            persisted[column] = {entry_id: encode(value) for entry_id, value in entries.items()}
+        else:
+            persisted[column] = None
+    player._persisted_entries = persisted
@@ -0,0 +1,134 @@
+"""
+Write-behind buffer for Player.save
+Saves are coalesced per player and flushed in batches, so back-to-back saves
+(gacha, world boss rewards, battles) cost one row update per flush
+"""
+
+import asyncio
+import logging
+from typing import Dict, Tuple
+
+FLUSH_INTERVAL = 2.0  # seconds between periodic flushes
+MAX_PENDING = 200     # flush early once this many players are waiting
+MAX_ATTEMPTS = 3      # solo write attempts before a failing player's save is dropped
+
+
+class PlayerWriteBehind:
+    """Coalesces Player.save() calls and writes them in one transaction"""
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, max_pending: int = MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, object] = {}  # player_id -> Player
+        self._failed: Dict[int, Tuple[object, int]] = {}  # player_id -> (Player, failed solo attempts)
+        self._task = None
+        self._wake = None
+        self._flush_lock = None
+        self.stats = {"saves": 0, "coalesced": 0, "flushes": 0, "rows_written": 0, "failures": 0, "dropped": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending) + len(self._failed)
+
+    def start(self):
+        """Start the background flush loop (needs a running event loop)"""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+        logging.info(f"Player write-behind started (every {self.flush_interval}s or {self.max_pending} players)")
+
+    def enqueue(self, player):
+        """Queue a player for the next flush; repeated saves collapse into one"""
+        self.stats["saves"] += 1
+        if player.id in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending[player.id] = player
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+    def discard(self, player_id):
+        """Drop a queued save (e.g. the player was deleted)"""
+        self._pending.pop(player_id, None)
+        self._failed.pop(player_id, None)
+
+    async def flush(self) -> int:
+        """
+        Write every pending player now. If the batch transaction fails, its
+        players are retried one at a time so a single unwritable row can't
+        hold back the rest; a player that keeps failing on its own is kept
+        out of the shared batch and dropped after MAX_ATTEMPTS.
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._pending and not self._failed:
+                return 0
+            batch = self._pending
+            self._pending = {}
+            failed = self._failed
+            self._failed = {}
+
+            from structure.player import Player
+            written = 0
+            # A newer save of a failed player rejoins the batch but keeps its attempt count
+            solo = {player_id: entry for player_id, entry in failed.items() if player_id not in batch}
+            if batch:
+                result = await Player.write_many(list(batch.values()))
+                self.stats["flushes"] += 1
+                if result is None:
+                    self.stats["failures"] += 1
+                    for player_id, player in batch.items():
+                        solo[player_id] = (player, failed.get(player_id, (None, 0))[1])
+                else:
+                    written += result
+
+            for player_id, (player, attempts) in solo.items():
+                result = await Player.write_many([player])
+                if result is not None:
+                    written += result
+                    continue
+                if player_id in self._pending:
+                    continue  # a newer save was queued meanwhile and will be tried with the next batch
+                attempts += 1
+                if attempts >= MAX_ATTEMPTS:
+                    self.stats["dropped"] += 1
+                    logging.error(f"Dropping queued save of player {player_id} after {attempts} failed writes")
+                else:
+                    self._failed[player_id] = (player, attempts)
+
+            self.stats["rows_written"] += written
+            return written
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"Error in player write-behind loop: {e}")
+
+    async def stop(self):
+        """Stop the loop and durably flush everything still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self.pending_count:
+            logging.error(f"Player write-behind stopped with {self.pending_count} unsaved players")
+
+
+player_write_behind = PlayerWriteBehind()
@@ -6,17 +6,21 @@ import aiosqlite
 import discord
 from discord.ui import View, Button, Select
 from discord import ui
-from discord.ext import commands, tasks
+from discord.ext import commands
 import asyncio
 import time
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
 
 from utilis.utilis import ELEMENT_WEAKNESSES, getStatHunter, getStatWeapon
 from structure.emoji import getClassEmoji, getEmoji
 from structure.heroes import HeroManager
 from structure.items import ItemManager
 from structure.player import Player
+from structure.db_pool import db_read, db_write
+from structure.delivery_queue import delivery_queue
+from structure.migrations import apply_migrations
+from structure.timer_scheduler import TimerScheduler
 from utilis.interaction_handler import InteractionHandler
 
 # --- Database Path and Stat Calculation ---
@@ -28,6 +32,87 @@ def get_database_path():
         return "data/player.db"
 
 DATABASE_PATH = get_database_path()
+CHECKPOINT_INTERVAL = 5.0  # seconds between battle state checkpoints
+
+RAID_COLUMNS = ("channel, level, shadow, raid_class, health, image, attack, defense, max_health, members, "
+                "started, message_id, is_world_boss, is_admin_spawned, rarity")
+
+
+class RaidCheckpointer:
+    """
+    Live raids are held in memory and are the source of truth while a fight
+    runs; attacks only change the objects. Rows that changed since the last
+    write are checkpointed on an interval and on phase transitions, so the
+    raids table always holds a recent snapshot to recover from.
+    """
+
+    def __init__(self, interval: float = CHECKPOINT_INTERVAL):
+        self.interval = interval
+        self.live: Dict[int, "Raid"] = {}
+        self._persisted: Dict[int, tuple] = {}
+        self._task = None
+        self.stats = {"checkpoints": 0, "rows_written": 0}
+
+    def track(self, raid, row: tuple = None):
+        self.live[raid.channel] = raid
+        if row is not None:
+            self._persisted[raid.channel] = row
+
+    def forget(self, channel_id):
+        self.live.pop(channel_id, None)
+        self._persisted.pop(channel_id, None)
+
+    async def checkpoint(self) -> int:
+        """Write every live raid whose state changed since its last write"""
+        changed = []
+        for channel_id, raid in list(self.live.items()):
+            row = raid.to_row()
+            if self._persisted.get(channel_id) != row:
+                changed.append(row)
+        if not changed:
+            return 0
+        placeholders = ", ".join("?" for _ in changed[0])
+        async with db_write(DATABASE_PATH) as db:
+            await db.executemany(f"INSERT OR REPLACE INTO raids ({RAID_COLUMNS}) VALUES ({placeholders})", changed)
+            await db.commit()
+        for row in changed:
+            # Skip raids deleted while the write was in flight
+            if row[0] in self.live:
+                self._persisted[row[0]] = row
+        self.stats["checkpoints"] += 1
+        self.stats["rows_written"] += len(changed)
+        return len(changed)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                logging.error(f"Raid checkpoint failed: {e}")
+
+    async def stop(self):
+        """Stop the loop and write a final checkpoint"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.checkpoint()
+
+
+raid_checkpointer = RaidCheckpointer()
 
 def statCalc(level: int, stat: int):
     return round(stat * (level / 12 + 1)) if level > 1 else stat
@@ -368,7 +453,7 @@ class Raid:
     @staticmethod
     async def clear_all_raids():
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
+            async with db_write(DATABASE_PATH) as db:
                 await db.execute("DELETE FROM raids")
                 await db.commit()
             logging.info("Successfully cleared all stale raids from the database.")
@@ -377,7 +462,7 @@ class Raid:
 
     @staticmethod
     async def initialize():
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             # Create the table with all required columns
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS raids (
@@ -388,31 +473,60 @@ class Raid:
                 )
             ''')
 
-            # Check for missing columns and add them (for existing databases)
-            cursor = await db.execute("PRAGMA table_info(raids)")
-            columns = await cursor.fetchall()
-            column_names = [column[1] for column in columns]
-
-            # List of required columns with their types
-            required_columns = {
-                'image': 'TEXT',
-                'attack': 'INTEGER',
-                'defense': 'INTEGER',
-                'max_health': 'INTEGER',
-                'message_id': 'INTEGER'
-            }
+            await db.commit()
+        # Columns added after the table was first created
+        await apply_migrations("raids", DATABASE_PATH)
 
-            # Add missing columns
-            for column_name, column_type in required_columns.items():
-                if column_name not in column_names:
-                    await db.execute(f'ALTER TABLE raids ADD COLUMN {column_name} {column_type}')
-                    logging.info(f"Added missing '{column_name}' column to raids table")
+    @staticmethod
+    async def recover_interrupted():
+        """
+        Close out fights that were running when the bot stopped, using their
+        last checkpoint: free the members so they aren't stuck as busy, log the
+        standings, and clear the table. Their Discord views can't be reattached.
+        """
+        raid_checkpointer.live.clear()
+        try:
+            async with db_read(DATABASE_PATH) as db:
+                cursor = await db.execute("SELECT channel, shadow, health, max_health, members FROM raids")
+                rows = await cursor.fetchall()
+        except Exception as e:
+            logging.error(f"Failed to read raid checkpoints: {e}")
+            rows = []
 
-            await db.commit()
+        for channel_id, shadow, health, max_health, members in rows:
+            try:
+                members = json.loads(members) if members else {}
+            except json.JSONDecodeError:
+                members = {}
+            standings = sorted(members.items(), key=lambda item: item[1].get('damage', 0), reverse=True)
+            logging.info(f"Recovered interrupted raid in {channel_id}: {shadow} at {health}/{max_health} HP, "
+                         f"damage {[(data.get('name'), data.get('damage', 0)) for _, data in standings]}")
+            for member_id in members:
+                player = await Player.get(int(member_id))
+                if player and player.inc:
+                    player.inc = False
+                    await player.save()
+
+        await Raid.clear_all_raids()
+        return len(rows)
+
+    def to_row(self) -> tuple:
+        return (
+            self.channel, self.level, self.shadow, self.raid_class, self.health, self.image,
+            self.attack, self.defense, self.max_health, json.dumps(self.members), int(self.started),
+            self.message_id, int(getattr(self, 'is_world_boss', False)),
+            int(getattr(self, 'is_admin_spawned', False)), getattr(self, 'rarity', None)
+        )
 
     @classmethod
     async def get(cls, channel_id, bot=None):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        # A running fight lives in memory; the table only holds its last checkpoint
+        live = raid_checkpointer.live.get(channel_id)
+        if live is not None:
+            if bot is not None:
+                live.bot = bot
+            return live
+        async with db_read(DATABASE_PATH) as db:
             try:
                 cursor = await db.execute('SELECT channel, level, shadow, raid_class, health, image, attack, defense, max_health, members, started, message_id, is_world_boss, is_admin_spawned, rarity FROM raids WHERE channel = ?', (channel_id,))
                 row = await cursor.fetchone()
@@ -473,20 +587,19 @@ class Raid:
             return None
 
     async def save(self):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            await db.execute('''
-                INSERT OR REPLACE INTO raids (channel, level, shadow, raid_class, health, image, attack, defense, max_health, members, started, message_id, is_world_boss, is_admin_spawned, rarity)
+        """Checkpoint this raid now (joins, starts, victories); attacks rely on the periodic checkpoint"""
+        row = self.to_row()
+        async with db_write(DATABASE_PATH) as db:
+            await db.execute(f'''
+                INSERT OR REPLACE INTO raids ({RAID_COLUMNS})
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                self.channel, self.level, self.shadow, self.raid_class, self.health, self.image,
-                self.attack, self.defense, self.max_health, json.dumps(self.members), int(self.started),
-                self.message_id, int(getattr(self, 'is_world_boss', False)),
-                int(getattr(self, 'is_admin_spawned', False)), getattr(self, 'rarity', None)
-            ))
+            ''', row)
             await db.commit()
+        raid_checkpointer.track(self, row)
 
     async def delete(self):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        raid_checkpointer.forget(self.channel)
+        async with db_write(DATABASE_PATH) as db:
             await db.execute("DELETE FROM raids WHERE channel = ?", (self.channel,))
             await db.commit()
 
@@ -1031,6 +1144,7 @@ class ShadowWorldBossBattle(discord.ui.View):
     async def handle_victory(self, interaction):
         """Handle shadow world boss victory and shadow unlocking"""
         self.battle_active = False
+        await self.raid.save()  # phase transition: checkpoint the final standings now
 
         # Create victory embed
         victory_embed = discord.Embed(
@@ -1063,29 +1177,24 @@ class ShadowWorldBossBattle(discord.ui.View):
                 player.add_boss_defeat(self.raid.shadow_unlock)
                 eligible_players.append(f"⚔️ {self.bot.get_user(user_id).display_name}")
 
-                # Send DM notification about arise eligibility
-                try:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        arise_embed = discord.Embed(
-                            title="⚔️ **SHADOW DEFEATED!** ⚔️",
-                            description=f"You have defeated **{self.raid.shadow}** and can now use the arise command!",
-                            color=discord.Color.purple()
-                        )
-                        arise_embed.add_field(
-                            name="🔮 Next Step",
-                            value=f"Use `sl arise {self.raid.shadow_unlock}` to add this shadow to your army!",
-                            inline=False
-                        )
-                        arise_embed.add_field(
-                            name="Shadow Details",
-                            value=f"**Name**: {self.raid.shadow}\n**Type**: Shadow\n**Rarity**: Unlockable",
-                            inline=False
-                        )
-                        arise_embed.set_footer(text="Use the arise command to claim your shadow!")
-                        await user.send(embed=arise_embed)
-                except:
-                    pass  # DM failed, continue
+                # Queue DM notification about arise eligibility
+                arise_embed = discord.Embed(
+                    title="⚔️ **SHADOW DEFEATED!** ⚔️",
+                    description=f"You have defeated **{self.raid.shadow}** and can now use the arise command!",
+                    color=discord.Color.purple()
+                )
+                arise_embed.add_field(
+                    name="🔮 Next Step",
+                    value=f"Use `sl arise {self.raid.shadow_unlock}` to add this shadow to your army!",
+                    inline=False
+                )
+                arise_embed.add_field(
+                    name="Shadow Details",
+                    value=f"**Name**: {self.raid.shadow}\n**Type**: Shadow\n**Rarity**: Unlockable",
+                    inline=False
+                )
+                arise_embed.set_footer(text="Use the arise command to claim your shadow!")
+                delivery_queue.send_dm(user_id, embed=arise_embed)
 
                 try:
                     await player.save()
@@ -1631,11 +1740,7 @@ class WorldBossBattleView(RaidBattleView):
 
         self.battle_log.append(f"⚔️ **{interaction.user.display_name}** attacks for `{damage}` damage!")
 
-        # Save raid data (batch with other operations to reduce API calls)
-        try:
-            await self.raid.save()
-        except:
-            pass  # Continue even if save fails
+        # Battle state stays in memory; raid_checkpointer writes it every few seconds
 
         # Check for victory using world boss victory handler
         if self.raid.health <= 0:
@@ -1666,6 +1771,7 @@ class WorldBossBattleView(RaidBattleView):
         # CRITICAL: Disable all buttons to prevent any further interaction
         for item in self.children:
             item.disabled = True
+        await self.raid.save()  # phase transition: checkpoint the final standings now
 
         # Create victory embed
         victory_embed = discord.Embed(
@@ -1756,82 +1862,63 @@ class WorldBossBattleView(RaidBattleView):
                             player.add_shadow(self.raid.shadow_unlock)
                             unlocked_players.append(f"👤 {self.bot.get_user(user_id).display_name} ({damage_percentage:.1%})")
 
-                            # Send DM notification about shadow unlock (with rate limit protection)
-                            try:
-                                user = self.bot.get_user(user_id)
-                                if user:
-                                    unlock_embed = discord.Embed(
-                                        title="👤 **SHADOW UNLOCKED!** 👤",
-                                        description=f"**{self.raid.shadow}** has joined your shadow army!",
-                                        color=discord.Color.purple()
-                                    )
-                                    unlock_embed.add_field(
-                                        name="🎉 Congratulations!",
-                                        value=f"You rolled successfully (25% chance) and unlocked **{shadow.name}**!\nDamage Contribution: **{damage_percentage:.1%}**",
-                                        inline=False
-                                    )
-                                    unlock_embed.add_field(
-                                        name="📊 Shadow Stats",
-                                        value=f"⚔️ **Attack Boost**: +{shadow.attack}%\n🛡️ **Defense Boost**: +{shadow.defense}%",
-                                        inline=False
-                                    )
-                                    unlock_embed.add_field(
-                                        name="🎁 Victory Rewards",
-                                        value=f"💰 **Gold**: +{gold_reward:,}\n💎 **Diamonds**: +{diamond_reward}\n🔮 **TOS**: +{tos_reward}\n⚡ **XP**: +{xp_reward:,}",
-                                        inline=False
-                                    )
-                                    unlock_embed.add_field(
-                                        name="⚔️ Next Steps",
-                                        value="Use `sl equip shadow` to equip your new shadow and gain its stat bonuses!",
-                                        inline=False
-                                    )
-                                    unlock_embed.set_footer(text="Lucky! You got the 25% chance!")
-
-                                    # Add delay to prevent rate limiting
-                                    import asyncio
-                                    await asyncio.sleep(0.5)  # 500ms delay between DMs
-                                    await user.send(embed=unlock_embed)
-                            except discord.errors.HTTPException:
-                                pass  # Rate limited or DM failed
-                            except:
-                                pass  # Other DM failure
+                            # Queue DM notification about shadow unlock (rate limited by the delivery queue)
+                            unlock_embed = discord.Embed(
+                                title="👤 **SHADOW UNLOCKED!** 👤",
+                                description=f"**{self.raid.shadow}** has joined your shadow army!",
+                                color=discord.Color.purple()
+                            )
+                            unlock_embed.add_field(
+                                name="🎉 Congratulations!",
+                                value=f"You rolled successfully (25% chance) and unlocked **{shadow.name}**!\nDamage Contribution: **{damage_percentage:.1%}**",
+                                inline=False
+                            )
+                            unlock_embed.add_field(
+                                name="📊 Shadow Stats",
+                                value=f"⚔️ **Attack Boost**: +{shadow.attack}%\n🛡️ **Defense Boost**: +{shadow.defense}%",
+                                inline=False
+                            )
+                            unlock_embed.add_field(
+                                name="🎁 Victory Rewards",
+                                value=f"💰 **Gold**: +{gold_reward:,}\n💎 **Diamonds**: +{diamond_reward}\n🔮 **TOS**: +{tos_reward}\n⚡ **XP**: +{xp_reward:,}",
+                                inline=False
+                            )
+                            unlock_embed.add_field(
+                                name="⚔️ Next Steps",
+                                value="Use `sl equip shadow` to equip your new shadow and gain its stat bonuses!",
+                                inline=False
+                            )
+                            unlock_embed.set_footer(text="Lucky! You got the 25% chance!")
+
+                            delivery_queue.send_dm(user_id, embed=unlock_embed)
                         else:
                             # Failed the 25% roll
                             failed_players.append(f"💔 {self.bot.get_user(user_id).display_name} ({damage_percentage:.1%})")
 
-                            # Send DM notification about failed attempt (with rate limit protection)
-                            try:
-                                user = self.bot.get_user(user_id)
-                                if user:
-                                    fail_embed = discord.Embed(
-                                        title="💔 **Shadow Unlock Failed** 💔",
-                                        description=f"You didn't get lucky this time (25% chance).\nDamage Contribution: **{damage_percentage:.1%}**",
-                                        color=discord.Color.orange()
-                                    )
-                                    fail_embed.add_field(
-                                        name="🔮 Try Again",
-                                        value=f"Use `sl arise {self.raid.shadow_unlock}` to attempt unlocking **{shadow.name}** again!",
-                                        inline=False
-                                    )
-                                    fail_embed.add_field(
-                                        name="🎁 Victory Rewards",
-                                        value=f"💰 **Gold**: +{gold_reward:,}\n💎 **Diamonds**: +{diamond_reward}\n🔮 **TOS**: +{tos_reward}\n⚡ **XP**: +{xp_reward:,}",
-                                        inline=False
-                                    )
-                                    fail_embed.add_field(
-                                        name="💰 Cost",
-                                        value=f"Each arise attempt costs **{shadow.price} TOS** with a 25% success rate.",
-                                        inline=False
-                                    )
-                                    fail_embed.set_footer(text="Better luck next time!")
-
-                                    # Add delay to prevent rate limiting
-                                    await asyncio.sleep(0.5)  # 500ms delay between DMs
-                                    await user.send(embed=fail_embed)
-                            except discord.errors.HTTPException:
-                                pass  # Rate limited or DM failed
-                            except:
-                                pass  # Other DM failure
+                            # Queue DM notification about failed attempt (rate limited by the delivery queue)
+                            fail_embed = discord.Embed(
+                                title="💔 **Shadow Unlock Failed** 💔",
+                                description=f"You didn't get lucky this time (25% chance).\nDamage Contribution: **{damage_percentage:.1%}**",
+                                color=discord.Color.orange()
+                            )
+                            fail_embed.add_field(
+                                name="🔮 Try Again",
+                                value=f"Use `sl arise {self.raid.shadow_unlock}` to attempt unlocking **{shadow.name}** again!",
+                                inline=False
+                            )
+                            fail_embed.add_field(
+                                name="🎁 Victory Rewards",
+                                value=f"💰 **Gold**: +{gold_reward:,}\n💎 **Diamonds**: +{diamond_reward}\n🔮 **TOS**: +{tos_reward}\n⚡ **XP**: +{xp_reward:,}",
+                                inline=False
+                            )
+                            fail_embed.add_field(
+                                name="💰 Cost",
+                                value=f"Each arise attempt costs **{shadow.price} TOS** with a 25% success rate.",
+                                inline=False
+                            )
+                            fail_embed.set_footer(text="Better luck next time!")
+
+                            delivery_queue.send_dm(user_id, embed=fail_embed)
 
                     try:
                         await player.save()
@@ -2342,8 +2429,19 @@ class WorldBossBattleView(RaidBattleView):
         await self.raid.delete()
 
 
+SPAWN_COOLDOWN = 7200          # seconds between world bosses in a guild
+SPAWN_CHECK_INTERVAL = 300     # how often an eligible guild rolls for a spawn
+HIGH_ACTIVITY_COMMANDS = 20    # commands per 10 minutes that raise the spawn chance
+SPAWN_CHANNEL_KEYWORDS = ('general', 'raid', 'boss', 'world')
+
+
 class WorldBossManager:
-    """Manages world boss spawns across all servers"""
+    """
+    Manages world boss spawns across all servers.
+    Each guild's next spawn roll sits in a timer heap, so only guilds that are
+    off cooldown (or just became busy) are evaluated. The spawn channel is
+    resolved once per guild and re-resolved when channels or permissions change.
+    """
 
     def __init__(self, bot):
         self.bot = bot
@@ -2358,6 +2456,8 @@ class WorldBossManager:
         self.activity_tracker = {}  # guild_id -> {'commands': count, 'last_reset': time}
         self.last_spawn_time = {}  # guild_id -> timestamp
         self.defeated_bosses = {}  # guild_id -> timestamp (for longer cooldown tracking)
+        self.spawn_schedule = TimerScheduler("world boss spawn", self._evaluate_due)
+        self.spawn_channels: Dict[int, Optional[int]] = {}  # guild_id -> channel id, None if no usable channel
 
         # Shadow World Boss pool - players kill these to unlock shadows
         self.shadow_boss_pool = {
@@ -2391,19 +2491,94 @@ class WorldBossManager:
 
     async def start_world_boss_system(self):
         """Initialize the world boss system"""
-        if not self.world_boss_loop.is_running():
-            self.world_boss_loop.start()
+        if not self.spawn_schedule.running:
+            self.spawn_schedule.start()
+            # Guilds are scheduled as they become available; the channel cache follows server edits
+            listeners = {
+                'on_guild_available': self._on_guild_ready,
+                'on_guild_join': self._on_guild_ready,
+                'on_guild_remove': self._on_guild_remove,
+                'on_guild_channel_create': self._on_channel_change,
+                'on_guild_channel_delete': self._on_channel_change,
+                'on_guild_channel_update': self._on_channel_update,
+                'on_guild_role_update': self._on_channel_update,
+                'on_member_update': self._on_member_update,
+            }
+            for event, listener in listeners.items():
+                self.bot.add_listener(listener, event)
+        for guild in self.bot.guilds:
+            self.schedule_guild(guild.id)
         logging.info("🌍 World Boss system started!")
 
-    @tasks.loop(minutes=5)  # Check every 5 minutes
-    async def world_boss_loop(self):
-        """Main loop for world boss spawning"""
-        try:
-            for guild in self.bot.guilds:
-                if await self.should_spawn_boss(guild.id):
+    def schedule_guild(self, guild_id: int, due: float = None):
+        """Queue the guild's next spawn roll, by default when its cooldown ends"""
+        if due is None:
+            # Jitter eligible guilds so a reconnect doesn't roll them all at once
+            due = max(self.last_spawn_time.get(guild_id, 0) + SPAWN_COOLDOWN,
+                      time.time() + random.uniform(0, SPAWN_CHECK_INTERVAL))
+        self.spawn_schedule.schedule(guild_id, due, guild_id)
+
+    async def _evaluate_due(self, guild_ids):
+        """Roll for a spawn in each guild whose check is due"""
+        for guild_id in guild_ids:
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue  # rescheduled when the guild becomes available again
+            try:
+                if await self.should_spawn_boss(guild_id):
                     await self.spawn_world_boss(guild)
-        except Exception as e:
-            logging.error(f"Error in world boss loop: {e}")
+            except Exception as e:
+                logging.error(f"Error in world boss spawn check for {guild_id}: {e}")
+            # A live boss reschedules the guild when it is removed
+            if guild_id not in self.active_bosses and guild_id not in self.spawn_schedule:
+                self.schedule_guild(guild_id, max(self.last_spawn_time.get(guild_id, 0) + SPAWN_COOLDOWN,
+                                                  time.time() + SPAWN_CHECK_INTERVAL))
+        await asyncio.sleep(0)  # let other tasks run between batches
+
+    def get_spawn_stats(self) -> dict:
+        return {**self.spawn_schedule.get_stats(), "cached_channels": len(self.spawn_channels)}
+
+    async def _on_guild_ready(self, guild: discord.Guild):
+        if guild.id not in self.active_bosses and guild.id not in self.spawn_schedule:
+            self.schedule_guild(guild.id)
+
+    async def _on_guild_remove(self, guild: discord.Guild):
+        self.spawn_schedule.cancel(guild.id)
+        self.spawn_channels.pop(guild.id, None)
+
+    async def _on_channel_change(self, channel):
+        self.spawn_channels.pop(channel.guild.id, None)
+
+    async def _on_channel_update(self, before, after):
+        self.spawn_channels.pop(after.guild.id, None)
+
+    async def _on_member_update(self, before, after):
+        # The bot's own roles decide which channels it can post in
+        if self.bot.user is not None and after.id == self.bot.user.id:
+            self.spawn_channels.pop(after.guild.id, None)
+
+    def get_spawn_channel(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """The guild's spawn channel, resolved once and cached until channels or permissions change"""
+        if guild.id in self.spawn_channels:
+            channel_id = self.spawn_channels[guild.id]
+            return guild.get_channel(channel_id) if channel_id is not None else None
+
+        # Prefer general, raid or boss channels, else the first one we can post in
+        channel = None
+        for ch in guild.text_channels:
+            if any(name in ch.name.lower() for name in SPAWN_CHANNEL_KEYWORDS):
+                if ch.permissions_for(guild.me).send_messages:
+                    channel = ch
+                    break
+
+        if not channel:
+            for ch in guild.text_channels:
+                if ch.permissions_for(guild.me).send_messages:
+                    channel = ch
+                    break
+
+        self.spawn_channels[guild.id] = channel.id if channel else None
+        return channel
 
     async def should_spawn_boss(self, guild_id: int) -> bool:
         """Determine if a world boss should spawn in this guild"""
@@ -2418,13 +2593,13 @@ class WorldBossManager:
         # Check if we have a defeated boss record (longer cooldown)
         if hasattr(self, 'defeated_bosses') and guild_id in getattr(self, 'defeated_bosses', {}):
             # 2 hours cooldown after defeat (as requested)
-            if current_time - last_spawn < 7200:  # 2 hours
+            if current_time - last_spawn < SPAWN_COOLDOWN:  # 2 hours
                 return False
             # Remove from defeated list after cooldown
             del self.defeated_bosses[guild_id]
         else:
             # 2 hours minimum cooldown for timeout/despawn (changed from 30 minutes)
-            if current_time - last_spawn < 7200:  # 2 hours
+            if current_time - last_spawn < SPAWN_COOLDOWN:  # 2 hours
                 return False
 
         # Random chance based on activity and time
@@ -2432,11 +2607,11 @@ class WorldBossManager:
 
         # Increase chance based on activity
         activity = self.activity_tracker.get(guild_id, {})
-        if activity.get('commands', 0) > 20:  # High activity
+        if activity.get('commands', 0) > HIGH_ACTIVITY_COMMANDS:  # High activity
             base_chance *= 1.5
 
         # Increase chance based on time since last spawn
-        time_multiplier = min(2.0, (time.time() - last_spawn) / 7200)  # Max 2x after 2 hours
+        time_multiplier = min(2.0, (time.time() - last_spawn) / SPAWN_COOLDOWN)  # Max 2x after 2 hours
         final_chance = base_chance * time_multiplier
 
         return random.random() < final_chance
@@ -2444,21 +2619,7 @@ class WorldBossManager:
     async def spawn_world_boss(self, guild: discord.Guild):
         """Spawn a world boss in the specified guild"""
         try:
-            # Find a suitable channel (general, raids, or first available)
-            channel = None
-            for ch in guild.text_channels:
-                if any(name in ch.name.lower() for name in ['general', 'raid', 'boss', 'world']):
-                    if ch.permissions_for(guild.me).send_messages:
-                        channel = ch
-                        break
-
-            if not channel:
-                # Fallback to first available channel
-                for ch in guild.text_channels:
-                    if ch.permissions_for(guild.me).send_messages:
-                        channel = ch
-                        break
-
+            channel = self.get_spawn_channel(guild)
             if not channel:
                 return  # No suitable channel found
 
@@ -2477,6 +2638,7 @@ class WorldBossManager:
             if raid:
                 self.active_bosses[guild.id] = raid
                 self.last_spawn_time[guild.id] = time.time()
+                self.spawn_schedule.cancel(guild.id)
 
                 logging.info(f"🌍 World Boss '{boss_data['name']}' spawned in {guild.name}")
 
@@ -2502,6 +2664,16 @@ class WorldBossManager:
 
         activity['commands'] += 1
 
+        if guild_id in self.active_bosses:
+            return
+        if guild_id not in self.spawn_schedule:
+            self.schedule_guild(guild_id)
+        elif activity['commands'] == HIGH_ACTIVITY_COMMANDS + 1:
+            # The guild just got busy enough to raise its odds: roll now if it's off cooldown
+            if current_time - self.last_spawn_time.get(guild_id, 0) >= SPAWN_COOLDOWN \
+                    and self.spawn_schedule.due(guild_id) > current_time:
+                self.schedule_guild(guild_id, current_time)
+
     async def trigger_special_spawn(self, guild_id: int, trigger_type: str):
         """Trigger a special world boss spawn based on events"""
         if guild_id in self.active_bosses:
@@ -2522,6 +2694,7 @@ class WorldBossManager:
 
             # Set last spawn time to current time
             self.last_spawn_time[guild_id] = time.time()
+            self.schedule_guild(guild_id)
 
             # Track defeated bosses for reference (both defeated and despawned now have 2-hour cooldown)
             if defeated:
@@ -2543,7 +2716,7 @@ class WorldBossManager:
             import json
             from datetime import datetime
 
-            async with aiosqlite.connect("new_player.db") as conn:
+            async with db_read("new_player.db") as conn:
                 conn.row_factory = aiosqlite.Row
                 cursor = await conn.execute("""
                     SELECT * FROM notification_settings
@@ -2552,73 +2725,60 @@ class WorldBossManager:
 
                 user_rows = await cursor.fetchall()
 
-                for row in user_rows:
-                    user_id = row['user_id']
-
-                    # Check if user is in this guild
-                    member = guild.get_member(user_id)
-                    if member:
-                        # Check server-specific settings
-                        allowed_servers = json.loads(row['world_boss_servers'] or '[]')
-                        if allowed_servers and str(guild.id) not in allowed_servers:
-                            continue  # User doesn't want notifications from this server
-
-                        # Check rarity filter
-                        allowed_rarities = json.loads(row['world_boss_rarities'] or '["common","rare","epic","legendary"]')
-                        boss_rarity = boss_data.get('rarity', 'common').lower()
-                        if boss_rarity not in allowed_rarities:
-                            continue  # User doesn't want notifications for this rarity
-
-                        # Check time-based filter (UTC time)
-                        wb_hours_start = row['world_boss_hours_start']
-                        wb_hours_end = row['world_boss_hours_end']
-                        if wb_hours_start is not None and wb_hours_end is not None:
-                            current_hour = datetime.utcnow().hour  # Always use UTC for filtering
-
-                            # Check if current UTC time is within allowed hours
-                            if wb_hours_start <= wb_hours_end:
-                                if not (wb_hours_start <= current_hour < wb_hours_end):
-                                    continue  # Outside allowed hours
-                            else:  # Hours span midnight
-                                if not (current_hour >= wb_hours_start or current_hour < wb_hours_end):
-                                    continue  # Outside allowed hours
-                        # Send immediate notification
-                        try:
-                            user = self.bot.get_user(user_id)
-                            if user:
-                                embed = discord.Embed(
-                                    title="⚔️ World Boss Spawned!",
-                                    description=f"**{boss_data['name']}** has appeared in **{guild.name}**!\n\n🔗 **[Join the Battle]({channel.jump_url})**",
-                                    color=discord.Color.red()
-                                )
-                                embed.add_field(
-                                    name="📍 Location",
-                                    value=f"{channel.mention}",
-                                    inline=True
-                                )
-                                embed.add_field(
-                                    name="⭐ Rarity",
-                                    value=boss_data.get('rarity', 'Unknown').title(),
-                                    inline=True
-                                )
-                                embed.set_footer(text="⚔️ World Boss Alert • Solo Leveling Bot")
-
-                                # Get user settings to determine delivery method
-                                settings = await notification_manager.get_user_settings(user_id)
-
-                                if settings.get('dm_notifications', 1):
-                                    try:
-                                        await user.send(embed=embed)
-                                    except discord.Forbidden:
-                                        # Try channel notification if DM fails (ephemeral to avoid spam)
-                                        if settings.get('channel_notifications', 0):
-                                            await notification_manager.send_channel_notification(user_id, embed, settings, ephemeral=True)
-                                elif settings.get('channel_notifications', 0):
-                                    # Channel-only notifications are ephemeral for world bosses to avoid spam
-                                    await notification_manager.send_channel_notification(user_id, embed, settings, ephemeral=True)
-
-                        except Exception as e:
-                            logging.error(f"Error sending world boss notification to user {user_id}: {e}")
+            for row in user_rows:
+                user_id = row['user_id']
+
+                # Check if user is in this guild
+                member = guild.get_member(user_id)
+                if member:
+                    # Check server-specific settings
+                    allowed_servers = json.loads(row['world_boss_servers'] or '[]')
+                    if allowed_servers and str(guild.id) not in allowed_servers:
+                        continue  # User doesn't want notifications from this server
+
+                    # Check rarity filter
+                    allowed_rarities = json.loads(row['world_boss_rarities'] or '["common","rare","epic","legendary"]')
+                    boss_rarity = boss_data.get('rarity', 'common').lower()
+                    if boss_rarity not in allowed_rarities:
+                        continue  # User doesn't want notifications for this rarity
+
+                    # Check time-based filter (UTC time)
+                    wb_hours_start = row['world_boss_hours_start']
+                    wb_hours_end = row['world_boss_hours_end']
+                    if wb_hours_start is not None and wb_hours_end is not None:
+                        current_hour = datetime.utcnow().hour  # Always use UTC for filtering
+
+                        # Check if current UTC time is within allowed hours
+                        if wb_hours_start <= wb_hours_end:
+                            if not (wb_hours_start <= current_hour < wb_hours_end):
+                                continue  # Outside allowed hours
+                        else:  # Hours span midnight
+                            if not (current_hour >= wb_hours_start or current_hour < wb_hours_end):
+                                continue  # Outside allowed hours
+                    # Queue the notification; the row already holds this user's settings
+                    try:
+                        embed = discord.Embed(
+                            title="⚔️ World Boss Spawned!",
+                            description=f"**{boss_data['name']}** has appeared in **{guild.name}**!\n\n🔗 **[Join the Battle]({channel.jump_url})**",
+                            color=discord.Color.red()
+                        )
+                        embed.add_field(
+                            name="📍 Location",
+                            value=f"{channel.mention}",
+                            inline=True
+                        )
+                        embed.add_field(
+                            name="⭐ Rarity",
+                            value=boss_data.get('rarity', 'Unknown').title(),
+                            inline=True
+                        )
+                        embed.set_footer(text="⚔️ World Boss Alert • Solo Leveling Bot")
+
+                        # Channel notifications are ephemeral for world bosses to avoid spam
+                        notification_manager.queue_delivery(user_id, embed, dict(row), ephemeral=True)
+
+                    except Exception as e:
+                        logging.error(f"Error sending world boss notification to user {user_id}: {e}")
 
         except Exception as e:
             logging.error(f"Error sending world boss notifications: {e}")
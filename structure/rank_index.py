@@ -0,0 +1,294 @@
+"""
+Leaderboard rank index
+In-memory order-statistic index per leaderboard category (gold, diamond,
+arena streak, glory points, evaluated power). Built from the database on startup, kept up to
+date from Player/Glory saves, and periodically rebuilt as a safety net for
+writes that bypass those classes. Rank-of-player and top-N pages are
+O(log n) instead of a COUNT(*) or a full sort.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from structure.db_pool import db_read
+
+REBUILD_INTERVAL = 15 * 60  # seconds before an index is re-read from the database
+MAX_LEVELS = 24             # enough for ~16M entries
+
+
+class _End:
+    """Sentinel key that sorts after every real key"""
+
+    def __lt__(self, other):
+        return False
+
+    def __le__(self, other):
+        return False
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels  # entries skipped by each link
+
+
+_TAIL = _Node(_End(), 0)
+
+
+class _IndexableSkipList:
+    """Sorted keys with O(log n) insert, remove, count-below and positional access"""
+
+    def __init__(self):
+        self.size = 0
+        self.head = _Node(None, MAX_LEVELS)
+        self.head.next = [_TAIL] * MAX_LEVELS
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, key):
+        chain = [None] * MAX_LEVELS
+        steps_at_level = [0] * MAX_LEVELS
+        node = self.head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key <= key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        levels = 1
+        while levels < MAX_LEVELS and random.random() < 0.5:
+            levels += 1
+        new_node = _Node(key, levels)
+        steps = 0
+        for level in range(levels):
+            previous = chain[level]
+            new_node.next[level] = previous.next[level]
+            previous.next[level] = new_node
+            new_node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, MAX_LEVELS):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        chain = [None] * MAX_LEVELS
+        node = self.head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is _TAIL or target.key != key:
+            raise KeyError(key)
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def count_below(self, key) -> int:
+        """Number of keys strictly less than `key`"""
+        count = 0
+        node = self.head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key < key:
+                count += node.width[level]
+                node = node.next[level]
+        return count
+
+    def slice(self, start: int, count: int) -> list:
+        """Up to `count` keys starting at position `start`"""
+        if start < 0 or start >= self.size or count <= 0:
+            return []
+        node = self.head
+        remaining = start + 1
+        for level in reversed(range(MAX_LEVELS)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        keys = []
+        while node is not _TAIL and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class RankIndex:
+    """
+    Members of one leaderboard ordered by score, highest first.
+    Ranks follow the existing `COUNT(*) + 1 WHERE score > mine` rule, so
+    tied members share a rank.
+    """
+
+    def __init__(self, table: str, id_column: str, score_column: str):
+        self.table = table
+        self.id_column = id_column
+        self.score_column = score_column
+        self._list = _IndexableSkipList()
+        self._scores: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._pending: Optional[Dict[int, Optional[int]]] = None  # changes seen while rebuilding
+        self._refresh: Optional[asyncio.Task] = None  # background safety rebuild
+
+    def __len__(self):
+        return len(self._scores)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    async def ensure_loaded(self, path: str):
+        """
+        Build the index if it was never built. Once built, a due safety
+        rebuild runs as a background task and lookups keep using the current
+        index until it finishes.
+        """
+        if self._loaded_at is not None:
+            if (time.monotonic() - self._loaded_at >= REBUILD_INTERVAL
+                    and (self._refresh is None or self._refresh.done())):
+                self._refresh = asyncio.create_task(self._background_rebuild(path))
+            return
+        async with self._lock:
+            if self._loaded_at is None:
+                await self.rebuild(path)
+
+    async def _background_rebuild(self, path: str):
+        async with self._lock:
+            try:
+                await self.rebuild(path)
+            except Exception as e:
+                logging.error(f"Rank index {self.table}.{self.score_column} rebuild failed: {e}")
+
+    async def rebuild(self, path: str):
+        """Replace the index with the scores currently in the database"""
+        self._pending = {}
+        try:
+            async with db_read(path) as conn:
+                cursor = await conn.execute(f"SELECT {self.id_column}, {self.score_column} FROM {self.table}")
+                rows = await cursor.fetchall()
+            pending = self._pending
+        finally:
+            self._pending = None
+
+        self._list = _IndexableSkipList()
+        self._scores = {}
+        for member_id, score in rows:
+            self._insert(member_id, score or 0)
+        # Saves that landed while the rows were being read win over the snapshot
+        for member_id, score in pending.items():
+            if score is None:
+                self._discard(member_id)
+            else:
+                self._set(member_id, score)
+        self._loaded_at = time.monotonic()
+        logging.info(f"Rank index {self.table}.{self.score_column} built with {len(self._scores)} entries")
+
+    def reset(self):
+        """Drop the index; the next lookup rebuilds it"""
+        self._list = _IndexableSkipList()
+        self._scores = {}
+        self._loaded_at = None
+
+    def _insert(self, member_id, score):
+        self._scores[member_id] = score
+        self._list.insert((-score, member_id))
+
+    def _discard(self, member_id):
+        score = self._scores.pop(member_id, None)
+        if score is not None:
+            self._list.remove((-score, member_id))
+
+    def _set(self, member_id, score):
+        if self._scores.get(member_id) == score:
+            return
+        self._discard(member_id)
+        self._insert(member_id, score)
+
+    def update(self, member_id, score):
+        """Record a member's new score"""
+        score = score or 0
+        if self._pending is not None:
+            self._pending[member_id] = score
+        if self._loaded_at is not None:
+            self._set(member_id, score)
+
+    def remove(self, member_id):
+        if self._pending is not None:
+            self._pending[member_id] = None
+        if self._loaded_at is not None:
+            self._discard(member_id)
+
+    def score(self, member_id) -> Optional[int]:
+        return self._scores.get(member_id)
+
+    def rank(self, member_id) -> Optional[int]:
+        """1-based rank, or None if the member isn't on this leaderboard"""
+        score = self._scores.get(member_id)
+        if score is None:
+            return None
+        return self.count_above(score) + 1
+
+    def count_above(self, score) -> int:
+        """Number of members with a strictly higher score"""
+        return self._list.count_below((-score, float("-inf")))
+
+    def top(self, count: int, offset: int = 0) -> List[Tuple[int, int]]:
+        """(member_id, score) pairs for positions offset+1 .. offset+count"""
+        return [(member_id, -negative) for negative, member_id in self._list.slice(offset, count)]
+
+
+# Leaderboard category -> index
+LEADERBOARDS: Dict[str, RankIndex] = {
+    "gold": RankIndex("players", "id", "gold"),
+    "diamond": RankIndex("players", "id", "diamond"),
+    "arena": RankIndex("players", "id", "aStreak"),
+    "glory": RankIndex("glory", "user_id", "points"),
+    "power": RankIndex("leaderboard", "id", "power"),
+}
+
+
+def get_index(category: str) -> RankIndex:
+    return LEADERBOARDS[category]
+
+
+def record(table: str, member_id, row: dict):
+    """Feed a saved row to every index over `table`"""
+    for index in LEADERBOARDS.values():
+        if index.table == table and index.score_column in row:
+            index.update(member_id, row[index.score_column])
+
+
+def forget(table: str, member_id):
+    for index in LEADERBOARDS.values():
+        if index.table == table:
+            index.remove(member_id)
+
+
+def reset(table: str):
+    for index in LEADERBOARDS.values():
+        if index.table == table:
+            index.reset()
+
+
+async def load_all(paths: Dict[str, str]):
+    """Build every index whose table has a path in {table: database path}"""
+    for category, index in LEADERBOARDS.items():
+        path = paths.get(index.table)
+        if path is None:
+            continue
+        try:
+            await index.ensure_loaded(path)
+        except Exception as e:
+            logging.error(f"Failed to build {category} rank index: {e}")
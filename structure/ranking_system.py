@@ -1,7 +1,9 @@
 import json
 import logging
-import aiosqlite
-from typing import Dict, List, Optional, Tuple
+import time
+from bisect import bisect_right
+from structure.db_pool import db_read, db_write
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from enum import Enum
 
 def get_database_path():
@@ -14,6 +16,26 @@ def get_database_path():
         return "ranking.db"
 
 DATABASE_PATH = get_database_path()
+RECALC_BATCH_SIZE = 1000  # players per progress report during a bulk recalculation
+
+
+def message_progress(message, embed, label: str, interval: float = 3.0):
+    """
+    Progress callback for recalculate_all that shows `label processed / total`
+    on a status embed, editing the message at most every `interval` seconds
+    (Discord rate-limits edits); the final count is left to the caller's result embed.
+    """
+    last_update = time.monotonic()
+
+    async def report(processed, total):
+        nonlocal last_update
+        if processed >= total or time.monotonic() - last_update < interval:
+            return
+        last_update = time.monotonic()
+        embed.description = f"{label} `{processed:,}` / `{total:,}`"
+        await message.edit(embed=embed)
+
+    return report
 
 class HunterRank(Enum):
     """Hunter ranking system from Solo Leveling"""
@@ -40,6 +62,7 @@ class RankingSystem:
         HunterRank.S: {"level": 100, "total_stats": 15000},
         HunterRank.NATIONAL: {"level": 150, "total_stats": 30000}
     }
+    _compiled_requirements = None  # (RANK_REQUIREMENTS, ranks, level thresholds, stat thresholds)
     
     # Rank benefits and unlocks
     RANK_BENEFITS = {
@@ -97,7 +120,7 @@ class RankingSystem:
     @classmethod
     async def initialize(cls):
         """Initialize the ranking database"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS hunter_rankings (
                     player_id TEXT PRIMARY KEY,
@@ -134,7 +157,7 @@ class RankingSystem:
     @classmethod
     async def get_player_rank(cls, player_id: str) -> Tuple[HunterRank, int]:
         """Get player's current rank and rank points, with migration from old system"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             # First check new ranking system
             cursor = await db.execute(
                 "SELECT current_rank, rank_points FROM hunter_rankings WHERE player_id = ?",
@@ -222,7 +245,7 @@ class RankingSystem:
         import time
         current_time = str(time.time())
         
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             # Get current rank for history
             cursor = await db.execute(
                 "SELECT current_rank, rank_history FROM hunter_rankings WHERE player_id = ?",
@@ -288,6 +311,87 @@ class RankingSystem:
         }
         return rank_values.get(rank, 1)
     
+    @classmethod
+    def _thresholds(cls):
+        """Ranks in ascending order with their level and total-stat thresholds, compiled once per table"""
+        compiled = cls._compiled_requirements
+        if compiled is None or compiled[0] is not cls.RANK_REQUIREMENTS:
+            ranks = sorted(cls.RANK_REQUIREMENTS, key=cls._rank_value)
+            levels = [cls.RANK_REQUIREMENTS[rank]["level"] for rank in ranks]
+            stats = [cls.RANK_REQUIREMENTS[rank]["total_stats"] for rank in ranks]
+            if levels != sorted(levels) or stats != sorted(stats):
+                raise ValueError("RANK_REQUIREMENTS must not decrease from one rank to the next")
+            compiled = cls._compiled_requirements = (cls.RANK_REQUIREMENTS, ranks, levels, stats)
+        return compiled
+
+    @classmethod
+    def rank_for(cls, level: int, total_stats: int) -> HunterRank:
+        """Highest rank whose level and total-stat requirements are both met"""
+        _, ranks, levels, stats = cls._thresholds()
+        index = min(bisect_right(levels, level), bisect_right(stats, total_stats)) - 1
+        return ranks[index] if index >= 0 else HunterRank.E
+
+    @classmethod
+    async def recalculate_all(cls, progress: Optional[Callable[[int, int], Awaitable[None]]] = None) -> Dict:
+        """
+        Recalculate every player's rank from the players table in one pass.
+        Queued player saves are flushed first, then level and stat totals are
+        read straight from SQL (no Player objects, so the player cache is
+        untouched), ranks come from the threshold table by bisection, and
+        every changed rank is upserted into player_ranks in a single
+        transaction. A player's current rank is their player_ranks row, else
+        their hunter_rankings row, else E. `progress(processed, total)` is
+        awaited after each batch of RECALC_BATCH_SIZE players, once the
+        database readers have been released.
+        """
+        from structure import player as player_module
+
+        await player_module.player_write_behind.flush()
+        await cls.initialize()
+        current = {}
+        async with db_read(DATABASE_PATH) as db:
+            for table in ("hunter_rankings", "player_ranks"):  # player_ranks wins
+                cursor = await db.execute(f"SELECT player_id, current_rank FROM {table}")
+                current.update(await cursor.fetchall())
+                await cursor.close()
+
+        async with db_read(player_module.DATABASE_PATH) as db:
+            cursor = await db.execute("""
+                SELECT id, COALESCE(level, 1),
+                       COALESCE(attack, 0) + COALESCE(defense, 0) + COALESCE(precision, 0)
+                       + COALESCE(hp, 0) + COALESCE(mp, 0)
+                FROM players
+            """)
+            rows = await cursor.fetchall()
+            await cursor.close()
+
+        _, ranks, levels, stats = cls._thresholds()
+        changes = []
+        by_rank = {rank.value: 0 for rank in ranks}
+        total = len(rows)
+        for start in range(0, total, RECALC_BATCH_SIZE):
+            for player_id, level, total_stats in rows[start:start + RECALC_BATCH_SIZE]:
+                index = min(bisect_right(levels, level), bisect_right(stats, total_stats)) - 1
+                rank = ranks[index].value if index >= 0 else HunterRank.E.value
+                by_rank[rank] += 1
+                if current.get(str(player_id), HunterRank.E.value) != rank:
+                    changes.append((str(player_id), rank))
+            if progress:
+                await progress(min(start + RECALC_BATCH_SIZE, total), total)
+        processed = total
+
+        if changes:
+            async with db_write(DATABASE_PATH) as db:
+                await db.executemany("""
+                    INSERT OR REPLACE INTO player_ranks
+                    (player_id, current_rank, progress, last_updated)
+                    VALUES (?, ?, 0, datetime('now'))
+                """, changes)
+                await db.commit()
+
+        logging.info(f"Rank recalculation processed {processed} players, {len(changes)} rank changes")
+        return {"processed": processed, "changed": len(changes), "by_rank": by_rank}
+
     @classmethod
     def get_rank_info(cls, rank: HunterRank) -> Dict:
         """Get detailed information about a rank"""
@@ -311,7 +415,7 @@ class RankingSystem:
     @classmethod
     async def get_rank_leaderboard(cls, limit: int = 10) -> List[Dict]:
         """Get top players by rank"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             cursor = await db.execute("""
                 SELECT player_id, current_rank, rank_points, total_evaluations
                 FROM hunter_rankings
@@ -398,7 +502,7 @@ class RankingSystem:
             # Get current rank directly from database to avoid recursion
             current_rank = HunterRank.E  # Default
             try:
-                async with aiosqlite.connect(DATABASE_PATH) as db:
+                async with db_read(DATABASE_PATH) as db:
                     cursor = await db.execute(
                         "SELECT current_rank FROM hunter_rankings WHERE player_id = ?",
                         (player_id,)
@@ -410,17 +514,8 @@ class RankingSystem:
             except Exception:
                 current_rank = HunterRank.E
 
-            # Determine appropriate rank (start with E rank)
-            new_rank = HunterRank.E
-
-            # Check rank requirements in descending order
-            for rank in [HunterRank.NATIONAL, HunterRank.S, HunterRank.A,
-                        HunterRank.B, HunterRank.C, HunterRank.D, HunterRank.E]:
-                requirements = RankingSystem.RANK_REQUIREMENTS[rank]
-                if (player.level >= requirements["level"] and
-                    total_stats >= requirements["total_stats"]):
-                    new_rank = rank
-                    break
+            # Determine appropriate rank (highest rank whose requirements are met)
+            new_rank = RankingSystem.rank_for(player.level, total_stats)
 
             # Check if rank changed
             rank_changed = current_rank != new_rank
@@ -439,7 +534,7 @@ class RankingSystem:
     async def set_player_rank(player_id: str, rank: HunterRank, progress: int = 0):
         """Set a player's rank directly"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
+            async with db_write(DATABASE_PATH) as db:
                 # Ensure tables exist before trying to insert
                 await db.execute("""
                     CREATE TABLE IF NOT EXISTS player_ranks (
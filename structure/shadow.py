@@ -1,6 +1,8 @@
 import json
 import logging
-import aiosqlite
+from structure.db_pool import db_read, db_write
+from structure.catalog_cache import CatalogCache
+from structure.migrations import apply_migrations
 
 def get_database_path():
     try:
@@ -14,6 +16,8 @@ def get_database_path():
 DATABASE_PATH = get_database_path()
 
 class Shadow:
+    _catalog = CatalogCache("shadows", lambda: Shadow._fetch_all())
+
     def __init__(self, shadow_id: str, name: str, description: str, image: str, price: int, attack: int, defense: int, required_boss: str = None, custom_emoji: str = "", emoji_name: str = "", rarity: str = "Common"):
         self.id = shadow_id
         self.name = name
@@ -30,7 +34,7 @@ class Shadow:
     @classmethod
     async def initialize(cls):
         """Initialize the database and create the shadows table if it doesn't exist."""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS shadows (
                     id TEXT PRIMARY KEY,
@@ -45,40 +49,14 @@ class Shadow:
                 )
             """)
 
-            # Add custom emoji columns to existing tables if they don't exist
-            try:
-                await db.execute("ALTER TABLE shadows ADD COLUMN custom_emoji TEXT DEFAULT ''")
-            except:
-                pass  # Column already exists
-            try:
-                await db.execute("ALTER TABLE shadows ADD COLUMN emoji_name TEXT DEFAULT ''")
-            except:
-                pass  # Column already exists
-            try:
-                await db.execute("ALTER TABLE shadows ADD COLUMN rarity TEXT DEFAULT 'Common'")
-            except:
-                pass  # Column already exists
-
             await db.commit()
+        # Columns added after the table was first created
+        await apply_migrations("shadows", DATABASE_PATH)
 
     @classmethod
-    async def get(cls, shadow_id: str):
-        """Retrieve a single shadow by its ID."""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            cursor = await db.execute("SELECT id, name, description, image, price, attack, defense, custom_emoji, emoji_name, rarity FROM shadows WHERE id = ?", (shadow_id,))
-            row = await cursor.fetchone()
-            await cursor.close()
-            if row:
-                # Handle missing rarity column gracefully
-                if len(row) < 10:  # If rarity column is missing
-                    row = row + ("Common",)  # Add default rarity
-                return cls(*row)
-            return None
-
-    @classmethod
-    async def get_all(cls):
-        """Retrieve all shadows from the database."""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+    async def _fetch_all(cls):
+        """Read the whole shadows table (used to fill the catalog cache)."""
+        async with db_read(DATABASE_PATH) as db:
             cursor = await db.execute("SELECT id, name, description, image, price, attack, defense, custom_emoji, emoji_name, rarity FROM shadows")
             rows = await cursor.fetchall()
             await cursor.close()
@@ -90,19 +68,35 @@ class Shadow:
                 shadows.append(cls(*row))
             return shadows
 
+    @classmethod
+    async def get(cls, shadow_id: str):
+        """Retrieve a single shadow by its ID."""
+        return await cls._catalog.get(shadow_id)
+
+    @classmethod
+    async def get_many(cls, shadow_ids):
+        """Retrieve several shadows at once as {shadow_id: Shadow}; unknown ids are left out."""
+        return await cls._catalog.get_many(shadow_ids)
+
+    @classmethod
+    async def get_all(cls):
+        """Retrieve all shadows from the database."""
+        return await cls._catalog.all()
+
     async def save(self):
         """Save or update a shadow in the database."""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_write(DATABASE_PATH) as db:
             await db.execute("""
                 INSERT OR REPLACE INTO shadows (id, name, description, image, price, attack, defense, custom_emoji, emoji_name, rarity)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (self.id, self.name, self.description, self.image, self.price, self.attack, self.defense, self.custom_emoji, self.emoji_name, self.rarity))
             await db.commit()
+        Shadow._catalog.invalidate()
 
     @classmethod
     async def get_all_ids(cls):
         """Retrieve all shadow IDs from the database."""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_read(DATABASE_PATH) as db:
             cursor = await db.execute("SELECT id FROM shadows")
             rows = await cursor.fetchall()
             await cursor.close()
@@ -112,9 +106,10 @@ class Shadow:
     async def delete(cls, shadow_id: str):
         """Delete a shadow from the database."""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
+            async with db_write(DATABASE_PATH) as db:
                 cursor = await db.execute("DELETE FROM shadows WHERE id = ?", (shadow_id,))
                 await db.commit()
+                cls._catalog.invalidate()
                 return cursor.rowcount > 0  # Returns True if shadow was deleted
         except Exception as e:
             print(f"An error occurred while deleting shadow {shadow_id}: {e}")
@@ -4,6 +4,9 @@ from typing import List, Dict, Any, Optional
 import discord
 from discord.ext import commands
 import aiosqlite
+from structure.db_pool import db_read, db_write
+from structure.catalog_cache import CatalogCache
+from structure.migrations import apply_migrations
 import logging
 
 class EffectType(Enum):
@@ -149,29 +152,19 @@ DATABASE_PATH = get_database_path()
 
 class SkillManager:
     DATABASE_PATH = get_database_path()
+    _catalog = CatalogCache("skills", lambda: SkillManager._fetch_all())
 
     @staticmethod
     async def migrate_add_level():
         """
         Add a default level of 1 to all existing skills in the database.
         """
-        try:
-            async with aiosqlite.connect(SkillManager.DATABASE_PATH) as conn:
-                # Add the `level` column if it doesn't already exist
-                await conn.execute("ALTER TABLE skills ADD COLUMN level INTEGER NOT NULL DEFAULT 1")
-                await conn.commit()
-                logging.info("Migration successful: Added 'level' column with default value 1 to all skills.")
-        except aiosqlite.OperationalError as e:
-            if "duplicate column name: level" in str(e).lower():
-                logging.info("Migration skipped: 'level' column already exists.")
-            else:
-                logging.error(f"Migration failed: {e}")
-        except Exception as e:
-            logging.error(f"Unexpected error during migration: {e}")
+        await apply_migrations("skills", SkillManager.DATABASE_PATH)
+
     @staticmethod
     async def initialize():
         try:
-            async with aiosqlite.connect(SkillManager.DATABASE_PATH) as conn:
+            async with db_write(SkillManager.DATABASE_PATH) as conn:
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS skills (
                         id TEXT PRIMARY KEY,
@@ -190,33 +183,55 @@ class SkillManager:
         except Exception as e:
             logging.error(f"Failed to initialize skills database: {e}")
 
+    @staticmethod
+    def _from_row(row) -> Skill:
+        return Skill(
+            id=row[0],
+            skill_type=SkillType(row[1]),
+            name=row[2],
+            effects=[EffectType[effect.strip()] for effect in row[3].split(",")],
+            damage=row[4],
+            mp_cost=row[5],
+            element=Element[row[6]],
+            character_id=row[7],
+            level=row[8]
+        )
+
+    @staticmethod
+    async def _fetch_all() -> List[Skill]:
+        """Read the whole skills table (used to fill the catalog cache)."""
+        async with db_read(SkillManager.DATABASE_PATH) as conn:
+            cursor = await conn.execute("SELECT * FROM skills")
+            rows = await cursor.fetchall()
+        skills = []
+        for row in rows:
+            try:
+                skills.append(SkillManager._from_row(row))
+            except (KeyError, ValueError, AttributeError) as e:
+                logging.error(f"Skipping malformed skill row {row[0]}: {e}")
+        return skills
+
     @staticmethod
     async def get(skill_id: str) -> Optional[Skill]:
         try:
-            async with aiosqlite.connect(SkillManager.DATABASE_PATH) as conn:
-                cursor = await conn.execute("SELECT * FROM skills WHERE id = ?", (skill_id,))
-                row = await cursor.fetchone()
-                if row:
-                    return Skill(
-                        id=row[0],
-                        skill_type=SkillType(row[1]),
-                        name=row[2],
-                        effects=[EffectType[effect] for effect in row[3].split(",")],
-                        damage=row[4],
-                        mp_cost=row[5],
-                        element=Element[row[6]],
-                        character_id=row[7],
-                        level=row[8]# Retrieve character ID
-                    )
-                return None
+            return await SkillManager._catalog.get(skill_id)
         except Exception as e:
             logging.error(f"Failed to retrieve skill with ID {skill_id}: {e}")
             return None
 
+    @staticmethod
+    async def get_many(skill_ids) -> Dict[str, Skill]:
+        """Retrieve several skills at once as {skill_id: Skill}; unknown ids are left out."""
+        try:
+            return await SkillManager._catalog.get_many(skill_ids)
+        except Exception as e:
+            logging.error(f"Failed to retrieve skills: {e}")
+            return {}
+
     @staticmethod
     async def save(skill: Skill):
         try:
-            async with aiosqlite.connect(SkillManager.DATABASE_PATH) as conn:
+            async with db_write(SkillManager.DATABASE_PATH) as conn:
                 query = '''
                     INSERT INTO skills (id, type, name, effects, damage, mp_cost, element, character_id, level)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -245,29 +260,14 @@ class SkillManager:
                     )
                 )
                 await conn.commit()
+            SkillManager._catalog.invalidate()
         except Exception as e:
             logging.error(f"Failed to save skill {skill.id}: {e}")
 
     @staticmethod
     async def get_all() -> List[Skill]:
         try:
-            async with aiosqlite.connect(SkillManager.DATABASE_PATH) as conn:
-                cursor = await conn.execute("SELECT * FROM skills")
-                rows = await cursor.fetchall()
-                return [
-                    Skill(
-                        id=row[0],
-                        skill_type=SkillType(row[1]),
-                        name=row[2],
-                        effects=[EffectType[effect.strip()] for effect in row[3].split(",")],
-                        damage=row[4],
-                        mp_cost=row[5],
-                        element=Element[row[6]],
-                        character_id=row[7],
-                        level=row[8]
-                    )
-                    for row in rows
-                ]
+            return await SkillManager._catalog.all()
         except Exception as e:
             logging.error(f"Failed to retrieve all skills: {e}")
             return []
@@ -317,3 +317,38 @@ class SkillManager:
             logging.error(f"Error getting skill with player level: {e}")
             return await SkillManager.get(skill_id)  # Fallback to base skill
 
+    @staticmethod
+    async def get_many_with_player_level(skill_ids, player_id: str) -> Dict[str, Skill]:
+        """Get several skills with the player's levels applied, reading each skill tree once"""
+        skills = await SkillManager.get_many(skill_ids)
+        if not skills:
+            return {}
+
+        levels = {}
+        try:
+            from structure.skill_tree_system import SkillTreeSystem, SkillTreeType
+
+            for tree_type in SkillTreeType:
+                tree_data = await SkillTreeSystem.get_player_skill_tree(str(player_id), tree_type)
+                for skill_id in tree_data['unlocked_skills']:
+                    levels.setdefault(skill_id, tree_data['skill_levels'].get(skill_id, 1))
+        except Exception as e:
+            logging.error(f"Error getting player skill levels: {e}")
+            return skills  # Fallback to base skills
+
+        scaled = {}
+        for skill_id, skill in skills.items():
+            level = levels.get(skill_id, 1)
+            scaled[skill_id] = Skill(
+                skill.id,
+                skill.skill_type,
+                skill.name,
+                skill.effects,
+                skill.get_scaled_damage(level),
+                skill.get_scaled_mp_cost(level),
+                skill.element,
+                skill.character_id,
+                level
+            )
+        return scaled
+
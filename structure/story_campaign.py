@@ -1,13 +1,26 @@
+import bisect
 import json
 import aiosqlite
 import logging
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass
+from discord.ext import commands
 from structure.player import Player
 from structure.emoji import getEmoji
 from utilis.database_setup import DATABASE_PATH
 
+# Feature -> story mission that unlocks it
+FEATURE_GATES = {
+    "Shadow Extraction": "cartenon_002",
+    "Stat Allocation": "double_dungeon_002",
+    "Skill Learning": "double_dungeon_002",
+}
+
+# Story mode is optional: gates are declared but every feature stays available
+STORY_LOCKS_ENABLED = False
+AVAILABLE_CACHE_SIZE = 1024  # (completed, level) -> available mask entries kept per graph
+
 class StoryChapter(Enum):
     """Story chapters following Solo Leveling narrative"""
     PROLOGUE = "prologue"
@@ -69,6 +82,131 @@ class StoryMission:
         if self.unlocks is None:
             self.unlocks = []
 
+class MissionGraph:
+    """
+    The mission prerequisites compiled into a DAG with integer ids in
+    topological order. A player's completed missions are one int bitset, so
+    availability and completion queries are bitwise ops on ints.
+    """
+
+    def __init__(self, missions: Dict[str, StoryMission]):
+        self.source = missions
+        self.ids = self._topological_order(missions)
+        self.index = {mission_id: bit for bit, mission_id in enumerate(self.ids)}
+        self.missions = [missions[mission_id] for mission_id in self.ids]
+        self.all_mask = (1 << len(self.ids)) - 1
+        self._available: Dict[Tuple[int, int], int] = {}
+
+        self.prerequisites: List[int] = []
+        self.blocked = 0  # missions with a prerequisite that doesn't exist can never open
+        for bit, mission in enumerate(self.missions):
+            need = 0
+            for prereq in mission.prerequisites:
+                if prereq in self.index:
+                    need |= 1 << self.index[prereq]
+                else:
+                    self.blocked |= 1 << bit
+            self.prerequisites.append(need)
+
+        # Missions unlocked at each level requirement, as cumulative masks
+        by_level = sorted((mission.level_requirement, bit) for bit, mission in enumerate(self.missions))
+        self._levels: List[int] = []
+        self._level_masks: List[int] = []
+        mask = 0
+        for level, bit in by_level:
+            mask |= 1 << bit
+            if self._levels and self._levels[-1] == level:
+                self._level_masks[-1] = mask
+            else:
+                self._levels.append(level)
+                self._level_masks.append(mask)
+
+    @staticmethod
+    def _topological_order(missions: Dict[str, StoryMission]) -> List[str]:
+        """Kahn's algorithm, keeping declaration order among missions that are ready together"""
+        declared = {mission_id: position for position, mission_id in enumerate(missions)}
+        waiting = {mission_id: sum(1 for prereq in mission.prerequisites if prereq in missions)
+                   for mission_id, mission in missions.items()}
+        dependents: Dict[str, List[str]] = {}
+        for mission_id, mission in missions.items():
+            for prereq in mission.prerequisites:
+                if prereq in missions:
+                    dependents.setdefault(prereq, []).append(mission_id)
+
+        keys = list(missions)
+        ready = sorted(declared[mission_id] for mission_id, count in waiting.items() if count == 0)
+        order = []
+        while ready:
+            mission_id = keys[ready.pop(0)]
+            order.append(mission_id)
+            for dependent in dependents.get(mission_id, ()):
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    bisect.insort(ready, declared[dependent])
+        if len(order) != len(missions):
+            cycle = sorted(set(missions) - set(order))
+            raise ValueError(f"Story missions have a prerequisite cycle: {cycle}")
+        return order
+
+    def level_mask(self, level: int) -> int:
+        """Missions whose level requirement is met at `level`"""
+        position = bisect.bisect_right(self._levels, level)
+        return self._level_masks[position - 1] if position else 0
+
+    def completed_mask(self, progress: Dict) -> int:
+        mask = 0
+        for mission_id, state in progress.items():
+            bit = self.index.get(mission_id)
+            if bit is not None and isinstance(state, dict) and state.get("completed", False):
+                mask |= 1 << bit
+        return mask
+
+    def available_mask(self, completed: int, level: int) -> int:
+        """Missions whose prerequisites are all in `completed` and whose level requirement is met"""
+        key = (completed, level)
+        cached = self._available.get(key)
+        if cached is not None:
+            return cached
+        candidates = self.level_mask(level) & ~self.blocked
+        available = 0
+        while candidates:
+            low = candidates & -candidates
+            bit = low.bit_length() - 1
+            if not self.prerequisites[bit] & ~completed:
+                available |= low
+            candidates ^= low
+        if len(self._available) >= AVAILABLE_CACHE_SIZE:
+            del self._available[next(iter(self._available))]  # oldest entry
+        self._available[key] = available
+        return available
+
+    def missing_prerequisite(self, mission_id: str, completed: int) -> Optional[str]:
+        """The first prerequisite of mission_id that isn't completed, if any"""
+        missing = self.prerequisites[self.index[mission_id]] & ~completed
+        if missing:
+            return self.ids[(missing & -missing).bit_length() - 1]
+        if self.blocked >> self.index[mission_id] & 1:
+            return next(prereq for prereq in self.missions[self.index[mission_id]].prerequisites
+                        if prereq not in self.index)
+        return None
+
+    def next_mission(self, completed: int, level: int) -> Optional[StoryMission]:
+        """The earliest available mission the player hasn't completed"""
+        open_missions = self.available_mask(completed, level) & ~completed
+        if not open_missions:
+            return None
+        return self.missions[(open_missions & -open_missions).bit_length() - 1]
+
+    def select(self, mask: int) -> List[StoryMission]:
+        """Missions in a mask, in topological order"""
+        selected = []
+        while mask:
+            low = mask & -mask
+            selected.append(self.missions[low.bit_length() - 1])
+            mask ^= low
+        return selected
+
+
 class StoryCampaign:
     """Main story campaign system"""
     
@@ -805,6 +943,100 @@ class StoryCampaign:
         )
     }
     
+    _graph: Optional[MissionGraph] = None
+
+    @classmethod
+    def graph(cls) -> MissionGraph:
+        """The compiled mission graph (rebuilt if STORY_MISSIONS is swapped or resized)"""
+        graph = cls._graph
+        if graph is None or graph.source is not cls.STORY_MISSIONS or len(graph.ids) != len(cls.STORY_MISSIONS):
+            graph = cls._graph = MissionGraph(cls.STORY_MISSIONS)
+        return graph
+
+    _gate_graph: Optional[MissionGraph] = None
+    _gate_table: Dict[str, int] = {}
+    _unlock_cache: Dict[str, int] = {}  # player id -> completed mission bitmap
+
+    @classmethod
+    def gate_table(cls) -> Dict[str, int]:
+        """FEATURE_GATES compiled to mission bits (recompiled along with the mission graph)"""
+        graph = cls.graph()
+        if cls._gate_graph is not graph:
+            table = {}
+            for feature, mission_id in FEATURE_GATES.items():
+                bit = graph.index.get(mission_id)
+                if bit is None:
+                    logging.warning(f"Feature gate '{feature}' requires unknown mission '{mission_id}'")
+                    continue
+                table[feature] = 1 << bit
+            cls._gate_table = table
+            cls._gate_graph = graph
+            cls._unlock_cache.clear()  # bit positions may have moved
+        return cls._gate_table
+
+    @classmethod
+    async def unlock_bitmap(cls, player_id) -> Optional[int]:
+        """Completed mission bitmap for gate checks, cached until the player's story progress changes"""
+        key = str(player_id)
+        bitmap = cls._unlock_cache.get(key)
+        if bitmap is None:
+            player, _, bitmap = await cls.get_story_state(player_id)
+            if player is None:
+                return None
+            cls._unlock_cache[key] = bitmap
+        return bitmap
+
+    @classmethod
+    def invalidate_unlocks(cls, player_id):
+        cls._unlock_cache.pop(str(player_id), None)
+
+    @classmethod
+    async def check_feature_gate(cls, player_id, feature_name: str, required_mission: str = None) -> Tuple[bool, str]:
+        """
+        Whether a player may use a gated feature, and the lock message if not.
+        The gate comes from FEATURE_GATES unless `required_mission` is given;
+        features without a gate, and players without a profile, pass.
+        """
+        if not STORY_LOCKS_ENABLED:
+            return True, ""
+        table = cls.gate_table()
+        if required_mission is None:
+            mask = table.get(feature_name)
+        else:
+            bit = cls.graph().index.get(required_mission)
+            mask = 1 << bit if bit is not None else None
+        if mask is None:
+            return True, ""
+
+        bitmap = await cls.unlock_bitmap(player_id)
+        if bitmap is None or bitmap & mask:
+            return True, ""
+        mission = cls.graph().select(mask)[0]
+        return False, (f"**{feature_name}** unlocks after the story mission **{mission.name}**.\n"
+                       f"Use `sl story` to continue your journey.")
+
+    @staticmethod
+    def _progress_of(player) -> Dict:
+        # Get story progress from player data
+        if hasattr(player, 'story_progress') and player.story_progress:
+            if isinstance(player.story_progress, str):
+                try:
+                    return json.loads(player.story_progress)
+                except json.JSONDecodeError:
+                    return {}
+            elif isinstance(player.story_progress, dict):
+                return player.story_progress
+        return {}
+
+    @classmethod
+    async def get_story_state(cls, player_id: str) -> Tuple[Optional[Player], Dict, int]:
+        """One player load: (player, progress, completed mission bitset)"""
+        player = await Player.get(player_id)
+        if not player:
+            return None, {}, 0
+        progress = cls._progress_of(player)
+        return player, progress, cls.graph().completed_mask(progress)
+
     @classmethod
     async def get_player_story_progress(cls, player_id: str) -> Dict:
         """Get player's story campaign progress"""
@@ -812,17 +1044,7 @@ class StoryCampaign:
             player = await Player.get(player_id)
             if not player:
                 return {}
-
-            # Get story progress from player data
-            if hasattr(player, 'story_progress') and player.story_progress:
-                if isinstance(player.story_progress, str):
-                    try:
-                        return json.loads(player.story_progress)
-                    except json.JSONDecodeError:
-                        return {}
-                elif isinstance(player.story_progress, dict):
-                    return player.story_progress
-            return {}
+            return cls._progress_of(player)
         except Exception as e:
             logging.error(f"Error getting story progress for player {player_id}: {e}")
             return {}
@@ -848,6 +1070,7 @@ class StoryCampaign:
             # Update player data
             player.story_progress = progress
             await player.save()
+            cls.invalidate_unlocks(player_id)
             return True
         except Exception as e:
             logging.error(f"Error updating story progress for player {player_id}: {e}")
@@ -860,7 +1083,7 @@ class StoryCampaign:
             return False, "Mission not found"
         
         mission = cls.STORY_MISSIONS[mission_id]
-        player = await Player.get(player_id)
+        player, _, completed = await cls.get_story_state(player_id)
         
         if not player:
             return False, "Player not found"
@@ -870,12 +1093,11 @@ class StoryCampaign:
             return False, f"Requires level {mission.level_requirement}"
         
         # Check prerequisites
-        progress = await cls.get_player_story_progress(player_id)
-        for prereq in mission.prerequisites:
-            if prereq not in progress or not progress[prereq].get("completed", False):
-                prereq_mission = cls.STORY_MISSIONS.get(prereq)
-                prereq_name = prereq_mission.name if prereq_mission else prereq
-                return False, f"Must complete '{prereq_name}' first"
+        prereq = cls.graph().missing_prerequisite(mission_id, completed)
+        if prereq is not None:
+            prereq_mission = cls.STORY_MISSIONS.get(prereq)
+            prereq_name = prereq_mission.name if prereq_mission else prereq
+            return False, f"Must complete '{prereq_name}' first"
         
         # Don't block already completed missions - allow them to be viewed/replayed
         # if mission_id in progress and progress[mission_id].get("completed", False):
@@ -886,22 +1108,25 @@ class StoryCampaign:
     @classmethod
     async def get_available_missions(cls, player_id: str) -> List[StoryMission]:
         """Get all available missions for a player"""
-        available = []
-        for mission_id, mission in cls.STORY_MISSIONS.items():
-            is_available, _ = await cls.is_mission_available(player_id, mission_id)
-            if is_available:
-                available.append(mission)
-        return available
+        player, _, completed = await cls.get_story_state(player_id)
+        if not player:
+            return []
+        graph = cls.graph()
+        return graph.select(graph.available_mask(completed, player.level))
     
     @classmethod
     async def get_completed_missions(cls, player_id: str) -> List[StoryMission]:
         """Get all completed missions for a player"""
-        progress = await cls.get_player_story_progress(player_id)
-        completed = []
-        for mission_id, mission in cls.STORY_MISSIONS.items():
-            if mission_id in progress and progress[mission_id].get("completed", False):
-                completed.append(mission)
-        return completed
+        _, _, completed = await cls.get_story_state(player_id)
+        return cls.graph().select(completed)
+
+    @classmethod
+    async def get_next_mission(cls, player_id: str) -> Optional[StoryMission]:
+        """The earliest mission the player can play but hasn't completed"""
+        player, _, completed = await cls.get_story_state(player_id)
+        if not player:
+            return None
+        return cls.graph().next_mission(completed, player.level)
     
     @classmethod
     async def complete_mission(cls, player_id: str, mission_id: str) -> Tuple[bool, str, StoryReward]:
@@ -1046,9 +1271,9 @@ class StoryCampaign:
 
     @classmethod
     async def check_feature_unlocked(cls, player_id: str, feature: str) -> bool:
-        """Check if a player has unlocked a specific feature - DISABLED: Story mode is optional"""
-        # Story mode is now optional - all features are always unlocked
-        return True
+        """Check if a player has unlocked a specific feature (always True while STORY_LOCKS_ENABLED is off)"""
+        can_access, _ = await cls.check_feature_gate(player_id, feature)
+        return can_access
 
     @classmethod
     async def get_unlocked_features(cls, player_id: str) -> Dict[str, Dict]:
@@ -1076,9 +1301,8 @@ class StoryCampaign:
 
     @classmethod
     async def require_story_completion(cls, player_id: str, required_mission: str, feature_name: str) -> tuple[bool, str]:
-        """Check if player has completed required story mission for a feature - DISABLED: Story mode is optional"""
-        # Story mode is now optional - all features are always available
-        return True, ""
+        """Check if player has completed required story mission for a feature (always passes while STORY_LOCKS_ENABLED is off)"""
+        return await cls.check_feature_gate(player_id, feature_name, required_mission)
 
     @classmethod
     async def reset_player_story_progress(cls, player_id: str) -> tuple[bool, str, dict]:
@@ -1094,6 +1318,7 @@ class StoryCampaign:
             # Reset story progress
             player.story_progress = {}
             await player.save()
+            cls.invalidate_unlocks(player_id)
 
             # Get available missions after reset
             available_missions = await cls.get_available_missions(player_id)
@@ -1103,11 +1328,10 @@ class StoryCampaign:
         except Exception as e:
             return False, f"Error resetting story progress: {str(e)}", {}
 
-# Utility function for easy access - DISABLED: Story mode is optional
+# Utility function for easy access - passes everything while STORY_LOCKS_ENABLED is off
 async def check_story_lock(player_id: str, required_mission: str, feature_name: str) -> tuple[bool, str]:
-    """Utility function to check story locks from anywhere in the codebase - Story mode is optional"""
-    # Story mode is now optional - all features are always available
-    return True, ""
+    """Utility function to check story locks from anywhere in the codebase"""
+    return await StoryCampaign.check_feature_gate(player_id, feature_name, required_mission)
 
     @classmethod
     def apply_balanced_rewards_to_all_missions(cls):
@@ -1208,5 +1432,25 @@ async def check_story_lock(player_id: str, required_mission: str, feature_name:
             # Update the mission's rewards
             mission.rewards = balanced_reward
 
+
+def story_gate(feature_name: str):
+    """
+    Command check for a FEATURE_GATES entry. Locked players get the lock
+    message and the command doesn't run:
+
+        @commands.command(name="arise")
+        @story_gate("Shadow Extraction")
+    """
+    async def predicate(ctx) -> bool:
+        can_access, lock_message = await StoryCampaign.check_feature_gate(ctx.author.id, feature_name)
+        if can_access:
+            return True
+        from utilis.utilis import create_embed, WARNING_COLOR
+        embed = create_embed("🔒 Feature Locked", lock_message, WARNING_COLOR, ctx.author)
+        await ctx.reply(embed=embed, mention_author=False)
+        return False
+    return commands.check(predicate)
+
+
 # Note: Balanced rewards are applied automatically when missions are created
 # The balanced reward system is built into the mission creation process
@@ -0,0 +1,139 @@
+"""
+Timer scheduler
+One background task and a min-heap of due times replace a sleeping task
+per timer. Due entries are handed to the dispatch callback in batches;
+entries can be rescheduled or cancelled by key.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+MAX_IDLE_WAIT = 60.0  # re-check the heap at least this often (guards against clock jumps)
+
+
+class TimerScheduler:
+    """Min-heap of (due time, key) dispatched by a single runner task"""
+
+    def __init__(self, name: str, dispatch: Callable[[List[Any]], Awaitable[None]], batch_size: int = 50):
+        self.name = name
+        self._dispatch = dispatch
+        self.batch_size = batch_size
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int, Any]] = {}  # key -> live (due, seq, payload)
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"scheduled": 0, "cancelled": 0, "dispatched": 0, "batches": 0, "errors": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the runner on the current event loop"""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def schedule(self, key: Hashable, due: float, payload: Any = None):
+        """Add a timer, replacing any pending timer with the same key"""
+        seq = next(self._counter)
+        self._entries[key] = (due, seq, payload)
+        heapq.heappush(self._heap, (due, seq, key))
+        self.stats["scheduled"] += 1
+        if self._heap[0][1] == seq and self._wakeup is not None:
+            self._wakeup.set()  # new earliest timer
+        self._maybe_compact()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop a pending timer; its heap slot is skipped when it surfaces"""
+        if self._entries.pop(key, None) is None:
+            return False
+        self.stats["cancelled"] += 1
+        self._maybe_compact()
+        return True
+
+    def due(self, key: Hashable) -> Optional[float]:
+        """When the pending timer for key fires, or None if there isn't one"""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def _maybe_compact(self):
+        # Cancelled and replaced timers leave stale heap slots behind
+        if len(self._heap) > 1024 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [(due, seq, key) for key, (due, seq, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _next_due(self) -> Optional[float]:
+        while self._heap:
+            due, seq, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == seq:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: float) -> List[Any]:
+        """Remove and return up to batch_size payloads that are due"""
+        batch = []
+        while len(batch) < self.batch_size:
+            due = self._next_due()
+            if due is None or due > now:
+                break
+            _, _, key = heapq.heappop(self._heap)
+            _, _, payload = self._entries.pop(key)
+            batch.append(payload)
+        return batch
+
+    def get_stats(self) -> dict:
+        """Queue depth and counters for monitoring"""
+        next_due = self._next_due()
+        return {
+            **self.stats,
+            "depth": len(self._entries),
+            "heap_size": len(self._heap),
+            "next_due_in": round(next_due - time.time(), 1) if next_due is not None else None,
+            "running": self.running,
+        }
+
+    async def _run(self):
+        while True:
+            batch = self.pop_due(time.time())
+            if batch:
+                self.stats["batches"] += 1
+                self.stats["dispatched"] += len(batch)
+                try:
+                    await self._dispatch(batch)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logging.error(f"{self.name} scheduler failed to dispatch {len(batch)} timers: {e}")
+                continue
+
+            next_due = self._next_due()
+            timeout = MAX_IDLE_WAIT if next_due is None else min(max(next_due - time.time(), 0), MAX_IDLE_WAIT)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,199 @@
+"""
+Upgrade planner
+Per-level upgrade costs for hunters, weapons and shadows as piecewise
+`flat + per_level * L + per_step * (L // step)` curves. Totals over a level
+range come from closed-form prefix sums, so pricing +N levels, finding the
+most levels a budget affords and planning a whole inventory never walk the
+levels one at a time.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LIMIT_BREAK_CAPS = (10, 20, 40, 60, 80, 100)
+SHADOW_MAX_LEVEL = 100
+RESOURCES = ("gold", "gear1", "gear2", "gear3", "tos")
+
+# A curve is a tuple of pieces (from_level, flat, per_level, per_step, step),
+# each piece covering the levels up to the next piece's from_level
+HUNTER_GOLD = ((0, 0, 150, 500, 10),)
+HUNTER_GEAR = {
+    "gear3": ((0, 0, 8, 25, 10),),
+    "gear2": ((0, 0, 5, 15, 10),),
+    "gear1": ((0, 0, 3, 10, 10),),
+}
+WEAPON_GOLD = ((0, 1000, 300, 1000, 10),)
+_WEAPON_GEAR3 = (40, 0, 12, 35, 15)
+_WEAPON_GEAR2 = (20, 0, 8, 20, 15)
+_WEAPON_GEAR1 = (0, 0, 5, 10, 15)
+SHADOW_TOS = ((0, 0, 100, 0, 1),)
+SHADOW_XP = ((0, 0, 1000, 0, 1),)
+
+
+def _prefix(n: int, flat: int, per_level: int, per_step: int, step: int) -> int:
+    """Sum of flat + per_level * L + per_step * (L // step) for L in [0, n)"""
+    if n <= 0:
+        return 0
+    q, r = divmod(n, step)
+    return flat * n + per_level * n * (n - 1) // 2 + per_step * (step * q * (q - 1) // 2 + q * r)
+
+
+def curve_sum(curve, lo: int, hi: int) -> int:
+    """Total of a cost curve over the levels in [lo, hi)"""
+    total = 0
+    for i, (start, flat, per_level, per_step, step) in enumerate(curve):
+        end = curve[i + 1][0] if i + 1 < len(curve) else hi
+        a, b = max(lo, start), min(hi, end)
+        if a < b:
+            total += _prefix(b, flat, per_level, per_step, step) - _prefix(a, flat, per_level, per_step, step)
+    return total
+
+
+def level_cap(kind: str, tier: int) -> int:
+    if kind == "shadow":
+        return SHADOW_MAX_LEVEL
+    return LIMIT_BREAK_CAPS[tier] if tier < len(LIMIT_BREAK_CAPS) else LIMIT_BREAK_CAPS[-1]
+
+
+def gear_type(kind: str, tier: int, level: int) -> Optional[str]:
+    """Gear pool an upgrade run draws from; weapons pick theirs from the level the run starts at"""
+    if kind == "hunter":
+        return "gear3" if tier >= 3 else "gear2" if tier >= 2 else "gear1"
+    if kind == "weapon":
+        return "gear3" if tier >= 3 or level >= 40 else "gear2" if tier >= 2 or level >= 20 else "gear1"
+    return None
+
+
+def _weapon_gear_curve(tier: int):
+    # The per-level price steps up at levels 20 and 40 unless the tier already did
+    if tier >= 3:
+        return ((0,) + _WEAPON_GEAR3[1:],)
+    if tier >= 2:
+        return ((0,) + _WEAPON_GEAR2[1:], _WEAPON_GEAR3)
+    return (_WEAPON_GEAR1, _WEAPON_GEAR2, _WEAPON_GEAR3)
+
+
+def cost_curves(kind: str, tier: int, level: int) -> Dict[str, tuple]:
+    """Resource -> cost curve for an upgrade run starting at `level`"""
+    if kind == "shadow":
+        return {"tos": SHADOW_TOS}
+    gear = gear_type(kind, tier, level)
+    if kind == "hunter":
+        return {"gold": HUNTER_GOLD, gear: HUNTER_GEAR[gear]}
+    return {"gold": WEAPON_GOLD, gear: _weapon_gear_curve(tier)}
+
+
+def upgrade_cost(kind: str, tier: int, level: int, levels: int) -> Dict[str, int]:
+    """Resources needed to raise an item from `level` by `levels`"""
+    return {resource: curve_sum(curve, level, level + levels)
+            for resource, curve in cost_curves(kind, tier, level).items()}
+
+
+def shadow_xp(level: int, levels: int) -> int:
+    """XP that carries a shadow from `level` up `levels` levels"""
+    return curve_sum(SHADOW_XP, level, level + levels)
+
+
+def affordable(cost: Dict[str, int], budget: Dict[str, int]) -> bool:
+    return all(budget.get(resource, 0) >= amount for resource, amount in cost.items())
+
+
+def max_affordable(kind: str, tier: int, level: int, budget: Dict[str, int], cap: Optional[int] = None) -> int:
+    """
+    Most levels the budget buys before the level cap. Totals only grow with
+    the level count, so this is a binary search over closed-form totals.
+    """
+    limit = max(0, (level_cap(kind, tier) if cap is None else cap) - level)
+    curves = cost_curves(kind, tier, level)
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if all(budget.get(resource, 0) >= curve_sum(curve, level, level + mid)
+               for resource, curve in curves.items()):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+@dataclass
+class UpgradePlan:
+    item_id: str
+    kind: str
+    tier: int
+    level: int
+    levels: int
+    cost: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def target(self) -> int:
+        return self.level + self.levels
+
+    @property
+    def cap(self) -> int:
+        return level_cap(self.kind, self.tier)
+
+
+def plan_upgrade(item_id: str, kind: str, tier: int, level: int, budget: Dict[str, int],
+                 levels: int = -1) -> UpgradePlan:
+    """
+    Plan +levels for one item (-1 for as many as the budget affords). A
+    requested count is clamped to the level cap but not to the budget;
+    check the cost with `affordable` before applying.
+    """
+    if levels == -1:
+        levels = max_affordable(kind, tier, level, budget)
+    levels = max(0, min(levels, level_cap(kind, tier) - level))
+    return UpgradePlan(item_id, kind, tier, level, levels, upgrade_cost(kind, tier, level, levels))
+
+
+def plan_many(items: Iterable[Tuple[str, str, int, int]], budget: Dict[str, int]) -> Tuple[List[UpgradePlan], Dict[str, int]]:
+    """
+    Spend one shared budget across many (item_id, kind, tier, level) items.
+    Lowest levels are filled first since their levels are the cheapest; each
+    item takes the most levels the remaining budget affords. Returns the
+    plans that gain at least one level and the budget left over.
+    """
+    remaining = {resource: budget.get(resource, 0) for resource in RESOURCES}
+    plans = []
+    for item_id, kind, tier, level in sorted(items, key=lambda item: (item[3], item[1], item[0])):
+        plan = plan_upgrade(item_id, kind, tier, level, remaining)
+        if plan.levels <= 0:
+            continue
+        for resource, amount in plan.cost.items():
+            remaining[resource] -= amount
+        plans.append(plan)
+    return plans, remaining
+
+
+def budget_of(player) -> Dict[str, int]:
+    return {resource: getattr(player, resource, 0) or 0 for resource in RESOURCES}
+
+
+def upgradeable_items(player) -> List[Tuple[str, str, int, int]]:
+    """(item_id, kind, tier, level) for every hunter, weapon and shadow with level data"""
+    items = []
+    for kind, collection in (("hunter", player.get_hunters()), ("weapon", player.get_inventory())):
+        for item_id, data in collection.items():
+            if item_id.startswith("s_") or not isinstance(data, dict) or "level" not in data:
+                continue
+            items.append((item_id, kind, data.get("tier", 0), data.get("level", 1)))
+    for shadow_id, data in player.get_shadows().items():
+        if isinstance(data, dict):
+            items.append((shadow_id, "shadow", 0, data.get("level", 1)))
+    return items
+
+
+def apply_plans(player, plans: Iterable[UpgradePlan]) -> int:
+    """Charge the player for the plans and raise the levels; returns the levels gained (caller saves)"""
+    hunters, inventory = player.get_hunters(), player.get_inventory()
+    gained = 0
+    for plan in plans:
+        for resource, amount in plan.cost.items():
+            setattr(player, resource, getattr(player, resource) - amount)
+        if plan.kind == "shadow":
+            player.add_shadow(plan.item_id, shadow_xp(plan.level, plan.levels))
+        else:
+            (hunters if plan.kind == "hunter" else inventory)[plan.item_id]["level"] += plan.levels
+        gained += plan.levels
+    return gained
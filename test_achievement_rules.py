@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test the compiled achievement rule tables, batched unlocks and bulk backtracking
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+
+import structure.achievement_system as achievement_module
+from commands.achievement_backtrack import backtrack_counters
+from structure.achievement_system import PROGRESS_COUNTERS, AchievementRules, AchievementSystem
+from structure.achievement_tracker import TRACKED_ACHIEVEMENTS, apply_achievements
+from structure.db_pool import close_pools
+from structure.player import Player
+
+ORIGINAL_ACHIEVEMENT_PATH = achievement_module.DATABASE_PATH
+
+
+def _meets(requirements, progress):
+    """The per-requirement comparison check_achievements used to run"""
+    for key, value in requirements.items():
+        if key not in progress:
+            return False
+        if isinstance(value, bool):
+            if not (progress[key] >= 1 if value else progress[key] == 0):
+                return False
+        elif progress[key] < value:
+            return False
+    return True
+
+
+def test_rules_match_per_requirement_checks():
+    """Bitset evaluation agrees with the old loop; `changed` only looks at dependent rules"""
+    print("🏆 Testing compiled rule tables...")
+    requirements = {achievement_id: achievement.requirements
+                    for achievement_id, achievement in AchievementSystem.ACHIEVEMENTS.items()}
+    requirements["loner"] = {"guild_joined": False, "level": 10}
+    requirements["both"] = {"battles_won": 5, "dungeons_cleared": 5}
+    requirements["untracked"] = {"pets_owned": 1}
+    rules = AchievementRules(requirements, PROGRESS_COUNTERS)
+
+    rng = random.Random(5)
+    for _ in range(2000):
+        progress = {counter: rng.choice([0, 1, 5, 10, 25, 60, 120, 300, 1500]) for counter in PROGRESS_COUNTERS}
+        progress["guild_joined"] = rng.randrange(2)
+        expected = {achievement_id for achievement_id, requirement in requirements.items()
+                    if _meets(requirement, progress)}
+        assert set(rules.select(rules.met(progress))) == expected
+
+        changed = rng.sample(PROGRESS_COUNTERS, 2)
+        dependent = {achievement_id for achievement_id in expected
+                     if any(counter in requirements[achievement_id] for counter in changed)}
+        assert set(rules.select(rules.met(progress, changed))) == dependent
+
+        done = rules.mask_of(rng.sample(sorted(expected), len(expected) // 2))
+        assert rules.met(progress, exclude=done) == rules.met(progress) & ~done
+    print("✅ 2000 random progress rows agree with the per-requirement loop")
+
+
+def test_batched_unlocks_and_backtrack():
+    """update_progress unlocks everything in one transaction; backtrack covers the whole table"""
+    print("\n📊 Testing batched unlocks and bulk backtrack...")
+    path = os.path.join(tempfile.mkdtemp(), "achievements.db")
+    achievement_module.DATABASE_PATH = path
+
+    async def run():
+        await AchievementSystem.initialize()
+        unlocked = await AchievementSystem.update_progress("1", level=60, battles_won=150)
+        assert {achievement.id for achievement in unlocked} == {
+            "first_steps", "rising_hunter", "veteran_hunter", "first_blood", "battle_tested"}
+        assert await AchievementSystem.update_progress("1", battles_won=151) == []
+        assert [a.id for a in await AchievementSystem.update_progress("1", shadows_collected=50)] == ["shadow_monarch"]
+
+        # Rows written behind the rule engine's back are picked up by the backtrack
+        with sqlite3.connect(path) as db:
+            db.executemany("INSERT INTO achievement_progress (player_id, level, dungeons_cleared) VALUES (?, ?, ?)",
+                           [(str(player_id), player_id % 120, player_id % 150) for player_id in range(2, 1002)])
+        awarded = await AchievementSystem.backtrack()
+        assert "1" not in awarded
+        assert {a.id for a in awarded["101"]} == {"first_steps", "rising_hunter", "veteran_hunter",
+                                                 "elite_hunter", "dungeon_crawler", "dungeon_master"}
+        assert await AchievementSystem.backtrack() == {}
+
+        data = await AchievementSystem.get_player_achievements("101")
+        assert data["total_unlocked"] == 6 and data["progress"]["dungeons_cleared"] == 101
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        achievement_module.DATABASE_PATH = ORIGINAL_ACHIEVEMENT_PATH
+    print("✅ Unlocks batched per update, 1000 players backtracked in one pass")
+
+
+def test_tracker_and_backtrack_counters():
+    """Live tracking only fires rules for the action; backtracking applies the level proxies"""
+    print("\n🎖️ Testing tracker rules...")
+    player = Player(77)
+    player.level = 30
+    player.gold = 20000
+    player.achievements = {"level_10": {"unlocked": True}}
+
+    awarded = apply_achievements(player, {"victories": 1, "level": player.level}, ("victories",))
+    assert awarded == ["first_victory", "combat_veteran", "battle_master"]
+    assert player.achievements["combat_veteran"]["progress"] == 1
+
+    awarded = apply_achievements(player, backtrack_counters(player), unlocked_at="backtracked")
+    assert "level_10" not in awarded and "level_25" in awarded and "level_50" not in awarded
+    assert {"wealthy_10k", "arena_legend", "gate_master", "raid_veteran", "daily_warrior"} <= set(awarded)
+    assert "guild_member" not in awarded and "guild_leader" not in awarded
+    assert player.achievements["wealthy_10k"]["unlocked_at"] == "backtracked"
+    assert apply_achievements(player, backtrack_counters(player)) == []
+    assert set(player.achievements) <= set(TRACKED_ACHIEVEMENTS)
+    print(f"✅ {len(player.achievements)} tracked achievements, no duplicates on re-run")
+
+
+if __name__ == "__main__":
+    test_rules_match_per_requirement_checks()
+    test_batched_unlocks_and_backtrack()
+    test_tracker_and_backtrack_counters()
+    print("\n🎉 All achievement rule tests passed!")
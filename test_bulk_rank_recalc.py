@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test the set-based rank recalculation used by the admin recalc commands
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+
+import structure.player as player_module
+import structure.ranking_system as ranking_module
+from structure.db_pool import close_pools
+from structure.player import Player
+from structure.player_writer import PlayerWriteBehind
+from structure.ranking_system import HunterRank, RankingSystem
+
+ORIGINAL_PLAYER_PATH = player_module.DATABASE_PATH
+ORIGINAL_RANKING_PATH = ranking_module.DATABASE_PATH
+ORIGINAL_BATCH_SIZE = ranking_module.RECALC_BATCH_SIZE
+
+
+def _loop_rank(level, total_stats):
+    """The descending requirement check calculate_rank used to run"""
+    for rank in [HunterRank.NATIONAL, HunterRank.S, HunterRank.A,
+                 HunterRank.B, HunterRank.C, HunterRank.D, HunterRank.E]:
+        requirements = RankingSystem.RANK_REQUIREMENTS[rank]
+        if level >= requirements["level"] and total_stats >= requirements["total_stats"]:
+            return rank
+    return HunterRank.E
+
+
+def test_rank_for_matches_requirement_loop():
+    """Bisecting the threshold table picks the same rank as the descending check"""
+    print("📐 Testing threshold matching...")
+    for level in range(0, 200, 3):
+        for total_stats in range(0, 35000, 250):
+            assert RankingSystem.rank_for(level, total_stats) == _loop_rank(level, total_stats)
+    print("✅ Bisection agrees with the per-rank loop")
+
+
+def test_recalculate_all_in_one_pass():
+    """Stats stream from SQL, only changed ranks are written and the player cache stays empty"""
+    print("\n📊 Testing bulk rank recalculation...")
+    directory = tempfile.mkdtemp()
+    player_module.DATABASE_PATH = os.path.join(directory, "player.db")
+    ranking_module.DATABASE_PATH = os.path.join(directory, "ranking.db")
+    ranking_module.RECALC_BATCH_SIZE = 400
+    Player._players.clear()
+
+    rng = random.Random(24)
+    columns = [key for key in Player(0).to_row() if key != "id"]
+    rows = {}
+    for player_id in range(1, 2001):
+        level = rng.randrange(1, 180)
+        stats = [rng.randrange(0, 7000) for _ in range(5)]
+        rows[player_id] = (level, stats)
+    with sqlite3.connect(player_module.DATABASE_PATH) as db:
+        db.execute(f"CREATE TABLE players (id INTEGER PRIMARY KEY, {', '.join(columns)})")
+        db.executemany("INSERT INTO players (id, level, attack, defense, precision, hp, mp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       [(player_id, level, *stats) for player_id, (level, stats) in rows.items()])
+        db.execute("INSERT INTO players (id) VALUES (5000)")  # never played: NULL stats
+
+    expected = {str(player_id): _loop_rank(level, sum(stats)).value for player_id, (level, stats) in rows.items()}
+
+    async def run():
+        await RankingSystem.initialize()
+        async with ranking_module.db_write(ranking_module.DATABASE_PATH) as db:
+            await db.execute("INSERT INTO hunter_rankings (player_id, current_rank) VALUES ('1', ?)", (expected["1"],))
+            await db.execute("INSERT INTO player_ranks (player_id, current_rank) VALUES ('2', 'National')")
+            await db.commit()
+
+        reports = []
+
+        async def progress(processed, total):
+            reports.append((processed, total))
+
+        result = await RankingSystem.recalculate_all(progress=progress)
+        assert reports == [(400, 2001), (800, 2001), (1200, 2001), (1600, 2001), (2000, 2001), (2001, 2001)]
+        assert result["processed"] == 2001
+        # Player 1 already had its rank, player 2's player_ranks row wins and E needs no row
+        current = {"1": expected["1"], "2": "National"}
+        assert result["changed"] == sum(1 for player_id, rank in expected.items() if current.get(player_id, "E") != rank)
+        assert sum(result["by_rank"].values()) == 2001
+        assert len(Player._players) == 0
+
+        async with ranking_module.db_read(ranking_module.DATABASE_PATH) as db:
+            cursor = await db.execute("SELECT player_id, current_rank FROM player_ranks")
+            stored = dict(await cursor.fetchall())
+            await cursor.close()
+        for player_id, rank in expected.items():
+            assert stored.get(player_id, "E" if player_id != "1" else rank) == rank
+        assert "5000" not in stored
+
+        assert (await RankingSystem.recalculate_all())["changed"] == 0
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        player_module.DATABASE_PATH = ORIGINAL_PLAYER_PATH
+        ranking_module.DATABASE_PATH = ORIGINAL_RANKING_PATH
+        ranking_module.RECALC_BATCH_SIZE = ORIGINAL_BATCH_SIZE
+        Player._players.clear()
+    print("✅ 2001 players recalculated in one pass; a second run changes nothing")
+
+
+def test_recalculate_all_flushes_queued_saves():
+    """A save still sitting in the write-behind queue is ranked from its new stats"""
+    print("\n🚚 Testing queued saves are flushed before the recalculation...")
+    directory = tempfile.mkdtemp()
+    player_module.DATABASE_PATH = os.path.join(directory, "player.db")
+    ranking_module.DATABASE_PATH = os.path.join(directory, "ranking.db")
+    Player._players.clear()
+    columns = [key for key in Player(0).to_row() if key != "id"]
+    with sqlite3.connect(player_module.DATABASE_PATH) as db:
+        db.execute(f"CREATE TABLE players (id INTEGER PRIMARY KEY, {', '.join(columns)})")
+
+    async def run():
+        writer = PlayerWriteBehind(flush_interval=3600)
+        player_module.player_write_behind = writer
+        writer.start()
+        try:
+            player = await Player.get(7)
+            player.level = 150
+            player.attack = player.defense = player.precision = player.hp = player.mp = 6000
+            await player.save()
+            assert writer.pending_count == 1
+            result = await RankingSystem.recalculate_all()
+            assert writer.pending_count == 0
+            return result
+        finally:
+            await writer.stop()
+            await close_pools()
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        player_module.player_write_behind = PlayerWriteBehind()
+        player_module.DATABASE_PATH = ORIGINAL_PLAYER_PATH
+        ranking_module.DATABASE_PATH = ORIGINAL_RANKING_PATH
+        Player._players.clear()
+    assert result["processed"] == 1
+    assert result["by_rank"][_loop_rank(150, 30000).value] == 1
+    print("✅ The queued save was written before the players table was read")
+
+
+if __name__ == "__main__":
+    test_rank_for_matches_requirement_loop()
+    test_recalculate_all_in_one_pass()
+    test_recalculate_all_flushes_queued_saves()
+    print("\n🎉 All bulk rank recalculation tests passed!")
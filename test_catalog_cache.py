@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the read-through catalog cache behind ItemManager / SkillManager / Shadow / Boss
+"""
+
+import asyncio
+import os
+import tempfile
+
+import structure.items as items_module
+from structure.items import Item, ItemManager
+from structure.db_pool import close_pools
+
+ORIGINAL_PATH = items_module.DATABASE_PATH
+
+
+def _item(item_id, attack=10):
+    return Item(item_id, item_id.title(), "SSR", "Fire", "Weapon", "", attack=attack)
+
+
+async def _temp_items_db():
+    items_module.DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "items.db")
+    ItemManager._catalog.invalidate()
+    await ItemManager.initialize()
+    for item_id in ("sword", "bow", "staff"):
+        await ItemManager.save(_item(item_id))
+
+
+def test_get_many_is_one_load():
+    """A batch lookup after warm-up needs no further table reads"""
+    print("📚 Testing batch lookups...")
+
+    async def run():
+        await _temp_items_db()
+        loads = ItemManager._catalog.stats["loads"]
+        items = await ItemManager.get_many(["sword", "bow", "missing"] * 100)
+        assert set(items) == {"sword", "bow"}
+        for _ in range(300):
+            assert (await ItemManager.get("staff")).name == "Staff"
+        assert ItemManager._catalog.stats["loads"] == loads + 1
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        items_module.DATABASE_PATH = ORIGINAL_PATH
+        ItemManager._catalog.invalidate()
+    print("✅ 301 lookups served from one table read")
+
+
+def test_save_and_delete_invalidate():
+    """Admin edits through save/delete are visible immediately"""
+    print("\n✏️ Testing invalidation...")
+
+    async def run():
+        await _temp_items_db()
+        sword = await ItemManager.get("sword")
+        sword.attack = 9999  # a caller's tweak never leaks into the cache
+        assert (await ItemManager.get("sword")).attack == 10
+
+        await ItemManager.save(_item("sword", attack=50))
+        assert (await ItemManager.get("sword")).attack == 50
+        assert await ItemManager.delete("bow") is True
+        assert await ItemManager.get("bow") is None
+        assert len(await ItemManager.get_all()) == 2
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        items_module.DATABASE_PATH = ORIGINAL_PATH
+        ItemManager._catalog.invalidate()
+    print("✅ Catalog follows saves and deletes")
+
+
+if __name__ == "__main__":
+    test_get_many_is_one_load()
+    test_save_and_delete_invalidate()
+    print("\n🎉 All catalog cache tests passed!")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the preloaded channel command settings cache
+"""
+
+import asyncio
+import os
+import tempfile
+
+from structure.channel_commands import ChannelCommandManager
+
+
+def test_checks_never_touch_database_after_preload():
+    """After the preload, enabled and disabled channels are answered from memory"""
+    print("📋 Testing preloaded command checks...")
+    directory = tempfile.mkdtemp()
+
+    async def run():
+        manager = ChannelCommandManager()
+        manager.db_path = os.path.join(directory, "channel_commands.db")
+        await manager.initialize_database()
+        assert await manager.disable_command(100, "gacha", disabled_by=1)
+        assert await manager.disable_command(100, "arena", disabled_by=1)
+
+        fresh = ChannelCommandManager()
+        fresh.db_path = manager.db_path
+        await fresh.preload()
+        fresh.db_path = os.path.join(directory, "missing", "gone.db")  # any database access would fail
+
+        assert await fresh.is_command_disabled(100, "gacha")
+        assert not await fresh.is_command_disabled(100, "daily")
+        for channel_id in range(1000, 2000):  # the common case: nothing disabled
+            assert not await fresh.is_command_disabled(channel_id, "gacha")
+        assert fresh.get_cache_stats() == {"preloaded": True, "channels": 1, "disabled_commands": 2}
+        assert isinstance(fresh._cache[100], frozenset)
+
+    asyncio.run(run())
+    print("✅ 1002 checks answered from the cache")
+
+
+def test_cache_follows_enable_and_disable():
+    """Write-through updates keep the cache coherent, including negative entries"""
+    print("\n🔁 Testing cache coherence...")
+    directory = tempfile.mkdtemp()
+
+    async def run():
+        manager = ChannelCommandManager()
+        manager.db_path = os.path.join(directory, "channel_commands.db")
+        await manager.initialize_database()
+
+        assert await manager.disable_command(5, "trade", disabled_by=1)
+        assert await manager.is_command_disabled(5, "trade")
+        assert not await manager.disable_command(5, "trade", disabled_by=1)
+        assert await manager.enable_command(5, "trade")
+        assert not await manager.is_command_disabled(5, "trade")
+        assert 5 not in manager._cache  # empty channels don't take space
+
+        # Before a preload, an empty lookup is cached as a negative result
+        manager.clear_cache()
+        assert not await manager.is_command_disabled(6, "trade")
+        assert manager._cache[6] == frozenset()
+        assert await manager.disable_command(6, "trade", disabled_by=1)
+        assert await manager.is_command_disabled(6, "trade")
+        assert await manager.get_disabled_commands(6) == {"trade"}
+
+    asyncio.run(run())
+    print("✅ Enable/disable keep the cache in step with the table")
+
+
+if __name__ == "__main__":
+    test_checks_never_touch_database_after_preload()
+    test_cache_follows_enable_and_disable()
+    print("\n🎉 All channel command cache tests passed!")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test the shared aiosqlite connection pool
+"""
+
+import asyncio
+import os
+import tempfile
+
+from structure.db_pool import DatabasePool, db_read, db_write, close_pools
+
+
+def _temp_db():
+    return os.path.join(tempfile.mkdtemp(), "pool_test.db")
+
+
+def test_read_write_roundtrip():
+    """Writes through the writer are visible to readers"""
+    print("🔌 Testing pooled read/write...")
+
+    async def run():
+        path = _temp_db()
+        async with db_write(path) as conn:
+            await conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+            await conn.execute("INSERT INTO t (id, v) VALUES (1, 'a')")
+            await conn.commit()
+
+        async with db_read(path) as conn:
+            cursor = await conn.execute("SELECT v FROM t WHERE id = 1")
+            row = await cursor.fetchone()
+
+        async with db_read(path) as conn:
+            cursor = await conn.execute("PRAGMA journal_mode")
+            mode = (await cursor.fetchone())[0]
+
+        pool = DatabasePool.for_path(path)
+        await close_pools()
+        return row, mode, pool
+
+    row, mode, pool = asyncio.run(run())
+    assert row[0] == "a"
+    assert mode == "wal"
+    assert pool.stats["writes"] == 1 and pool.stats["reads"] == 2
+    print("✅ Reader sees committed write, WAL enabled once")
+
+
+def test_uncommitted_write_rolls_back():
+    """Leaving the writer without commit discards the transaction"""
+    print("\n↩️ Testing rollback of uncommitted writes...")
+
+    async def run():
+        path = _temp_db()
+        async with db_write(path) as conn:
+            await conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+            await conn.commit()
+
+        try:
+            async with db_write(path) as conn:
+                await conn.execute("INSERT INTO t (id) VALUES (1)")
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        async with db_write(path) as conn:
+            await conn.execute("INSERT INTO t (id) VALUES (2)")
+
+        async with db_read(path) as conn:
+            cursor = await conn.execute("SELECT COUNT(*) FROM t")
+            count = (await cursor.fetchone())[0]
+        await close_pools()
+        return count
+
+    assert asyncio.run(run()) == 0
+    print("✅ Failed and uncommitted writes were rolled back")
+
+
+def test_nested_writer_is_reentrant():
+    """A task that already holds the writer can borrow it again"""
+    print("\n🔁 Testing re-entrant writer...")
+
+    async def run():
+        path = _temp_db()
+        async with db_write(path) as outer:
+            await outer.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+            async with db_write(path) as inner:
+                assert inner is outer
+                await inner.execute("INSERT INTO t (id) VALUES (1)")
+            await outer.commit()
+
+        async with db_read(path) as conn:
+            cursor = await conn.execute("SELECT COUNT(*) FROM t")
+            count = (await cursor.fetchone())[0]
+        await close_pools()
+        return count
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=10)) == 1
+    print("✅ Nested write did not deadlock")
+
+
+def test_abandoned_cursor_does_not_pin_snapshot():
+    """A half-read cursor from one borrow doesn't hide later commits"""
+    print("\n📸 Testing reader snapshot reset...")
+
+    async def run():
+        path = _temp_db()
+        DatabasePool.for_path(path).reader_count = 1
+        async with db_write(path) as conn:
+            await conn.execute("CREATE TABLE t (id INTEGER)")
+            await conn.executemany("INSERT INTO t (id) VALUES (?)", [(i,) for i in range(10)])
+            await conn.commit()
+
+        async with db_read(path) as conn:
+            abandoned = await conn.execute("SELECT id FROM t")
+            await abandoned.fetchone()
+
+        async with db_write(path) as conn:
+            await conn.execute("INSERT INTO t (id) VALUES (99)")
+            await conn.commit()
+
+        async with db_read(path) as conn:
+            cursor = await conn.execute("SELECT COUNT(*) FROM t")
+            count = (await cursor.fetchone())[0]
+        await close_pools()
+        return count
+
+    assert asyncio.run(run()) == 11
+    print("✅ Reader saw the latest commit")
+
+
+if __name__ == "__main__":
+    test_read_write_roundtrip()
+    test_uncommitted_write_rolls_back()
+    test_nested_writer_is_reentrant()
+    test_abandoned_cursor_does_not_pin_snapshot()
+    print("\n🎉 All database pool tests passed!")
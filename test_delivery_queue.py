@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test the rate-limited outbound delivery queue
+"""
+
+import asyncio
+import time
+
+import discord
+
+from structure import delivery_queue as delivery_module
+from structure.delivery_queue import DeliveryQueue, TokenBucket
+
+
+class _Response:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "test"
+
+
+class _User:
+    def __init__(self, sent, user_id):
+        self.sent = sent
+        self.id = user_id
+
+    async def send(self, content=None, embed=None):
+        self.sent.append((self.id, embed.title if embed else content))
+
+
+class _Bot:
+    def __init__(self):
+        self.sent = []
+
+    def get_user(self, user_id):
+        return _User(self.sent, user_id)
+
+
+def test_enqueue_is_instant_and_drains():
+    """40 boss-kill DMs are queued in well under a millisecond each and all arrive"""
+    print("📨 Testing queue and drain...")
+
+    async def run():
+        bot = _Bot()
+        queue = DeliveryQueue(workers=4, rate=1000, burst=1000)
+        queue.start(bot)
+        started = time.perf_counter()
+        for user_id in range(40):
+            assert queue.send_dm(user_id, embed=discord.Embed(title="Victory"))
+        enqueue_time = time.perf_counter() - started
+        await asyncio.wait_for(queue._queue.join(), timeout=2)
+        stats = queue.get_stats()
+        await queue.stop()
+        return bot.sent, enqueue_time, stats
+
+    sent, enqueue_time, stats = asyncio.run(run())
+    assert sorted(user_id for user_id, _ in sent) == list(range(40))
+    assert enqueue_time < 0.05
+    assert stats["sent"] == 40 and stats["pending"] == 0
+    print(f"✅ Queued 40 DMs in {enqueue_time * 1000:.2f}ms, all delivered")
+
+
+def test_token_bucket_limits_rate():
+    """After the burst, sends are spaced by the refill rate"""
+    print("\n🪣 Testing token bucket...")
+
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=5)
+        started = time.monotonic()
+        for _ in range(15):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(run())
+    assert 0.15 <= elapsed < 0.5, elapsed  # 10 tokens beyond the burst at 50/s
+    print(f"✅ 15 sends took {elapsed:.2f}s at 50/s with a burst of 5")
+
+
+def test_retry_and_forbidden_fallback():
+    """429s are retried with backoff; closed DMs run the fallback once"""
+    print("\n🔁 Testing retries and fallbacks...")
+    original_backoff = delivery_module.BASE_BACKOFF
+    delivery_module.BASE_BACKOFF = 0.01
+
+    async def run():
+        queue = DeliveryQueue(workers=2, rate=1000, burst=1000)
+        queue.start(_Bot())
+        attempts = []
+        fallbacks = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise discord.HTTPException(_Response(429), "rate limited")
+
+        async def closed_dms():
+            raise discord.Forbidden(_Response(403), "closed")
+
+        async def fallback():
+            fallbacks.append(1)
+
+        queue.enqueue("flaky", flaky)
+        queue.enqueue("closed", closed_dms, on_forbidden=fallback)
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if queue.get_stats()["sent"] == 1 and not queue._retrying:
+                break
+        stats = queue.get_stats()
+        await queue.stop()
+        return len(attempts), len(fallbacks), stats
+
+    try:
+        attempts, fallbacks, stats = asyncio.run(run())
+    finally:
+        delivery_module.BASE_BACKOFF = original_backoff
+    assert attempts == 3 and fallbacks == 1
+    assert stats["retried"] == 2 and stats["forbidden"] == 1 and stats["failed"] == 0
+    print("✅ Retried twice before succeeding, fallback ran for closed DMs")
+
+
+if __name__ == "__main__":
+    test_enqueue_is_instant_and_drains()
+    test_token_bucket_limits_rate()
+    test_retry_and_forbidden_fallback()
+    print("\n🎉 All delivery queue tests passed!")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the cached emojis.json / images.json registry
+"""
+
+import json
+import os
+import tempfile
+from unittest import mock
+
+import structure.emoji as emoji_module
+from structure.emoji import JsonRegistry, getEmoji, get_image, reload_emojis
+
+
+def _temp_registries(emojis, images):
+    directory = tempfile.mkdtemp()
+    emoji_path = os.path.join(directory, "emojis.json")
+    image_path = os.path.join(directory, "images.json")
+    with open(emoji_path, "w") as f:
+        json.dump(emojis, f)
+    with open(image_path, "w") as f:
+        json.dump(images, f)
+    return JsonRegistry(emoji_path), JsonRegistry(image_path)
+
+
+def test_lookups_do_no_file_io():
+    """Repeated lookups are served from memory"""
+    print("🎨 Testing cached lookups...")
+    emojis, images = _temp_registries({"sword": "<:sword:123>"}, {"sword": "https://img/sword.png"})
+    with mock.patch.object(emoji_module, "_emojis", emojis), mock.patch.object(emoji_module, "_images", images):
+        assert getEmoji("sword") == "<:sword:123>"
+        assert get_image("sword") == "https://img/sword.png"
+        with mock.patch("builtins.open", side_effect=AssertionError("file opened")), \
+                mock.patch("os.stat", side_effect=AssertionError("file stat")):
+            for _ in range(100):
+                assert getEmoji("sword") == "<:sword:123>"
+                assert getEmoji("sword", as_url=True) == "https://cdn.discordapp.com/emojis/123.png"
+                assert getEmoji("missing") == "❔"
+                assert getEmoji("missing", as_url=True) is None
+                assert get_image("missing") == emoji_module.DEFAULT_IMAGE
+    print("✅ 500 lookups without touching the disk")
+
+
+def test_reload_hook():
+    """reload_emojis() picks up edits made by the emoji tools"""
+    print("\n🔄 Testing reload hook...")
+    emojis, images = _temp_registries({}, {})
+    with mock.patch.object(emoji_module, "_emojis", emojis), mock.patch.object(emoji_module, "_images", images):
+        assert getEmoji("shield") == "❔"
+        with open(emojis.path, "w") as f:
+            json.dump({"shield": "<:shield:456>"}, f)
+        reload_emojis()
+        assert getEmoji("shield") == "<:shield:456>"
+        assert getEmoji("shield", as_url=True) == "https://cdn.discordapp.com/emojis/456.png"
+    print("✅ New emoji visible after reload")
+
+
+if __name__ == "__main__":
+    test_lookups_do_no_file_io()
+    test_reload_hook()
+    print("\n🎉 All emoji registry tests passed!")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test the compiled story feature gates, the cached unlock bitmaps and the story_gate decorator
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+import structure.player as player_module
+import structure.story_campaign as story_module
+from structure import rank_index
+from structure.db_pool import close_pools
+from structure.matchmaking import matchmaking_index
+from structure.player import Player
+from structure.story_campaign import FEATURE_GATES, StoryCampaign, check_story_lock, story_gate
+
+ORIGINAL_PLAYER_PATH = player_module.DATABASE_PATH
+
+
+class _Author:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.display_name = f"hunter-{user_id}"
+        self.display_avatar = None
+
+
+class _Context:
+    """The parts of a command context the gate check touches"""
+
+    def __init__(self, user_id):
+        self.author = _Author(user_id)
+        self.replies = []
+
+    async def reply(self, embed=None, mention_author=False):
+        self.replies.append(embed)
+
+
+def _use_temp_player_database():
+    path = os.path.join(tempfile.mkdtemp(), "player.db")
+    columns = [key for key in Player(0).to_row() if key != "id"]
+    with sqlite3.connect(path) as db:
+        db.execute(f"CREATE TABLE players (id INTEGER PRIMARY KEY, {', '.join(columns)})")
+    player_module.DATABASE_PATH = path
+    Player._players.clear()
+    rank_index.reset("players")
+    matchmaking_index.reset()
+    StoryCampaign._unlock_cache.clear()
+
+
+def _restore():
+    story_module.STORY_LOCKS_ENABLED = False
+    player_module.DATABASE_PATH = ORIGINAL_PLAYER_PATH
+    Player._players.clear()
+    rank_index.reset("players")
+    matchmaking_index.reset()
+    StoryCampaign._unlock_cache.clear()
+
+
+def test_gate_table_compiles_to_mission_bits():
+    """Every declared gate points at one real mission bit; disabled locks never load players"""
+    print("🔐 Testing compiled feature gates...")
+    graph = StoryCampaign.graph()
+    table = StoryCampaign.gate_table()
+    assert set(table) == set(FEATURE_GATES)
+    for feature, mask in table.items():
+        assert mask & (mask - 1) == 0
+        assert graph.select(mask)[0].id == FEATURE_GATES[feature]
+
+    async def run():
+        StoryCampaign._unlock_cache.clear()
+        for player_id in range(900000, 900100):
+            assert await check_story_lock(player_id, "cartenon_002", "Shadow Extraction") == (True, "")
+        assert StoryCampaign._unlock_cache == {}
+
+    asyncio.run(run())
+    print(f"✅ {len(table)} gates compiled; optional story mode leaves every feature open")
+
+
+def test_unlock_bitmap_cached_until_progress_changes():
+    """One progress read per player; completing or resetting the story invalidates it"""
+    print("\n🗺️ Testing cached unlock bitmaps...")
+    _use_temp_player_database()
+    story_module.STORY_LOCKS_ENABLED = True
+
+    async def run():
+        player = await Player.get(5)
+        player.level = 100
+        await player.save(immediate=True)
+
+        can_access, message = await check_story_lock(5, "double_dungeon_002", "Skill Learning")
+        mission = StoryCampaign.STORY_MISSIONS["double_dungeon_002"]
+        assert not can_access and mission.name in message and "Skill Learning" in message
+        assert "5" in StoryCampaign._unlock_cache
+
+        # Edits that bypass the campaign aren't seen until the cache is invalidated
+        player.story_progress = {"double_dungeon_002": {"completed": True}}
+        assert not (await StoryCampaign.require_story_completion(5, "double_dungeon_002", "Skill Learning"))[0]
+        player.story_progress = {}
+
+        assert await StoryCampaign.update_story_progress(5, "double_dungeon_002", True)
+        assert await StoryCampaign.check_feature_unlocked(5, "Skill Learning")
+        assert await StoryCampaign.check_feature_unlocked(5, "Stat Allocation")
+        assert not await StoryCampaign.check_feature_unlocked(5, "Shadow Extraction")
+        assert await StoryCampaign.check_feature_unlocked(5, "Fishing")  # not gated
+
+        ok, _, previous = await StoryCampaign.reset_player_story_progress(5)
+        assert ok and "double_dungeon_002" in previous
+        assert not await StoryCampaign.check_feature_unlocked(5, "Skill Learning")
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore()
+    print("✅ Bitmap reused between checks and refreshed on complete/reset")
+
+
+def test_story_gate_decorator():
+    """The decorator registers a command check that replies with the lock message"""
+    print("\n🎛️ Testing story_gate decorator...")
+    _use_temp_player_database()
+    story_module.STORY_LOCKS_ENABLED = True
+
+    @story_gate("Shadow Extraction")
+    async def arise(self, ctx, name: str):
+        pass
+
+    (predicate,) = arise.__commands_checks__
+
+    async def run():
+        player = await Player.get(7)
+        await player.save(immediate=True)
+        ctx = _Context(7)
+        assert await predicate(ctx) is False
+        assert len(ctx.replies) == 1 and ctx.replies[0].title == "🔒 Feature Locked"
+
+        player.story_progress = {"cartenon_002": {"completed": True}}
+        StoryCampaign.invalidate_unlocks(7)
+        ctx = _Context(7)
+        assert await predicate(ctx) is True and ctx.replies == []
+
+        story_module.STORY_LOCKS_ENABLED = False
+        StoryCampaign.invalidate_unlocks(7)
+        player.story_progress = {}
+        assert await predicate(_Context(7)) is True
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore()
+    print("✅ Locked players get one reply and the command is skipped")
+
+
+if __name__ == "__main__":
+    test_gate_table_compiles_to_mission_bits()
+    test_unlock_bitmap_cached_until_progress_changes()
+    test_story_gate_decorator()
+    print("\n🎉 All feature gate tests passed!")
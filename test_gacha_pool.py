@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the precomputed gacha pool engine
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+import structure.gacha_pool as gacha_module
+import structure.heroes as heroes_module
+import structure.items as items_module
+from structure.gacha_pool import GachaPool
+from structure.heroes import HeroManager
+from structure.items import Item, ItemManager
+from structure.db_pool import close_pools
+
+ORIGINAL_PATHS = (heroes_module.HUNTERS_JSON_PATH, items_module.DATABASE_PATH, gacha_module.CUSTOMS_JSON_PATH)
+RATES = {"UR": 0.1, "SSR": 4.9, "Super Rare": 95}
+
+
+class FakePlayer:
+    def __init__(self, player_id, gacha=0):
+        self.id = player_id
+        self.gacha = gacha
+        self.owned = set()
+
+    def add_item(self, item_id):
+        duplicate = item_id in self.owned
+        self.owned.add(item_id)
+        return duplicate
+
+    add_hunter = add_item
+
+
+def _hero(hero_id, rarity):
+    return {
+        "id": hero_id, "name": hero_id.title(), "rarity": rarity, "classType": "Fire", "type": "DPS",
+        "image": "", "description": "", "health": 1, "attack": 1, "defense": 1, "speed": 1, "mp": 1,
+        "age": 20, "gender": "", "country": "", "weapon": "", "guild": "", "rank": "S",
+    }
+
+
+async def _temp_catalogs():
+    directory = tempfile.mkdtemp()
+    heroes_module.HUNTERS_JSON_PATH = os.path.join(directory, "hunters.json")
+    with open(heroes_module.HUNTERS_JSON_PATH, "w") as f:
+        json.dump([_hero("jinwoo", "SSR"), _hero("yoo_jinho", "Super Rare")], f)
+    HeroManager.invalidate()
+
+    items_module.DATABASE_PATH = os.path.join(directory, "items.db")
+    ItemManager._catalog.invalidate()
+    await ItemManager.initialize()
+    await ItemManager.save(Item("kamish_dagger", "Kamish Dagger", "SSR", "Dark", "Weapon", ""))
+    await ItemManager.save(Item("iron_sword", "Iron Sword", "Super Rare", "Fire", "Weapon", ""))
+
+    gacha_module.CUSTOMS_JSON_PATH = os.path.join(directory, "customs.json")
+    with open(gacha_module.CUSTOMS_JSON_PATH, "w") as f:
+        json.dump([{"type": "hunter", "name": "Custom Hero", "user_id": 7}], f)
+
+
+def _restore():
+    heroes_module.HUNTERS_JSON_PATH, items_module.DATABASE_PATH, gacha_module.CUSTOMS_JSON_PATH = ORIGINAL_PATHS
+    HeroManager.invalidate()
+    ItemManager._catalog.invalidate()
+
+
+def test_pity_and_buckets():
+    """The 80th pull is an SSR and every result comes from its rarity bucket"""
+    print("🎰 Testing pity and rarity buckets...")
+
+    async def run():
+        await _temp_catalogs()
+        pool = GachaPool()
+        player = FakePlayer(1, gacha=70)
+        results = await pool.draw(player, 15, RATES)
+        await close_pools()
+        return player, results
+
+    try:
+        player, results = asyncio.run(run())
+    finally:
+        _restore()
+
+    assert player.gacha == 85 and len(results) == 15
+    assert results[9][1] == "SSR"  # pull #80
+    for res_type, rarity, entity, _ in results:
+        assert entity.rarity == rarity and res_type in ("Hero", "Item")
+    print(f"✅ Pity SSR on pull 80; {len(results)} results bucketed correctly")
+
+
+def test_pool_rebuilds_only_on_catalog_change():
+    """Buckets are reused across pulls and rebuilt after an item is added"""
+    print("\n🔁 Testing pool refresh...")
+
+    async def run():
+        await _temp_catalogs()
+        pool = GachaPool()
+        await pool.draw(FakePlayer(1), 10, RATES)
+        first = pool.item_buckets
+        await pool.draw(FakePlayer(1), 10, RATES)
+        reused = pool.item_buckets is first
+
+        await ItemManager.save(Item("demon_sword", "Demon Sword", "SSR", "Dark", "Weapon", ""))
+        await pool.draw(FakePlayer(1), 1, RATES)
+        ssr_items = {item.id for item in pool.item_buckets["ssr"]}
+        await close_pools()
+        return reused, ssr_items
+
+    try:
+        reused, ssr_items = asyncio.run(run())
+    finally:
+        _restore()
+
+    assert reused
+    assert ssr_items == {"kamish_dagger", "demon_sword"}
+    print("✅ Pool reused between pulls, rebuilt on catalog change")
+
+
+def test_customs_indexed_per_player():
+    """customs.json entries only reach the player they belong to"""
+    print("\n👤 Testing custom index...")
+
+    async def run():
+        await _temp_catalogs()
+        pool = GachaPool()
+        heroes, _ = pool.get_customs(7)
+        others, _ = pool.get_customs(8)
+        await close_pools()
+        return heroes, others
+
+    try:
+        heroes, others = asyncio.run(run())
+    finally:
+        _restore()
+
+    assert [hero.id for hero in heroes] == ["custom_hero"]
+    assert others == []
+    print("✅ Custom hunters indexed by owner")
+
+
+if __name__ == "__main__":
+    test_pity_and_buckets()
+    test_pool_rebuilds_only_on_catalog_change()
+    test_customs_indexed_per_player()
+    print("\n🎉 All gacha pool tests passed!")
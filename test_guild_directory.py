@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test the unified guild directory and its member -> guild index
+"""
+
+import asyncio
+import os
+import tempfile
+
+import structure.enhanced_guild as enhanced_module
+import structure.guild as guild_module
+from structure.enhanced_guild import EnhancedGuild
+from structure.guild import Guild
+from structure.guild_directory import guild_directory
+
+ORIGINAL_GUILD_PATH = guild_module.DATABASE_PATH
+ORIGINAL_ENHANCED_PATH = enhanced_module.DATABASE_PATH
+
+
+def _use_temp_databases():
+    directory = tempfile.mkdtemp()
+    guild_module.DATABASE_PATH = os.path.join(directory, "player.db")
+    enhanced_module.DATABASE_PATH = os.path.join(directory, "database.db")
+    Guild.initialize()
+    EnhancedGuild.initialize()
+    guild_directory.reset()
+
+
+def _restore():
+    guild_module.DATABASE_PATH = ORIGINAL_GUILD_PATH
+    enhanced_module.DATABASE_PATH = ORIGINAL_ENHANCED_PATH
+    guild_directory.reset()
+
+
+def _legacy(guild_id, owner, members, points=0):
+    return Guild(guild_id, guild_id.title(), owner, members, 1, points, "", "", 0)
+
+
+def _enhanced(guild_id, owner, member_ids, points=0):
+    return EnhancedGuild(guild_id, guild_id.title(), owner, [{"id": m, "role": "member"} for m in member_ids],
+                         1, points, "", "", 0)
+
+
+def test_directory_merges_both_tables():
+    """Both tables load once; the enhanced copy wins and every member maps to one guild"""
+    print("🏰 Testing unified guild directory...")
+    _use_temp_databases()
+
+    async def run():
+        await _legacy("wolves", 1, [{"id": 2, "gc": 3}, 3], points=500).save()
+        await _legacy("ravens", 10, [{"id": 11, "gc": 0}], points=900).save()
+        await _enhanced("ravens", 10, [11, 12], points=950).save()
+        await _enhanced("hunters", 20, [21, 22, 23], points=100).save()
+
+        await guild_directory.ensure_loaded()
+        assert len(guild_directory) == 3
+        assert guild_directory.legacy_ids() == ["wolves"]
+        assert guild_directory.guild_id_of(3) == "wolves" and guild_directory.guild_id_of("2") == "wolves"
+        assert guild_directory.guild_of(12).points == 950  # enhanced copy, not the legacy one
+        assert guild_directory.is_member(20, "hunters") and not guild_directory.is_member(20, "wolves")
+        assert guild_directory.guild_id_of(99) is None
+        assert [g.id for g in guild_directory.ranked("points")] == ["ravens", "wolves", "hunters"]
+        assert [g.id for g in guild_directory.ranked("members")] == ["hunters", "ravens", "wolves"]
+        assert [g.id for g in guild_directory.page("name", 1, 2)] == ["wolves"]
+        assert guild_directory.get_stats()["members"] == 10
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore()
+    print("✅ 3 guilds, 10 members indexed across both tables")
+
+
+def test_join_leave_kick_delete_keep_index_current():
+    """Saves and deletes update the directory without rereading the tables"""
+    print("\n🔁 Testing membership updates...")
+    _use_temp_databases()
+
+    async def run():
+        guild = _enhanced("hunters", 20, [21])
+        await guild.save()
+        old_guild = _legacy("wolves", 1, [])
+        await old_guild.save()
+        await guild_directory.ensure_loaded()
+
+        # The tables are now unreachable: anything that reread them would see nothing
+        guild_module.DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "gone.db")
+        Guild.initialize()
+
+        assert await guild.add_member(30)
+        assert guild_directory.guild_id_of(30) == "hunters"
+        assert await guild.remove_member(21)
+        assert guild_directory.guild_id_of(21) is None
+
+        await old_guild.add_member(40)
+        assert guild_directory.guild_id_of(40) == "wolves"
+        ranked = guild_directory.ranked("members")
+        await old_guild.remove_member(40)  # kick
+        assert guild_directory.guild_id_of(40) is None
+        assert guild_directory.ranked("members") is not ranked  # cached ordering invalidated
+
+        await guild.delete()
+        assert "hunters" not in guild_directory and guild_directory.guild_id_of(30) is None
+        await old_guild.delete()
+        assert len(guild_directory) == 0 and guild_directory.get_stats()["members"] == 0
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore()
+    print("✅ Join, leave, kick and delete reflected immediately")
+
+
+def test_conversion_replaces_legacy_entry():
+    """Converting a legacy guild leaves one enhanced entry with the same members"""
+    print("\n🔄 Testing legacy conversion...")
+    _use_temp_databases()
+
+    async def run():
+        from guild_integration_manager import GuildIntegrationManager
+        await _legacy("wolves", 1, [{"id": 2, "gc": 1}, 3]).save()
+        guilds = await GuildIntegrationManager.get_all_guilds()
+        assert [g.id for g in guilds] == ["wolves"]
+        assert not guild_directory.is_legacy("wolves")
+        assert await Guild.get("wolves") is None
+        assert guild_directory.guild_id_of(3) == "wolves" and guild_directory.guild_id_of(1) == "wolves"
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore()
+    print("✅ Legacy guild converted, index unchanged")
+
+
+def test_deleting_enhanced_copy_restores_legacy_guild():
+    """The legacy guild hidden behind an enhanced copy comes back when that copy is deleted"""
+    print("\n🪞 Testing shadowed legacy guilds...")
+    _use_temp_databases()
+
+    async def run():
+        await _legacy("ravens", 10, [{"id": 11, "gc": 0}], points=900).save()
+        enhanced = _enhanced("ravens", 10, [11, 12], points=950)
+        await enhanced.save()
+        await guild_directory.ensure_loaded()
+        assert not guild_directory.is_legacy("ravens")
+
+        await enhanced.delete()
+        assert guild_directory.is_legacy("ravens") and guild_directory.get("ravens").points == 900
+        assert guild_directory.guild_id_of(11) == "ravens" and guild_directory.guild_id_of(12) is None
+
+        enhanced = _enhanced("ravens", 10, [11], points=990)
+        await enhanced.save()
+        await (await Guild.get("ravens")).delete()  # the hidden legacy row goes away
+        await enhanced.delete()
+        assert "ravens" not in guild_directory
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore()
+    print("✅ Legacy guild restored, then gone once both copies are deleted")
+
+
+def test_safety_rebuild_runs_in_background():
+    """A due rebuild doesn't block the lookup; the current directory serves until it is replaced"""
+    print("\n⏱️ Testing background safety rebuild...")
+    _use_temp_databases()
+
+    async def run():
+        from structure.rank_index import REBUILD_INTERVAL
+        await _legacy("wolves", 1, [2]).save()
+        await guild_directory.ensure_loaded()
+        await _enhanced("hunters", 20, [21]).save()
+        guild_directory.forget("hunters")  # as if the save had bypassed EnhancedGuild
+        guild_directory._loaded_at -= REBUILD_INTERVAL
+
+        await guild_directory.ensure_loaded()
+        assert "hunters" not in guild_directory  # still the old snapshot
+        refresh = guild_directory._refresh
+        assert refresh is not None and not refresh.done()
+        await guild_directory.ensure_loaded()
+        assert guild_directory._refresh is refresh  # one rebuild at a time
+
+        await refresh
+        assert guild_directory.guild_id_of(21) == "hunters" and guild_directory.guild_id_of(2) == "wolves"
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore()
+    print("✅ Stale directory served while the rebuild ran")
+
+
+if __name__ == "__main__":
+    test_directory_merges_both_tables()
+    test_join_leave_kick_delete_keep_index_current()
+    test_conversion_replaces_legacy_entry()
+    test_deleting_enhanced_copy_restores_legacy_guild()
+    test_safety_rebuild_runs_in_background()
+    print("\n🎉 All guild directory tests passed!")
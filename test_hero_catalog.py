@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory hunters.json catalog used by HeroManager
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+import structure.heroes as heroes_module
+from structure.heroes import HeroManager
+
+ORIGINAL_PATH = heroes_module.HUNTERS_JSON_PATH
+
+
+def _hero(hero_id, rarity="SSR", name=None):
+    return {
+        "id": hero_id, "name": name or hero_id.title(), "rarity": rarity, "classType": "Fire",
+        "type": "DPS", "image": "", "description": "", "health": 100, "attack": 10,
+        "defense": 10, "speed": 10, "mp": 10, "age": 20, "gender": "", "country": "",
+        "weapon": "", "guild": "", "rank": "S",
+    }
+
+
+def _temp_catalog(heroes):
+    path = os.path.join(tempfile.mkdtemp(), "hunters.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(heroes, f)
+    heroes_module.HUNTERS_JSON_PATH = path
+    HeroManager.invalidate()
+    return path
+
+
+def _restore_catalog():
+    heroes_module.HUNTERS_JSON_PATH = ORIGINAL_PATH
+    HeroManager.invalidate()
+
+
+def test_indexed_lookups():
+    """get / get_random are served from the id and rarity indexes"""
+    print("📇 Testing indexed lookups...")
+    _temp_catalog([_hero("jinwoo"), _hero("hae_in"), _hero("kim_chul", rarity="Super Rare")])
+
+    async def run():
+        hero = await HeroManager.get("kim_chul")
+        assert hero.rarity == "Super Rare"
+        assert await HeroManager.get("missing") is None
+        assert (await HeroManager.get_random("Super Rare")).id == "kim_chul"
+        assert (await HeroManager.get_random("Unknown")).id in {"jinwoo", "hae_in", "kim_chul"}
+        assert len(await HeroManager.get_all()) == 3
+
+        # Edits on a returned hero must not leak into the catalog
+        hero.attack = 9999
+        assert (await HeroManager.get("kim_chul")).attack == 10
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore_catalog()
+    print("✅ Lookups served from the catalog")
+
+
+def test_reload_on_external_change():
+    """Editing hunters.json on disk is picked up on the next check"""
+    print("\n🔄 Testing hot reload...")
+    path = _temp_catalog([_hero("jinwoo")])
+
+    async def run():
+        assert await HeroManager.get("beru") is None
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([_hero("jinwoo"), _hero("beru")], f)
+        os.utime(path, ns=(1, 1))  # make sure the mtime differs
+        HeroManager._last_check = 0.0
+        assert (await HeroManager.get("beru")) is not None
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore_catalog()
+    print("✅ Catalog reloaded after file change")
+
+
+def test_save_and_delete_write_through():
+    """save / delete update the file atomically and the catalog immediately"""
+    print("\n💾 Testing write-through...")
+    path = _temp_catalog([_hero("jinwoo")])
+    os.chmod(path, 0o644)
+
+    async def run():
+        hero = await HeroManager.get("jinwoo")
+        hero.name = "Shadow Monarch"
+        await HeroManager.save(hero)
+        assert (await HeroManager.get("jinwoo")).name == "Shadow Monarch"
+        assert await HeroManager.delete("jinwoo") is True
+        assert await HeroManager.delete("jinwoo") is False
+        assert await HeroManager.get("jinwoo") is None
+
+    try:
+        asyncio.run(run())
+    finally:
+        _restore_catalog()
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == []
+    assert os.stat(path).st_mode & 0o777 == 0o644  # the rewrite keeps the file's permissions
+    assert not [name for name in os.listdir(os.path.dirname(path)) if name.endswith(".tmp")]
+    print("✅ File and catalog stay in sync")
+
+
+if __name__ == "__main__":
+    test_indexed_lookups()
+    test_reload_on_external_change()
+    test_save_and_delete_write_through()
+    print("\n🎉 All hero catalog tests passed!")
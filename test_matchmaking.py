@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test the rating-indexed arena matchmaking pool
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+
+import structure.player as player_module
+from structure import rank_index
+from structure.db_pool import close_pools
+from structure.matchmaking import MatchmakingIndex, matchmaking_index, party_power
+from structure.player import Player
+
+ORIGINAL_PLAYER_PATH = player_module.DATABASE_PATH
+
+
+def _party(level, tier=0):
+    hunters = {"sung": {"level": level, "tier": tier}}
+    return {"Party_1": "sung"}, hunters
+
+
+def test_nearest_rating_lookup():
+    """Opponents come from the closest ratings; busy and partyless players are skipped"""
+    print("⚔️ Testing nearest-rating matchmaking...")
+    index = MatchmakingIndex()
+    index._loaded_at = 0.0  # treat as built so updates apply
+    rng = random.Random(3)
+    for player_id in range(1, 5001):
+        index.update(player_id, rng.randrange(1, 2000))
+    index.update(6000, 0)  # no party: never matched
+    assert 6000 not in index and len(index) == 5000
+
+    for _ in range(200):
+        seeker = rng.randrange(1, 5001)
+        opponent = index.find_opponent(seeker)
+        assert opponent != seeker
+        gap = abs(index.power(opponent) - index.power(seeker))
+        closer = sum(1 for pid, power in index._power.items()
+                     if pid != seeker and abs(power - index.power(seeker)) < gap)
+        assert closer < 5, closer  # among the five closest ratings
+
+    busy = {pid for pid, power in index._power.items() if abs(power - 1000) < 200}
+    opponent = index.find_opponent(0, 1000, exclude=busy)
+    assert opponent is not None and opponent not in busy
+    assert MatchmakingIndex().find_opponent(1, 10) is None
+    print("✅ 200 lookups matched within the five closest ratings")
+
+
+def test_player_saves_update_pool():
+    """Equipping or clearing a party moves a player in and out of the pool"""
+    print("\n🛡️ Testing pool updates from Player saves...")
+    path = os.path.join(tempfile.mkdtemp(), "player.db")
+    columns = [key for key in Player(0).to_row() if key != "id"]
+    with sqlite3.connect(path) as db:
+        db.execute(f"CREATE TABLE players (id INTEGER PRIMARY KEY, {', '.join(columns)})")
+        equipped, hunters = _party(40, 1)
+        db.execute("INSERT INTO players (id, equipped, hunters) VALUES (1, ?, ?)",
+                   (json.dumps(equipped), json.dumps(hunters)))
+        db.execute("INSERT INTO players (id, equipped, hunters) VALUES (2, '{}', '{}')")
+    player_module.DATABASE_PATH = path
+    Player._players.clear()
+    rank_index.reset("players")
+    matchmaking_index.reset()
+
+    async def run():
+        await matchmaking_index.ensure_loaded(path)
+        assert matchmaking_index.power(1) == 80 and 2 not in matchmaking_index
+
+        player = await Player.get(2)
+        player.equipped, player.hunters = _party(30)
+        await player.save(immediate=True)
+        assert matchmaking_index.power(2) == party_power(player.equipped, player.hunters) == 30
+        assert matchmaking_index.find_opponent(1) == 2
+
+        player.equipped = {}
+        await player.save(immediate=True)
+        assert 2 not in matchmaking_index
+        await Player.delete_player(1)
+        assert len(matchmaking_index) == 0
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        player_module.DATABASE_PATH = ORIGINAL_PLAYER_PATH
+        Player._players.clear()
+        rank_index.reset("players")
+        matchmaking_index.reset()
+    print("✅ Pool follows party changes without reloading players")
+
+
+def test_safety_rebuild_runs_in_background():
+    """A due rebuild doesn't hold up matchmaking; the current pool serves until it is replaced"""
+    print("\n⏱️ Testing background safety rebuild...")
+    path = os.path.join(tempfile.mkdtemp(), "player.db")
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE players (id INTEGER PRIMARY KEY, equipped TEXT, hunters TEXT)")
+        for player_id, level in ((1, 10), (2, 20)):
+            equipped, hunters = _party(level)
+            db.execute("INSERT INTO players VALUES (?, ?, ?)", (player_id, json.dumps(equipped), json.dumps(hunters)))
+
+    async def run():
+        index = MatchmakingIndex()
+        await index.ensure_loaded(path)
+        assert index.power(1) == 10
+
+        with sqlite3.connect(path) as db:  # a write that bypassed Player.save
+            equipped, hunters = _party(50)
+            db.execute("UPDATE players SET hunters = ? WHERE id = 1", (json.dumps(hunters),))
+        index._loaded_at -= rank_index.REBUILD_INTERVAL
+        await index.ensure_loaded(path)
+        assert index.power(1) == 10  # still the old pool
+        refresh = index._refresh
+        await index.ensure_loaded(path)
+        assert index._refresh is refresh  # one rebuild at a time
+
+        await refresh
+        assert index.power(1) == 50
+        await close_pools()
+
+    asyncio.run(run())
+    print("✅ Stale pool served while the rebuild ran")
+
+
+if __name__ == "__main__":
+    test_nearest_rating_lookup()
+    test_player_saves_update_pool()
+    test_safety_rebuild_runs_in_background()
+    print("\n🎉 All matchmaking tests passed!")
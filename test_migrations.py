@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the versioned schema migrations and the hot-query plan check
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+from structure.db_pool import close_pools
+from structure.migrations import apply_all, apply_migrations, explain_hot_queries
+
+
+def _temp_db(*statements):
+    path = os.path.join(tempfile.mkdtemp(), "migrations.db")
+    conn = sqlite3.connect(path)
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _versions(path, scope):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT version FROM schema_migrations WHERE scope = ? ORDER BY version", (scope,)).fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+def test_migrations_run_once():
+    """Columns and indexes are added once and recorded per scope"""
+    print("🧱 Testing migration bookkeeping...")
+    path = _temp_db("CREATE TABLE players (id INTEGER PRIMARY KEY, gold INTEGER, diamond INTEGER, aStreak INTEGER, level INTEGER)")
+
+    async def run():
+        assert await apply_migrations("players", path) == 2
+        assert await apply_migrations("players", path) == 0
+        await close_pools()
+
+    asyncio.run(run())
+    assert _versions(path, "players") == [1, 2]
+    conn = sqlite3.connect(path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(players)")}
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(players)")}
+    conn.close()
+    assert {"oshi_list", "ecube", "story_progress", "titles", "active_title"} <= columns
+    assert "idx_players_gold" in indexes
+    print("✅ Each migration applied exactly once")
+
+
+def test_missing_table_stays_pending():
+    """A scope whose table doesn't exist yet is retried later"""
+    print("\n⏳ Testing pending migrations...")
+    path = _temp_db()
+
+    async def run():
+        assert await apply_migrations("market", path) == 0
+        await close_pools()
+
+    async def run_after_create():
+        assert await apply_migrations("market", path) == 1
+        await close_pools()
+
+    asyncio.run(run())
+    assert _versions(path, "market") == []
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE market (id INTEGER PRIMARY KEY, sid INTEGER, i_t TEXT, p INTEGER)")
+    conn.commit()
+    conn.close()
+    asyncio.run(run_after_create())
+    assert _versions(path, "market") == [1]
+    print("✅ Migration applied once its table appeared")
+
+
+def test_hot_queries_use_indexes():
+    """The startup self-check reports indexed plans after migrating"""
+    print("\n🔍 Testing query plan report...")
+    path = _temp_db("CREATE TABLE glory (id INTEGER PRIMARY KEY, points INTEGER)")
+
+    async def run():
+        before = await explain_hot_queries({"glory": path})
+        await apply_all({"glory": path})
+        after = await explain_hot_queries({"glory": path})
+        await close_pools()
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert any(line.startswith("⚠️") for line in before)
+    assert all(line.startswith("✅") for line in after), after
+    print("✅ Glory rankings are served from the points index")
+
+
+if __name__ == "__main__":
+    test_migrations_run_once()
+    test_missing_table_stays_pending()
+    test_hot_queries_use_indexes()
+    print("\n🎉 All migration tests passed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the bounded LRU/TTL player cache
+"""
+
+import gc
+import time
+
+from structure.player_cache import PlayerCache
+
+
+class FakePlayer:
+    def __init__(self, player_id):
+        self.id = player_id
+        self._persisted = {"inventory": "x" * 100}
+
+
+def test_lru_eviction():
+    """Least recently used players are evicted once over budget"""
+    print("📉 Testing LRU eviction...")
+    cache = PlayerCache(max_entries=2, idle_ttl=3600)
+    cache[1] = FakePlayer(1)
+    cache[2] = FakePlayer(2)
+    cache.get(1)                 # 1 becomes most recent
+    cache[3] = FakePlayer(3)     # evicts 2
+    gc.collect()
+
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+    assert cache.stats["evictions"] == 1
+    print(f"✅ Stats after eviction: {cache.get_stats()}")
+
+
+def test_idle_expiry():
+    """Players idle past the TTL expire"""
+    print("\n⏳ Testing idle TTL expiry...")
+    cache = PlayerCache(max_entries=10, idle_ttl=0.05)
+    cache[1] = FakePlayer(1)
+    time.sleep(0.1)
+    gc.collect()
+
+    assert cache.get(1) is None
+    assert cache.stats["expirations"] == 1
+    print("✅ Idle player expired")
+
+
+def test_in_use_player_is_revived():
+    """An evicted player still held by a view comes back as the same object"""
+    print("\n🔗 Testing revival of in-use players...")
+    cache = PlayerCache(max_entries=1, idle_ttl=3600)
+    held_by_view = FakePlayer(1)
+    cache[1] = held_by_view
+    cache[2] = FakePlayer(2)     # evicts 1, but the view still references it
+
+    assert cache.get(1) is held_by_view
+    assert cache.stats["revived"] == 1
+    print("✅ Same Player object returned, no duplicate copy")
+
+
+def test_byte_budget():
+    """The optional byte budget also bounds the cache"""
+    print("\n💾 Testing byte budget...")
+    cache = PlayerCache(max_entries=100, idle_ttl=3600, max_bytes=1500)
+    for player_id in range(5):
+        cache[player_id] = FakePlayer(player_id)
+
+    assert cache.get_stats()["estimated_bytes"] <= 1500
+    assert len(cache) < 5
+    print(f"✅ {len(cache)} players kept within byte budget")
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_idle_expiry()
+    test_in_use_player_is_revived()
+    test_byte_budget()
+    print("\n🎉 All player cache tests passed!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test the opt-in normalized player collection storage
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+import structure.player as player_module
+from structure import player_storage
+from structure.player import Player
+from structure.db_pool import close_pools
+
+ORIGINAL_PATH = player_module.DATABASE_PATH
+
+
+def _temp_player_db():
+    path = os.path.join(tempfile.mkdtemp(), "player.db")
+    columns = [key for key in Player(0).to_row() if key != "id"]
+    with sqlite3.connect(path) as db:
+        db.execute(f"CREATE TABLE players (id INTEGER PRIMARY KEY, {', '.join(columns)})")
+    player_module.DATABASE_PATH = path
+    Player._players.clear()
+    return path
+
+
+def _query(path, sql, *params):
+    with sqlite3.connect(path) as db:
+        return db.execute(sql, params).fetchall()
+
+
+def _restore():
+    player_storage.NORMALIZED_COLLECTIONS = False
+    player_module.DATABASE_PATH = ORIGINAL_PATH
+    Player._players.clear()
+
+
+def test_blob_player_is_migrated_on_save():
+    """A player stored with blobs moves into the tables on their next save"""
+    print("📦 Testing lazy migration...")
+
+    async def run():
+        path = _temp_player_db()
+        player = await Player.get(1)
+        player.add_item("sword")
+        player.add_hunter("jinwoo", level=5)
+        await player.save()  # blob layout
+
+        player_storage.NORMALIZED_COLLECTIONS = True
+        Player._players.clear()
+        player = await Player.get(1)
+        assert player._persisted_entries["inventory"] is None  # blob still holds data
+        await player.save()
+
+        Player._players.clear()
+        reloaded = await Player.get(1)
+        await close_pools()
+        return path, reloaded
+
+    try:
+        path, reloaded = asyncio.run(run())
+    finally:
+        _restore()
+
+    assert reloaded.inventory == {"sword": {"level": 1, "tier": 1, "xp": 0}}
+    assert reloaded.hunters["jinwoo"]["level"] == 5
+    assert _query(path, "SELECT inventory, hunters FROM players WHERE id = 1") == [("{}", "{}")]
+    assert _query(path, "SELECT item_id, level, tier, xp FROM player_items") == [("sword", 1, 1, 0)]
+    print("✅ Blobs moved into player_items / player_hunters")
+
+
+def test_save_touches_only_changed_entries():
+    """One hunter XP tick rewrites one hunter row and leaves the players row alone"""
+    print("\n🎯 Testing row-level saves...")
+
+    async def run():
+        path = _temp_player_db()
+        player_storage.NORMALIZED_COLLECTIONS = True
+        player = await Player.get(2)
+        for index in range(50):
+            player.add_hunter(f"hunter_{index}")
+        player.add_item("sword")
+        await player.save()
+
+        player.hunter_add_xp("hunter_7", 30)
+        del player.inventory["sword"]
+        collections = {column: player._clean_data_for_save(getattr(player, column))
+                       for column in player_storage.COLLECTION_TABLES}
+        changes = player_storage.diff(player.id, collections, player._persisted_entries)
+        row_changes = player.dirty_columns(player_storage.strip_row(player.to_row()))
+        await player.save()
+        await close_pools()
+        return path, changes, row_changes
+
+    try:
+        path, changes, row_changes = asyncio.run(run())
+    finally:
+        _restore()
+
+    assert list(changes.upserts) == ["hunters"] and list(changes.upserts["hunters"]) == ["hunter_7"]
+    assert changes.deletes == {"inventory": ["sword"]}
+    assert row_changes == {}
+    assert _query(path, "SELECT xp FROM player_hunters WHERE hunter_id = 'hunter_7'") == [(30,)]
+    assert _query(path, "SELECT COUNT(*) FROM player_items") == [(0,)]
+    print("✅ 1 upsert + 1 delete, players row untouched")
+
+
+if __name__ == "__main__":
+    test_blob_player_is_migrated_on_save()
+    test_save_touches_only_changed_entries()
+    print("\n🎉 All player storage tests passed!")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test write-behind batching and dirty-column saves for Player
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+import structure.player as player_module
+from structure.player import Player
+from structure.player_writer import PlayerWriteBehind
+from structure.db_pool import close_pools
+
+
+def _temp_player_db():
+    """Create a players table matching Player.to_row() in a temp database"""
+    path = os.path.join(tempfile.mkdtemp(), "player.db")
+    columns = [key for key in Player(0).to_row() if key != "id"]
+    with sqlite3.connect(path) as db:
+        db.execute(f"CREATE TABLE players (id INTEGER PRIMARY KEY, {', '.join(columns)})")
+    player_module.DATABASE_PATH = path
+    Player._players.clear()
+    return path
+
+
+def _gold(path, player_id):
+    with sqlite3.connect(path) as db:
+        row = db.execute("SELECT gold FROM players WHERE id = ?", (player_id,)).fetchone()
+        return row[0] if row else None
+
+
+def test_dirty_columns():
+    """Only changed columns are reported after a save"""
+    print("🧮 Testing dirty column detection...")
+
+    async def run():
+        path = _temp_player_db()
+        player = await Player.get(1)
+        assert player.dirty_columns(player.to_row()) == player.to_row()
+
+        await player.save()
+        assert player.dirty_columns(player.to_row()) == {}
+
+        player.gold += 500
+        player.inventory["sword"] = {"level": 1, "tier": 1, "xp": 0}
+        dirty = player.dirty_columns(player.to_row())
+        await close_pools()
+        return path, dirty
+
+    path, dirty = asyncio.run(run())
+    assert set(dirty) == {"gold", "inventory"}
+    print(f"✅ Dirty columns: {sorted(dirty)}")
+
+
+def test_saves_are_coalesced():
+    """Repeated saves of one player become one row write"""
+    print("\n📦 Testing save coalescing...")
+
+    async def run():
+        path = _temp_player_db()
+        writer = PlayerWriteBehind(flush_interval=60)
+        player_module.player_write_behind = writer
+        writer.start()
+        try:
+            player = await Player.get(2)
+            for _ in range(5):
+                player.gold += 100
+                await player.save()
+            queued_gold = _gold(path, 2)
+            written = await writer.flush()
+        finally:
+            await writer.stop()
+            await close_pools()
+        return path, queued_gold, written, writer.stats
+
+    try:
+        path, queued_gold, written, stats = asyncio.run(run())
+    finally:
+        player_module.player_write_behind = PlayerWriteBehind()
+
+    assert queued_gold is None  # nothing hit the database before the flush
+    assert written == 1
+    assert stats["saves"] == 5 and stats["coalesced"] == 4
+    assert _gold(path, 2) == 500
+    print(f"✅ 5 saves → {written} row write")
+
+
+def test_stop_flushes_pending():
+    """Stopping the buffer durably writes what is still queued"""
+    print("\n🛑 Testing flush on shutdown...")
+
+    async def run():
+        path = _temp_player_db()
+        writer = PlayerWriteBehind(flush_interval=60)
+        player_module.player_write_behind = writer
+        writer.start()
+        player = await Player.get(3)
+        player.gold = 42
+        await player.save()
+        await writer.stop()
+        await close_pools()
+        return path
+
+    try:
+        path = asyncio.run(run())
+    finally:
+        player_module.player_write_behind = PlayerWriteBehind()
+
+    assert _gold(path, 3) == 42
+    print("✅ Pending save written on stop")
+
+
+def test_bad_row_does_not_block_batch():
+    """A row SQLite can't store fails alone; its batch-mates are still written"""
+    print("\n🧯 Testing failing row isolation...")
+
+    async def run():
+        path = _temp_player_db()
+        writer = PlayerWriteBehind(flush_interval=60)
+        player_module.player_write_behind = writer
+        writer.start()
+        try:
+            players = [await Player.get(player_id) for player_id in (10, 11, 12)]
+            for player in players:
+                player.gold = player.id
+                await player.save()
+            players[1].gold = 2 ** 64  # OverflowError when bound
+            written = await writer.flush()
+            assert writer.pending_count == 1 and writer.stats["failures"] == 1
+
+            # Later flushes retry it alone and finally drop it; other saves keep flowing
+            players[0].gold = 99
+            await players[0].save()
+            assert await writer.flush() == 1
+            await writer.flush()
+            assert writer.pending_count == 0 and writer.stats["dropped"] == 1
+        finally:
+            await writer.stop()
+            await close_pools()
+        return path, written
+
+    try:
+        path, written = asyncio.run(run())
+    finally:
+        player_module.player_write_behind = PlayerWriteBehind()
+
+    assert written == 2
+    assert _gold(path, 10) == 99 and _gold(path, 12) == 12 and _gold(path, 11) is None
+    print("✅ Good players persisted, the bad row dropped after retries")
+
+
+if __name__ == "__main__":
+    test_dirty_columns()
+    test_saves_are_coalesced()
+    test_stop_flushes_pending()
+    test_bad_row_does_not_block_batch()
+    print("\n🎉 All write-behind tests passed!")
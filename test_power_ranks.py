@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test percentile rank assignment on the power index and the S-Rank diff update
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+
+import structure.Rank as rank_module
+from structure import rank_index
+from structure.db_pool import close_pools
+from structure.Rank import PERCENTILE_RANKS, RankingLeaderboard, rank_for_position
+
+ORIGINAL_RANK_PATH = rank_module.DATABASE_PATH
+
+
+def _expected(powers, player_id, power):
+    """Position and rank from a full sort of everyone else's power"""
+    if not set(powers) - {player_id}:
+        return 'S-Rank', 1
+    stronger = sum(1 for other_id, other in powers.items() if other_id != player_id and other > power)
+    total = len(powers) + (player_id not in powers)
+    position = stronger + 1
+    percentile = position / total * 100
+    for cutoff, rank in PERCENTILE_RANKS:
+        if percentile <= cutoff:
+            return rank, position
+    return 'E-Rank', position
+
+
+def test_rank_for_position_cutoffs():
+    """Percentile boundaries land on the same side as the old chain of comparisons"""
+    print("📏 Testing percentile cutoffs...")
+    assert rank_for_position(1, 10) == 'S-Rank' and rank_for_position(2, 10) == 'A-Rank'
+    assert rank_for_position(25, 100) == 'A-Rank' and rank_for_position(26, 100) == 'B-Rank'
+    assert rank_for_position(90, 100) == 'D-Rank' and rank_for_position(91, 100) == 'E-Rank'
+    assert rank_for_position(3, 10) == 'B-Rank'
+    print("✅ Cutoffs inclusive at 10/25/50/75/90%")
+
+
+def test_assign_evaluate_and_srank_diff():
+    """Ranks match a full sort; S-Rank membership is written as a diff"""
+    print("\n⚖️ Testing power index ranks...")
+    rank_module.DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "player.db")
+    rank_index.reset("leaderboard")
+    rng = random.Random(25)
+
+    async def run():
+        await RankingLeaderboard.initialize_db()
+        leaderboard = RankingLeaderboard()
+        assert await leaderboard.assign_rank(500) == ('S-Rank', 1)
+
+        powers = {}
+        for player_id in range(1, 301):
+            power = rng.randrange(0, 2000, 10)  # coarse values so ties happen
+            expected = _expected(powers, player_id, power)
+            assert await leaderboard.assign_rank(power, player_id) == expected
+            await leaderboard.add_player(player_id, power)
+            powers[player_id] = power
+            assert (await RankingLeaderboard.get(player_id))[1:3] == expected
+
+        for _ in range(200):
+            player_id = rng.randrange(1, 301)
+            power = rng.randrange(0, 2500, 10)
+            expected = _expected(powers, player_id, power)
+            assert await leaderboard.evaluate(player_id, power) == expected
+            powers[player_id] = power
+
+        await leaderboard.delete_player(300)
+        del powers[300]
+        index = await RankingLeaderboard.power_index()
+        assert len(index) == 299 and index.score(300) is None
+
+        def srank_ids():
+            return {player_id for player_id, power in powers.items()
+                    if _expected(powers, player_id, power)[0] == 'S-Rank'}
+
+        result = await leaderboard.update_srank()
+        assert f"({len(srank_ids())} joined, 0 left)" in result
+        assert {row[0] for row in await leaderboard.get_srank_players()} == srank_ids()
+        assert "(0 joined, 0 left)" in await leaderboard.update_srank()
+
+        # The weakest S-Rank hunter drops out, a new top hunter takes the spot
+        weakest = min(srank_ids(), key=lambda player_id: (powers[player_id], -player_id))
+        await leaderboard.evaluate(weakest, 0)
+        powers[weakest] = 0
+        challenger = max(set(powers) - srank_ids(), key=lambda player_id: powers[player_id])
+        await leaderboard.evaluate(challenger, 10 ** 6)
+        powers[challenger] = 10 ** 6
+        result = await leaderboard.update_srank()
+        assert weakest not in srank_ids() and challenger in srank_ids()
+        assert {row[0] for row in await leaderboard.get_srank_players()} == srank_ids()
+        assert "left)" in result and "(0 joined, 0 left)" not in result
+
+        # A rebuild from the table agrees with the incrementally maintained index
+        await index.rebuild(rank_module.DATABASE_PATH)
+        assert all(index.score(player_id) == power for player_id, power in powers.items())
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        rank_module.DATABASE_PATH = ORIGINAL_RANK_PATH
+        rank_index.reset("leaderboard")
+    print("✅ 300 additions and 200 evaluations match a full sort; S-Rank synced by diff")
+
+
+if __name__ == "__main__":
+    test_rank_for_position_cutoffs()
+    test_assign_evaluate_and_srank_diff()
+    print("\n🎉 All power rank tests passed!")
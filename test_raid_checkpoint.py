@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test in-memory raid state with periodic checkpointing
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+
+import structure.player as player_module
+import structure.raids as raids_module
+from structure import rank_index
+from structure.db_pool import close_pools
+from structure.player import Player
+from structure.raids import Raid, RaidCheckpointer
+
+ORIGINAL_PLAYER_PATH = player_module.DATABASE_PATH
+ORIGINAL_RAIDS_PATH = raids_module.DATABASE_PATH
+
+
+def _stored_health(path, channel_id):
+    with sqlite3.connect(path) as db:
+        row = db.execute("SELECT health FROM raids WHERE channel = ?", (channel_id,)).fetchone()
+    return row[0] if row else None
+
+
+def test_attacks_are_checkpointed_in_batches():
+    """Attacks only touch memory; one checkpoint writes the latest state"""
+    print("⚔️ Testing battle checkpoints...")
+    path = os.path.join(tempfile.mkdtemp(), "raids.db")
+    raids_module.DATABASE_PATH = path
+    original_checkpointer = raids_module.raid_checkpointer
+    checkpointer = RaidCheckpointer(interval=3600)
+    raids_module.raid_checkpointer = checkpointer
+
+    async def run():
+        await Raid.initialize()
+        raid = Raid(1, 10, "Igris", "Knight", 5000, "", 100, 50, 5000)
+        raid.members[7] = {"name": "Jinwoo", "health": 100, "max_health": 100, "damage": 0}
+        await raid.save()
+        assert await Raid.get(1) is raid  # live object, not a copy from the table
+
+        for _ in range(200):
+            raid.health -= 10
+            raid.members[7]["damage"] += 10
+        assert _stored_health(path, 1) == 5000
+
+        assert await checkpointer.checkpoint() == 1
+        assert _stored_health(path, 1) == 3000
+        assert await checkpointer.checkpoint() == 0  # nothing changed since
+
+        await raid.delete()
+        assert await Raid.get(1) is None
+        await close_pools()
+        return checkpointer.stats
+
+    try:
+        stats = asyncio.run(run())
+    finally:
+        raids_module.DATABASE_PATH = ORIGINAL_RAIDS_PATH
+        raids_module.raid_checkpointer = original_checkpointer
+    assert stats == {"checkpoints": 1, "rows_written": 1}
+    print("✅ 200 attacks persisted with a single write")
+
+
+def test_recovery_releases_members():
+    """Raids left in the table by a crash free their members on startup"""
+    print("\n♻️ Testing recovery of interrupted raids...")
+    directory = tempfile.mkdtemp()
+    player_path = os.path.join(directory, "player.db")
+    raids_path = os.path.join(directory, "raids.db")
+    columns = [key for key in Player(0).to_row() if key != "id"]
+    with sqlite3.connect(player_path) as db:
+        db.execute(f"CREATE TABLE players (id INTEGER PRIMARY KEY, {', '.join(columns)})")
+    player_module.DATABASE_PATH = player_path
+    raids_module.DATABASE_PATH = raids_path
+    Player._players.clear()
+    rank_index.reset("players")
+
+    async def run():
+        player = await Player.get(7)
+        player.inc = True
+        await player.save(immediate=True)
+
+        await Raid.initialize()
+        members = {"7": {"name": "Jinwoo", "damage": 1200}}
+        with sqlite3.connect(raids_path) as db:
+            db.execute("INSERT INTO raids (channel, shadow, health, max_health, members, started) "
+                       "VALUES (1, 'Igris', 800, 2000, ?, 1)", (json.dumps(members),))
+
+        Player._players.clear()
+        recovered = await Raid.recover_interrupted()
+        Player._players.clear()
+        player = await Player.get(7)
+        await close_pools()
+        return recovered, player.inc
+
+    try:
+        recovered, busy = asyncio.run(run())
+    finally:
+        player_module.DATABASE_PATH = ORIGINAL_PLAYER_PATH
+        raids_module.DATABASE_PATH = ORIGINAL_RAIDS_PATH
+        Player._players.clear()
+        rank_index.reset("players")
+    assert recovered == 1 and not busy
+    assert _stored_health(raids_path, 1) is None
+    print("✅ Interrupted raid closed out and its hunter released")
+
+
+if __name__ == "__main__":
+    test_attacks_are_checkpointed_in_batches()
+    test_recovery_releases_members()
+    print("\n🎉 All raid checkpoint tests passed!")
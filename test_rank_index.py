@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory leaderboard rank indexes
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+
+import structure.glory as glory_module
+import structure.player as player_module
+from structure import rank_index
+from structure.db_pool import close_pools
+from structure.glory import Glory
+from structure.player import Player
+from structure.rank_index import RankIndex
+
+ORIGINAL_PLAYER_PATH = player_module.DATABASE_PATH
+ORIGINAL_GLORY_PATH = glory_module.DATABASE_PATH
+
+
+def _sql_rank(scores, member_id):
+    """What `COUNT(*) + 1 WHERE score > mine` returns"""
+    return sum(1 for score in scores.values() if score > scores[member_id]) + 1
+
+
+def test_matches_brute_force():
+    """Ranks and pages agree with a full sort after random updates"""
+    print("🎲 Testing rank index against a full sort...")
+    index = RankIndex("players", "id", "gold")
+    index._loaded_at = 0.0  # treat as built so updates apply
+    scores = {}
+    rng = random.Random(7)
+    for _ in range(3000):
+        member_id = rng.randrange(300)
+        if rng.random() < 0.1:
+            index.remove(member_id)
+            scores.pop(member_id, None)
+        else:
+            score = rng.randrange(50)  # plenty of ties
+            index.update(member_id, score)
+            scores[member_id] = score
+
+    assert len(index) == len(scores)
+    for member_id in scores:
+        assert index.rank(member_id) == _sql_rank(scores, member_id)
+    ordered = sorted(((-score, member_id) for member_id, score in scores.items()))
+    expected = [(member_id, -negative) for negative, member_id in ordered]
+    assert index.top(15) == expected[:15]
+    assert index.top(15, 30) == expected[30:45]
+    assert index.top(15, len(expected)) == []
+    print(f"✅ {len(scores)} ranks and pages match")
+
+
+def test_player_saves_update_index():
+    """Ranks follow Player saves without re-reading the table"""
+    print("\n💰 Testing incremental updates from Player saves...")
+    path = os.path.join(tempfile.mkdtemp(), "player.db")
+    columns = [key for key in Player(0).to_row() if key != "id"]
+    with sqlite3.connect(path) as db:
+        db.execute(f"CREATE TABLE players (id INTEGER PRIMARY KEY, {', '.join(columns)})")
+        db.execute("CREATE TABLE glory (user_id INTEGER PRIMARY KEY, name TEXT, points INTEGER DEFAULT 0, "
+                   "rank INTEGER DEFAULT 0, hs INTEGER DEFAULT 0, current_streak INTEGER DEFAULT 0, logs TEXT)")
+    player_module.DATABASE_PATH = path
+    glory_module.DATABASE_PATH = path
+    Player._players.clear()
+    rank_index.reset("players")
+    rank_index.reset("glory")
+
+    async def run():
+        for player_id, gold in ((1, 100), (2, 300), (3, 200)):
+            player = await Player.get(player_id)
+            player.gold = gold
+            await player.save(immediate=True)
+
+        index = await Player.get_rank_index("gold")
+        assert index.top(3) == [(2, 300), (3, 200), (1, 100)]
+        loaded_at = index._loaded_at
+
+        player = await Player.get(1)
+        player.gold = 500
+        await player.save(immediate=True)
+        assert index.rank(1) == 1 and index.rank(2) == 2
+        assert index._loaded_at == loaded_at  # no rebuild needed
+
+        await Player.delete_player(3)
+        assert index.rank(3) is None and len(index) == 2
+
+        for user_id, points in ((10, 50), (11, 70), (12, 60)):
+            await Glory(user_id, name=f"Hunter {user_id}", points=points).save()
+        assert await Glory.get_position(11) == 1
+        page = await Glory.get_page(1, per_page=2)
+        assert [glory.user_id for glory in page] == [11, 12]
+        glory = await Glory.get(10)
+        await glory.add_points(100)
+        await glory.update_rank()
+        assert (await Glory.get(10)).rank == 1
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        player_module.DATABASE_PATH = ORIGINAL_PLAYER_PATH
+        glory_module.DATABASE_PATH = ORIGINAL_GLORY_PATH
+        Player._players.clear()
+        rank_index.reset("players")
+        rank_index.reset("glory")
+    print("✅ Gold and glory ranks updated in place")
+
+
+def test_safety_rebuild_runs_in_background():
+    """A due rebuild doesn't block the lookup; the old index serves until the new one is built"""
+    print("\n⏱️ Testing background safety rebuild...")
+    path = os.path.join(tempfile.mkdtemp(), "player.db")
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE players (id INTEGER PRIMARY KEY, gold INTEGER)")
+        db.executemany("INSERT INTO players VALUES (?, ?)", [(1, 100), (2, 200)])
+
+    async def run():
+        index = RankIndex("players", "id", "gold")
+        await index.ensure_loaded(path)
+        assert index.top(2) == [(2, 200), (1, 100)]
+
+        with sqlite3.connect(path) as db:  # a write that bypassed Player.save
+            db.execute("UPDATE players SET gold = 300 WHERE id = 1")
+        index._loaded_at -= rank_index.REBUILD_INTERVAL
+        await index.ensure_loaded(path)
+        assert index.top(2) == [(2, 200), (1, 100)]  # still the old snapshot
+        refresh = index._refresh
+        await index.ensure_loaded(path)
+        assert index._refresh is refresh  # one rebuild at a time
+
+        await refresh
+        assert index.top(2) == [(1, 300), (2, 200)]
+        await close_pools()
+
+    asyncio.run(run())
+    print("✅ Stale index served while the rebuild ran")
+
+
+if __name__ == "__main__":
+    test_matches_brute_force()
+    test_player_saves_update_index()
+    test_safety_rebuild_runs_in_background()
+    print("\n🎉 All rank index tests passed!")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the compiled story mission graph and bitset availability queries
+"""
+
+import asyncio
+import random
+
+from structure.player import Player
+from structure.story_campaign import MissionGraph, StoryCampaign, StoryChapter, StoryDifficulty, StoryMission, StoryReward
+
+
+def _brute_force_available(progress, level):
+    """The per-mission rules get_available_missions used to apply one by one"""
+    available = []
+    for mission_id, mission in StoryCampaign.STORY_MISSIONS.items():
+        if level < mission.level_requirement:
+            continue
+        if all(prereq in progress and progress[prereq].get("completed", False) for prereq in mission.prerequisites):
+            available.append(mission_id)
+    return available
+
+
+def _mission(mission_id, prerequisites, level=1):
+    return StoryMission(
+        id=mission_id, name=mission_id, description="", chapter=StoryChapter.PROLOGUE,
+        difficulty=StoryDifficulty.NORMAL, level_requirement=level, prerequisites=prerequisites,
+        objectives=[], rewards=StoryReward(), enemies=[], dialogue=[]
+    )
+
+
+def test_graph_matches_per_mission_checks():
+    """Bitset availability agrees with the prerequisite walk for random progress"""
+    print("📖 Testing mission graph against per-mission checks...")
+    graph = StoryCampaign.graph()
+    position = {mission_id: bit for bit, mission_id in enumerate(graph.ids)}
+    for mission in graph.missions:
+        assert all(position[prereq] < position[mission.id] for prereq in mission.prerequisites)
+
+    rng = random.Random(11)
+    mission_ids = list(StoryCampaign.STORY_MISSIONS)
+    for _ in range(500):
+        done = rng.sample(mission_ids, rng.randrange(len(mission_ids) + 1))
+        progress = {mission_id: {"completed": True} for mission_id in done}
+        progress["unknown_mission"] = {"completed": True}
+        level = rng.randrange(1, 120)
+        completed = graph.completed_mask(progress)
+        available = [mission.id for mission in graph.select(graph.available_mask(completed, level))]
+        assert sorted(available) == sorted(_brute_force_available(progress, level))
+        assert sorted(mission.id for mission in graph.select(completed)) == sorted(done)
+    print(f"✅ 500 random progress states agree across {len(mission_ids)} missions")
+
+
+def test_campaign_queries_use_one_player_load():
+    """Story menu queries come from one cached player and its bitset"""
+    print("\n🎯 Testing campaign queries...")
+    player = Player(424242)
+    player.level = 100
+    player.story_progress = {"prologue_001": {"completed": True}}
+    Player._players[player.id] = player
+
+    async def run():
+        available = await StoryCampaign.get_available_missions(player.id)
+        completed = await StoryCampaign.get_completed_missions(player.id)
+        next_mission = await StoryCampaign.get_next_mission(player.id)
+        ok, reason = await StoryCampaign.is_mission_available(player.id, "double_dungeon_002")
+        return available, completed, next_mission, ok, reason
+
+    try:
+        available, completed, next_mission, ok, reason = asyncio.run(run())
+    finally:
+        Player._players.pop(player.id, None)
+    assert [mission.id for mission in available] == sorted(
+        _brute_force_available(player.story_progress, 100), key=StoryCampaign.graph().index.get)
+    assert [mission.id for mission in completed] == ["prologue_001"]
+    assert next_mission is not None and next_mission.id != "prologue_001"
+    assert next_mission.prerequisites in ([], ["prologue_001"])
+    assert not ok and reason.startswith("Must complete")
+    print(f"✅ {len(available)} available, next up: {next_mission.name}")
+
+
+def test_cycles_and_missing_prerequisites():
+    """Cycles are rejected; a mission with an unknown prerequisite never opens"""
+    print("\n🔁 Testing malformed graphs...")
+    try:
+        MissionGraph({"a": _mission("a", ["b"]), "b": _mission("b", ["a"])})
+    except ValueError as e:
+        assert "cycle" in str(e)
+    else:
+        raise AssertionError("cycle not detected")
+
+    graph = MissionGraph({"a": _mission("a", []), "b": _mission("b", ["ghost"])})
+    assert graph.select(graph.available_mask(graph.all_mask, 50)) == [graph.missions[0]]
+    assert graph.missing_prerequisite("b", graph.all_mask) == "ghost"
+    print("✅ Cycle rejected, orphaned mission stays locked")
+
+
+if __name__ == "__main__":
+    test_graph_matches_per_mission_checks()
+    test_campaign_queries_use_one_player_load()
+    test_cycles_and_missing_prerequisites()
+    print("\n🎉 All story graph tests passed!")
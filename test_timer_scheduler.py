@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test the heap-based timer scheduler and notification paging
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+import structure.notification_system as notification_module
+from structure.db_pool import close_pools
+from structure.notification_system import NotificationManager
+from structure.timer_scheduler import TimerScheduler
+
+ORIGINAL_PATH = notification_module.DATABASE_PATH
+
+
+def test_batches_in_due_order():
+    """Due timers come out in order, in batches, and cancelled ones never fire"""
+    print("⏰ Testing dispatch order and cancellation...")
+
+    async def run():
+        batches = []
+
+        async def dispatch(batch):
+            batches.append(batch)
+
+        scheduler = TimerScheduler("test", dispatch, batch_size=3)
+        now = time.time()
+        for key in range(10):
+            scheduler.schedule(key, now - 1 + key * 0.001, key)
+        scheduler.schedule(3, now + 0.05, 3)  # rescheduled later
+        assert scheduler.cancel(7) is True
+        assert scheduler.cancel(7) is False
+        scheduler.schedule("later", now + 3600, "later")
+
+        scheduler.start()
+        await asyncio.sleep(0.2)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+        return batches, stats
+
+    batches, stats = asyncio.run(run())
+    fired = [key for batch in batches for key in batch]
+    assert fired == [0, 1, 2, 4, 5, 6, 8, 9, 3], fired
+    assert all(len(batch) <= 3 for batch in batches)
+    assert stats["depth"] == 1 and stats["cancelled"] == 1 and stats["dispatched"] == 9
+    print(f"✅ {len(fired)} timers in {len(batches)} batches, one still queued")
+
+
+def test_wakes_for_earlier_timer():
+    """A timer added while the runner sleeps on a later one fires on time"""
+    print("\n🔔 Testing early wake-up...")
+
+    async def run():
+        fired = []
+
+        async def dispatch(batch):
+            fired.extend(batch)
+
+        scheduler = TimerScheduler("test", dispatch)
+        scheduler.start()
+        scheduler.schedule("late", time.time() + 30, "late")
+        await asyncio.sleep(0.01)
+        scheduler.schedule("soon", time.time() + 0.05, "soon")
+        await asyncio.sleep(0.2)
+        await scheduler.stop()
+        return fired
+
+    assert asyncio.run(run()) == ["soon"]
+    print("✅ Runner woke up for the earlier timer")
+
+
+def test_notifications_are_paged():
+    """Only the upcoming window of notifications is held in memory"""
+    print("\n📄 Testing notification paging...")
+    path = os.path.join(tempfile.mkdtemp(), "notifications.db")
+    now = time.time()
+    with sqlite3.connect(path) as db:
+        db.execute("""
+            CREATE TABLE notifications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+                notification_type TEXT NOT NULL, title TEXT NOT NULL, message TEXT NOT NULL,
+                scheduled_time REAL NOT NULL, created_time REAL NOT NULL, is_active INTEGER DEFAULT 1,
+                is_recurring INTEGER DEFAULT 0, recurring_interval INTEGER DEFAULT 0,
+                notification_data TEXT DEFAULT '{}', delivery_method TEXT DEFAULT 'dm')
+        """)
+        for offset in (60, 120, 86400):
+            db.execute("INSERT INTO notifications (user_id, notification_type, title, message, scheduled_time, created_time) "
+                       "VALUES (1, 'cooldown', 't', 'm', ?, ?)", (now + offset, now))
+    notification_module.DATABASE_PATH = path
+
+    async def run():
+        manager = NotificationManager(bot=None)
+        await manager.load_active_notifications()
+        assert len(manager.scheduler) == 2  # tomorrow's stays in the database
+        await manager.load_active_notifications()
+        assert len(manager.scheduler) == 2  # paging again doesn't duplicate
+        await manager.schedule_notification({"id": 99, "scheduled_time": now + 86400})
+        assert 99 not in manager.scheduler
+        manager.scheduler.cancel(1)
+        assert manager.get_queue_stats()["depth"] == 1
+        await close_pools()
+
+    try:
+        asyncio.run(run())
+    finally:
+        notification_module.DATABASE_PATH = ORIGINAL_PATH
+    print("✅ Far-future notifications wait in the database")
+
+
+def test_recurring_delivery_is_retired():
+    """A delivered recurring notification hands over to one successor row and isn't swept again"""
+    print("\n🔁 Testing recurring notification hand-over...")
+    path = os.path.join(tempfile.mkdtemp(), "notifications.db")
+    now = time.time()
+    with sqlite3.connect(path) as db:
+        db.execute("""
+            CREATE TABLE notifications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+                notification_type TEXT NOT NULL, title TEXT NOT NULL, message TEXT NOT NULL,
+                scheduled_time REAL NOT NULL, created_time REAL NOT NULL, is_active INTEGER DEFAULT 1,
+                is_recurring INTEGER DEFAULT 0, recurring_interval INTEGER DEFAULT 0,
+                notification_data TEXT DEFAULT '{}', delivery_method TEXT DEFAULT 'dm')
+        """)
+        db.execute("INSERT INTO notifications (user_id, notification_type, title, message, scheduled_time, "
+                   "created_time, is_recurring, recurring_interval) VALUES (1, 'daily_reminder', 't', 'm', ?, ?, 1, 86400)",
+                   (now - 10, now))
+    notification_module.DATABASE_PATH = path
+
+    async def run():
+        manager = NotificationManager(bot=None)
+        sent = []
+        manager.queue_delivery = lambda user_id, embed, settings, ephemeral=False: sent.append(user_id)
+        async with notification_module.db_read(path) as conn:
+            conn.row_factory = notification_module.aiosqlite.Row
+            cursor = await conn.execute("SELECT * FROM notifications")
+            row = dict(await cursor.fetchone())
+
+        await manager.deliver_batch([row])
+        await manager.notification_loop.coro(manager)  # the 5-minute missed-notification sweep
+        await close_pools()
+        return sent
+
+    try:
+        sent = asyncio.run(run())
+    finally:
+        notification_module.DATABASE_PATH = ORIGINAL_PATH
+    with sqlite3.connect(path) as db:
+        rows = db.execute("SELECT id, is_active, scheduled_time FROM notifications ORDER BY id").fetchall()
+    assert sent == [1]
+    assert len(rows) == 2
+    assert rows[0][1] == 0 and rows[1][1] == 1
+    assert abs(rows[1][2] - (now - 10 + 86400)) < 1e-6
+    print("✅ One send, one successor row")
+
+
+if __name__ == "__main__":
+    test_batches_in_due_order()
+    test_wakes_for_earlier_timer()
+    test_notifications_are_paged()
+    test_recurring_delivery_is_retired()
+    print("\n🎉 All timer scheduler tests passed!")
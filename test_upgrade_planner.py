@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test the closed-form upgrade planner against the level-by-level cost loops it replaces
+"""
+
+import random
+
+from structure import upgrade_planner
+from structure.player import Player
+
+
+def _level_cost(kind, tier, level, start_level):
+    """One level's price as perform_upgrade used to compute it"""
+    if kind == "shadow":
+        return {"tos": level * 100}
+    if kind == "hunter":
+        gear = "gear3" if tier >= 3 else "gear2" if tier >= 2 else "gear1"
+        gold = (150 * level) + ((level // 10) * 500)
+        if tier >= 3:
+            gear_cost = (8 * level) + ((level // 10) * 25)
+        elif tier >= 2:
+            gear_cost = (5 * level) + ((level // 10) * 15)
+        else:
+            gear_cost = (3 * level) + ((level // 10) * 10)
+    else:
+        gear = "gear3" if tier >= 3 or start_level >= 40 else "gear2" if tier >= 2 or start_level >= 20 else "gear1"
+        gold = 1000 + (level * 300) + ((level // 10) * 1000)
+        if tier >= 3 or level >= 40:
+            gear_cost = (12 * level) + ((level // 15) * 35)
+        elif tier >= 2 or level >= 20:
+            gear_cost = (8 * level) + ((level // 15) * 20)
+        else:
+            gear_cost = (5 * level) + ((level // 15) * 10)
+    return {"gold": gold, gear: gear_cost}
+
+
+def _loop_max(kind, tier, level, budget):
+    remaining = dict(budget)
+    levels = 0
+    while level + levels < upgrade_planner.level_cap(kind, tier):
+        cost = _level_cost(kind, tier, level + levels, level)
+        if any(remaining[resource] < amount for resource, amount in cost.items()):
+            break
+        for resource, amount in cost.items():
+            remaining[resource] -= amount
+        levels += 1
+    return levels
+
+
+def test_closed_form_matches_level_loop():
+    """Totals and max affordable levels agree with walking the levels one at a time"""
+    print("🧮 Testing closed-form upgrade costs...")
+    rng = random.Random(23)
+    checked = 0
+    for kind in ("hunter", "weapon", "shadow"):
+        for tier in range(0, 7):
+            cap = upgrade_planner.level_cap(kind, tier)
+            for level in range(1, cap + 1):
+                for levels in (0, 1, 5, cap - level):
+                    expected = {}
+                    for step in range(levels):
+                        for resource, amount in _level_cost(kind, tier, level + step, level).items():
+                            expected[resource] = expected.get(resource, 0) + amount
+                    cost = upgrade_planner.upgrade_cost(kind, tier, level, levels)
+                    assert {r: a for r, a in cost.items() if a} == {r: a for r, a in expected.items() if a}
+
+                budget = {resource: rng.choice([0, 500, 5000, 50000, 500000, 10 ** 7]) for resource in upgrade_planner.RESOURCES}
+                assert upgrade_planner.max_affordable(kind, tier, level, budget) == _loop_max(kind, tier, level, budget)
+                checked += 1
+    assert upgrade_planner.shadow_xp(3, 2) == 3000 + 4000
+    print(f"✅ {checked} items priced in closed form, identical to the per-level loop")
+
+
+def test_plan_many_shares_one_budget():
+    """Bulk plans never overspend, fill low levels first and apply in one pass"""
+    print("\n📦 Testing bulk upgrade planning...")
+    player = Player(1)
+    player.gold, player.gear1, player.gear2, player.gear3, player.tos = 60000, 400, 300, 0, 3000
+    player.hunters = {"jinwoo": {"level": 1, "tier": 0}, "chae": {"level": 12, "tier": 2}, "cha": {"level": 40, "tier": 3}}
+    player.inventory = {"dagger": {"level": 5, "tier": 1}, "s_dagger": {"level": 3}, "potion": 4}
+    player.shadows = {"igris": {"level": 5, "xp": 0}}
+
+    items = upgrade_planner.upgradeable_items(player)
+    assert sorted(item[0] for item in items) == ["cha", "chae", "dagger", "igris", "jinwoo"]
+
+    budget = upgrade_planner.budget_of(player)
+    plans, remaining = upgrade_planner.plan_many(items, budget)
+    planned = {plan.item_id: plan for plan in plans}
+    assert "cha" not in planned  # no gear3 to spend
+    assert planned["jinwoo"].target == 10  # capped by tier 0's limit-break level
+    assert all(amount >= 0 for amount in remaining.values())
+    for resource in upgrade_planner.RESOURCES:
+        spent = sum(plan.cost.get(resource, 0) for plan in plans)
+        assert spent == budget[resource] - remaining[resource]
+
+    gained = upgrade_planner.apply_plans(player, plans)
+    assert gained == sum(plan.levels for plan in plans)
+    assert player.hunters["jinwoo"]["level"] == 10 and player.inventory["dagger"]["level"] == planned["dagger"].target
+    assert player.shadows["igris"]["level"] == planned["igris"].target and player.shadows["igris"]["xp"] == 0
+    assert upgrade_planner.budget_of(player) == remaining
+
+    # Whatever is left can't buy a single further level anywhere
+    assert upgrade_planner.plan_many(upgrade_planner.upgradeable_items(player), remaining)[0] == []
+    print(f"✅ {len(plans)} items upgraded by {gained} levels from one shared budget")
+
+
+if __name__ == "__main__":
+    test_closed_form_matches_level_loop()
+    test_plan_many_shares_one_budget()
+    print("\n🎉 All upgrade planner tests passed!")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test the event-driven world boss spawn scheduler and spawn channel cache
+"""
+
+import asyncio
+import time
+
+from structure.raids import SPAWN_CHECK_INTERVAL, SPAWN_COOLDOWN, HIGH_ACTIVITY_COMMANDS, WorldBossManager
+
+
+class _Permissions:
+    def __init__(self, send_messages):
+        self.send_messages = send_messages
+
+
+class _Channel:
+    checks = 0
+
+    def __init__(self, channel_id, name, guild, writable=True):
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.writable = writable
+
+    def permissions_for(self, member):
+        _Channel.checks += 1
+        return _Permissions(self.writable)
+
+
+class _Guild:
+    def __init__(self, guild_id, names=("off-topic", "general")):
+        self.id = guild_id
+        self.name = f"Guild {guild_id}"
+        self.me = object()
+        self.text_channels = [_Channel(guild_id * 10 + i, name, self) for i, name in enumerate(names)]
+
+    def get_channel(self, channel_id):
+        return next((ch for ch in self.text_channels if ch.id == channel_id), None)
+
+
+class _Bot:
+    def __init__(self, guilds):
+        self.guilds = guilds
+        self.user = None
+
+    def get_guild(self, guild_id):
+        return next((guild for guild in self.guilds if guild.id == guild_id), None)
+
+
+def test_only_eligible_guilds_are_evaluated():
+    """Guilds on cooldown wait in the heap; a failed roll retries one interval later"""
+    print("🌍 Testing spawn scheduling...")
+    guilds = [_Guild(guild_id) for guild_id in range(1, 1001)]
+    manager = WorldBossManager(_Bot(guilds))
+    now = time.time()
+    for guild in guilds[1:]:
+        manager.last_spawn_time[guild.id] = now - 60  # spawned a minute ago
+        manager.schedule_guild(guild.id)
+    manager.schedule_guild(1, now - 1)
+
+    rolled = []
+
+    async def never_spawn(guild_id):
+        rolled.append(guild_id)
+        return False
+
+    manager.should_spawn_boss = never_spawn
+    due = manager.spawn_schedule.pop_due(time.time())
+    assert due == [1]
+    asyncio.run(manager._evaluate_due(due))
+    assert rolled == [1]
+    assert manager.spawn_schedule.due(1) >= now + SPAWN_CHECK_INTERVAL
+    assert manager.spawn_schedule.due(500) >= now - 60 + SPAWN_COOLDOWN
+    print(f"✅ 1 of {len(guilds)} guilds evaluated, the rest wait for their cooldown")
+
+
+def test_activity_brings_roll_forward():
+    """Crossing the activity threshold rolls an eligible guild immediately"""
+    print("\n📈 Testing activity-driven checks...")
+    manager = WorldBossManager(_Bot([_Guild(1)]))
+    manager.track_activity(1)
+    assert 1 in manager.spawn_schedule  # first command schedules an unseen guild
+    for _ in range(HIGH_ACTIVITY_COMMANDS):
+        manager.track_activity(1)
+    assert manager.spawn_schedule.due(1) <= time.time()
+
+    manager.active_bosses[2] = object()
+    manager.track_activity(2)
+    assert 2 not in manager.spawn_schedule  # a live boss reschedules on removal
+    print("✅ Busy guild rolled early, guild with a live boss left alone")
+
+
+def test_spawn_channel_is_cached():
+    """Channels are scanned once per guild until a channel or permission change"""
+    print("\n📍 Testing spawn channel cache...")
+    guild = _Guild(1)
+    manager = WorldBossManager(_Bot([guild]))
+    _Channel.checks = 0
+
+    channel = manager.get_spawn_channel(guild)
+    assert channel.name == "general"
+    scans = _Channel.checks
+    for _ in range(100):
+        assert manager.get_spawn_channel(guild) is channel
+    assert _Channel.checks == scans
+
+    channel.writable = False
+    asyncio.run(manager._on_channel_update(channel, channel))
+    assert manager.get_spawn_channel(guild).name == "off-topic"
+
+    for ch in guild.text_channels:
+        ch.writable = False
+    asyncio.run(manager._on_channel_update(channel, channel))
+    assert manager.get_spawn_channel(guild) is None
+    assert manager.spawn_channels[1] is None  # "no usable channel" is cached too
+    print("✅ One scan per guild, re-resolved after permission changes")
+
+
+if __name__ == "__main__":
+    test_only_eligible_guilds_are_evaluated()
+    test_activity_brings_roll_forward()
+    test_spawn_channel_is_cached()
+    print("\n🎉 All world boss spawn tests passed!")
@@ -1,6 +1,8 @@
 import aiosqlite
 import logging
 
+from structure.migrations import apply_migrations
+
 DATABASE_PATH = "data/player.db"
 
 async def setup_database():
@@ -82,46 +84,6 @@ async def setup_database():
                 )
             """)
 
-            # Add oshi_list column if it doesn't exist (for existing databases)
-            try:
-                await conn.execute("ALTER TABLE players ADD COLUMN oshi_list TEXT DEFAULT '[]'")
-                logging.info("Added oshi_list column to existing players table.")
-            except Exception:
-                # Column already exists, which is fine
-                pass
-
-            # Add ecube column if it doesn't exist (for Earth element cubes)
-            try:
-                await conn.execute("ALTER TABLE players ADD COLUMN ecube INTEGER DEFAULT 0")
-                logging.info("Added ecube column to existing players table.")
-            except Exception:
-                # Column already exists, which is fine
-                pass
-
-            # Add story_progress column if it doesn't exist (for Story Campaign System)
-            try:
-                await conn.execute("ALTER TABLE players ADD COLUMN story_progress TEXT DEFAULT '{}'")
-                logging.info("Added story_progress column to existing players table.")
-            except Exception:
-                # Column already exists, which is fine
-                pass
-
-            # Add titles column if it doesn't exist (for Title System)
-            try:
-                await conn.execute("ALTER TABLE players ADD COLUMN titles TEXT DEFAULT '{}'")
-                logging.info("Added titles column to existing players table.")
-            except Exception:
-                # Column already exists, which is fine
-                pass
-
-            # Add active_title column if it doesn't exist (for Title System)
-            try:
-                await conn.execute("ALTER TABLE players ADD COLUMN active_title TEXT DEFAULT NULL")
-                logging.info("Added active_title column to existing players table.")
-            except Exception:
-                # Column already exists, which is fine
-                pass
-
             # Create enhanced_guilds table if it doesn't exist (for Enhanced Guild System)
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS enhanced_guilds (
@@ -208,6 +170,9 @@ async def setup_database():
 
             logging.info("Database setup complete. All tables are ready.")
             await conn.commit()
+
+        # Column additions for existing databases live in structure.migrations
+        await apply_migrations("players", DATABASE_PATH)
     except Exception as e:
         logging.error(f"Failed to set up database: {e}", exc_info=True)
 
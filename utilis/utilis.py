@@ -25,7 +25,7 @@ from structure.items import ItemManager
 from structure.heroes import HeroManager
 from structure.skills import SkillManager
 from structure.shadow import Shadow
-from structure.emoji import getEmoji
+from structure.emoji import getEmoji, get_image as _get_registry_image
 
 
 async def getStatWeapon(weapon_id: str, level: int):
@@ -70,22 +70,11 @@ def get_emoji_url(emoji_str: str):
 
 def get_emoji(name: str) -> str:
     """Retrieves a custom emoji string from the emojis.json file."""
-    try:
-        with open('emojis.json', 'r') as file:
-            emojis = json.load(file)
-        return emojis.get(name, "❔")
-    except (FileNotFoundError, json.JSONDecodeError):
-        return "❔"
+    return getEmoji(name)
 
 def get_image(name: str) -> str:
     """Retrieves an image URL from the images.json file."""
-    try:
-        with open('images.json', 'r') as file:
-            images = json.load(file)
-        url = images.get(name, "https://files.catbox.moe/jvxvcr.png")
-        return validate_url(url)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return "https://files.catbox.moe/jvxvcr.png"
+    return validate_url(_get_registry_image(name))
 
 def validate_url(url: str) -> str:
     """Validates a URL and returns a safe fallback if invalid."""
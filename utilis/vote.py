@@ -1,16 +1,21 @@
-import asyncio
 import json
 import os
 import time
 import discord
 
+from structure.delivery_queue import delivery_queue
+from structure.timer_scheduler import TimerScheduler
+
 REMINDER_FILE = "vote_reminders.json"
+VOTE_COOLDOWN = 43200  # 12 hours between votes
 
 class VoteReminderManager:
     def __init__(self, bot):
         self.bot = bot
         self.reminders = {}  # user_id: (platform, timestamp)
+        self.scheduler = TimerScheduler("vote reminders", self._send_due)
         self.load_reminders()
+        self.scheduler.start()
 
     def load_reminders(self):
         if os.path.exists(REMINDER_FILE):
@@ -19,10 +24,9 @@ class VoteReminderManager:
                     data = json.load(f)
                     now = time.time()
                     for user_id, (platform, timestamp) in data.items():
-                        remaining = 43200 - (now - timestamp)
-                        if remaining > 0:
+                        if timestamp + VOTE_COOLDOWN > now:
                             self.reminders[int(user_id)] = (platform, timestamp)
-                            asyncio.create_task(self._schedule(int(user_id), remaining))
+                            self.scheduler.schedule(int(user_id), timestamp + VOTE_COOLDOWN, int(user_id))
             except Exception as e:
                 print(f"Error loading reminders: {e}")
 
@@ -39,34 +43,25 @@ class VoteReminderManager:
         now = time.time()
         self.reminders[user_id] = (platform, now)
         self.save_reminders()
-        asyncio.create_task(self._schedule(user_id, 43200))
+        self.scheduler.schedule(user_id, now + VOTE_COOLDOWN, user_id)
 
-    async def _schedule(self, user_id: int, delay: float = 43200):
-        await asyncio.sleep(delay)
-        platform, _ = self.reminders.pop(user_id, (None, None))
+    async def _send_due(self, user_ids):
+        due = [(user_id, self.reminders.pop(user_id, (None, None))[0]) for user_id in user_ids]
         self.save_reminders()
+        for user_id, platform in due:
+            embed = self._reminder_embed(platform)
+            if embed:
+                # Sent through the shared, rate-limited queue; closed DMs are simply skipped
+                delivery_queue.send_dm(user_id, embed=embed)
 
-        if platform:
-            for guild in self.bot.guilds:
-                try:
-                    user = await guild.fetch_member(user_id)
-                    if user:
-                        await self._send_reminder(user, platform)
-                        break
-                except discord.NotFound:
-                    continue
-                except discord.HTTPException:
-                    continue
-
-    async def _send_reminder(self, user, platform):
-        try:
-            if platform == "dbl":
-                embed = discord.Embed(title="Voting Reminder")
-                embed.description = "🔔 You can now vote again on [Discord Bot List](https://discordbotlist.com/bots/arise/upvote)"
-                await user.send(embed=embed)
-            elif platform == "topgg":
-                embed = discord.Embed(title="Voting Reminder")
-                embed.description = "🔔 You can now vote again on [Top.gg](https://top.gg/bot/1231157738629890118/vote)"
-                await user.send(embed=embed)
-        except discord.Forbidden:
-            pass  # User has DMs off
+    @staticmethod
+    def _reminder_embed(platform):
+        if platform == "dbl":
+            embed = discord.Embed(title="Voting Reminder")
+            embed.description = "🔔 You can now vote again on [Discord Bot List](https://discordbotlist.com/bots/arise/upvote)"
+            return embed
+        elif platform == "topgg":
+            embed = discord.Embed(title="Voting Reminder")
+            embed.description = "🔔 You can now vote again on [Top.gg](https://top.gg/bot/1231157738629890118/vote)"
+            return embed
+        return None